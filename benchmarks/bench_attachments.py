@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark for attachment text indexing
+Writes N text, HTML and JSON attachments spread over people, then times
+reading them on one process and on the worker pool, reopening the same
+files from the content-hash cache, and searching their words.
+
+Usage: python benchmarks/bench_attachments.py [files [kilobytes per file]]
+"""
+
+import sys
+import os
+import json
+import random
+import shutil
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Person
+from src.graph_store import GraphStore
+from src.attachment_index import AttachmentIndex
+
+DEFAULT_FILES = 2000
+DEFAULT_KILOBYTES = 40
+FILES_PER_PERSON = 4
+WORDS = ["shipment", "arrives", "tuesday", "warehouse", "invoice", "meeting", "harbor", "cash", "wire",
+         "transfer", "account", "contact", "phone", "address", "vehicle", "plate", "route", "payment"]
+
+
+def write_files(folder, count, kilobytes, rng):
+    paths = []
+    for number in range(count):
+        words = [rng.choice(WORDS) if rng.random() < 0.7 else f"id{rng.randint(0, 10 ** 6)}"
+                 for _ in range(kilobytes * 1024 // 8)]
+        kind = number % 3
+        if kind == 0:
+            name, text = f"note_{number}.txt", " ".join(words)
+        elif kind == 1:
+            name, text = f"page_{number}.html", "<html><body>" + "".join(f"<p>{' '.join(words[i:i + 20])}</p>" for i in range(0, len(words), 20)) + "</body></html>"
+        else:
+            name, text = f"record_{number}.json", json.dumps({"entries": [{"text": " ".join(words[i:i + 20])} for i in range(0, len(words), 20)]})
+        path = os.path.join(folder, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        paths.append(path)
+    return paths
+
+
+def index_files(paths, cache_path, processes):
+    store = GraphStore()
+    index = AttachmentIndex(store, cache_path=cache_path, processes=processes)
+    start = time.perf_counter()
+    with store.batch():
+        for i in range(0, len(paths), FILES_PER_PERSON):
+            person = Person(f"Person {i}")
+            person.files = paths[i:i + FILES_PER_PERSON]
+            store.add(person)
+    index.extractor.wait()
+    return index, time.perf_counter() - start
+
+
+def main(count=DEFAULT_FILES, kilobytes=DEFAULT_KILOBYTES):
+    rng = random.Random(9)
+    temp_dir = tempfile.mkdtemp()
+    try:
+        print(f"Writing {count} attachments of {kilobytes} KB...")
+        paths = write_files(temp_dir, count, kilobytes, rng)
+
+        for label, processes in (("1 process", 1), (f"{os.cpu_count()} processes", None)):
+            cache_path = os.path.join(temp_dir, f"cache_{processes}.sqlite3")
+            index, elapsed = index_files(paths, cache_path, processes)
+            print(f"First indexing on {label}: {elapsed:.2f} s, {index.extractor.extracted} files read")
+
+        index, elapsed = index_files(paths, cache_path, None)
+        print(f"Reopened from the cache: {elapsed:.2f} s, {index.extractor.cached} files from the cache, "
+              f"{index.extractor.extracted} read")
+
+        for query in ("warehouse", "wire trans", "id123"):
+            start = time.perf_counter()
+            found = index.search(query)
+            print(f"{query!r}: {len(found)} files in {(time.perf_counter() - start) * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark for whole-network duplicate detection
+Generates N people, a few percent of them re-entered with typos, reformatted
+phone numbers or missing fields, then times blocking and scoring on one
+process and on the full pool, and reports how many planted duplicates were
+found.
+
+Usage: python benchmarks/bench_dedup.py [people [processes]]
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Person
+from src.graph_store import GraphStore
+from src.dedup import candidate_pairs, find_duplicates, person_records
+
+DEFAULT_PEOPLE = 200_000
+DUPLICATE_SHARE = 0.02
+SYLLABLES = ["an", "ber", "car", "dan", "el", "fi", "ga", "han", "is", "jo", "ka", "li", "mar", "na",
+             "ol", "pe", "ro", "sa", "ta", "u", "vi", "wil", "ya", "zo", "son", "ton", "ley", "ette",
+             "ia", "ri", "mi", "chel", "der", "ner", "man", "sky", "ez", "ov", "ova", "berg", "stein"]
+
+
+def make_word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).title()
+
+
+def make_typo(rng, name):
+    chars = list(name)
+    i = rng.randrange(1, len(chars))
+    if rng.random() < 0.5:
+        chars[i] = rng.choice("aeiou")
+    else:
+        del chars[i]
+    return "".join(chars)
+
+
+def make_store(count, rng):
+    """People with random details, plus re-entered copies of some; returns the store and the planted pairs"""
+    firsts = [make_word(rng) for _ in range(2000)]
+    lasts = [make_word(rng) for _ in range(20000)]
+    store = GraphStore()
+    planted = []
+    with store.batch():
+        originals = []
+        for _ in range(int(count * (1 - DUPLICATE_SHARE))):
+            first, last = rng.choice(firsts), rng.choice(lasts)
+            person = Person(f"{first} {last}",
+                            dob=f"{rng.randint(1940, 2005)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                            phone=f"555-{rng.randint(0, 999):03d}-{rng.randint(0, 9999):04d}",
+                            email=f"{first}.{last}{rng.randint(1, 99)}@example.com".lower() if rng.random() < 0.5 else "")
+            originals.append(store.add(person))
+        while len(store.people) < count:
+            original = store[rng.choice(originals)]
+            year, month, day = original.dob.split("-")
+            copy = Person(make_typo(rng, original.name) if rng.random() < 0.7 else original.name,
+                          dob=f"{month}/{day}/{year}" if rng.random() < 0.7 else "",
+                          phone=original.phone.replace("-", " ") if rng.random() < 0.5 else "",
+                          email=original.email.upper())
+            planted.append((original.card_id, store.add(copy)))
+    return store, planted
+
+
+def main(count=DEFAULT_PEOPLE, processes=None):
+    rng = random.Random(11)
+    print(f"Generating {count} people...")
+    store, planted = make_store(count, rng)
+
+    start = time.perf_counter()
+    records = person_records(store)
+    pairs = candidate_pairs(records)
+    print(f"Records and blocking: {time.perf_counter() - start:.1f} s, "
+          f"{len(pairs)} candidate pairs instead of {count * (count - 1) // 2}")
+
+    for label, workers in (("1 process", 1), (f"{processes or os.cpu_count()} processes", processes)):
+        start = time.perf_counter()
+        found = find_duplicates(records, processes=workers)
+        print(f"find_duplicates on {label}: {time.perf_counter() - start:.1f} s, {len(found)} pairs")
+
+    found_pairs = {(id1, id2) for _, id1, id2, _ in found}
+    recalled = sum(1 for pair in planted if tuple(sorted(pair)) in found_pairs)
+    print(f"Planted duplicates found: {recalled} of {len(planted)}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
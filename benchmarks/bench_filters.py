@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark for attribute filters
+Builds a network of N cards with random colors, addresses and connections,
+then times filter queries answered from the attribute and search indexes,
+against checking every card in turn.
+
+Usage: python benchmarks/bench_filters.py [cards]
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Person, TextboxCard
+from src.graph_store import GraphStore
+from src.search_index import SearchIndex
+from src.filters import AttributeIndex, FilterQuery
+
+DEFAULT_CARDS = 100_000
+QUERIES = [
+    'color=red AND degree>5 AND address~"Main St" AND type=person',
+    'name~ann OR title~report',
+    'type=person NOT color=red',
+]
+STREETS = ["Main St", "Oak Ave", "Pine Rd", "Elm St", "Maple Dr", "Cedar Ln", "Lake Blvd", "Hill Ct"]
+NAMES = ["Ann", "Bob", "Carl", "Dina", "Ed", "Fay", "Gus", "Hana", "Ivan", "Jo", "Kim", "Lee"]
+
+
+def make_store(count, rng):
+    store = GraphStore()
+    with store.batch():
+        ids = []
+        for i in range(count):
+            if i % 10:
+                card = Person(f"{rng.choice(NAMES)} {rng.choice(NAMES)}son {i}",
+                              address=f"{rng.randint(1, 999)} {rng.choice(STREETS)}", color=rng.randrange(8))
+            else:
+                card = TextboxCard(f"Report {i}", "notes", color=rng.randrange(8))
+            ids.append(store.add(card))
+        for _ in range(count * 3):
+            first, second = rng.sample(ids, 2)
+            if not store.has_edge(first, second):
+                store.connect(first, second, "")
+    return store
+
+
+def scan(store, card_id):
+    """The example query checked field by field, the way a filter without indexes would"""
+    card = store[card_id]
+    return (store.type_of(card_id) == 'person' and card.color == 1 and store.degree(card_id) > 5
+            and "main st" in card.address.lower())
+
+
+def main(count=DEFAULT_CARDS):
+    rng = random.Random(5)
+    print(f"Generating {count} cards...")
+    store = make_store(count, rng)
+    attributes = AttributeIndex(store)
+
+    start = time.perf_counter()
+    attributes.ensure_built()
+    search = SearchIndex(store)
+    print(f"Index build: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for text in QUERIES:
+        query = FilterQuery(text)
+        start = time.perf_counter()
+        found = query.matches(store, attributes, search)
+        print(f"{text!r}: {len(found)} cards in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    scanned = {card_id for card_id in list(store.people) + list(store.textboxes) if scan(store, card_id)}
+    print(f"Example query by scanning every card: {len(scanned)} cards in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark for whole-board geometric passes
+Times content bounds and zoom-scaled edge endpoints over N cards: a Python loop over the card objects, compared with
+the geometry index's NumPy columns (and its pure Python fallback).
+
+Usage: python benchmarks/bench_geometry.py [count ...]
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Person
+from src.graph_store import GraphStore
+from src.card_layout import LayoutEngine
+from src.geometry_index import GeometryIndex, NUMPY_AVAILABLE
+
+DEFAULT_COUNTS = [10_000, 100_000]
+ZOOM = 0.5
+
+
+def make_store(count):
+    """A grid of person cards, each connected to its right-hand neighbour"""
+    store = GraphStore()
+    with store.batch():
+        for i in range(count):
+            card = Person(f"Person {i}", phone="555-0100" if i % 3 == 0 else "")
+            card.x = (i % 1000) * 250
+            card.y = (i // 1000) * 180
+            store.add(card)
+        for card_id in range(1, count):
+            if card_id % 1000:
+                store.connect(card_id, card_id + 1, "")
+    return store
+
+
+def loop_passes(store, layout, edges):
+    """The per-card loops the index replaces"""
+    boxes = [layout.bounds(card_id, card) for card_id, card in store.items()]
+    bounds = (min(b[0] for b in boxes), min(b[1] for b in boxes),
+              max(b[2] for b in boxes), max(b[3] for b in boxes))
+    endpoints = []
+    for id1, id2 in edges:
+        card1, card2 = store[id1], store[id2]
+        endpoints.append((card1.x * ZOOM, card1.y * ZOOM, card2.x * ZOOM, card2.y * ZOOM))
+    return bounds, len(endpoints)
+
+
+def index_passes(index, edges):
+    bounds = index.content_bounds()
+    endpoints = index.edge_endpoints(edges, ZOOM)
+    return bounds, len(endpoints)
+
+
+def timed(function, *args, repeat=5):
+    """Best wall time of several runs, in milliseconds, and the last result"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main(counts):
+    print(f"{'cards':>10} {'method':<16} {'build ms':>9} {'passes ms':>10}")
+    for count in counts:
+        store = make_store(count)
+        layout = LayoutEngine()
+        edges = [key for key, _ in store.edges()]
+        loop_ms, expected = timed(loop_passes, store, layout, edges)
+        print(f"{count:>10} {'python loops':<16} {'':>9} {loop_ms:>10.1f}")
+        for label, use_numpy in (("index (numpy)", True), ("index (python)", False)):
+            if use_numpy and not NUMPY_AVAILABLE:
+                continue
+            build_ms, index = timed(GeometryIndex, store, layout, use_numpy, repeat=1)
+            passes_ms, result = timed(index_passes, index, edges)
+            assert result[1:] == expected[1:], (label, result, expected)
+            print(f"{'':>10} {label:<16} {build_ms:>9.1f} {passes_ms:>10.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS)
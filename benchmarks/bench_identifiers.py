@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark for finding people who share an identifier
+Builds the identifier index over N people (some sharing phones, emails and
+addresses in different formats) and lists the shared groups, then times the
+nested loop it replaces on a sample and extrapolates it to N.
+
+Usage: python benchmarks/bench_identifiers.py [people]
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Person
+from src.graph_store import GraphStore
+from src.identifier_index import IdentifierIndex, identifier_keys
+
+DEFAULT_PEOPLE = 100_000
+NESTED_SAMPLE = 3_000
+STREETS = ["Main", "Oak", "Pine", "Maple", "Cedar", "Elm", "Lake", "Hill", "Park", "River"]
+
+
+def make_store(count, rng):
+    store = GraphStore()
+    with store.batch():
+        for i in range(count):
+            phone = rng.randint(0, count)  # Roughly one in three phone numbers is shared
+            house = rng.randint(1, count // 5)
+            store.add(Person(f"Person {i}",
+                             phone=f"(555) {phone // 10000:03d}-{phone % 10000:04d}" if i % 2 else f"555.{phone // 10000:03d}.{phone % 10000:04d}",
+                             email=f"user{rng.randint(0, count)}@Example.com",
+                             address=f"{house} {rng.choice(STREETS)} {'Street' if i % 3 else 'St.'}"))
+    return store
+
+
+def nested_loop(people):
+    """Every pair compared on every identifier: the approach the index replaces"""
+    keys = [set(identifier_keys(person)) for person in people]
+    shared = 0
+    for i in range(len(keys)):
+        for j in range(i + 1, len(keys)):
+            if keys[i] & keys[j]:
+                shared += 1
+    return shared
+
+
+def main(count=DEFAULT_PEOPLE):
+    rng = random.Random(5)
+    print(f"Generating {count} people...")
+    store = make_store(count, rng)
+
+    index = IdentifierIndex(store)
+    start = time.perf_counter()
+    index.build()
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    groups = index.shared_groups()
+    suggestions = index.suggestions()
+    lookup = time.perf_counter() - start
+    print(f"Index build: {build * 1000:.0f} ms; shared groups and suggestions: {lookup * 1000:.0f} ms "
+          f"({len(groups)} shared identifiers, {len(suggestions)} suggestions)")
+
+    card_id = next(iter(store))
+    start = time.perf_counter()
+    for i in range(1000):
+        store.update(card_id, phone=f"555-000-{i:04d}")
+    print(f"Phone edit with index update: {(time.perf_counter() - start):.3f} ms per edit")
+
+    sample = list(store.people.values())[:NESTED_SAMPLE]
+    start = time.perf_counter()
+    nested_loop(sample)
+    elapsed = time.perf_counter() - start
+    estimate = elapsed * (count / len(sample)) ** 2
+    print(f"Nested loop: {elapsed * 1000:.0f} ms for {len(sample)} people, about {estimate / 60:.0f} min for {count}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the cross-project library
+Writes N project archives of random people, notes and connections, each
+with an attachment the scan must not read, then times the first scan, an
+incremental rescan with one project changed, and searches, compared with
+opening every archive's data.csv to look for a name.
+
+Usage: python benchmarks/bench_library.py [projects [cards per project]]
+"""
+
+import sys
+import os
+import csv
+import io
+import random
+import shutil
+import tempfile
+import time
+import zipfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.project_io import CARD, CSV_HEADER, CONNECTIONS_HEADER, CONNECTIONS_MARKER, open_project_csv, read_project_csv
+from src.library import ProjectLibrary
+
+DEFAULT_PROJECTS = 500
+DEFAULT_CARDS = 300
+ATTACHMENT_SIZE = 256 * 1024
+QUERIES = ["smith", "alice smi", "shipment tuesday", "quill"]
+RARE_NAME = "Zed Quill"  # Planted in a few projects
+FIRSTS = ["Alice", "Bob", "Carol", "Dmitri", "Erin", "Farah", "Gustavo", "Hana", "Ivan", "Jun", "Kofi", "Lena"]
+LASTS = ["Smith", "Jones", "Okafor", "Novak", "Garcia", "Tanaka", "Ivanova", "Brown", "Silva", "Kim", "Meyer"]
+WORDS = ["shipment", "arrives", "tuesday", "warehouse", "invoice", "meeting", "harbor", "cash", "wire", "car"]
+
+
+def project_csv(cards, rng):
+    """data.csv of a random project, in the format save_data writes"""
+    f = io.StringIO()
+    writer = csv.writer(f)
+    writer.writerow(CSV_HEADER)
+    for card_id in range(1, cards + 1):
+        name = RARE_NAME if card_id == 1 and rng.random() < 0.01 else f"{rng.choice(FIRSTS)} {rng.choice(LASTS)}"
+        writer.writerow([card_id, name, '1990-01-01', '', f"{rng.randint(1, 999)} Main St",
+                         f"555-{rng.randint(0, 999):03d}-{rng.randint(0, 9999):04d}", '', '',
+                         rng.randint(0, 2000), rng.randint(0, 2000), rng.randrange(8), '["files/1_evidence.bin"]', 'person'])
+    for card_id in range(cards + 1, cards + cards // 10 + 1):
+        writer.writerow([card_id, f"Note {card_id}", " ".join(rng.choices(WORDS, k=12)), '', '', '',
+                         rng.randint(0, 2000), rng.randint(0, 2000), 0, '', 'textbox'])
+    writer.writerow([CONNECTIONS_MARKER])
+    writer.writerow(CONNECTIONS_HEADER)
+    for _ in range(cards):
+        writer.writerow([rng.randint(1, cards), rng.randint(1, cards), rng.choice(["", "knows", "paid", "brother"])])
+    return f.getvalue()
+
+
+def write_projects(folder, count, cards, rng):
+    attachment = rng.randbytes(ATTACHMENT_SIZE)
+    for number in range(count):
+        with zipfile.ZipFile(os.path.join(folder, f"case_{number:04d}.zip"), 'w', zipfile.ZIP_DEFLATED) as zipf:
+            zipf.writestr("data.csv", project_csv(cards, rng))
+            zipf.writestr("files/1_evidence.bin", attachment)
+
+
+def open_every_project(folder, name):
+    """Projects mentioning name, found the way one would without the library"""
+    found = []
+    for filename in sorted(os.listdir(folder)):
+        with zipfile.ZipFile(os.path.join(folder, filename)) as zipf, open_project_csv(zipf) as f:
+            if any(row[0] == CARD and getattr(row[2], 'name', '') == name for row in read_project_csv(f)):
+                found.append(filename)
+    return found
+
+
+def main(count=DEFAULT_PROJECTS, cards=DEFAULT_CARDS):
+    rng = random.Random(3)
+    temp_dir = tempfile.mkdtemp()
+    try:
+        folder = os.path.join(temp_dir, "projects")
+        os.makedirs(folder)
+        print(f"Writing {count} projects of {cards} people...")
+        write_projects(folder, count, cards, rng)
+
+        with ProjectLibrary(os.path.join(temp_dir, "library.sqlite3")) as library:
+            start = time.perf_counter()
+            counts = library.scan(folder)
+            print(f"First scan: {time.perf_counter() - start:.2f} s, {counts}")
+
+            start = time.perf_counter()
+            counts = library.scan(folder)
+            print(f"Rescan, nothing changed: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+            write_projects(folder, 1, cards, rng)  # Rewrites case_0000.zip
+            start = time.perf_counter()
+            counts = library.scan(folder)
+            print(f"Rescan, one project changed: {(time.perf_counter() - start) * 1000:.0f} ms, {counts}")
+
+            for query in QUERIES:
+                start = time.perf_counter()
+                hits = library.search(query)
+                projects = library.search_projects(query)
+                print(f"{query!r}: {len(hits)} cards shown, {len(projects)} projects "
+                      f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        found = open_every_project(folder, RARE_NAME)
+        print(f"Opening every project to look for {RARE_NAME!r}: {len(found)} projects in {time.perf_counter() - start:.1f} s")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
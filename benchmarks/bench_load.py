@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark for opening projects
+Saves a project of people with large photo attachments, then compares
+reading its data.csv alone, a load that extracts the whole archive and
+copies every attachment out (the earlier behavior), and a load that
+keeps the archive open and extracts files on first use, followed by
+drawing the photos of the first few people.
+
+Usage: python benchmarks/bench_load.py [people [photo MB]]
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Person
+from src.project_io import CARD, ProjectAttachments, local_path, open_project_csv, read_project_csv, write_project
+
+DEFAULT_PEOPLE = 400
+DEFAULT_PHOTO_MB = 4
+PEOPLE_ON_SCREEN = 20
+
+
+def make_project(directory, archive, count, photo_mb):
+    """Save count people with a photo each, then delete the originals"""
+    os.makedirs(directory)
+    people = {}
+    for person_id in range(1, count + 1):
+        photo = os.path.join(directory, f"person_{person_id}.jpg")
+        with open(photo, 'wb') as f:
+            f.write(b"\xff\xd8\xff\xe0" + os.urandom(photo_mb * 1024 * 1024))
+        people[person_id] = Person(f"Person {person_id}", phone=f"555-{person_id:04d}")
+        people[person_id].files = [photo]
+    write_project(archive, people, {}, {}, [])
+    shutil.rmtree(directory)
+
+
+def read_csv_only(archive, directory):
+    with zipfile.ZipFile(archive) as zipf, open_project_csv(zipf) as f:
+        for _ in read_project_csv(f):
+            pass
+
+
+def load_extract_all(archive, directory):
+    """The earlier load: extract everything, then copy each attachment out"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with zipfile.ZipFile(archive) as zipf:
+            zipf.extractall(temp_dir)
+            with open_project_csv(zipf) as f:
+                for row in read_project_csv(f):
+                    if row[0] == CARD:
+                        for zip_path, name in row[3]:
+                            shutil.copy2(os.path.join(temp_dir, zip_path), os.path.join(directory, name))
+
+
+def load_lazy(archive, directory):
+    files = ProjectAttachments(archive, directory)
+    paths = []
+    with open_project_csv(files.zipf) as f:
+        for row in read_project_csv(f):
+            if row[0] == CARD:
+                paths.extend(files.path(*ref) for ref in row[3])
+    return files, paths
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PEOPLE
+    photo_mb = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PHOTO_MB
+    temp_dir = tempfile.mkdtemp()
+    try:
+        archive = os.path.join(temp_dir, "case.zip")
+        make_project(os.path.join(temp_dir, "photos"), archive, count, photo_mb)
+        size = os.path.getsize(archive) / 1024 / 1024
+        print(f"{count} people with a {photo_mb} MB photo each, {size:.0f} MB archive")
+        loaded = os.path.join(temp_dir, "loaded")
+        for label, load in (("reading data.csv alone", read_csv_only),
+                            ("extracting everything", load_extract_all)):
+            os.makedirs(loaded)
+            elapsed, _ = timed(load, archive, loaded)
+            print(f"{label}: {elapsed:.2f} s")
+            shutil.rmtree(loaded)
+
+        os.makedirs(loaded)
+        elapsed, (files, paths) = timed(load_lazy, archive, loaded)
+        print(f"extracting on first use: {elapsed:.2f} s, {files.pending} files left in the archive")
+        elapsed, _ = timed(lambda: [local_path(path) for path in paths[:PEOPLE_ON_SCREEN]])
+        print(f"  then the photos of {PEOPLE_ON_SCREEN} people on screen: {elapsed:.2f} s")
+        files.close()
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
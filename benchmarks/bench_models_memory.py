@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the card models
+Measures the heap used by N cards with tracemalloc, compared with the
+previous dict-backed layout of the same fields.
+
+Usage: python benchmarks/bench_models_memory.py [count ...]
+"""
+
+import sys
+import os
+import gc
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Person, TextboxCard
+
+DEFAULT_COUNTS = [10_000, 100_000, 1_000_000]
+
+
+class DictPerson:
+    """The previous Person layout: instance __dict__ plus per-card containers"""
+    def __init__(self, name, dob="", alias="", address="", phone="", ssn="", email="", color=0):
+        self.name = name
+        self.dob = dob
+        self.alias = alias
+        self.address = address
+        self.phone = phone
+        self.ssn = ssn
+        self.email = email
+        self.x = 0
+        self.y = 0
+        self.color = color
+        self.connections = {}
+        self.files = []
+
+
+def make_people(cls, count):
+    """Build cards resembling a bulk import: names and a phone, most fields empty"""
+    cards = {}
+    for i in range(count):
+        card = cls(f"Person {i}", phone="555-0100" if i % 3 == 0 else "", color=i % 8)
+        card.x = (i % 1000) * 250
+        card.y = (i // 1000) * 180
+        # Cards get base coordinates once they are drawn
+        card.base_x = card.x
+        card.base_y = card.y
+        cards[i] = card
+    return cards
+
+
+def make_textboxes(count):
+    return {i: TextboxCard(f"Note {i}", "") for i in range(count)}
+
+
+def measure(factory, *args):
+    """Return (bytes allocated and still live, object count) for factory(*args)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = factory(*args)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    count = len(result)
+    del result
+    gc.collect()
+    return after - before, count
+
+
+def main(counts):
+    print(f"{'cards':>10} {'model':<14} {'total MiB':>10} {'bytes/card':>11}")
+    for count in counts:
+        rows = [
+            ("Person", measure(make_people, Person, count)),
+            ("dict Person", measure(make_people, DictPerson, count)),
+            ("TextboxCard", measure(make_textboxes, count)),
+        ]
+        for label, (used, n) in rows:
+            print(f"{n:>10} {label:<14} {used / 2**20:>10.1f} {used / n:>11.0f}")
+        slots, legacy = rows[0][1][0], rows[1][1][0]
+        print(f"{'':>10} slots save {100 * (1 - slots / legacy):.0f}% over the dict layout\n")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark for project databases
+Saves a large network of people spread over the canvas, connected in
+chains, as a ZIP archive and as a project database, then compares
+reading the whole data.csv with opening the database: the totals and the
+cards around the view, the cards a pan of one screen brings in, then the
+rest page by page.
+
+Usage: python benchmarks/bench_project_db.py [people]
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Person
+from src.project_io import open_project_csv, read_project_csv, write_project
+from src.project_db import PAGE_MARGIN, ProjectDatabase, write_project_db
+
+DEFAULT_PEOPLE = 200000
+SPACING = 400  # Canvas units between neighbouring people
+VIEW = (1600, 1000)  # Canvas size at 100% zoom
+
+
+def make_people(count):
+    """People on a square grid, each connected to the next"""
+    side = int(count ** 0.5) + 1
+    people = {}
+    for person_id in range(1, count + 1):
+        person = Person(f"Person {person_id}", phone=f"555-{person_id % 10000:04d}")
+        person.x, person.y = (person_id % side) * SPACING, (person_id // side) * SPACING
+        people[person_id] = person
+    edges = [((person_id, person_id + 1), "knows") for person_id in range(1, count)]
+    return people, edges
+
+
+def read_zip(archive):
+    with zipfile.ZipFile(archive) as zipf, open_project_csv(zipf) as f:
+        return sum(1 for _ in read_project_csv(f))
+
+
+def view_rect(x, y):
+    return (x - VIEW[0] / 2 - PAGE_MARGIN, y - VIEW[1] / 2 - PAGE_MARGIN,
+            x + VIEW[0] / 2 + PAGE_MARGIN, y + VIEW[1] / 2 + PAGE_MARGIN)
+
+
+def open_view(path):
+    """Totals, then the cards and connections around the middle of the network"""
+    project = ProjectDatabase(path)
+    project.counts()
+    first = project.cards_in(*view_rect(*project.view))
+    project.edges_in(*view_rect(*project.view))
+    return project, {row[1] for row in first}
+
+
+def pan(project, loaded):
+    """The cards one screen to the right not loaded yet, and their connections to loaded cards"""
+    x, y = project.view
+    added = {row[1] for row in project.cards_in(*view_rect(x + VIEW[0], y)) if row[1] not in loaded}
+    loaded |= added
+    project.edges_of(added)
+    return added
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PEOPLE
+    temp_dir = tempfile.mkdtemp()
+    try:
+        people, edges = make_people(count)
+        middle = people[count // 2]
+        archive = os.path.join(temp_dir, "case.zip")
+        database = os.path.join(temp_dir, "case.comrade")
+        print(f"{count} people, {len(edges)} connections")
+
+        elapsed, _ = timed(write_project, archive, people, {}, {}, edges)
+        print(f"saving as ZIP: {elapsed:.2f} s, {os.path.getsize(archive) / 1024 / 1024:.0f} MB")
+        elapsed, _ = timed(write_project_db, database, people, {}, {}, edges, (middle.x, middle.y))
+        print(f"saving as database: {elapsed:.2f} s, {os.path.getsize(database) / 1024 / 1024:.0f} MB")
+
+        elapsed, rows = timed(read_zip, archive)
+        print(f"reading the whole ZIP: {elapsed:.2f} s, {rows} rows")
+        elapsed, (project, first) = timed(open_view, database)
+        print(f"opening the database at its view: {elapsed * 1000:.1f} ms, {len(first)} cards")
+        elapsed, added = timed(pan, project, first)
+        print(f"  panning one screen: {elapsed * 1000:.1f} ms, {len(added)} cards")
+        elapsed, pages = timed(lambda: [len(page) for page in project.pages(skip=first)])
+        print(f"  then the rest: {elapsed:.2f} s in {len(pages)} pages,"
+              f" {elapsed / len(pages) * 1000:.1f} ms a page")
+        project.close()
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
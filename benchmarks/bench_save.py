@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark for saving projects
+Saves a project whose people share a few attachment names, at growing
+file counts, to show the time per file stays flat, then one large
+attachment with tracemalloc running to show the memory a save takes does
+not depend on the size of the files, then a photo-heavy project saved
+with the compression policy against deflating every file on one thread.
+
+Usage: python benchmarks/bench_save.py [files [large file MB [photos]]]
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import zipfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Person
+from src.project_io import write_project
+
+DEFAULT_FILES = 20000
+DEFAULT_LARGE_MB = 256
+DEFAULT_PHOTOS = 200
+PHOTO_SIZE = 3 * 1024 * 1024
+LOG_SIZE = 1024 * 1024
+FILES_PER_PERSON = 4
+FILE_NAMES = ["scan.pdf", "notes.txt", "photo.jpg"]  # Few names, so most need a counter
+
+
+def make_people(directory, files):
+    """People holding files small attachments, several with the same name"""
+    people = {}
+    for number in range(files):
+        folder = os.path.join(directory, str(number % 50))
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{number}_{FILE_NAMES[number % len(FILE_NAMES)]}")
+        with open(path, 'wb') as f:
+            f.write(os.urandom(256))
+        person_id = number // FILES_PER_PERSON + 1
+        if person_id not in people:
+            people[person_id] = Person(f"Person {person_id}")
+            people[person_id].files = []
+        people[person_id].files.append(path)
+    return people
+
+
+def make_photo_project(directory, photos):
+    """People each holding a photo (random bytes behind a JPEG header) and a text log"""
+    os.makedirs(directory)
+    people = {}
+    for number in range(photos):
+        photo = os.path.join(directory, f"{number}.jpg")
+        with open(photo, 'wb') as f:
+            f.write(b"\xff\xd8\xff\xe0" + os.urandom(PHOTO_SIZE))
+        log = os.path.join(directory, f"{number}.log")
+        with open(log, 'wb') as f:
+            f.write(f"{number} called the warehouse about the shipment\n".encode() * (LOG_SIZE // 48))
+        people[number + 1] = Person(f"Person {number + 1}")
+        people[number + 1].files = [photo, log]
+    return people
+
+
+def deflate_everything(archive, people):
+    """The previous save: every attachment deflated in turn on the calling thread"""
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for person_id, person in people.items():
+            for path in person.files:
+                zipf.write(path, f"files/{person_id}_{os.path.basename(path)}")
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_FILES
+    large_mb = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_LARGE_MB
+    temp_dir = tempfile.mkdtemp()
+    try:
+        people = make_people(os.path.join(temp_dir, "files"), files)
+        archive = os.path.join(temp_dir, "case.zip")
+        for count in (files // 4, files // 2, files):
+            subset = {person_id: person for person_id, person in people.items()
+                      if person_id <= count // FILES_PER_PERSON}
+            start = time.perf_counter()
+            stored = write_project(archive, subset, {}, {}, [])
+            elapsed = time.perf_counter() - start
+            print(f"{stored} files saved in {elapsed:.2f} s ({elapsed / stored * 1e6:.0f} us per file)")
+
+        large = os.path.join(temp_dir, "evidence.bin")
+        with open(large, 'wb') as f:
+            for _ in range(large_mb):
+                f.write(os.urandom(1024 * 1024))
+        person = Person("Evidence holder")
+        person.files = [large]
+        tracemalloc.start()
+        start = time.perf_counter()
+        write_project(archive, {1: person}, {}, {}, [])
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{large_mb} MB attachment saved in {elapsed:.2f} s, peak Python memory {peak / 1024 / 1024:.1f} MB")
+        os.remove(large)
+
+        photos = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_PHOTOS
+        people = make_photo_project(os.path.join(temp_dir, "photos"), photos)
+        start = time.perf_counter()
+        deflate_everything(archive, people)
+        before = time.perf_counter() - start
+        start = time.perf_counter()
+        write_project(archive, people, {}, {}, [])
+        after = time.perf_counter() - start
+        print(f"{photos} photos and logs: deflating everything {before:.2f} s,"
+              f" with the compression policy {after:.2f} s ({before / after:.1f}x, {os.cpu_count()} CPUs)")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the full-text search index
+Builds the index over N cards (people plus textbox notes), then times
+find-as-you-type queries, one character at a time, and incremental edits.
+
+Usage: python benchmarks/bench_search.py [cards [notes_mib]]
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Person, TextboxCard
+from src.graph_store import GraphStore
+from src.search_index import SearchIndex
+
+DEFAULT_CARDS = 100_000
+DEFAULT_NOTES_MIB = 64
+FIRST_NAMES = ["james", "mary", "john", "patricia", "robert", "jennifer", "michael", "linda",
+               "william", "elizabeth", "david", "barbara", "richard", "susan", "joseph", "jessica"]
+QUERIES = ["johnson", "main street", "harbour meeting", "jenifer", "555 0123", "s t u"]
+
+
+def make_words(rng, count):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(count)]
+
+
+def make_store(cards, notes_mib, rng):
+    """People with names and addresses, plus a fifth as many notes holding notes_mib of text"""
+    words = make_words(rng, 50_000) + ["harbour", "meeting", "johnson", "street"]
+    surnames = make_words(rng, 20_000) + ["johnson"]
+    note_count = cards // 5
+    note_words = max(1, notes_mib * 2**20 // (note_count * 7))
+    store = GraphStore()
+    with store.batch():
+        for i in range(cards - note_count):
+            store.add(Person(f"{rng.choice(FIRST_NAMES).title()} {rng.choice(surnames).title()}",
+                             address=f"{rng.randint(1, 999)} {rng.choice(words).title()} Street",
+                             phone=f"555-{rng.randint(0, 9999):04d}"))
+        for i in range(note_count):
+            store.add(TextboxCard(f"Note {i}", " ".join(rng.choices(words, k=note_words))))
+    return store
+
+
+def timed(function, *args, repeat=5):
+    """Best wall time of several runs, in milliseconds, and the last result"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main(cards=DEFAULT_CARDS, notes_mib=DEFAULT_NOTES_MIB):
+    rng = random.Random(7)
+    print(f"Generating {cards} cards with about {notes_mib} MiB of notes...")
+    store = make_store(cards, notes_mib, rng)
+    build_ms, index = timed(SearchIndex, store, repeat=1)
+    print(f"Index build: {build_ms / 1000:.1f} s for {len(index)} documents\n")
+
+    print(f"{'query as typed':<22} {'hits':>6} {'worst ms':>9}")
+    for query in QUERIES:
+        worst, hits = 0.0, []
+        for end in range(1, len(query) + 1):
+            ms, hits = timed(index.search, query[:end])
+            worst = max(worst, ms)
+        print(f"{query:<22} {len(hits):>6} {worst:>9.2f}")
+
+    # Incremental edits re-index only the changed card
+    card_id = next(iter(store))
+    start = time.perf_counter()
+    for i in range(1000):
+        store.update(card_id, name=f"Renamed {i}")
+    print(f"\nRename with index update: {(time.perf_counter() - start):.3f} ms per edit")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
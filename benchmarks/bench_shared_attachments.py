@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark for attachments shared between people
+Attaches a handful of evidence files to many people each, then compares
+the earlier layout (a copy per person under files/, loaded by extracting
+the whole archive and copying every file out) with content-addressed
+blobs extracted once each: archive size, save time and load time.
+
+Usage: python benchmarks/bench_shared_attachments.py [people [files]]
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Person
+from src.project_io import CARD, ProjectAttachments, open_project_csv, read_project_csv, write_project
+
+DEFAULT_PEOPLE = 300
+DEFAULT_FILES = 10
+FILE_SIZE = 1024 * 1024
+FILES_PER_PERSON = 3
+
+
+def make_people(directory, count, files):
+    """People each holding a few of the same evidence photos"""
+    os.makedirs(directory)
+    evidence = []
+    for number in range(files):
+        path = os.path.join(directory, f"evidence_{number}.jpg")
+        with open(path, 'wb') as f:
+            f.write(b"\xff\xd8\xff\xe0" + os.urandom(FILE_SIZE))
+        evidence.append(path)
+    people = {}
+    for person_id in range(1, count + 1):
+        people[person_id] = Person(f"Person {person_id}")
+        people[person_id].files = [evidence[(person_id + shift) % files] for shift in range(FILES_PER_PERSON)]
+    return people
+
+
+def save_copies(archive, people):
+    """The earlier layout: every person's files copied in under their own names"""
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for person_id, person in people.items():
+            for path in person.files:
+                zipf.write(path, f"files/{person_id}_{os.path.basename(path)}", zipfile.ZIP_STORED)
+
+
+def load_copies(archive, directory):
+    """The earlier load: extract everything, then copy each person's files out"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with zipfile.ZipFile(archive) as zipf:
+            zipf.extractall(temp_dir)
+        for name in os.listdir(os.path.join(temp_dir, "files")):
+            shutil.copy2(os.path.join(temp_dir, "files", name), os.path.join(directory, name))
+
+
+def load_shared(archive, directory):
+    """Load, then extract every attached file as if each were opened"""
+    files = ProjectAttachments(archive, directory)
+    with open_project_csv(files.zipf) as f:
+        for row in read_project_csv(f):
+            if row[0] == CARD:
+                for ref in row[3]:
+                    files.path(*ref)
+    files.fetch_all()
+    files.close()
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PEOPLE
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_FILES
+    temp_dir = tempfile.mkdtemp()
+    try:
+        people = make_people(os.path.join(temp_dir, "evidence"), count, files)
+        print(f"{count} people sharing {files} files of {FILE_SIZE // 1024} KB, {FILES_PER_PERSON} each")
+        for label, save, load in (("copy per person", save_copies, load_copies),
+                                  ("shared blobs", lambda archive, people: write_project(archive, people, {}, {}, []),
+                                   load_shared)):
+            archive = os.path.join(temp_dir, "case.zip")
+            loaded = os.path.join(temp_dir, "loaded")
+            os.makedirs(loaded)
+            save_time = timed(save, archive, people)
+            load_time = timed(load, archive, loaded)
+            size = os.path.getsize(archive) / 1024 / 1024
+            print(f"{label}: {size:.0f} MB archive, saved in {save_time:.2f} s, loaded in {load_time:.2f} s,"
+                  f" {len(os.listdir(loaded))} files extracted")
+            os.remove(archive)
+            shutil.rmtree(loaded)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
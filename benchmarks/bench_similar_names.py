@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the similar-name check run when a person is added
+Compares utils.find_similar_names (one SequenceMatcher ratio per existing
+person) with the maintained NameIndex, and checks that both give the same
+answer for every query.
+
+Usage: python benchmarks/bench_similar_names.py [count ...]
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Person
+from src.graph_store import GraphStore
+from src.name_index import NameIndex, NUMPY_AVAILABLE
+from src.utils import find_similar_names
+
+DEFAULT_COUNTS = [10_000, 40_000]
+QUERY_COUNT = 12
+SYLLABLES = ["an", "ber", "car", "dan", "el", "fi", "ga", "han", "is", "jo", "ka", "li", "mar", "na",
+             "ol", "pe", "ro", "sa", "ta", "u", "vi", "wil", "ya", "zo", "son", "ton", "ley", "ette",
+             "ia", "ri", "mi", "chel", "der", "ner", "man", "sky", "ez", "ov", "ova", "berg", "stein"]
+
+
+def make_word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).title()
+
+
+def make_typo(rng, name):
+    chars = list(name)
+    for _ in range(rng.randint(1, 2)):
+        i = rng.randrange(len(chars))
+        edit = rng.random()
+        if edit < 0.33:
+            chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        elif edit < 0.66 and len(chars) > 1:
+            del chars[i]
+        else:
+            chars.insert(i, rng.choice("abcdefghijklmnopqrstuvwxyz"))
+    return "".join(chars)
+
+
+def make_queries(rng, names):
+    """Misspelt existing names, exact duplicates and names nobody has"""
+    queries = [make_typo(rng, rng.choice(names)) for _ in range(QUERY_COUNT // 2)]
+    queries += [rng.choice(names) for _ in range(QUERY_COUNT // 6)]
+    while len(queries) < QUERY_COUNT:
+        queries.append(f"{make_word(rng)} {make_word(rng)}")
+    return queries
+
+
+def timed_queries(function, queries):
+    """Mean and worst milliseconds per query, and the answers"""
+    times, answers = [], []
+    for query in queries:
+        start = time.perf_counter()
+        answers.append(function(query))
+        times.append((time.perf_counter() - start) * 1000)
+    return sum(times) / len(times), max(times), answers
+
+
+def main(counts):
+    rng = random.Random(3)
+    firsts = [make_word(rng) for _ in range(800)]
+    lasts = [make_word(rng) for _ in range(6000)]
+    print(f"{'people':>8} {'method':<16} {'mean ms':>9} {'worst ms':>9} {'build ms':>9}")
+    for count in counts:
+        store = GraphStore()
+        with store.batch():
+            for _ in range(count):
+                store.add(Person(f"{rng.choice(firsts)} {rng.choice(lasts)}"))
+        names = [person.name for person in store.people.values() if person.name and person.name.strip()]
+        queries = make_queries(rng, names)
+
+        mean, worst, expected = timed_queries(lambda query: find_similar_names(query, names), queries)
+        print(f"{count:>8} {'linear scan':<16} {mean:>9.1f} {worst:>9.1f}")
+        for label, use_numpy in (("index (numpy)", True), ("index (python)", False)):
+            if use_numpy and not NUMPY_AVAILABLE:
+                continue
+            index = NameIndex(store, use_numpy=use_numpy)
+            start = time.perf_counter()
+            index.build()
+            build_ms = (time.perf_counter() - start) * 1000
+
+            def lookup(query):
+                card_id = index.find_similar(query)
+                return None if card_id is None else store[card_id].name.strip().lower()
+
+            mean, worst, answers = timed_queries(lookup, queries)
+            assert answers == expected, (label, list(zip(queries, answers, expected)))
+            print(f"{'':>8} {label:<16} {mean:>9.1f} {worst:>9.1f} {build_ms:>9.1f}")
+        print()
+    print("Both methods returned the same match for every query")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS)
@@ -1,2 +1,2 @@
-python -m PyInstaller --onefile --windowed --icon=assets/group.ico --hidden-import="PIL" --hidden-import="PIL.Image" --hidden-import="PIL.ImageDraw" --hidden-import="PIL.ImageFont" --hidden-import="requests" --hidden-import="src.models" --hidden-import="src.dialogs" --hidden-import="src.constants" --hidden-import="src.canvas_helpers" --hidden-import="src.data_management" --hidden-import="src.event_handlers" --hidden-import="src.ui_setup" --hidden-import="src.utils" main.py
+python -m PyInstaller --onefile --windowed --icon=assets/group.ico --hidden-import="PIL" --hidden-import="PIL.Image" --hidden-import="PIL.ImageDraw" --hidden-import="PIL.ImageFont" --hidden-import="requests" --hidden-import="src.models" --hidden-import="src.dialogs" --hidden-import="src.constants" --hidden-import="src.canvas_helpers" --hidden-import="src.data_management" --hidden-import="src.event_handlers" --hidden-import="src.ui_setup" --hidden-import="src.utils" --hidden-import="src.view_animation" --hidden-import="src.render_backend" --hidden-import="src.card_layout" --hidden-import="src.graph_store" --hidden-import="src.change_tracking" --hidden-import="src.undo" --hidden-import="src.clipboard" --hidden-import="src.geometry_index" --hidden-import="src.focus" --hidden-import="src.search_index" --hidden-import="src.name_index" --hidden-import="src.dedup" --hidden-import="src.identifier_index" --hidden-import="src.filters" --hidden-import="src.project_io" --hidden-import="src.library" --hidden-import="src.attachment_index" --hidden-import="src.project_db" main.py
 python rename_output.py
\ No newline at end of file
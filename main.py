@@ -4,7 +4,7 @@ import csv
 import math
 from datetime import datetime
 import os
-from collections import defaultdict
+from collections import defaultdict, Counter
 import logging
 import zipfile
 import shutil
@@ -13,6 +13,7 @@ import json
 import urllib.request
 import urllib.error
 import threading
+import multiprocessing
 from functools import lru_cache
 
 # Try to import PIL for PNG export functionality
@@ -25,12 +26,25 @@ except ImportError:
 # Import from supporting modules
 from src.constants import COLORS, CARD_COLORS
 from src.models import Person, TextboxCard, LegendCard
-from src.dialogs import PersonDialog, TextboxDialog, LegendDialog, ConnectionLabelDialog, VersionUpdateDialog, NoUpdateDialog
-from src.utils import setup_logging, darken_color, find_similar_names
+from src.dialogs import PersonDialog, TextboxDialog, LegendDialog, ConnectionLabelDialog, VersionUpdateDialog, NoUpdateDialog, DuplicateReviewDialog, SharedIdentifierDialog, LibraryDialog
+from src.utils import setup_logging, darken_color
 from src.ui_setup import UISetup
 from src.event_handlers import EventHandlers
 from src.data_management import DataManagement
 from src.canvas_helpers import CanvasHelpers
+from src.view_animation import ViewAnimator
+from src.graph_store import GraphStore
+from src.change_tracking import ChangeTracker
+from src.undo import UndoJournal
+from src.geometry_index import GeometryIndex
+from src.focus import FocusMode
+from src.search_index import SearchIndex
+from src.filters import AttributeIndex, FilterMode
+from src.name_index import NameIndex
+from src.attachment_index import AttachmentIndex
+from src.identifier_index import IdentifierIndex, connect_shared
+from src.library import DEFAULT_LIBRARY_PATH
+from src.dedup import person_record, person_records, find_duplicates, choose_kept, merge_people
 
 # Initialize logging
 setup_logging()
@@ -47,9 +61,10 @@ class ConnectionApp:
         self.root.configure(bg=COLORS['background'])
         
         # Data structures
-        self.people = {}  # {id: Person}
-        self.textboxes = {}  # {id: TextboxCard}
-        self.legends = {}  # {id: LegendCard}
+        self.store = GraphStore()  # Owns all cards and allocates ids
+        self.people = self.store.people  # Read-only {id: Person} view
+        self.textboxes = self.store.textboxes  # Read-only {id: TextboxCard} view
+        self.legends = self.store.legends  # Read-only {id: LegendCard} view
         self.person_widgets = {}  # {id: canvas_item_id}
         self.textbox_widgets = {}  # {id: canvas_item_id}
         self.legend_widgets = {}  # {id: canvas_item_id}
@@ -63,7 +78,6 @@ class ConnectionApp:
         self.base_image_cache = {}   # {image_path: PIL.Image} - original PIL images
         self.current_scale = 1.0     # Track current zoom level
         self.max_cache_size = 50     # Limit cache size to prevent memory issues
-        self.zoom_debounce_timer = None  # Timer for debouncing zoom events
         
         self.selected_person = None
         self.selected_textbox = None
@@ -74,12 +88,26 @@ class ConnectionApp:
         self.connecting = False
         self.connection_start = None
         self.temp_line = None
-        self.next_id = 1
         
         # Initialize helpers first, as UI setup depends on them
         self.events = EventHandlers(self)
         self.data = DataManagement(self)
         self.canvas_helpers = CanvasHelpers(self)
+        self.view_animator = ViewAnimator(self)
+        self.changes = ChangeTracker(self)
+        self.undo = UndoJournal(self)
+        self.geometry = GeometryIndex(self.store, self.canvas_helpers.layout)
+        self.search = SearchIndex(self.store, schedule=lambda step: self.root.after(1, step))
+        self.names = NameIndex(self.store)
+        self.identifiers = IdentifierIndex(self.store)
+        self.attributes = AttributeIndex(self.store)
+        self.attachments = AttachmentIndex(self.store)  # Reads attached text files in the background
+        self.library_path = DEFAULT_LIBRARY_PATH  # Search index of the projects in a folder
+
+        # The canvas follows the store: every change redraws only what it touched
+        self.store.subscribe(self.canvas_helpers.on_store_event)
+        self.focus = FocusMode(self)
+        self.filter = FilterMode(self)
 
         logger.info("Setting up UI")
         self.ui = UISetup(self)
@@ -96,47 +124,11 @@ class ConnectionApp:
     
     def refresh_person_widget(self, person_id):
         """Refresh a person's widget on the canvas"""
-        # Don't refresh during zoom operations to avoid double-scaling
-        if hasattr(self.events, '_zooming') and self.events._zooming:
-            return
-            
-        logger.info(f"Refreshing widget for person {person_id}")
-        
-        # Remove the old widget from the canvas
-        if person_id in self.person_widgets:
-            for item in self.person_widgets[person_id]:
-                self.canvas.delete(item)
-            del self.person_widgets[person_id]
-        
-        # Re-create the widget with the current zoom level
-        zoom = self.events.last_zoom
-        self.canvas_helpers.create_person_widget(person_id, zoom)
-        
-        # Redraw connections to ensure they are correctly positioned
-        self.canvas_helpers.update_connections()
-        logger.info(f"Widget for person {person_id} refreshed")
+        self.canvas_helpers.refresh_card_widget(person_id)
 
     def refresh_textbox_widget(self, textbox_id):
         """Refresh a textbox's widget on the canvas"""
-        # Don't refresh during zoom operations to avoid double-scaling
-        if hasattr(self.events, '_zooming') and self.events._zooming:
-            return
-            
-        logger.info(f"Refreshing widget for textbox {textbox_id}")
-        
-        # Remove the old widget from the canvas
-        if textbox_id in self.textbox_widgets:
-            for item in self.textbox_widgets[textbox_id]:
-                self.canvas.delete(item)
-            del self.textbox_widgets[textbox_id]
-        
-        # Re-create the widget with the current zoom level
-        zoom = self.events.last_zoom
-        self.canvas_helpers.create_textbox_widget(textbox_id, zoom)
-        
-        # Redraw connections to ensure they are correctly positioned
-        self.canvas_helpers.update_connections()
-        logger.info(f"Widget for textbox {textbox_id} refreshed")
+        self.canvas_helpers.refresh_card_widget(textbox_id)
 
     def add_person(self):
         logger.info("Add person button clicked")
@@ -150,12 +142,11 @@ class ConnectionApp:
             person.files = files  # Set files after creation
             
             # Check for similar names before creating the person
-            existing_names = [p.name for p in self.people.values() if p.name and p.name.strip()]
-            similar_name = find_similar_names(person.name, existing_names)
+            similar_id = self.names.find_similar(person.name)
             
-            if similar_name:
+            if similar_id is not None:
                 # Show confirmation dialog
-                original_name = next(p.name for p in self.people.values() if p.name and p.name.strip().lower() == similar_name.lower())
+                original_name = self.people[similar_id].name
                 confirm = messagebox.askyesno(
                     "Similar Name Detected",
                     f'This card has a similar title to "{original_name}". Are you sure you\'d like to continue?'
@@ -164,19 +155,12 @@ class ConnectionApp:
                     logger.info("User cancelled person creation due to similar name")
                     return
             
-            person_id = self.next_id
-            self.next_id += 1
-            logger.info(f"Creating person with ID {person_id}: {person.name}")
-            
             # Always place new person card at (500, 500)
             person.x = 500
             person.y = 500
-            logger.info(f"Positioned person at (500, 500)")
             
-            self.people[person_id] = person
-            logger.info(f"Added person to data structure. Total people: {len(self.people)}")
-            self.canvas_helpers.create_person_widget(person_id)
-            logger.info(f"Created widget for person {person_id}")
+            person_id = self.store.add(person)
+            logger.info(f"Created person with ID {person_id}: {person.name} at (500, 500). Total people: {len(self.people)}")
         else:
             logger.info("Dialog was cancelled")
             
@@ -187,19 +171,12 @@ class ConnectionApp:
         logger.info(f"Dialog result: {dialog.result}")
         if dialog.result:
             textbox = TextboxCard(**dialog.result)
-            textbox_id = self.next_id
-            self.next_id += 1
-            logger.info(f"Creating textbox with ID {textbox_id}: {textbox.title}")
-            
             # Always place new textbox card at (500, 500)
             textbox.x = 500
             textbox.y = 500
-            logger.info(f"Positioned textbox at (500, 500)")
             
-            self.textboxes[textbox_id] = textbox
-            logger.info(f"Added textbox to data structure. Total textboxes: {len(self.textboxes)}")
-            self.canvas_helpers.create_textbox_widget(textbox_id)
-            logger.info(f"Created widget for textbox {textbox_id}")
+            textbox_id = self.store.add(textbox)
+            logger.info(f"Created textbox with ID {textbox_id}: {textbox.title} at (500, 500). Total textboxes: {len(self.textboxes)}")
         else:
             logger.info("Dialog was cancelled")
 
@@ -218,9 +195,6 @@ class ConnectionApp:
         else:
             # Create a new legend since none exists
             legend = LegendCard(title="Legend", color_entries={})
-            legend_id = self.next_id
-            self.next_id += 1
-            logger.info(f"Creating new legend with ID {legend_id}")
             
             # Position using box layout (offset from people and textboxes)
             cols = 2
@@ -228,15 +202,13 @@ class ConnectionApp:
             row_height = 200
             start_x = 200
             start_y = 120
-            total_cards = len(self.people) + len(self.textboxes) + len(self.legends)
+            total_cards = len(self.store)
             row = total_cards // cols
             col = total_cards % cols
             legend.x = start_x + col * col_width
             legend.y = start_y + row * row_height
-            logger.info(f"Positioned legend at ({legend.x}, {legend.y})")
-            
-            self.legends[legend_id] = legend
-            self.canvas_helpers.create_legend_widget(legend_id)
+            legend_id = self.store.add(legend)
+            logger.info(f"Created new legend with ID {legend_id} at ({legend.x}, {legend.y})")
         
         # Open dialog to edit the legend
         dialog = LegendDialog(self.root, "Edit Legend Card", 
@@ -246,245 +218,94 @@ class ConnectionApp:
         logger.info(f"Dialog result: {dialog.result}")
         
         if dialog.result:
-            # Update the existing legend
-            legend.title = dialog.result['title']
-            legend.color_entries = dialog.result['color_entries']
-            
-            # Refresh the legend widget
-            self.refresh_legend_widget(legend_id)
+            # Update the existing legend; the canvas redraws it from the change event
+            self.store.update(legend_id, title=dialog.result['title'],
+                              color_entries=dialog.result['color_entries'])
             logger.info(f"Updated legend '{legend.title}'")
         else:
             logger.info("Dialog was cancelled")
 
     def refresh_legend_widget(self, legend_id):
         """Refresh a legend's widget on the canvas"""
-        # Don't refresh during zoom operations to avoid double-scaling
-        if hasattr(self.events, '_zooming') and self.events._zooming:
-            return
-            
-        logger.info(f"Refreshing widget for legend {legend_id}")
-        # Remove the existing widget
-        if legend_id in self.legend_widgets:
-            legend_items = self.legend_widgets[legend_id]
-            for item in legend_items:
-                self.canvas.delete(item)
-            del self.legend_widgets[legend_id]
-        
-        # Create a new widget with current zoom level
-        self.canvas_helpers.create_legend_widget(legend_id, zoom=self.events.last_zoom)
-        logger.info(f"Refreshed widget for legend {legend_id}")
+        self.canvas_helpers.refresh_card_widget(legend_id)
 
     def delete_person(self):
         """Delete the currently selected person"""
         if self.events.selected_person is None:
             messagebox.showwarning("No Selection", "Please select a person to delete by clicking on them first.")
             return
-            
-        person_id = self.events.selected_person
-        person = self.people[person_id]
-        
-        # Confirm deletion
-        result = messagebox.askyesno(
-            "Confirm Deletion", 
-            f"Are you sure you want to delete '{person.name}'?\n\nThis will also remove all their connections.",
-            icon='warning'
-        )
-        
-        if not result:
-            return
-            
-        logger.info(f"Deleting person {person_id}: {person.name}")
-        
-        # Remove all connections involving this person
-        connections_to_remove = []
-        for other_id in list(person.connections.keys()):
-            if other_id in self.people:
-                # Remove the connection from the other person's connections
-                if person_id in self.people[other_id].connections:
-                    del self.people[other_id].connections[person_id]
-                
-                # Track connection lines to remove
-                connection_key = (min(person_id, other_id), max(person_id, other_id))
-                connections_to_remove.append(connection_key)
-        
-        # Remove connection lines from canvas
-        for connection_key in connections_to_remove:
-            if connection_key in self.connection_lines:
-                elements = self.connection_lines[connection_key]
-                for element in elements:
-                    self.canvas.delete(element)
-                    # Clean up font size tracking for text items
-                    if element in self.original_font_sizes:
-                        del self.original_font_sizes[element]
-                del self.connection_lines[connection_key]
-        
-        # Remove person widget from canvas
-        if person_id in self.person_widgets:
-            widget_items = self.person_widgets[person_id]
-            for item in widget_items:
-                self.canvas.delete(item)
-                # Clean up tracking dictionaries
-                if item in self.original_font_sizes:
-                    del self.original_font_sizes[item]
-                if item in self.original_image_sizes:
-                    del self.original_image_sizes[item]
-            del self.person_widgets[person_id]
-        
-        # Remove from people dictionary
-        del self.people[person_id]
-        
-        # Clear selection
-        self.events.selected_person = None
-        
-        logger.info(f"Successfully deleted person {person_id}")
-        self.update_status(f"🗑️ Deleted '{person.name}' and their connections")
-        
-        # Update canvas
-        self.canvas.update()
+        if self.delete_card(self.events.selected_person):
+            self.events.selected_person = None
 
     def delete_textbox(self):
         """Delete the currently selected textbox"""
         if self.events.selected_textbox is None:
             messagebox.showwarning("No Selection", "Please select a textbox to delete by clicking on it first.")
             return
-            
-        textbox_id = self.events.selected_textbox
-        textbox = self.textboxes[textbox_id]
-        
-        # Confirm deletion
-        result = messagebox.askyesno(
-            "Confirm Deletion", 
-            f"Are you sure you want to delete textbox '{textbox.title}'?\n\nThis will also remove all its connections.",
-            icon='warning'
-        )
-        
-        if not result:
-            return
-            
-        logger.info(f"Deleting textbox {textbox_id}: {textbox.title}")
-        
-        # Remove all connections involving this textbox
-        connections_to_remove = []
-        for other_id in list(textbox.connections.keys()):
-            # Check if connected to person, textbox, or legend
-            other_card = self.people.get(other_id) or self.textboxes.get(other_id) or self.legends.get(other_id)
-            if other_card:
-                # Remove the connection from the other card's connections
-                if textbox_id in other_card.connections:
-                    del other_card.connections[textbox_id]
-                
-                # Track connection lines to remove
-                connection_key = (min(textbox_id, other_id), max(textbox_id, other_id))
-                connections_to_remove.append(connection_key)
-        
-        # Remove connection lines from canvas
-        for connection_key in connections_to_remove:
-            if connection_key in self.connection_lines:
-                elements = self.connection_lines[connection_key]
-                for element in elements:
-                    self.canvas.delete(element)
-                    # Clean up font size tracking for text items
-                    if element in self.original_font_sizes:
-                        del self.original_font_sizes[element]
-                del self.connection_lines[connection_key]
-        
-        # Remove textbox widget from canvas
-        if textbox_id in self.textbox_widgets:
-            widget_items = self.textbox_widgets[textbox_id]
-            for item in widget_items:
-                self.canvas.delete(item)
-                # Clean up tracking dictionaries
-                if item in self.original_font_sizes:
-                    del self.original_font_sizes[item]
-                if item in self.original_image_sizes:
-                    del self.original_image_sizes[item]
-            del self.textbox_widgets[textbox_id]
-        
-        # Remove from textboxes dictionary
-        del self.textboxes[textbox_id]
-        
-        # Clear selection
-        self.events.selected_textbox = None
-        
-        logger.info(f"Successfully deleted textbox {textbox_id}")
-        self.update_status(f"🗑️ Deleted textbox '{textbox.title}' and its connections")
-        
-        # Update canvas
-        self.canvas.update()
+        if self.delete_card(self.events.selected_textbox):
+            self.events.selected_textbox = None
 
     def delete_legend(self):
         """Delete the currently selected legend"""
         if self.events.selected_legend is None:
             messagebox.showwarning("No Selection", "Please select a legend to delete by clicking on it first.")
             return
-            
-        legend_id = self.events.selected_legend
-        legend = self.legends[legend_id]
-        
-        # Confirm deletion
-        result = messagebox.askyesno(
-            "Confirm Deletion", 
-            f"Are you sure you want to delete legend '{legend.title}'?\n\nThis will also remove all its connections.",
-            icon='warning'
-        )
-        
+        if self.delete_card(self.events.selected_legend):
+            self.events.selected_legend = None
+
+    def delete_card(self, card_id):
+        """Delete any card with its connections after confirmation; returns True if deleted"""
+        return self.delete_cards([card_id])
+
+    def delete_cards(self, card_ids):
+        """Delete cards and their connections after a single confirmation; returns True if deleted"""
+        card_ids = [card_id for card_id in dict.fromkeys(card_ids) if card_id in self.store]
+        if not card_ids:
+            return False
+        # Connections to cards still being paged in would be lost, and undo could not bring them back
+        self.data.finish_loading()
+        
+        if len(card_ids) == 1:
+            card = self.store[card_ids[0]]
+            if card.card_type == 'person':
+                description = f"'{card.name}'"
+                prompt = f"Are you sure you want to delete {description}?\n\nThis will also remove all their connections."
+                status = f"🗑️ Deleted {description} and their connections"
+            else:
+                description = f"{card.card_type} '{card.title}'"
+                prompt = f"Are you sure you want to delete {description}?\n\nThis will also remove all its connections."
+                status = f"🗑️ Deleted {description} and its connections"
+        else:
+            # Count what goes away through the store's indexes instead of walking every card
+            counts = Counter(self.store.type_of(card_id) for card_id in card_ids)
+            labels = {'person': "people", 'textbox': "textbox cards", 'legend': "legend cards"}
+            description = ", ".join(f"{counts[card_type]} {labels[card_type]}" for card_type in labels if counts[card_type])
+            total_connections = len(self.store.edges_touching(card_ids))
+            prompt = (f"Are you sure you want to delete {description}?\n\n"
+                      f"This will also remove {total_connections} connections.")
+            status = f"🗑️ Deleted {description} and {total_connections} connections"
+        
+        # Confirm deletion once for the whole set
+        result = messagebox.askyesno("Confirm Deletion", prompt, icon='warning')
         if not result:
-            return
+            return False
             
-        logger.info(f"Deleting legend {legend_id}: {legend.title}")
-        
-        # Remove all connections involving this legend
-        connections_to_remove = []
-        for other_id in list(legend.connections.keys()):
-            # Check if connected to person, textbox, or legend
-            other_card = self.people.get(other_id) or self.textboxes.get(other_id) or self.legends.get(other_id)
-            if other_card:
-                # Remove the connection from the other card's connections
-                if legend_id in other_card.connections:
-                    del other_card.connections[legend_id]
-                
-                # Track connection lines to remove
-                connection_key = (min(legend_id, other_id), max(legend_id, other_id))
-                connections_to_remove.append(connection_key)
-        
-        # Remove connection lines from canvas
-        for connection_key in connections_to_remove:
-            if connection_key in self.connection_lines:
-                elements = self.connection_lines[connection_key]
-                for element in elements:
-                    self.canvas.delete(element)
-                    # Clean up font size tracking for text items
-                    if element in self.original_font_sizes:
-                        del self.original_font_sizes[element]
-                del self.connection_lines[connection_key]
-        
-        # Remove legend widget from canvas
-        if legend_id in self.legend_widgets:
-            widget_items = self.legend_widgets[legend_id]
-            for item in widget_items:
-                self.canvas.delete(item)
-                # Clean up tracking dictionaries
-                if item in self.original_font_sizes:
-                    del self.original_font_sizes[item]
-                if item in self.original_image_sizes:
-                    del self.original_image_sizes[item]
-            del self.legend_widgets[legend_id]
-        
-        # Remove from legends dictionary
-        del self.legends[legend_id]
-        
-        # Clear selection
-        self.events.selected_legend = None
+        logger.info(f"Deleting {len(card_ids)} cards")
         
-        logger.info(f"Successfully deleted legend {legend_id}")
-        self.update_status(f"🗑️ Deleted legend '{legend.title}' and its connections")
+        # Remove the cards and their connections in one batch; the canvas drops their items at once
+        self.store.remove_many(card_ids)
+        self.events.set_selection(())
+        self.forget_removed_selection()
         
-        # Update canvas
-        self.canvas.update()
+        logger.info(f"Successfully deleted {len(card_ids)} cards")
+        self.update_status(status)
+        return True
 
     def delete_selected(self):
-        """Delete the currently selected card (person, textbox, or legend)"""
-        if self.events.selected_person:
+        """Delete the selected cards (person, textbox, or legend)"""
+        if self.events.selection:
+            self.delete_cards(self.events.selection)
+        elif self.events.selected_person:
             self.delete_person()
         elif self.events.selected_textbox:
             self.delete_textbox()
@@ -493,10 +314,110 @@ class ConnectionApp:
         else:
             messagebox.showwarning("No Selection", "Please select a card (person, textbox, or legend) to delete by clicking on it first.")
             
+    def forget_removed_selection(self):
+        """Drop selected cards that no longer exist"""
+        for attribute in ('selected_person', 'selected_textbox', 'selected_legend'):
+            if getattr(self.events, attribute) not in self.store:
+                setattr(self.events, attribute, None)
+
+    def find_duplicate_people(self):
+        """Look for likely duplicate people in the background, then open the review list"""
+        if getattr(self, "duplicate_search_running", False):
+            return
+        # Compare everyone, not just the people paged in so far
+        self.data.finish_loading()
+        if len(self.people) < 2:
+            messagebox.showinfo("Find Duplicates", "There are not enough people to compare.")
+            return
+        # Snapshot the fields here; the store must only be read on the UI thread
+        records = person_records(self.store)
+        self.duplicate_search_running = True
+        self.update_status(f"👥 Looking for duplicates among {len(records)} people...", duration=3600000)
+
+        def progress(done, total):
+            self.root.after(0, lambda: self.update_status(f"👥 Comparing likely pairs: {done}/{total}", duration=3600000))
+
+        def find_thread():
+            try:
+                matches = find_duplicates(records, progress=progress)
+                self.root.after(0, lambda: self.review_duplicates(matches, records))
+            except Exception as e:
+                logger.error(f"Duplicate search failed: {e}", exc_info=True)
+                self.root.after(0, lambda: self.review_duplicates(None, records))
+
+        threading.Thread(target=find_thread, daemon=True).start()
+
+    def review_duplicates(self, matches, records):
+        """Show the result of a duplicate search on the main thread"""
+        self.duplicate_search_running = False
+        if matches is not None:
+            # People edited, removed or replaced by loading another project while the search ran are left out
+            def unchanged(card_id):
+                person = self.people.get(card_id)
+                return person is not None and person_record(person) == records[card_id]
+            matches = [match for match in matches if unchanged(match[1]) and unchanged(match[2])]
+        if matches is None:
+            self.update_status("❌ Duplicate search failed")
+        elif not matches:
+            self.update_status("✅ No likely duplicates found")
+        else:
+            self.update_status(f"👥 Found {len(matches)} likely duplicate pairs")
+            DuplicateReviewDialog(self.root, self, matches)
+
+    def merge_people(self, id1, id2):
+        """Merge two people into the one with more connections; returns (kept id, removed id)"""
+        # Count and move every connection, including those of cards still being paged in
+        self.data.finish_loading()
+        keep_id, duplicate_id = choose_kept(self.store, id1, id2)
+        duplicate_name = self.people[duplicate_id].name
+        merge_people(self.store, keep_id, duplicate_id)
+        self.events.set_selection(self.events.selection - {duplicate_id})
+        self.forget_removed_selection()
+        self.update_status(f"🔗 Merged '{duplicate_name}' into '{self.people[keep_id].name}'")
+        return keep_id, duplicate_id
+
+    def show_shared_identifiers(self):
+        """Open the list of identifiers shared by people who are not yet connected"""
+        # Compare everyone, not just the people paged in so far
+        self.data.finish_loading()
+        if not self.identifiers.suggestions():
+            messagebox.showinfo("Shared Identifiers", "No unconnected people share a phone number, email, SSN or address.")
+            return
+        SharedIdentifierDialog(self.root, self)
+
+    def connect_shared_identifier(self, field, value, card_ids):
+        """Connect every pair of people sharing an identifier, as one undoable step"""
+        added = connect_shared(self.store, field, card_ids)
+        self.update_status(f"🔗 Added {added} connections between {len(card_ids)} people sharing {value}")
+        return added
+
+    def show_library(self):
+        """Open the search over every project saved in the library folder"""
+        LibraryDialog(self.root, self)
+
+    def open_library_project(self, path, card_id):
+        """Load a project found in the library and show the card that matched"""
+        if not self.data.open_project(path):
+            return
+        if card_id not in self.store:
+            # A project database may not have paged the card in yet
+            self.data.finish_loading()
+        if card_id in self.store:
+            self.events.show_cards([card_id], f"📚 Opened {os.path.basename(path)}")
+
     def clear_all(self):
         """Clear all people, connections, and reset the canvas"""
         self.data.clear_all()
 
+    def batch(self):
+        """Group bulk changes: rendering waits for the end of the block, and errors roll them back
+
+        with app.batch():
+            for row in rows:
+                app.store.add(Person(row['name']))
+        """
+        return self.store.batch()
+
     def update_status(self, message, duration=5000):
         """Update the status bar with a message that disappears after a duration"""
         self.status_label.config(text=message)
@@ -535,6 +456,8 @@ class ConnectionApp:
         self.data.cleanup_old_files()
 
 if __name__ == "__main__":
+    # Duplicate search starts worker processes; a frozen build must not re-run the app in them
+    multiprocessing.freeze_support()
     try:
         root = tk.Tk()
         app = ConnectionApp(root)
@@ -0,0 +1,488 @@
+# attachment_index.py
+"""
+Full-text search over the text files attached to people.
+
+Attachments with a text-like extension (``.txt``, ``.csv``, ``.json``,
+``.html`` and so on) are read in the background: the encoding is sniffed
+from byte-order marks and byte patterns, markup and JSON syntax are
+stripped, and only the first ``MAX_FILE_BYTES`` of a large file are read.
+Extraction runs on a worker process pool once there are enough files to
+be worth it, so a project with thousands of documents does not hold up
+the UI.
+
+The words found are cached under the SHA-256 of the file's content, so a
+file seen before (the same project reopened, the same document attached
+elsewhere) is only hashed, never read again. They feed an inverted index
+from each word to the (card id, file path) pairs containing it, which
+follows the graph store's change events like the other indexes.
+"""
+
+import codecs
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import re
+import sqlite3
+import threading
+import zlib
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+
+from src.graph_store import BATCH, CARD_ADDED, CARD_REMOVED, FIELD_CHANGED, STORE_CLEARED
+from src.project_io import content_digest, local_path
+from src.search_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+TEXT_EXTENSIONS = frozenset({
+    '.txt', '.text', '.log', '.md', '.csv', '.tsv', '.json', '.html', '.htm', '.xml',
+    '.eml', '.ini', '.cfg', '.yaml', '.yml',
+})
+MAX_FILE_BYTES = 16 * 1024 * 1024  # Only the start of a larger file is read
+MAX_WORD_LENGTH = 40               # Longer "words" are hashes and base64, not anything searched for
+SNIFF_BYTES = 4096
+HASH_WORKERS = 4
+PARALLEL_MIN_FILES = 8  # Fewer files are read on the indexing thread; starting a pool costs more
+DELIVER_EVERY = 100     # Files whose words are handed to the index at a time
+IDLE_SECONDS = 30       # The indexing thread and its pool stop after this long without work
+MAX_CACHED_FILES = 50_000
+
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.comrade_files/text_cache.sqlite3")
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'), (codecs.BOM_UTF32_BE, 'utf-32'),  # Before UTF-16: FF FE 00 00 starts with FF FE
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+_XML_TAG = re.compile(r"<[^>]*>")
+
+
+# Extraction
+
+def is_text_file(path):
+    return os.path.splitext(path)[1].lower() in TEXT_EXTENSIONS
+
+
+def sniff_encoding(data):
+    """Encoding of a file's bytes, or None if they look binary"""
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding
+    sample = data[:SNIFF_BYTES]
+    if b'\x00' in sample:
+        # UTF-16 without a BOM: mostly-ASCII text has a zero in every other byte
+        even, odd = sample[0::2].count(0), sample[1::2].count(0)
+        if odd > len(sample) * 0.3 and even < odd / 10:
+            return 'utf-16-le'
+        if even > len(sample) * 0.3 and odd < even / 10:
+            return 'utf-16-be'
+        return None
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # A sample cut through a multi-byte character is still UTF-8
+        if e.start >= len(sample) - 3 and len(data) > len(sample):
+            return 'utf-8'
+    return 'cp1252'
+
+
+def decode_text(data):
+    """Text of a file's bytes in its sniffed encoding; None for binary data"""
+    encoding = sniff_encoding(data)
+    if encoding is None:
+        return None
+    return data.decode(encoding, errors='replace')
+
+
+class _HTMLText(HTMLParser):
+    SKIPPED = frozenset({'script', 'style'})
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED:
+            self._skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def _json_text(value, parts):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            parts.append(str(key))
+            _json_text(item, parts)
+    elif isinstance(value, list):
+        for item in value:
+            _json_text(item, parts)
+    elif value is not None and not isinstance(value, bool):
+        parts.append(str(value))
+
+
+def extract_text(path, max_bytes=MAX_FILE_BYTES):
+    """Readable text of a text-like file, without markup; None if it is binary or cannot be read"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(max_bytes)
+    except OSError as e:
+        logger.warning(f"Could not read attachment {path}: {e}")
+        return None
+    text = decode_text(data)
+    if not text:
+        return text
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.html', '.htm'):
+        parser = _HTMLText()
+        parser.feed(text)
+        parser.close()
+        return " ".join(parser.parts)
+    if extension == '.json':
+        try:
+            parts = []
+            _json_text(json.loads(text), parts)
+            return " ".join(parts)
+        except ValueError:
+            pass  # Cut off by the size cap, or not JSON after all: index it as it is
+    elif extension == '.xml':
+        return _XML_TAG.sub(" ", text)
+    return text
+
+
+def text_words(text):
+    return {word for word in tokenize(text) if len(word) <= MAX_WORD_LENGTH}
+
+
+def extract_words(path):
+    """(path, set of words) for an attachment; runs in worker processes"""
+    text = extract_text(path)
+    return path, text_words(text) if text else set()
+
+
+# Cache
+
+class TextCache:
+    """
+    Words of previously read files by content hash, stored in SQLite
+
+    A connection belongs to the thread that made it.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30)
+        # Anything lost in a crash is only read again, so skip the per-commit sync
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS words ("
+                        " digest TEXT PRIMARY KEY, words BLOB NOT NULL, used INTEGER NOT NULL)")
+        self._clock = self.db.execute("SELECT COALESCE(MAX(used), 0) FROM words").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+    def get_many(self, digests):
+        """{digest: set of words} for the files among digests read before"""
+        found = {}
+        digests = list(digests)
+        for start in range(0, len(digests), 500):
+            chunk = digests[start:start + 500]
+            rows = self.db.execute(f"SELECT digest, words FROM words WHERE digest IN ({','.join('?' * len(chunk))})",
+                                   chunk).fetchall()
+            for digest, data in rows:
+                data = zlib.decompress(data).decode('utf-8')
+                found[digest] = set(data.split("\n")) if data else set()
+        if found:
+            self._clock += 1
+            with self.db:
+                self.db.executemany("UPDATE words SET used = ? WHERE digest = ?",
+                                    [(self._clock, digest) for digest in found])
+        return found
+
+    def put_many(self, items):
+        """Remember [(digest, words)], in one transaction"""
+        self._clock += 1
+        rows = [(digest, zlib.compress("\n".join(sorted(words)).encode('utf-8')), self._clock) for digest, words in items]
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO words (digest, words, used) VALUES (?, ?, ?)", rows)
+
+    def prune(self, max_files=MAX_CACHED_FILES):
+        """Forget the least recently used files beyond max_files"""
+        with self.db:
+            self.db.execute("DELETE FROM words WHERE digest IN"
+                            " (SELECT digest FROM words ORDER BY used DESC LIMIT -1 OFFSET ?)", (max_files,))
+
+
+# Background extraction
+
+class AttachmentExtractor:
+    """
+    Reads the words of attached files on a background thread
+
+    Jobs are [(card_id, path)] lists; results are delivered as
+    [(card_id, path, words)] lists to the deliver callback, on the
+    extraction thread. The thread (and its process pool) starts with the
+    first job and stops once there has been no work for IDLE_SECONDS.
+    """
+    def __init__(self, deliver, cache_path=DEFAULT_CACHE_PATH, processes=None):
+        self.deliver = deliver
+        self.cache_path = cache_path
+        self.processes = processes
+        self.extracted = 0  # Files read
+        self.cached = 0     # Files found in the cache
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def submit(self, jobs):
+        jobs = [(card_id, path) for card_id, path in jobs if is_text_file(path)]
+        if not jobs:
+            return
+        with self._lock:
+            self._jobs.put(jobs)
+            if not self._running:
+                self._running = True
+                threading.Thread(target=self._run, daemon=True).start()
+
+    def wait(self):
+        """Block until every submitted job has been delivered"""
+        self._jobs.join()
+
+    def _run(self):
+        cache = TextCache(self.cache_path)
+        pool = None
+        try:
+            with ThreadPoolExecutor(HASH_WORKERS) as hashers:
+                while True:
+                    try:
+                        jobs = self._jobs.get(timeout=IDLE_SECONDS)
+                    except queue.Empty:
+                        with self._lock:
+                            if self._jobs.empty():
+                                self._running = False
+                                return
+                        continue
+                    try:
+                        # Take everything queued so far as one run
+                        while True:
+                            try:
+                                more = self._jobs.get_nowait()
+                            except queue.Empty:
+                                break
+                            jobs.extend(more)
+                            self._jobs.task_done()
+                        pool = self._process(jobs, cache, hashers, pool)
+                    except Exception as e:
+                        logger.error(f"Attachment indexing failed: {e}", exc_info=True)
+                    finally:
+                        self._jobs.task_done()
+        finally:
+            if pool is not None:
+                pool.terminate()
+            cache.close()
+
+    def _process(self, jobs, cache, hashers, pool):
+        owners = {}  # {path: [card_id]}; a file attached to several people is read once
+        for card_id, path in jobs:
+            owners.setdefault(path, []).append(card_id)
+        paths = list(owners)
+
+        def deliver(words_by_path):
+            self.deliver([(card_id, path, words) for path, words in words_by_path.items() for card_id in owners[path]])
+
+        # Hashing reads whole files; hashlib releases the GIL, so threads overlap it.
+        # Files still in a loaded project's archive are named by their hash and not read at all
+        digests = dict(zip(paths, hashers.map(content_digest, paths)))
+        cached = cache.get_many({digest for digest in digests.values() if digest})
+        found, misses = {}, {}
+        for path, digest in digests.items():
+            if digest is None:
+                found[path] = set()  # Unreadable
+            elif digest in cached:
+                found[path] = cached[digest]
+            else:
+                misses[path] = digest
+        self.cached += len(found) - sum(1 for digest in digests.values() if digest is None)
+        if found:
+            deliver(found)
+
+        if misses:
+            list(hashers.map(local_path, misses))  # Only files that must be read are extracted
+            processes = self.processes or os.cpu_count() or 1
+            if processes == 1 or len(misses) < PARALLEL_MIN_FILES:
+                extracted = map(extract_words, misses)
+            else:
+                if pool is None:
+                    # Spawned, not forked: this is a background thread of the Tk process
+                    pool = multiprocessing.get_context('spawn').Pool(processes)
+                extracted = pool.imap_unordered(extract_words, misses)
+            # Delivered in chunks, so search results fill in while a large project is read
+            chunk = {}
+            for path, words in extracted:
+                chunk[path] = words
+                self.extracted += 1
+                if len(chunk) >= DELIVER_EVERY:
+                    cache.put_many((misses[path], words) for path, words in chunk.items())
+                    deliver(chunk)
+                    chunk = {}
+            if chunk:
+                cache.put_many((misses[path], words) for path, words in chunk.items())
+                deliver(chunk)
+            cache.prune()
+            logger.info(f"Read {len(misses)} attachments, {len(paths) - len(misses)} from the cache")
+        return pool
+
+
+# Index
+
+def _listed(vocabulary, word):
+    """Whether word is in the sorted vocabulary"""
+    position = bisect_left(vocabulary, word)
+    return position < len(vocabulary) and vocabulary[position] == word
+
+
+class AttachmentIndex:
+    """
+    Inverted index from words to the (card id, file path) pairs containing them, kept in sync with a GraphStore
+
+    Store events arrive on the UI thread; extraction results are added on
+    the extraction thread, a file at a time, so a large project never
+    holds up the UI while its words go in. A lock guards the index
+    between the two.
+    """
+    def __init__(self, store, cache_path=DEFAULT_CACHE_PATH, processes=None):
+        self.store = store
+        self.extractor = AttachmentExtractor(self._apply, cache_path, processes)
+        self._lock = threading.Lock()
+        self._postings = {}    # {word: {(card_id, path)}}
+        self._documents = {}   # {(card_id, path): frozenset(words)}
+        self._vocabulary = []  # Sorted words; may hold words whose postings emptied
+        self._files = {}       # {card_id: frozenset(paths)} submitted for indexing
+        store.subscribe(self.on_store_event, kinds=(CARD_ADDED, CARD_REMOVED, FIELD_CHANGED, STORE_CLEARED))
+
+    @property
+    def pending(self):
+        """Number of files submitted whose words have not arrived yet"""
+        with self._lock:
+            return sum(len(paths) for paths in self._files.values()) - len(self._documents)
+
+    # Store events
+
+    def on_store_event(self, event):
+        events = event.new if event.kind == BATCH else (event,)
+        touched = {}
+        for inner in events:
+            if inner.kind == FIELD_CHANGED and 'files' not in inner.new:
+                continue
+            if inner.kind != STORE_CLEARED:
+                touched[inner.card_id] = None
+        # The store is only read here, on its own thread
+        current = {}
+        for card_id in touched:
+            person = self.store.people.get(card_id)
+            files = person.files if person is not None and person.file_count() else ()
+            current[card_id] = frozenset(path for path in files if is_text_file(path))
+        jobs = []
+        with self._lock:
+            if any(inner.kind == STORE_CLEARED for inner in events):
+                self._postings.clear()
+                self._documents.clear()
+                self._vocabulary = []
+                self._files.clear()
+            for card_id, paths in current.items():
+                old = self._files.get(card_id, frozenset())
+                for path in old - paths:
+                    self._remove((card_id, path))
+                jobs.extend((card_id, path) for path in paths - old)
+                if paths:
+                    self._files[card_id] = paths
+                else:
+                    self._files.pop(card_id, None)
+        if jobs:
+            self.extractor.submit(jobs)
+
+    # Extraction results
+
+    def _apply(self, results):
+        """Add [(card_id, path, words)] from the extraction thread"""
+        new_words = []
+        for card_id, path, words in results:
+            with self._lock:
+                # Left out if the file was detached (or the card removed) while it was read
+                if path in self._files.get(card_id, ()):
+                    self._remove((card_id, path))
+                    self._add((card_id, path), words, new_words)
+        if new_words:
+            # Sorted here and merged in one pass (the vocabulary is a single sorted run), not per word
+            new_words = sorted(set(new_words))
+            with self._lock:
+                vocabulary = self._vocabulary
+                # Words whose postings emptied earlier may still be listed; list each word once
+                fresh = [word for word in new_words if not _listed(vocabulary, word)]
+                vocabulary.extend(fresh)
+                vocabulary.sort()
+
+    def _add(self, document, words, new_words):
+        self._documents[document] = frozenset(words)
+        postings = self._postings
+        for word in words:
+            posting = postings.get(word)
+            if posting is None:
+                postings[word] = {document}
+                new_words.append(word)
+            else:
+                posting.add(document)
+
+    def _remove(self, document):
+        postings = self._postings
+        for word in self._documents.pop(document, ()):
+            posting = postings[word]
+            posting.discard(document)
+            if not posting:
+                del postings[word]
+        if len(self._vocabulary) > 2 * len(postings) + 1000:
+            self._vocabulary = sorted(postings)
+
+    # Queries
+
+    def _with_word(self, term, prefix):
+        postings = self._postings
+        if not prefix:
+            return set(postings.get(term, ()))
+        vocabulary = self._vocabulary
+        found = set()
+        for word in vocabulary[bisect_left(vocabulary, term):]:
+            if not word.startswith(term):
+                break
+            found.update(postings.get(word, ()))
+        return found
+
+    def search(self, query, limit=50):
+        """Return up to limit (card id, path) pairs whose file contains every word of query, the last as a prefix"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        last = len(terms) - 1
+        found = None
+        with self._lock:
+            # Whole words first: they are one lookup, and usually rarer than a prefix
+            for i in sorted(range(len(terms)), key=lambda i: i == last):
+                documents = self._with_word(terms[i], i == last)
+                found = documents if found is None else found & documents
+                if not found:
+                    return []
+        return sorted(found)[:limit]
+
+    def __len__(self):
+        return len(self._documents)
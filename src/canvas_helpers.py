@@ -4,6 +4,11 @@ from functools import lru_cache
 import logging
 
 from src.constants import COLORS, CARD_COLORS
+from src.render_backend import TkCanvasBackend
+from src.card_layout import LayoutEngine, CardPainter, fit_image_size
+from src.project_io import local_path
+from src.graph_store import (CARD_ADDED, CARD_REMOVED, FIELD_CHANGED, CARD_MOVED,
+                             EDGE_ADDED, EDGE_REMOVED, EDGE_RELABELED, STORE_CLEARED, BATCH)
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +23,34 @@ except ImportError:
 class CanvasHelpers:
     def __init__(self, app):
         self.app = app
+        self._backend = None
+        self.layout = LayoutEngine()
+        self._stale_cards = set()  # Cards whose fields changed while a drag was in progress
+        self._selection = set()  # Multi-selected cards, outlined on the canvas
+        self._focus = None  # Cards to realize in focus mode; None realizes every card
+        self._hidden = set()  # Drawn cards hidden by the filter, along with their connections
+        self._store_handlers = {
+            CARD_ADDED: self._on_card_added,
+            CARD_REMOVED: self._on_card_removed,
+            FIELD_CHANGED: self._on_field_changed,
+            CARD_MOVED: self._on_card_moved,
+            EDGE_ADDED: self._on_edge_added,
+            EDGE_REMOVED: self._on_edge_removed,
+            EDGE_RELABELED: self._on_edge_relabeled,
+            STORE_CLEARED: self._on_store_cleared,
+            BATCH: self._on_batch,
+        }
+
+    @property
+    def backend(self):
+        """Render backend for the main canvas, created once the canvas exists"""
+        if self._backend is None:
+            self._backend = TkCanvasBackend(self.app.canvas)
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend):
+        self._backend = backend
 
     def store_text_font_size(self, item_id, font_tuple):
         """Store the original font size for a text item."""
@@ -30,7 +63,7 @@ class CanvasHelpers:
         Get a scaled and cached PhotoImage.
         Uses LRU cache for performance.
         """
-        if not PIL_AVAILABLE or not os.path.exists(image_path):
+        if not PIL_AVAILABLE or not os.path.exists(local_path(image_path)):
             return None
         try:
             # Open the base image (cached)
@@ -67,13 +100,9 @@ class CanvasHelpers:
                 
                 if person_tag:
                     person_id = int(person_tag.split('_')[1])
-                    if person_id in self.app.people:
-                        person = self.app.people[person_id]
-                        
-                        image_file = None
-                        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
-                        if hasattr(person, 'files') and person.files:
-                            image_file = next((fp for fp in person.files if os.path.exists(fp) and os.path.splitext(fp.lower())[1] in image_extensions), None)
+                    person = self.app.people.get(person_id)
+                    if person is not None:
+                        image_file = self.layout.get(person_id, person).image_file
 
                         if image_file and PIL_AVAILABLE:
                             try:
@@ -86,9 +115,16 @@ class CanvasHelpers:
 
     def rescale_text(self, zoom):
         # Rescale all text items on the canvas based on their original font sizes
+        for _ in self.iter_rescale_text(zoom):
+            pass
+
+    def iter_rescale_text(self, zoom, chunk_size=250):
+        """Rescale text items, yielding every chunk_size items so the work can be time-sliced"""
         text_items = [item for item in self.app.canvas.find_all() if self.app.canvas.type(item) == 'text']
         
-        for item in text_items:
+        for index, item in enumerate(text_items, 1):
+            if index % chunk_size == 0:
+                yield
             if item not in self.app.original_font_sizes:
                 current_font = self.app.canvas.itemcget(item, 'font')
                 parts = current_font.split()
@@ -125,81 +161,88 @@ class CanvasHelpers:
         
         x_step = max(int(grid_size), 40)
         for x in range(0, int(width + x_step), x_step):
-            self.app.canvas.create_line(x, 0, x, height, fill='#e2e8f0', width=1, tags="grid")
+            self.backend.line(x, 0, x, height, fill='#e2e8f0', width=1, tags="grid")
         
         y_step = max(int(grid_size), 40)
         for y in range(0, int(height + y_step), y_step):
-            self.app.canvas.create_line(0, y, width, y, fill='#e2e8f0', width=1, tags="grid")
+            self.backend.line(0, y, width, y, fill='#e2e8f0', width=1, tags="grid")
         
-        self.app.canvas.tag_lower("grid")
+        self.backend.lower("grid")
 
     def update_connections(self):
         """Redraw all connection lines based on current person positions and zoom"""
         zoom = self.app.events.last_zoom
         
         # Clear all existing lines and labels first
-        for key, elements in list(self.app.connection_lines.items()):
-            if len(elements) == 4:
-                line_id, label_id, clickable_area_id, bg_rect_id = elements
-                self.app.canvas.delete(line_id)
-                if label_id:
-                    self.app.canvas.delete(label_id)
-                if bg_rect_id:
-                    self.app.canvas.delete(bg_rect_id)
-                if clickable_area_id:
-                    self.app.canvas.delete(clickable_area_id)
-            elif len(elements) == 3: # Backwards compatibility
-                line_id, label_id, clickable_area_id = elements[:3]
-                self.app.canvas.delete(line_id)
-                if label_id:
-                    # Delete the label and its background group
-                    group_tag = f"connection_label_group_{key[0]}_{key[1]}"
-                    self.app.canvas.delete(group_tag)
-                    self.app.canvas.delete(label_id)
-                if clickable_area_id:
-                    self.app.canvas.delete(clickable_area_id)
+        for key in list(self.app.connection_lines):
+            self.remove_connection_line(key)
+
+        # Redraw all connections in one pass over the edge table, restacking cards once at the end;
+        # the geometry index scales every endpoint in one vectorized pass
+        edges = list(self.app.store.edges())
+        geometry = getattr(self.app, 'geometry', None)
+        if geometry is not None and edges:
+            endpoints = geometry.edge_endpoints([key for key, _ in edges], zoom)
+        else:
+            endpoints = [None] * len(edges)
+        for ((id1, id2), label), ends in zip(edges, endpoints):
+            self.draw_connection(id1, id2, label, zoom, restack=False, endpoints=ends)
+        self.restack_cards()
+
+    def remove_connection_line(self, key):
+        """Delete the canvas items of one connection"""
+        self.backend.delete(*self._pop_connection_items(key))
+
+    def _pop_connection_items(self, key):
+        """Forget a connection's canvas items and return them for deletion"""
+        elements = self.app.connection_lines.pop(key, None)
+        if not elements:
+            return []
+        items = [element for element in elements if element]
+        if len(elements) == 3:  # Backwards compatibility
+            items.append(f"connection_label_group_{key[0]}_{key[1]}")
+        for item in items:
+            # Clean up font size tracking for text items
+            self.app.original_font_sizes.pop(item, None)
+        return items
+
+    def redraw_card_connections(self, card_id):
+        """Redraw only the connections touching one card"""
+        zoom = self.app.events.last_zoom
+        for other_id, label in self.app.store.iter_neighbors(card_id):
+            key = (min(card_id, other_id), max(card_id, other_id))
+            self.remove_connection_line(key)
+            self.draw_connection(key[0], key[1], label, zoom)
 
-        self.app.connection_lines.clear()
+    def draw_connection(self, id1, id2, label, zoom=1.0, restack=True, endpoints=None):
+        """Draw a single connection line and its label, scaled by zoom
 
-        # Redraw all connections
-        # Check connections from people
-        for id1, p1 in self.app.people.items():
-            for id2, label in p1.connections.items():
-                if id2 in self.app.people or id2 in self.app.textboxes:
-                    # Ensure we only draw each connection once
-                    if id1 < id2:
-                        self.draw_connection(id1, id2, label, zoom)
-        
-        # Check connections from textboxes (to avoid duplication, only check textbox-to-textbox with higher ID)
-        for id1, t1 in self.app.textboxes.items():
-            for id2, label in t1.connections.items():
-                if id2 in self.app.textboxes and id1 < id2:
-                    self.draw_connection(id1, id2, label, zoom)
-        
-        # Check connections from legend cards
-        for id1, l1 in self.app.legends.items():
-            for id2, label in l1.connections.items():
-                if id2 in self.app.legends and id1 < id2:
-                    self.draw_connection(id1, id2, label, zoom)
-
-    def draw_connection(self, id1, id2, label, zoom=1.0):
-        """Draw a single connection line and its label, scaled by zoom"""
+        Pass restack=False when drawing many lines and call restack_cards() once afterwards.
+        endpoints is the (x1, y1, x2, y2) already scaled, if known.
+        """
         # Get card objects (could be person, textbox, or legend)
-        card1 = self.app.people.get(id1) or self.app.textboxes.get(id1) or self.app.legends.get(id1)
-        card2 = self.app.people.get(id2) or self.app.textboxes.get(id2) or self.app.legends.get(id2)
+        card1 = self.app.store.get(id1)
+        card2 = self.app.store.get(id2)
         
         if not card1 or not card2:
             return
+        if self._focus is not None and (id1 not in self._focus or id2 not in self._focus):
+            return
         
         # Get scaled coordinates
-        x1, y1 = card1.x * zoom, card1.y * zoom
-        x2, y2 = card2.x * zoom, card2.y * zoom
+        if endpoints is None:
+            x1, y1 = card1.x * zoom, card1.y * zoom
+            x2, y2 = card2.x * zoom, card2.y * zoom
+        else:
+            x1, y1, x2, y2 = (float(value) for value in endpoints)
         
         # Create the main line
-        line = self.app.canvas.create_line(x1, y1, x2, y2, fill=COLORS['text_secondary'], width=2, tags=("connection", f"connection_{id1}_{id2}"))
+        # Every item of a connection also carries one tag for the whole edge, to show or hide it at once
+        edge_tags = ("edge", f"edge_{id1}_{id2}")
+        line = self.backend.line(x1, y1, x2, y2, fill=COLORS['text_secondary'], width=2, tags=("connection", f"connection_{id1}_{id2}") + edge_tags)
         
         # Create a thicker, transparent line for easier clicking
-        clickable_area = self.app.canvas.create_line(x1, y1, x2, y2, fill="", width=10, tags=("connection_clickable", f"connection_clickable_{id1}_{id2}"))
+        clickable_area = self.backend.line(x1, y1, x2, y2, fill="", width=10, tags=("connection_clickable", f"connection_clickable_{id1}_{id2}") + edge_tags)
         
         label_id = None
         bg_rect_id = None
@@ -213,22 +256,22 @@ class CanvasHelpers:
             label_font = ("Segoe UI", font_size)
             
             # Create the text label
-            label_id = self.app.canvas.create_text(mid_x, mid_y, text=label, 
+            label_id = self.backend.text(mid_x, mid_y, text=label, 
                                              font=label_font, 
                                              fill=COLORS['text_primary'], 
-                                             tags=("connection_label", f"connection_label_{id1}_{id2}"))
+                                             tags=("connection_label", f"connection_label_{id1}_{id2}") + edge_tags)
             
             # Get bounding box of the text to create a background
-            bbox = self.app.canvas.bbox(label_id)
+            bbox = self.backend.bbox(label_id)
             if bbox:
                 # Create a rectangle behind the text with padding
                 x1_bbox, y1_bbox, x2_bbox, y2_bbox = bbox
                 padding = 5 * zoom
-                bg_rect_id = self.app.canvas.create_rectangle(x1_bbox - padding, y1_bbox - padding, x2_bbox + padding, y2_bbox + padding, 
+                bg_rect_id = self.backend.rectangle(x1_bbox - padding, y1_bbox - padding, x2_bbox + padding, y2_bbox + padding, 
                                                         fill=COLORS['surface'], 
                                                         outline='#e0e0e0', 
                                                         width=1,
-                                                        tags=(f"connection_label_bg_{id1}_{id2}",))
+                                                        tags=(f"connection_label_bg_{id1}_{id2}",) + edge_tags)
 
             # Store original font size for scaling
             if label_id:
@@ -237,28 +280,33 @@ class CanvasHelpers:
         # Store all parts of the connection
         self.app.connection_lines[(min(id1, id2), max(id1, id2))] = (line, label_id, clickable_area, bg_rect_id)
         
-        # Ensure grid stays at the very bottom
-        self.app.canvas.tag_lower("grid")
-
         # After creating all elements, ensure proper layering
-        self.app.canvas.tag_lower(line)
+        self.backend.lower(line)
         if clickable_area:
-            self.app.canvas.tag_lower(clickable_area)
+            self.backend.lower(clickable_area)
 
         if bg_rect_id:
-            self.app.canvas.tag_lower(bg_rect_id, line) # ensure bg is below line
-            self.app.canvas.tag_raise(bg_rect_id) # then raise it
+            self.backend.lower(bg_rect_id, line) # ensure bg is below line
+            self.backend.raise_item(bg_rect_id) # then raise it
         if label_id:
-            self.app.canvas.tag_lower(label_id, line) # ensure label is below line
-            self.app.canvas.tag_raise(label_id) # then raise it
+            self.backend.lower(label_id, line) # ensure label is below line
+            self.backend.raise_item(label_id) # then raise it
         
         if bg_rect_id and label_id:
-            self.app.canvas.tag_raise(label_id, bg_rect_id)
+            self.backend.raise_item(label_id, bg_rect_id)
 
-        # Ensure person, textbox, and legend widgets are on top of lines
-        self.app.canvas.tag_raise("person")
-        self.app.canvas.tag_raise("textbox")
-        self.app.canvas.tag_raise("legend")
+        if id1 in self._hidden or id2 in self._hidden:
+            self.backend.set_state(f"edge_{id1}_{id2}", 'hidden')
+
+        if restack:
+            self.restack_cards()
+
+    def restack_cards(self):
+        """Keep the grid at the bottom and person, textbox, and legend widgets on top of lines"""
+        self.backend.lower("grid")
+        self.backend.raise_item("person")
+        self.backend.raise_item("textbox")
+        self.backend.raise_item("legend")
     
     def add_grid_pattern(self):
         canvas_width = self.app.fixed_canvas_width
@@ -266,190 +314,335 @@ class CanvasHelpers:
         grid_size = 40
         
         for x in range(0, canvas_width, grid_size):
-            self.app.canvas.create_line(x, 0, x, canvas_height, fill='#e2e8f0', width=1, tags="grid")
+            self.backend.line(x, 0, x, canvas_height, fill='#e2e8f0', width=1, tags="grid")
         
         for y in range(0, canvas_height, grid_size):
-            self.app.canvas.create_line(0, y, canvas_width, y, fill='#e2e8f0', width=1, tags="grid")
+            self.backend.line(0, y, canvas_width, y, fill='#e2e8f0', width=1, tags="grid")
         
-        self.app.canvas.tag_lower("grid")
+        self.backend.lower("grid")
+
+    def widgets_for(self, card_type):
+        """Return the {id: [canvas items]} map for a card type"""
+        return {'person': self.app.person_widgets, 'textbox': self.app.textbox_widgets, 'legend': self.app.legend_widgets}[card_type]
+
+    def create_card_widget(self, card_id, zoom=None):
+        """Draw any card, whatever its type; cards outside the focus are not realized"""
+        if not self.is_realized(card_id):
+            return
+        card_type = self.app.store.type_of(card_id)
+        if card_type == 'person':
+            self.create_person_widget(card_id, zoom)
+        elif card_type == 'textbox':
+            self.create_textbox_widget(card_id, zoom)
+        elif card_type == 'legend':
+            self.create_legend_widget(card_id, zoom)
+
+    def remove_card_widget(self, card_id, card_type):
+        """Delete the canvas items of one card"""
+        self.backend.delete(*self._pop_card_items(card_id, card_type))
+
+    def _pop_card_items(self, card_id, card_type):
+        """Forget a card's canvas items and return them for deletion"""
+        items = self.widgets_for(card_type).pop(card_id, [])
+        image_refs = getattr(self.app, 'image_refs', {})
+        for item in items:
+            # Clean up tracking dictionaries
+            self.app.original_font_sizes.pop(item, None)
+            self.app.original_image_sizes.pop(item, None)
+            image_refs.pop(item, None)
+        return items
+
+    def refresh_card_widget(self, card_id):
+        """Redraw one card at the current zoom; deferred until the drag ends while dragging"""
+        card_type = self.app.store.type_of(card_id)
+        if card_type is None:
+            return
+        if self.app.events.dragging:
+            self._stale_cards.add(card_id)
+            return
+        logger.info(f"Refreshing widget for {card_type} {card_id}")
+        self.remove_card_widget(card_id, card_type)
+        self.create_card_widget(card_id, self.app.events.last_zoom)
+
+    def refresh_stale_cards(self):
+        """Redraw the cards that changed during a drag"""
+        stale, self._stale_cards = self._stale_cards, set()
+        for card_id in stale:
+            self.refresh_card_widget(card_id)
+
+    def is_realized(self, card_id):
+        """Whether a card is drawn, i.e. not hidden by focus mode"""
+        return self._focus is None or card_id in self._focus
+
+    def set_focus(self, card_ids):
+        """Realize only the given cards (None realizes every card), changing only the difference"""
+        store = self.app.store
+        old = set(store) if self._focus is None else self._focus
+        new = set(store) if card_ids is None else set(card_ids)
+        leaving, entering = old - new, new - old
+        self._focus = None if card_ids is None else new
+
+        # Drop the hidden cards and every line touching them in one call
+        stale_items = []
+        for card_id in leaving:
+            card_type = store.type_of(card_id)
+            if card_type is not None:
+                stale_items.extend(self._pop_card_items(card_id, card_type))
+        for key in store.edges_touching(leaving):
+            stale_items.extend(self._pop_connection_items(key))
+        self.backend.delete(*stale_items)
+
+        zoom = self.app.events.last_zoom
+        for card_id in entering:
+            if card_id in store:
+                self.create_card_widget(card_id, zoom)
+        drawn = 0
+        for key in store.edges_touching(entering):
+            if key not in self.app.connection_lines:
+                self.draw_connection(key[0], key[1], store.edge_label(*key), zoom, restack=False)
+                drawn += 1
+        if drawn:
+            self.restack_cards()
+        if self._selection:
+            self._draw_selection()
+        logger.info(f"Focus changed: {len(entering)} cards shown, {len(leaving)} hidden")
+
+    def is_visible(self, card_id):
+        """Whether a card is drawn and not hidden by the filter"""
+        return self.is_realized(card_id) and card_id not in self._hidden
+
+    def set_filter(self, card_ids):
+        """Hide every card not in card_ids (None shows them all), with the connections touching them
+
+        Items are hidden through their state rather than deleted, and the
+        canvas is updated with whichever is fewer calls: toggling the cards
+        whose visibility changed, or setting everything at once by type tag
+        and then toggling the smaller of the shown or hidden sets.
+        """
+        store = self.app.store
+        hidden = set() if card_ids is None else set(store).difference(card_ids)
+        changed = hidden ^ self._hidden
+        self._hidden = hidden
+        # Cards outside the focus have no items to toggle; they are hidden when drawn
+        drawn = set(self.app.person_widgets)
+        drawn.update(self.app.textbox_widgets, self.app.legend_widgets)
+        changed &= drawn
+        drawn_hidden = hidden & drawn
+        drawn_shown = drawn - drawn_hidden
+        backend = self.backend
+        if len(changed) <= min(len(drawn_hidden), len(drawn_shown)):
+            toggled = changed
+            for card_id in toggled:
+                backend.set_state(self._card_tag(card_id), 'hidden' if card_id in hidden else 'normal')
+        else:
+            # Everything to the majority state by type tag, then the minority one card at a time
+            if len(drawn_hidden) <= len(drawn_shown):
+                majority, minority, toggled = 'normal', 'hidden', drawn_hidden
+            else:
+                majority, minority, toggled = 'hidden', 'normal', drawn_shown
+            for tag in ("person", "textbox", "legend", "edge"):
+                backend.set_state(tag, majority)
+            for card_id in toggled:
+                backend.set_state(self._card_tag(card_id), minority)
+        for key in store.edges_touching(toggled):
+            if key in self.app.connection_lines:
+                backend.set_state(f"edge_{key[0]}_{key[1]}",
+                                  'hidden' if key[0] in hidden or key[1] in hidden else 'normal')
+        if self._selection:
+            self._draw_selection()
+        logger.info(f"Filter changed: {len(drawn_shown)} cards shown, {len(drawn_hidden)} hidden, {len(toggled)} toggled")
+
+    def _card_tag(self, card_id):
+        return f"{self.app.store.type_of(card_id)}_{card_id}"
+
+    # Store events
+
+    def on_store_event(self, event):
+        """Apply a single store change to the canvas"""
+        handler = self._store_handlers.get(event.kind)
+        if handler:
+            handler(event)
+        # Keep the selection outlines on the cards they belong to
+        if self._selection and (event.kind == BATCH or event.card_id in self._selection):
+            self._draw_selection()
+
+    def show_selection(self, card_ids):
+        """Outline the multi-selected cards"""
+        self._selection = set(card_ids)
+        self._draw_selection()
+
+    def _draw_selection(self):
+        self.backend.delete("selection")
+        store = self.app.store
+        self._selection = {card_id for card_id in self._selection if card_id in store}
+        zoom = self.app.events.last_zoom
+        padding = 6
+        for card_id in self._selection:
+            if not self.is_visible(card_id):
+                continue
+            left, top, right, bottom = self.layout.bounds(card_id, store[card_id])
+            self.backend.rectangle((left - padding) * zoom, (top - padding) * zoom,
+                                   (right + padding) * zoom, (bottom + padding) * zoom,
+                                   outline=COLORS['primary'], width=2, tags=("selection",))
+        if self._selection:
+            self.backend.raise_item("selection")
+
+    def _on_card_added(self, event):
+        self.create_card_widget(event.card_id)
+
+    def _on_card_removed(self, event):
+        self.remove_card_widget(event.card_id, event.old.card_type)
+        self.layout.invalidate(event.card_id)
+        self._stale_cards.discard(event.card_id)
+        self._hidden.discard(event.card_id)
+
+    def _on_field_changed(self, event):
+        self.refresh_card_widget(event.card_id)
+
+    def _on_card_moved(self, event):
+        zoom = self.app.events.last_zoom
+        dx = (event.new[0] - event.old[0]) * zoom
+        dy = (event.new[1] - event.old[1]) * zoom
+        card_type = self.app.store.type_of(event.card_id)
+        if card_type is None:
+            return
+        for item in self.widgets_for(card_type).get(event.card_id, ()):
+            self.backend.move(item, dx, dy)
+        self.redraw_card_connections(event.card_id)
+
+    def _on_edge_added(self, event):
+        self.draw_connection(event.card_id, event.other_id, event.new, self.app.events.last_zoom)
+
+    def _on_edge_removed(self, event):
+        self.remove_connection_line(event.edge)
+
+    def _on_edge_relabeled(self, event):
+        self.remove_connection_line(event.edge)
+        self.draw_connection(event.card_id, event.other_id, event.new, self.app.events.last_zoom)
+
+    def _on_store_cleared(self, event):
+        self.backend.delete("all")
+        for widgets in (self.app.person_widgets, self.app.textbox_widgets, self.app.legend_widgets):
+            widgets.clear()
+        self.app.connection_lines.clear()
+        self.app.original_font_sizes.clear()
+        self.app.original_image_sizes.clear()
+        self.app.image_cache.clear()
+        self.app.scaled_image_cache.clear()
+        self.app.base_image_cache.clear()
+        self.layout.clear()
+        self._stale_cards.clear()
+        self._selection.clear()
+        self._focus = None
+        self._hidden.clear()
+        # Recreate the grid pattern after clearing
+        self.add_grid_pattern()
+
+    def _on_batch(self, event):
+        """Redraw everything a batch touched once, from the store's final state"""
+        if any(inner.kind == STORE_CLEARED for inner in event.new):
+            self._on_store_cleared(event)
+            cards = set(self.app.store)
+            edges = {key for key, _ in self.app.store.edges()}
+        else:
+            cards, edges = set(), set()
+            for inner in event.new:
+                if inner.kind in (EDGE_ADDED, EDGE_REMOVED, EDGE_RELABELED):
+                    edges.add(inner.edge)
+                else:
+                    cards.add(inner.card_id)
+                    if inner.kind == CARD_MOVED:
+                        for other_id in self.app.store.neighbors(inner.card_id):
+                            edges.add((min(inner.card_id, other_id), max(inner.card_id, other_id)))
+
+        if self.app.events.dragging:
+            self._stale_cards.update(card_id for card_id in cards if card_id in self.app.store)
+            cards = ()
+        # Delete every stale item in one call, then draw the final state
+        stale_items = []
+        redraw_cards = []
+        for card_id in cards:
+            for card_type in ('person', 'textbox', 'legend'):
+                stale_items.extend(self._pop_card_items(card_id, card_type))
+            if card_id in self.app.store:
+                redraw_cards.append(card_id)
+            else:
+                self.layout.invalidate(card_id)
+                self._hidden.discard(card_id)
+        redraw_edges = []
+        for key in edges:
+            stale_items.extend(self._pop_connection_items(key))
+            label = self.app.store.edge_label(*key, default=None)
+            if label is not None:
+                redraw_edges.append((key, label))
+        self.backend.delete(*stale_items)
+
+        zoom = self.app.events.last_zoom
+        for card_id in redraw_cards:
+            self.create_card_widget(card_id, zoom)
+        for key, label in redraw_edges:
+            self.draw_connection(key[0], key[1], label, zoom, restack=False)
+        if redraw_edges:
+            self.restack_cards()
+        logger.info(f"Applied batch of {len(event.new)} changes: {len(cards)} cards, {len(edges)} connections redrawn")
 
     def create_person_widget(self, person_id, zoom=None):
+        self._create_card_widget(person_id, self.app.people, self.app.person_widgets, "person",
+                                 lambda e, pid=person_id: self.app.events.edit_person(pid),
+                                 self.add_hover_effects, zoom)
+
+    def _create_card_widget(self, card_id, cards, widgets, kind, on_double_click, add_hover, zoom=None):
+        """Draw a card from its cached layout and register its canvas items"""
         if self.app.events.dragging:
-            logger.warning(f"Attempted to create widget for person {person_id} during drag - skipping")
+            logger.warning(f"Attempted to create widget for {kind} {card_id} during drag - skipping")
             return
-            
-        logger.info(f"Creating modern widget for person {person_id}")
-        person = self.app.people[person_id]
+
+        logger.info(f"Creating widget for {kind} {card_id}")
+        card = cards[card_id]
         if zoom is None:
             zoom = self.app.events.last_zoom if hasattr(self.app.events, 'last_zoom') else 1.0
 
-        if not hasattr(person, 'base_x'):
-            person.base_x = person.x
-            person.base_y = person.y
-        x = person.x * zoom
-        y = person.y * zoom
-        
-        group = []
-        
-        info_lines = [
-            f"👤 {person.name}" if person.name else "👤 Unnamed",
-            f"🎂 {person.dob}" if person.dob else "",
-            f"🏷️ {person.alias}" if person.alias else "",
-            f"🏠 {person.address}" if person.address else "",
-            f"📞 {person.phone}" if person.phone else "",
-            f"🔒 {person.ssn}" if person.ssn else "",
-            f"📧 {person.email}" if person.email else ""
-        ]
-        info_lines = [line for line in info_lines if line.strip()]
-        
-        image_file = None
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
-        if hasattr(person, 'files') and person.files:
-            image_file = next((fp for fp in person.files if os.path.exists(fp) and os.path.splitext(fp.lower())[1] in image_extensions), None)
-
-        base_width = max(max(len(line) for line in info_lines) * 9 if info_lines else 0, 200)
-        image_width = 120 if image_file else 0
-        card_width = (base_width + image_width + (20 if image_file else 0)) * zoom
-        card_height = max(len(info_lines) * 25 + 40, 120, 140 if image_file else 120) * zoom
-        
-        half_width = card_width // 2
-        half_height = card_height // 2
-        
-        shadow_offset = int(3 * zoom)
-        for i in range(3, 0, -1):
-            shadow_color = '#e0e0e0' if i == 3 else ('#d0d0d0' if i == 2 else '#c0c0c0')
-            shadow = self.app.canvas.create_rectangle(
-                x - half_width + i, y - half_height + i,
-                x + half_width + i, y + half_height + i,
-                fill=shadow_color, outline='', width=0,
-                tags=(f"person_{person_id}", "person", "shadow")
-            )
-            group.append(shadow)
+        if not hasattr(card, 'base_x'):
+            card.base_x = card.x
+            card.base_y = card.y
+
+        geometry = self.layout.get(card_id, card)
+        painter = CardPainter(self.backend, load_image=self.load_card_image)
+        painted = painter.paint(card_id, card, geometry, zoom, tags=(f"{kind}_{card_id}", kind))
+
+        for item, font in painted.fonts.items():
+            self.store_text_font_size(item, font)
+        if painted.images:
+            if not hasattr(self.app, 'image_refs'):
+                self.app.image_refs = {}
+            for item, (photo, base_width, base_height) in painted.images.items():
+                self.app.image_refs[item] = photo
+                self.app.original_image_sizes[item] = (base_width, base_height)
+
+        group = painted.items
+        widgets[card_id] = group
+        if card_id in self._hidden:
+            self.backend.set_state(f"{kind}_{card_id}", 'hidden')
 
-        person_color = CARD_COLORS[person.color % len(CARD_COLORS)]
-        
-        main_card = self.app.canvas.create_rectangle(
-            x - half_width, y - half_height, x + half_width, y + half_height,
-            fill=COLORS['surface'], outline=person_color, width=2,
-            tags=(f"person_{person_id}", "person")
-        )
-        group.append(main_card)
-        
-        header_height = int(30 * zoom)
-        header = self.app.canvas.create_rectangle(
-            x - half_width, y - half_height, x + half_width, y - half_height + header_height,
-            fill=person_color, outline='', width=0,
-            tags=(f"person_{person_id}", "person")
-        )
-        group.append(header)
-        
-        avatar_size = int(20 * zoom)
-        avatar_x = x - half_width + int(15 * zoom)
-        avatar_y = y - half_height + int(15 * zoom)
-
-        avatar_bg = self.app.canvas.create_oval(
-            avatar_x - avatar_size//2, avatar_y - avatar_size//2,
-            avatar_x + avatar_size//2, avatar_y + avatar_size//2,
-            fill='white', outline=person_color, width=2,
-            tags=(f"person_{person_id}", "person")
-        )
-        group.append(avatar_bg)
-
-        avatar_icon = self.app.canvas.create_text(
-            avatar_x, avatar_y, text="👤",
-            font=("Arial", int(10 * zoom)), fill=person_color,
-            tags=(f"person_{person_id}", "person")
-        )
-        self.store_text_font_size(avatar_icon, ("Arial", 10))
-        group.append(avatar_icon)
-
-        name_text = self.app.canvas.create_text(
-            avatar_x + avatar_size + int(10 * zoom), avatar_y,
-            text=person.name or "Unnamed",
-            anchor="w", font=("Segoe UI", int(11 * zoom), "bold"), 
-            fill='white',
-            tags=(f"person_{person_id}", "person")
-        )
-        self.store_text_font_size(name_text, ("Segoe UI", 11, "bold"))
-        group.append(name_text)
-
-        if getattr(person, 'files', []):
-            file_icon = self.app.canvas.create_text(
-                avatar_x + avatar_size + int(10 * zoom) + int(8 * zoom) + self.app.canvas.bbox(name_text)[2] - self.app.canvas.bbox(name_text)[0],
-                avatar_y,
-                text="📎",
-                anchor="w", font=("Segoe UI Emoji", int(10 * zoom)),
-                fill='white',
-                tags=(f"person_{person_id}", "person", "file_icon")
-            )
-            self.store_text_font_size(file_icon, ("Segoe UI Emoji", 10))
-            group.append(file_icon)
-
-        details_start_y = y - half_height + header_height + int(15 * zoom)
-        line_height = int(20 * zoom)
-
-        details = [("🎂", person.dob), ("🏷️", person.alias), ("🏠", person.address), ("📞", person.phone), ("🔒", person.ssn), ("📧", person.email)]
-
-        current_y = details_start_y
-        icon_x = x - half_width + int(15 * zoom)
-        text_x = icon_x + int(25 * zoom)
-        
-        for icon, value in details:
-            if value and value.strip():
-                icon_item = self.app.canvas.create_text(
-                    icon_x, current_y, text=icon, anchor="nw", font=("Segoe UI Emoji", int(9 * zoom)),
-                    fill=COLORS['text_primary'], tags=(f"person_{person_id}", "person")
-                )
-                self.store_text_font_size(icon_item, ("Segoe UI Emoji", 9))
-                text_item = self.app.canvas.create_text(
-                    text_x, current_y, text=value, anchor="nw", font=("Segoe UI", int(9 * zoom)),
-                    fill=COLORS['text_primary'], tags=(f"person_{person_id}", "person")
-                )
-                self.store_text_font_size(text_item, ("Segoe UI", 9))
-                group.extend([icon_item, text_item])
-                current_y += line_height
-        
-        if image_file and PIL_AVAILABLE:
-            try:
-                base_max_width, base_max_height = 100, 100
-                pil_image = Image.open(image_file)
-                img_ratio = pil_image.width / pil_image.height
-                if base_max_width / base_max_height > img_ratio:
-                    base_img_height = base_max_height
-                    base_img_width = int(base_img_height * img_ratio)
-                else:
-                    base_img_width = base_max_width
-                    base_img_height = int(base_img_width / img_ratio)
-                
-                img_width, img_height = int(base_img_width * zoom), int(base_img_height * zoom)
-                
-                photo = self.get_scaled_image(image_file, img_width, img_height)
-                
-                if photo:
-                    img_x = x + half_width - img_width//2 - int(10 * zoom)
-                    img_y = y - half_height + header_height + img_height//2 + int(10 * zoom)
-                    
-                    img_item = self.app.canvas.create_image(
-                        img_x, img_y, image=photo, anchor="center",
-                        tags=(f"person_{person_id}", "person", "image")
-                    )
-                    
-                    if not hasattr(self.app, 'image_refs'):
-                        self.app.image_refs = {}
-                    self.app.image_refs[img_item] = photo
-                    
-                    self.app.original_image_sizes[img_item] = (base_img_width, base_img_height)
-                    group.append(img_item)
-            except Exception as e:
-                logger.error(f"Failed to load image {image_file}: {e}")
-        
-        self.app.person_widgets[person_id] = group
-        
         for item in group:
-            self.app.canvas.tag_bind(item, "<Double-Button-1>", lambda e, pid=person_id: self.app.events.edit_person(pid))
-        
-        self.add_hover_effects(person_id, group)
-        logger.info(f"Modern widget creation complete for person {person_id}")
+            self.backend.bind(item, "<Double-Button-1>", on_double_click)
+
+        add_hover(card_id, group)
+        logger.info(f"Widget creation complete for {kind} {card_id}")
+
+    def load_card_image(self, image_path, max_width, max_height, zoom):
+        """Load a person image fitted to the card's image slot, as a PhotoImage scaled to zoom"""
+        if not PIL_AVAILABLE:
+            return None
+        try:
+            with Image.open(local_path(image_path)) as pil_image:
+                base_width, base_height = fit_image_size(pil_image.width, pil_image.height, max_width, max_height)
+            photo = self.get_scaled_image(image_path, max(1, int(base_width * zoom)), max(1, int(base_height * zoom)))
+            if photo:
+                return photo, base_width, base_height
+        except Exception as e:
+            logger.error(f"Failed to load image {image_path}: {e}")
+        return None
 
     def add_hover_effects(self, person_id, group):
         def on_enter(event):
@@ -471,25 +664,27 @@ class CanvasHelpers:
                         self.app.canvas.itemconfig(item, outline=person_color, width=2)
 
         for item in group:
-            self.app.canvas.tag_bind(item, "<Enter>", on_enter)
-            self.app.canvas.tag_bind(item, "<Leave>", on_leave)
+            self.backend.bind(item, "<Enter>", on_enter)
+            self.backend.bind(item, "<Leave>", on_leave)
 
     def highlight_card_for_connection(self, card_id):
         """Highlight a card (person, textbox, or legend) for connection"""
-        if card_id in self.app.people:
+        card_type = self.app.store.type_of(card_id)
+        if card_type == 'person':
             self.highlight_person_for_connection(card_id)
-        elif card_id in self.app.textboxes:
+        elif card_type == 'textbox':
             self.highlight_textbox_for_connection(card_id)
-        elif card_id in self.app.legends:
+        elif card_type == 'legend':
             self.highlight_legend_for_connection(card_id)
     
     def unhighlight_card_for_connection(self, card_id):
         """Unhighlight a card (person, textbox, or legend) for connection"""
-        if card_id in self.app.people:
+        card_type = self.app.store.type_of(card_id)
+        if card_type == 'person':
             self.unhighlight_person_for_connection(card_id)
-        elif card_id in self.app.textboxes:
+        elif card_type == 'textbox':
             self.unhighlight_textbox_for_connection(card_id)
-        elif card_id in self.app.legends:
+        elif card_type == 'legend':
             self.unhighlight_legend_for_connection(card_id)
 
     def highlight_textbox_for_connection(self, textbox_id):
@@ -533,157 +728,9 @@ class CanvasHelpers:
 
     def create_textbox_widget(self, textbox_id, zoom=None):
         """Create a textbox card widget on the canvas"""
-        if self.app.events.dragging:
-            logger.warning(f"Attempted to create widget for textbox {textbox_id} during drag - skipping")
-            return
-            
-        logger.info(f"Creating widget for textbox {textbox_id}")
-        textbox = self.app.textboxes[textbox_id]
-        if zoom is None:
-            zoom = self.app.events.last_zoom if hasattr(self.app.events, 'last_zoom') else 1.0
-
-        if not hasattr(textbox, 'base_x'):
-            textbox.base_x = textbox.x
-            textbox.base_y = textbox.y
-        x = textbox.x * zoom
-        y = textbox.y * zoom
-        
-        group = []
-        
-        # Calculate card dimensions based on content
-        title_width = len(textbox.title) * 10 if textbox.title else 100
-        
-        # For content, we'll use a fixed width for wrapping and calculate height based on wrapped lines
-        content_char_width = 70  # Characters per line for wrapping
-        wrapped_lines = []
-        if textbox.content:
-            content_lines = textbox.content.split('\n')
-            for line in content_lines:
-                if len(line) <= content_char_width:
-                    wrapped_lines.append(line)
-                else:
-                    # Wrap long lines
-                    words = line.split(' ')
-                    current_line = ''
-                    for word in words:
-                        if len(current_line + word) <= content_char_width:
-                            current_line += word + ' '
-                        else:
-                            if current_line:
-                                wrapped_lines.append(current_line.strip())
-                            current_line = word + ' '
-                    if current_line:
-                        wrapped_lines.append(current_line.strip())
-        
-        base_width = max(title_width, content_char_width * 8, 250)
-        base_height = max(120, 50 + len(wrapped_lines) * 20)
-        
-        card_width = base_width * zoom
-        card_height = base_height * zoom
-        
-        half_width = card_width // 2
-        half_height = card_height // 2
-        
-        # Create shadow effect
-        shadow_offset = int(3 * zoom)
-        for i in range(3, 0, -1):
-            shadow_color = '#e0e0e0' if i == 3 else ('#d0d0d0' if i == 2 else '#c0c0c0')
-            shadow = self.app.canvas.create_rectangle(
-                x - half_width + i, y - half_height + i,
-                x + half_width + i, y + half_height + i,
-                fill=shadow_color, outline='', width=0,
-                tags=(f"textbox_{textbox_id}", "textbox", "shadow")
-            )
-            group.append(shadow)
-
-        textbox_color = CARD_COLORS[textbox.color % len(CARD_COLORS)]
-        
-        # Main card
-        main_card = self.app.canvas.create_rectangle(
-            x - half_width, y - half_height, x + half_width, y + half_height,
-            fill=COLORS['surface'], outline=textbox_color, width=2,
-            tags=(f"textbox_{textbox_id}", "textbox")
-        )
-        group.append(main_card)
-        
-        # Header
-        header_height = int(35 * zoom)
-        header = self.app.canvas.create_rectangle(
-            x - half_width, y - half_height, x + half_width, y - half_height + header_height,
-            fill=textbox_color, outline='', width=0,
-            tags=(f"textbox_{textbox_id}", "textbox")
-        )
-        group.append(header)
-        
-        # Icon and title in header
-        icon_x = x - half_width + int(15 * zoom)
-        icon_y = y - half_height + int(17 * zoom)
-        
-        # Document icon
-        icon = self.app.canvas.create_text(
-            icon_x, icon_y, text="📝",
-            font=("Segoe UI Emoji", int(12 * zoom)), fill='white',
-            tags=(f"textbox_{textbox_id}", "textbox")
-        )
-        self.store_text_font_size(icon, ("Segoe UI Emoji", 12))
-        group.append(icon)
-
-        # Title text
-        title_text = self.app.canvas.create_text(
-            icon_x + int(25 * zoom), icon_y,
-            text=textbox.title or "Untitled",
-            anchor="w", font=("Segoe UI", int(12 * zoom), "bold"), 
-            fill='white',
-            tags=(f"textbox_{textbox_id}", "textbox")
-        )
-        self.store_text_font_size(title_text, ("Segoe UI", 12, "bold"))
-        group.append(title_text)
-
-        # Content area
-        if textbox.content:
-            content_start_y = y - half_height + header_height + int(15 * zoom)
-            content_x = x - half_width + int(15 * zoom)
-            
-            # Use wrapped lines for display
-            line_height = int(18 * zoom)
-            
-            # Limit display to 8 lines for the card
-            display_lines = wrapped_lines[:8]
-            
-            for i, line in enumerate(display_lines):
-                if line.strip():  # Only show non-empty lines
-                    line_y = content_start_y + (i * line_height)
-                    
-                    content_item = self.app.canvas.create_text(
-                        content_x, line_y, text=line, anchor="nw", 
-                        font=("Segoe UI", int(10 * zoom)),
-                        fill=COLORS['text_primary'], 
-                        tags=(f"textbox_{textbox_id}", "textbox")
-                    )
-                    self.store_text_font_size(content_item, ("Segoe UI", 10))
-                    group.append(content_item)
-            
-            # Show "..." if there are more lines
-            if len(wrapped_lines) > 8:
-                more_text = self.app.canvas.create_text(
-                    content_x, content_start_y + (8 * line_height), 
-                    text="...", anchor="nw", 
-                    font=("Segoe UI", int(10 * zoom), "italic"),
-                    fill=COLORS['text_secondary'], 
-                    tags=(f"textbox_{textbox_id}", "textbox")
-                )
-                self.store_text_font_size(more_text, ("Segoe UI", 10, "italic"))
-                group.append(more_text)
-
-        self.app.textbox_widgets[textbox_id] = group
-        
-        # Add event bindings
-        for item in group:
-            self.app.canvas.tag_bind(item, "<Double-Button-1>", 
-                                   lambda e, tid=textbox_id: self.app.events.edit_textbox(tid))
-        
-        self.add_textbox_hover_effects(textbox_id, group)
-        logger.info(f"Widget creation complete for textbox {textbox_id}")
+        self._create_card_widget(textbox_id, self.app.textboxes, self.app.textbox_widgets, "textbox",
+                                 lambda e, tid=textbox_id: self.app.events.edit_textbox(tid),
+                                 self.add_textbox_hover_effects, zoom)
 
     def add_textbox_hover_effects(self, textbox_id, group):
         """Add hover effects to textbox widgets"""
@@ -706,8 +753,8 @@ class CanvasHelpers:
                         self.app.canvas.itemconfig(item, outline=textbox_color, width=2)
         
         for item in group:
-            self.app.canvas.tag_bind(item, "<Enter>", on_enter)
-            self.app.canvas.tag_bind(item, "<Leave>", on_leave)
+            self.backend.bind(item, "<Enter>", on_enter)
+            self.backend.bind(item, "<Leave>", on_leave)
 
     def highlight_person_for_connection(self, person_id):
         """Highlight a person for connection"""
@@ -750,138 +797,9 @@ class CanvasHelpers:
 
     def create_legend_widget(self, legend_id, zoom=None):
         """Create a legend card widget on the canvas"""
-        if self.app.events.dragging:
-            logger.warning(f"Attempted to create widget for legend {legend_id} during drag - skipping")
-            return
-            
-        logger.info(f"Creating widget for legend {legend_id}")
-        legend = self.app.legends[legend_id]
-        if zoom is None:
-            zoom = self.app.events.last_zoom if hasattr(self.app.events, 'last_zoom') else 1.0
-
-        if not hasattr(legend, 'base_x'):
-            legend.base_x = legend.x
-            legend.base_y = legend.y
-        x = legend.x * zoom
-        y = legend.y * zoom
-        
-        group = []
-        
-        # Calculate card dimensions based on legend entries
-        title_width = len(legend.title) * 10 if legend.title else 100
-        
-        # Calculate width based on longest description
-        max_desc_width = 0
-        for desc in legend.color_entries.values():
-            if desc:
-                max_desc_width = max(max_desc_width, len(desc) * 8)
-        
-        # Add space for color swatch + padding
-        swatch_width = 30
-        padding = 20
-        
-        base_width = max(title_width, max_desc_width + swatch_width + padding, 250)
-        base_height = max(120, 60 + len(legend.color_entries) * 30)
-        
-        card_width = base_width * zoom
-        card_height = base_height * zoom
-        
-        half_width = card_width // 2
-        half_height = card_height // 2
-        
-        # Create shadow effect
-        shadow_offset = int(3 * zoom)
-        for i in range(3, 0, -1):
-            shadow_color = '#e0e0e0' if i == 3 else ('#d0d0d0' if i == 2 else '#c0c0c0')
-            shadow = self.app.canvas.create_rectangle(
-                x - half_width + i, y - half_height + i,
-                x + half_width + i, y + half_height + i,
-                fill=shadow_color, outline='', width=0,
-                tags=(f"legend_{legend_id}", "legend", "shadow")
-            )
-            group.append(shadow)
-
-        # Main card (no color outline - legend cards are neutral)
-        main_card = self.app.canvas.create_rectangle(
-            x - half_width, y - half_height, x + half_width, y + half_height,
-            fill=COLORS['surface'], outline=COLORS['border'], width=2,
-            tags=(f"legend_{legend_id}", "legend")
-        )
-        group.append(main_card)
-        
-        # Header
-        header_height = int(35 * zoom)
-        header = self.app.canvas.create_rectangle(
-            x - half_width, y - half_height, x + half_width, y - half_height + header_height,
-            fill=COLORS['slate_gray'], outline='', width=0,
-            tags=(f"legend_{legend_id}", "legend")
-        )
-        group.append(header)
-        
-        # Icon and title in header
-        icon_x = x - half_width + int(15 * zoom)
-        icon_y = y - half_height + int(17 * zoom)
-        
-        # Title text (no folder icon)
-        title_text = self.app.canvas.create_text(
-            icon_x, icon_y,
-            text=legend.title or "Legend",
-            anchor="w", font=("Segoe UI", int(12 * zoom), "bold"), 
-            fill='white',
-            tags=(f"legend_{legend_id}", "legend")
-        )
-        self.store_text_font_size(title_text, ("Segoe UI", 12, "bold"))
-        group.append(title_text)
-
-        # Color entries
-        if legend.color_entries:
-            entry_start_y = y - half_height + header_height + int(15 * zoom)
-            entry_x = x - half_width + int(15 * zoom)
-            
-            line_height = int(25 * zoom)
-            swatch_size = int(15 * zoom)
-            
-            for i, (color_index, description) in enumerate(legend.color_entries.items()):
-                entry_y = entry_start_y + (i * line_height)
-                
-                # Draw color swatch
-                if isinstance(color_index, (int, str)):
-                    try:
-                        color_idx = int(color_index)
-                        color = CARD_COLORS[color_idx % len(CARD_COLORS)]
-                    except (ValueError, IndexError):
-                        color = CARD_COLORS[0]
-                else:
-                    color = CARD_COLORS[0]
-                
-                swatch = self.app.canvas.create_rectangle(
-                    entry_x, entry_y - swatch_size//2,
-                    entry_x + swatch_size, entry_y + swatch_size//2,
-                    fill=color, outline=COLORS['border'], width=1,
-                    tags=(f"legend_{legend_id}", "legend")
-                )
-                group.append(swatch)
-                
-                # Draw description text
-                desc_text = self.app.canvas.create_text(
-                    entry_x + swatch_size + int(10 * zoom), entry_y, 
-                    text=description or f"Color {color_index}",
-                    anchor="w", font=("Segoe UI", int(10 * zoom)),
-                    fill=COLORS['text_primary'], 
-                    tags=(f"legend_{legend_id}", "legend")
-                )
-                self.store_text_font_size(desc_text, ("Segoe UI", 10))
-                group.append(desc_text)
-
-        self.app.legend_widgets[legend_id] = group
-        
-        # Add event bindings
-        for item in group:
-            self.app.canvas.tag_bind(item, "<Double-Button-1>", 
-                                   lambda e, lid=legend_id: self.app.events.edit_legend(lid))
-        
-        self.add_legend_hover_effects(legend_id, group)
-        logger.info(f"Widget creation complete for legend {legend_id}")
+        self._create_card_widget(legend_id, self.app.legends, self.app.legend_widgets, "legend",
+                                 lambda e, lid=legend_id: self.app.events.edit_legend(lid),
+                                 self.add_legend_hover_effects, zoom)
 
     def add_legend_hover_effects(self, legend_id, group):
         """Add hover effects to legend widgets"""
@@ -908,8 +826,8 @@ class CanvasHelpers:
                             self.app.canvas.itemconfig(item, outline=COLORS['border'], width=2)
         
         for item in group:
-            self.app.canvas.tag_bind(item, "<Enter>", on_enter)
-            self.app.canvas.tag_bind(item, "<Leave>", on_leave)
+            self.backend.bind(item, "<Enter>", on_enter)
+            self.backend.bind(item, "<Leave>", on_leave)
 
     def highlight_legend_for_connection(self, legend_id):
         """Highlight a legend for connection"""
@@ -0,0 +1,395 @@
+# card_layout.py
+"""
+Card layout engine shared by the canvas and the PNG exporter.
+
+``LayoutEngine`` computes a zoom-independent ``CardGeometry`` for each card
+(size, header height, detail rows, wrapped text, image slot) and caches it
+until one of the card's layout-relevant fields changes. ``CardPainter``
+draws a card from its geometry through any render backend, so the canvas
+and the exporter produce the same card at any scale.
+"""
+
+import os
+
+from src.constants import COLORS, CARD_COLORS
+from src.project_io import attachment_available
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
+
+# Layout constants (world units, i.e. pixels at zoom 1.0)
+PERSON_CHAR_WIDTH = 9
+PERSON_MIN_WIDTH = 200
+PERSON_HEADER_HEIGHT = 30
+PERSON_IMAGE_WIDTH = 120
+PERSON_IMAGE_GAP = 20
+PERSON_IMAGE_MAX = 100
+TEXTBOX_WRAP_CHARS = 70
+TEXTBOX_MAX_LINES = 8
+TEXTBOX_HEADER_HEIGHT = 35
+LEGEND_HEADER_HEIGHT = 35
+SHADOW_COLORS = {3: '#e0e0e0', 2: '#d0d0d0', 1: '#c0c0c0'}
+
+# Detail rows: (attribute, emoji icon, text label used by backends without emoji support)
+PERSON_DETAIL_FIELDS = [
+    ('dob', "🎂", "DOB:"),
+    ('alias', "🏷️", "Alias:"),
+    ('address', "🏠", "Addr:"),
+    ('phone', "📞", "Phone:"),
+    ('ssn', "🔒", "SSN:"),
+    ('email', "📧", "Email:"),
+]
+
+
+def find_image_file(files):
+    """Return the first existing image among a card's attached files, or None
+
+    An image still in its project's archive counts as existing; it is
+    extracted when it is drawn.
+    """
+    for file_path in files or ():
+        if os.path.splitext(file_path.lower())[1] in IMAGE_EXTENSIONS and attachment_available(file_path):
+            return file_path
+    return None
+
+
+def fit_image_size(width, height, max_width, max_height):
+    """Scale (width, height) to fit inside (max_width, max_height), keeping the aspect ratio"""
+    img_ratio = width / height
+    if max_width / max_height > img_ratio:
+        return int(max_height * img_ratio), max_height
+    return max_width, int(max_width / img_ratio)
+
+
+def wrap_text(content, width=TEXTBOX_WRAP_CHARS):
+    """Word-wrap content into lines of at most width characters"""
+    wrapped_lines = []
+    if not content:
+        return wrapped_lines
+    for line in content.split('\n'):
+        if len(line) <= width:
+            wrapped_lines.append(line)
+            continue
+        current_line = ''
+        for word in line.split(' '):
+            if len(current_line + word) <= width:
+                current_line += word + ' '
+            else:
+                if current_line:
+                    wrapped_lines.append(current_line.strip())
+                current_line = word + ' '
+        if current_line:
+            wrapped_lines.append(current_line.strip())
+    return wrapped_lines
+
+
+def card_kind(card):
+    """Return 'person', 'textbox' or 'legend' for a card object"""
+    return card.card_type
+
+
+class CardGeometry:
+    """
+    Zoom-independent geometry of a card, relative to the card center
+    """
+    __slots__ = ('kind', 'width', 'height', 'header_height', 'rows', 'lines',
+                 'truncated', 'entries', 'image_file', 'has_files')
+
+    def __init__(self, kind, width, height, header_height, rows=(), lines=(),
+                 truncated=False, entries=(), image_file=None, has_files=False):
+        self.kind = kind
+        self.width = width
+        self.height = height
+        self.header_height = header_height
+        self.rows = rows              # Person detail rows: [(icon, label, value)]
+        self.lines = lines            # Textbox content lines to display
+        self.truncated = truncated    # Textbox content has more lines than displayed
+        self.entries = entries        # Legend entries: [(color, description)]
+        self.image_file = image_file  # Person image shown in the image slot
+        self.has_files = has_files
+
+    def __repr__(self):
+        return f"CardGeometry(kind='{self.kind}', width={self.width}, height={self.height})"
+
+    @property
+    def half_width(self):
+        return self.width / 2
+
+    @property
+    def half_height(self):
+        return self.height / 2
+
+    def bounds(self, x, y):
+        """World-space bounding box of a card centred at (x, y)"""
+        half_width, half_height = self.width / 2, self.height / 2
+        return (x - half_width, y - half_height, x + half_width, y + half_height)
+
+    def image_slot(self):
+        """Image slot as (right, top, max_width, max_height) relative to the card center"""
+        if not self.image_file:
+            return None
+        return (self.width / 2 - 10, -self.height / 2 + self.header_height + 10,
+                PERSON_IMAGE_MAX, PERSON_IMAGE_MAX)
+
+
+def layout_signature(card):
+    """Tuple of the fields that affect a card's geometry"""
+    kind = card_kind(card)
+    if kind == 'person':
+        return (kind, card.name, card.dob, card.alias, card.address, card.phone,
+                card.ssn, card.email, tuple(card.files) if card.file_count() else ())
+    if kind == 'textbox':
+        return (kind, card.title, card.content)
+    return (kind, card.title, tuple(card.color_entries.items()))
+
+
+def compute_geometry(card):
+    """Compute the geometry of a card from its fields"""
+    kind = card_kind(card)
+    if kind == 'person':
+        rows = [(icon, label, getattr(card, attr)) for attr, icon, label in PERSON_DETAIL_FIELDS
+                if getattr(card, attr) and getattr(card, attr).strip()]
+        info_lines = [f"👤 {card.name}" if card.name else "👤 Unnamed"]
+        info_lines.extend(f"{icon} {value}" for icon, _, value in rows)
+        files = card.files if card.file_count() else ()
+        image_file = find_image_file(files)
+        base_width = max(max(len(line) for line in info_lines) * PERSON_CHAR_WIDTH, PERSON_MIN_WIDTH)
+        if image_file:
+            base_width += PERSON_IMAGE_WIDTH + PERSON_IMAGE_GAP
+        height = max(len(info_lines) * 25 + 40, 140 if image_file else 120)
+        return CardGeometry(kind, base_width, height, PERSON_HEADER_HEIGHT, rows=rows,
+                            image_file=image_file, has_files=bool(files))
+
+    if kind == 'textbox':
+        wrapped_lines = wrap_text(card.content)
+        lines = wrapped_lines[:TEXTBOX_MAX_LINES]
+        truncated = len(wrapped_lines) > TEXTBOX_MAX_LINES
+        title_width = len(card.title) * 10 if card.title else 100
+        width = max(title_width, TEXTBOX_WRAP_CHARS * 8, 250)
+        # Size to the rows actually displayed (plus the "..." row when truncated)
+        height = max(120, 50 + (len(lines) + (1 if truncated else 0)) * 20)
+        return CardGeometry(kind, width, height, TEXTBOX_HEADER_HEIGHT, lines=lines, truncated=truncated)
+
+    entries = []
+    for color_index, description in card.color_entries.items():
+        try:
+            color = CARD_COLORS[int(color_index) % len(CARD_COLORS)]
+        except (ValueError, TypeError):
+            color = CARD_COLORS[0]
+        entries.append((color, description or f"Color {color_index}"))
+    title_width = len(card.title) * 10 if card.title else 100
+    max_desc_width = max((len(desc) * 8 for desc in card.color_entries.values() if desc), default=0)
+    width = max(title_width, max_desc_width + 30 + 20, 250)
+    height = max(120, 60 + len(entries) * 30)
+    return CardGeometry(kind, width, height, LEGEND_HEADER_HEIGHT, entries=entries)
+
+
+class LayoutEngine:
+    """
+    Caches card geometry, recomputing it only when a card's fields change
+    """
+    def __init__(self):
+        self._cache = {}  # {card_id: (signature, CardGeometry)}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, card_id, card):
+        """Return the cached geometry for a card, recomputing it if its fields changed"""
+        signature = layout_signature(card)
+        cached = self._cache.get(card_id)
+        if cached is not None and cached[0] == signature:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        geometry = compute_geometry(card)
+        self._cache[card_id] = (signature, geometry)
+        return geometry
+
+    def bounds(self, card_id, card):
+        """World-space bounding box of a card"""
+        return self.get(card_id, card).bounds(card.x, card.y)
+
+    def invalidate(self, card_id):
+        self._cache.pop(card_id, None)
+
+    def clear(self):
+        self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class PaintedCard:
+    """
+    Items produced by painting one card
+    """
+    __slots__ = ('items', 'fonts', 'images')
+
+    def __init__(self):
+        self.items = []
+        self.fonts = {}   # {item: base font tuple at zoom 1.0}
+        self.images = {}  # {item: (image, base_width, base_height)}
+
+    def add(self, item, font=None):
+        self.items.append(item)
+        if font is not None:
+            self.fonts[item] = font
+        return item
+
+
+class CardPainter:
+    """
+    Draws cards from their geometry through a render backend.
+
+    ``zoom`` scales geometry and fonts; ``pixel_scale`` scales hairline
+    details (borders, shadows) so high-DPI exports keep their proportions.
+    ``load_image(path, max_width, max_height, zoom)`` returns (image,
+    base_width, base_height) with the image already scaled to zoom, or None.
+    """
+    def __init__(self, backend, load_image=None):
+        self.backend = backend
+        self.load_image = load_image
+
+    def paint(self, card_id, card, geometry, zoom=1.0, pixel_scale=1.0, tags=()):
+        if geometry.kind == 'person':
+            return self.paint_person(card, geometry, zoom, pixel_scale, tags)
+        if geometry.kind == 'textbox':
+            return self.paint_textbox(card, geometry, zoom, pixel_scale, tags)
+        return self.paint_legend(card, geometry, zoom, pixel_scale, tags)
+
+    def _text(self, painted, x, y, text, font, zoom, fill, anchor, tags):
+        scaled_font = (font[0], max(1, int(font[1] * zoom))) + tuple(font[2:])
+        item = self.backend.text(x, y, text=text, font=scaled_font, fill=fill, anchor=anchor, tags=tags)
+        return painted.add(item, font)
+
+    def _frame(self, painted, x, y, geometry, zoom, pixel_scale, tags, outline, header_fill):
+        """Draw shadows, card body and header; returns the card's top-left corner"""
+        backend = self.backend
+        half_width = geometry.width * zoom // 2
+        half_height = geometry.height * zoom // 2
+        for i in range(3, 0, -1):
+            offset = i * pixel_scale
+            painted.add(backend.rectangle(
+                x - half_width + offset, y - half_height + offset,
+                x + half_width + offset, y + half_height + offset,
+                fill=SHADOW_COLORS[i], outline='', width=0, tags=tags + ("shadow",)))
+        painted.add(backend.rectangle(
+            x - half_width, y - half_height, x + half_width, y + half_height,
+            fill=COLORS['surface'], outline=outline, width=2 * pixel_scale, tags=tags))
+        painted.add(backend.rectangle(
+            x - half_width, y - half_height,
+            x + half_width, y - half_height + int(geometry.header_height * zoom),
+            fill=header_fill, outline='', width=0, tags=tags))
+        return x - half_width, y - half_height, half_width
+
+    def paint_person(self, card, geometry, zoom, pixel_scale, tags):
+        backend = self.backend
+        painted = PaintedCard()
+        color = CARD_COLORS[card.color % len(CARD_COLORS)]
+        x, y = card.x * zoom, card.y * zoom
+        left, top, half_width = self._frame(painted, x, y, geometry, zoom, pixel_scale, tags, color, color)
+        header_height = int(geometry.header_height * zoom)
+
+        avatar_size = int(20 * zoom)
+        avatar_x = left + int(15 * zoom)
+        avatar_y = top + int(15 * zoom)
+        painted.add(backend.oval(
+            avatar_x - avatar_size // 2, avatar_y - avatar_size // 2,
+            avatar_x + avatar_size // 2, avatar_y + avatar_size // 2,
+            fill='white', outline=color, width=2 * pixel_scale, tags=tags))
+        if backend.supports_emoji:
+            self._text(painted, avatar_x, avatar_y, "👤", ("Arial", 10), zoom, color, "center", tags)
+
+        name_x = avatar_x + avatar_size + int(10 * zoom)
+        name_font = ("Segoe UI", 11, "bold")
+        name_text = self._text(painted, name_x, avatar_y, card.name or "Unnamed", name_font,
+                               zoom, 'white', "w", tags)
+        if geometry.has_files and backend.supports_emoji:
+            box = backend.bbox(name_text)
+            name_width = box[2] - box[0] if box else backend.measure_text(
+                card.name or "Unnamed", (name_font[0], max(1, int(11 * zoom)), "bold"))[0]
+            self._text(painted, name_x + int(8 * zoom) + name_width, avatar_y, "📎",
+                       ("Segoe UI Emoji", 10), zoom, 'white', "w", tags + ("file_icon",))
+
+        icon_x = left + int(15 * zoom)
+        text_x = icon_x + int((25 if backend.supports_emoji else 40) * zoom)
+        current_y = top + header_height + int(15 * zoom)
+        line_height = int(20 * zoom)
+        for icon, label, value in geometry.rows:
+            if backend.supports_emoji:
+                self._text(painted, icon_x, current_y, icon, ("Segoe UI Emoji", 9), zoom,
+                           COLORS['text_primary'], "nw", tags)
+            else:
+                self._text(painted, icon_x, current_y, label, ("Segoe UI", 9), zoom,
+                           COLORS['text_secondary'], "nw", tags)
+            self._text(painted, text_x, current_y, value, ("Segoe UI", 9), zoom,
+                       COLORS['text_primary'], "nw", tags)
+            current_y += line_height
+
+        slot = geometry.image_slot()
+        if slot and self.load_image:
+            right, slot_top, max_width, max_height = slot
+            loaded = self.load_image(geometry.image_file, max_width, max_height, zoom)
+            if loaded:
+                image, base_width, base_height = loaded
+                item = backend.image(x + right * zoom, y + slot_top * zoom, image,
+                                     anchor="ne", tags=tags + ("image",))
+                painted.add(item)
+                painted.images[item] = (image, base_width, base_height)
+        return painted
+
+    def paint_textbox(self, card, geometry, zoom, pixel_scale, tags):
+        backend = self.backend
+        painted = PaintedCard()
+        color = CARD_COLORS[card.color % len(CARD_COLORS)]
+        x, y = card.x * zoom, card.y * zoom
+        left, top, half_width = self._frame(painted, x, y, geometry, zoom, pixel_scale, tags, color, color)
+        header_height = int(geometry.header_height * zoom)
+
+        icon_x = left + int(15 * zoom)
+        icon_y = top + int(17 * zoom)
+        if backend.supports_emoji:
+            self._text(painted, icon_x, icon_y, "📝", ("Segoe UI Emoji", 12), zoom, 'white', "center", tags)
+        else:
+            icon_size = int(16 * zoom)
+            painted.add(backend.rectangle(
+                icon_x - icon_size // 2, icon_y - icon_size // 2,
+                icon_x + icon_size // 2, icon_y + icon_size // 2,
+                fill='white', outline=color, width=2 * pixel_scale, tags=tags))
+        self._text(painted, icon_x + int(25 * zoom), icon_y, card.title or "Untitled",
+                   ("Segoe UI", 12, "bold"), zoom, 'white', "w", tags)
+
+        content_x = left + int(15 * zoom)
+        content_start_y = top + header_height + int(15 * zoom)
+        line_height = int(18 * zoom)
+        for i, line in enumerate(geometry.lines):
+            if line.strip():
+                self._text(painted, content_x, content_start_y + i * line_height, line,
+                           ("Segoe UI", 10), zoom, COLORS['text_primary'], "nw", tags)
+        if geometry.truncated:
+            self._text(painted, content_x, content_start_y + len(geometry.lines) * line_height, "...",
+                       ("Segoe UI", 10, "italic"), zoom, COLORS['text_secondary'], "nw", tags)
+        return painted
+
+    def paint_legend(self, card, geometry, zoom, pixel_scale, tags):
+        backend = self.backend
+        painted = PaintedCard()
+        x, y = card.x * zoom, card.y * zoom
+        left, top, half_width = self._frame(painted, x, y, geometry, zoom, pixel_scale, tags,
+                                            COLORS['border'], COLORS['slate_gray'])
+        header_height = int(geometry.header_height * zoom)
+
+        self._text(painted, left + int(15 * zoom), top + int(17 * zoom), card.title or "Legend",
+                   ("Segoe UI", 12, "bold"), zoom, 'white', "w", tags)
+
+        entry_x = left + int(15 * zoom)
+        entry_start_y = top + header_height + int(15 * zoom)
+        line_height = int(25 * zoom)
+        swatch_size = int(15 * zoom)
+        for i, (color, description) in enumerate(geometry.entries):
+            entry_y = entry_start_y + i * line_height
+            painted.add(backend.rectangle(
+                entry_x, entry_y - swatch_size // 2, entry_x + swatch_size, entry_y + swatch_size // 2,
+                fill=color, outline=COLORS['border'], width=pixel_scale, tags=tags))
+            self._text(painted, entry_x + swatch_size + int(10 * zoom), entry_y, description,
+                       ("Segoe UI", 10), zoom, COLORS['text_primary'], "w", tags)
+        return painted
@@ -0,0 +1,46 @@
+# change_tracking.py
+"""
+Tracks unsaved changes to the network.
+
+Subscribes to the graph store's change events, keeps a dirty flag and a
+running count of changes since the last save/load, and marks the window
+title with "*" while there are unsaved changes.
+"""
+
+import logging
+from collections import Counter
+
+from src.graph_store import BATCH
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeTracker:
+    """
+    Dirty flag and change statistics driven by store events
+    """
+    def __init__(self, app, title="COMRADE"):
+        self.app = app
+        self.title = title
+        self.dirty = False
+        self.changes = Counter()  # {event kind: count} since the last save/load
+        app.store.subscribe(self.on_store_event)
+
+    def on_store_event(self, event):
+        for change in (event.new if event.kind == BATCH else (event,)):
+            self.changes[change.kind] += 1
+        if not self.dirty:
+            self.dirty = True
+            self._update_title()
+
+    def mark_clean(self):
+        """Forget pending changes, e.g. after saving or loading"""
+        self.changes.clear()
+        if self.dirty:
+            self.dirty = False
+            self._update_title()
+
+    def _update_title(self):
+        root = getattr(self.app, 'root', None)
+        if root is not None:
+            root.title(f"{self.title} *" if self.dirty else self.title)
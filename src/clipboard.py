@@ -0,0 +1,95 @@
+# clipboard.py
+"""
+Subgraph clipboard for copy/cut/paste.
+
+A copied selection is kept as a compact, JSON-ready dict: each card's
+non-empty fields plus the edges between the selected cards (edges leading
+outside the selection are dropped). The same JSON text is put on the system
+clipboard so cards can be pasted into another COMRADE window. Pasting
+remaps the ids and inserts every card and edge in one store batch.
+"""
+
+import json
+import logging
+
+from src.models import Person, TextboxCard, LegendCard
+
+logger = logging.getLogger(__name__)
+
+CLIPBOARD_FORMAT = "comrade-subgraph"
+CLIPBOARD_VERSION = 1
+
+CARD_CLASSES = {'person': Person, 'textbox': TextboxCard, 'legend': LegendCard}
+
+
+def copy_subgraph(store, card_ids):
+    """Serialize cards and the edges among them"""
+    selected = [card_id for card_id in dict.fromkeys(card_ids) if card_id in store]
+    inside = set(selected)
+    cards = []
+    for card_id in selected:
+        data = store[card_id].to_dict()
+        del data['connections']
+        # Empty fields fall back to their defaults on paste
+        entry = {key: value for key, value in data.items() if value not in ("", [], {}, None)}
+        entry['id'] = card_id
+        entry['type'] = store.type_of(card_id)
+        cards.append(entry)
+    edges = []
+    for card_id in selected:
+        for other_id, label in store.iter_neighbors(card_id):
+            if card_id < other_id and other_id in inside:
+                edges.append([card_id, other_id, label])
+    return {'format': CLIPBOARD_FORMAT, 'version': CLIPBOARD_VERSION, 'cards': cards, 'edges': edges}
+
+
+def to_json(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def from_json(text):
+    """Parse clipboard text; returns None unless it holds a copied COMRADE subgraph"""
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('format') != CLIPBOARD_FORMAT:
+        return None
+    if data.get('version', 0) > CLIPBOARD_VERSION:
+        logger.warning(f"Clipboard data version {data.get('version')} is newer than supported")
+        return None
+    return data
+
+
+def clipboard_files(data):
+    """Paths of the files attached to the people in copied subgraph data"""
+    if not data:
+        return set()
+    return {path for entry in data.get('cards', ()) if entry.get('type') == 'person'
+            for path in entry.get('files', ())}
+
+
+def paste_subgraph(store, data, x, y):
+    """Insert a copied subgraph centred on (x, y) in one batch; returns the new card ids"""
+    cards = [entry for entry in data.get('cards', ()) if entry.get('type') in CARD_CLASSES]
+    if not cards:
+        return []
+
+    # Keep the cards' relative layout, with the group centred on the paste position
+    xs = [entry.get('x', 0) for entry in cards]
+    ys = [entry.get('y', 0) for entry in cards]
+    offset_x = x - (min(xs) + max(xs)) / 2
+    offset_y = y - (min(ys) + max(ys)) / 2
+
+    id_map = {}  # {copied id: new id}
+    with store.batch():
+        for entry in cards:
+            card = CARD_CLASSES[entry['type']].from_dict(entry)
+            card.x += offset_x
+            card.y += offset_y
+            id_map[entry.get('id')] = store.add(card)
+        for id1, id2, label in data.get('edges', ()):
+            if id1 in id_map and id2 in id_map:
+                store.connect(id_map[id1], id_map[id2], label)
+    logger.info(f"Pasted {len(id_map)} cards")
+    return list(id_map.values())
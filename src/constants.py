@@ -37,6 +37,9 @@ CARD_COLORS = [
     '#be185d'   # Pink
 ]
 
+# Names of the card colors, as used in filters (color=red)
+CARD_COLOR_NAMES = ['blue', 'red', 'green', 'yellow', 'purple', 'orange', 'cyan', 'pink']
+
 # Application settings
 APP_TITLE = "🔗 People Connection Visualizer"
 WINDOW_WIDTH = 1500
@@ -4,8 +4,6 @@ from tkinter import messagebox, filedialog
 import csv
 import os
 import json
-import zipfile
-import tempfile
 import shutil
 import logging
 import threading
@@ -14,7 +12,7 @@ import urllib.error
 import webbrowser
 
 try:
-    from PIL import Image, ImageDraw, ImageFont
+    from PIL import Image
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
@@ -22,122 +20,49 @@ except ImportError:
 from src.models import Person, TextboxCard, LegendCard
 from src.dialogs import VersionUpdateDialog, NoUpdateDialog
 from src.constants import COLORS, CARD_COLORS, COMRADE_VERSION
+from src.render_backend import PILBackend
+from src.card_layout import CardPainter, fit_image_size
+from src.clipboard import clipboard_files
+from src.project_io import (CONNECTION, ProjectAttachments, local_path, open_project_csv, read_project_csv,
+                            release_projects, write_project)
+from src.project_db import (PAGE_MARGIN, PROJECT_DB_EXTENSION, DatabaseAttachments, ProjectDatabase,
+                            is_project_db, write_project_db)
 
 logger = logging.getLogger(__name__)
 
+VIEW_POLL_MS = 150  # How often a project database being paged in checks whether the view moved
+
 class DataManagement:
     def __init__(self, app):
         self.app = app
+        self._paged_load = None  # (database, attachments, ids of its cards loaded, total cards) while one is paged in
+        self._paged_view = None  # World rectangle the cards were last paged in for
+        self._view_job = None
 
     def save_data(self):
-        """Save data as a ZIP file containing CSV and all attached files"""
+        """Save data as a ZIP file containing CSV and all attached files, or as a project database"""
         filename = filedialog.asksaveasfilename(
             defaultextension=".zip",
-            filetypes=[("COMRADE files", "*.zip"), ("All files", "*.*")]
+            filetypes=[("COMRADE files", "*.zip"), ("COMRADE database", "*" + PROJECT_DB_EXTENSION),
+                       ("All files", "*.*")]
         )
         if not filename:
             return
             
         try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Create CSV file in temp directory
-                csv_path = os.path.join(temp_dir, "data.csv")
-                file_mapping = {}  # Maps original paths to ZIP internal paths
-                
-                with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['ID', 'Name', 'DOB', 'Alias', 'Address', 'Phone', 'SSN', 'Email', 'X', 'Y', 'Color', 'Files', 'Type'])
-
-                    # Save people
-                    for person_id, person in self.app.people.items():
-                        # Process attached files
-                        zip_file_paths = []
-                        if hasattr(person, 'files') and person.files:
-                            for file_path in person.files:
-                                if os.path.exists(file_path):
-                                    # Create unique filename in ZIP
-                                    filename_only = os.path.basename(file_path)
-                                    name, ext = os.path.splitext(filename_only)
-                                    zip_internal_path = f"files/{person_id}_{name}{ext}"
-                                    
-                                    # Handle duplicate filenames
-                                    counter = 1
-                                    while zip_internal_path in file_mapping.values():
-                                        zip_internal_path = f"files/{person_id}_{name}_{counter}{ext}"
-                                        counter += 1
-                                    
-                                    file_mapping[file_path] = zip_internal_path
-                                    zip_file_paths.append(zip_internal_path)
-                        
-                        # Convert file paths list to JSON string for CSV storage
-                        files_json = json.dumps(zip_file_paths) if zip_file_paths else ""
-                        
-                        writer.writerow([
-                            person_id, person.name, person.dob, person.alias, 
-                            person.address, person.phone, person.ssn, person.email, person.x, person.y, 
-                            person.color, files_json, 'person'
-                        ])
-                    
-                    # Save textboxes
-                    for textbox_id, textbox in self.app.textboxes.items():
-                        writer.writerow([
-                            textbox_id, textbox.title, textbox.content, '', 
-                            '', '', textbox.x, textbox.y, 
-                            textbox.color, '', 'textbox'
-                        ])
-                    
-                    # Save legend cards
-                    for legend_id, legend in self.app.legends.items():
-                        # Convert color_entries dict to JSON string for CSV storage
-                        color_entries_json = json.dumps(legend.color_entries) if legend.color_entries else ""
-                        writer.writerow([
-                            legend_id, legend.title, color_entries_json, '', 
-                            '', '', legend.x, legend.y, 
-                            0, '', 'legend'  # legends don't have a color property
-                        ])
-                    
-                    writer.writerow(['CONNECTIONS'])
-                    writer.writerow(['From_ID', 'To_ID', 'Label'])
-                    
-                    # Save connections
-                    saved = set()
-                    # Save connections from people
-                    for id1, person in self.app.people.items():
-                        for id2, label in person.connections.items():
-                            key = (min(id1, id2), max(id1, id2))
-                            if key not in saved:
-                                writer.writerow([id1, id2, label])
-                                saved.add(key)
-                    
-                    # Save connections from textboxes
-                    for id1, textbox in self.app.textboxes.items():
-                        for id2, label in textbox.connections.items():
-                            key = (min(id1, id2), max(id1, id2))
-                            if key not in saved:
-                                writer.writerow([id1, id2, label])
-                                saved.add(key)
-                    
-                    # Save connections from legend cards
-                    for id1, legend in self.app.legends.items():
-                        for id2, label in legend.connections.items():
-                            key = (min(id1, id2), max(id1, id2))
-                            if key not in saved:
-                                writer.writerow([id1, id2, label])
-                                saved.add(key)
-                
-                # Create ZIP file
-                with zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    # Add CSV file
-                    zipf.write(csv_path, "data.csv")
-                    
-                    # Add all attached files
-                    for original_path, zip_path in file_mapping.items():
-                        if os.path.exists(original_path):
-                            zipf.write(original_path, zip_path)
-                        else:
-                            logger.warning(f"File not found: {original_path}")
-            
-            messagebox.showinfo("Success", f"Data saved successfully to {os.path.basename(filename)}!\n\nContains:\n• Network data (CSV)\n• {len(file_mapping)} attached files")
+            # A project still being paged in is saved whole
+            self.finish_loading()
+            if is_project_db(filename):
+                left, top, right, bottom = self._view_rect()
+                stored = write_project_db(filename, self.app.people, self.app.textboxes, self.app.legends,
+                                          self.app.store.edges(), view=((left + right) / 2, (top + bottom) / 2))
+                contents = "Network data (database)"
+            else:
+                stored = write_project(filename, self.app.people, self.app.textboxes,
+                                       self.app.legends, self.app.store.edges())
+                contents = "Network data (CSV)"
+            self.app.changes.mark_clean()
+            messagebox.showinfo("Success", f"Data saved successfully to {os.path.basename(filename)}!\n\nContains:\n• {contents}\n• {stored} attached files")
             
         except Exception as e:
             logger.error(f"Error saving data: {e}")
@@ -145,6 +70,16 @@ class DataManagement:
             
     def load_data(self):
         """Load data from a ZIP file containing CSV and attached files"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("COMRADE files", "*.zip"), ("COMRADE database", "*" + PROJECT_DB_EXTENSION),
+                       ("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        self.open_project(filename)
+
+    def open_project(self, filename):
+        """Load the project saved in filename; returns True if it loaded"""
         
         # Reset zoom to default before loading to prevent positioning issues
         if hasattr(self.app, 'zoom_var') and self.app.zoom_var.get() != 1.0:
@@ -152,184 +87,227 @@ class DataManagement:
             # Actually trigger the zoom event handler to apply the zoom
             self.app.events.on_zoom(1.0)
             self.app.update_status("Zoom reset for loading", duration=2000)
-
-        filename = filedialog.askopenfilename(
-            filetypes=[("COMRADE files", "*.zip"), ("CSV files", "*.csv"), ("All files", "*.*")]
-        )
-        if not filename:
-            return
             
         try:
-            # Handle both ZIP and legacy CSV files
+            # Handle ZIP, database and legacy CSV files
             if filename.lower().endswith('.zip'):
-                self._load_from_zip(filename)
+                return self._load_from_zip(filename)
+            elif is_project_db(filename):
+                return self._load_from_db(filename)
             else:
-                self._load_legacy_csv(filename)
+                return self._load_legacy_csv(filename)
                 
         except Exception as e:
             logger.error(f"Error loading data: {e}")
             messagebox.showerror("Error", f"Failed to load data: {str(e)}")
+            return False
     
     def _load_from_zip(self, zip_filename):
         """Load data from ZIP file format"""
-        self.clear_all()
+        if not self.clear_all(loading=True):
+            return False
+        files_dir = self._new_files_dir()
+
+        # Only data.csv is read now; the archive stays open and each attachment
+        # is extracted the first time it is shown, indexed or saved
+        files = ProjectAttachments(zip_filename, files_dir)
+        try:
+            # Fill the store in one batch: the canvas draws everything once at the end,
+            # and a malformed file leaves no half-loaded network behind
+            with open_project_csv(files.zipf) as f, self.app.store.batch():
+                self._add_rows(read_project_csv(f), files)
+        except Exception:
+            files.close()
+            raise
+
+        self.app.changes.mark_clean()
+        self.app.undo.clear()
+        self._release_projects(keep=(files,))
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            with zipfile.ZipFile(zip_filename, 'r') as zipf:
-                # Extract all files to temp directory
-                zipf.extractall(temp_dir)
-                
-                # Read CSV data
-                csv_path = os.path.join(temp_dir, "data.csv")
-                if not os.path.exists(csv_path):
-                    raise ValueError("Invalid COMRADE file: data.csv not found")
-                
-                # Create a permanent directory for extracted files
-                app_data_dir = os.path.expanduser("~/.comrade_files")
-                if not os.path.exists(app_data_dir):
-                    os.makedirs(app_data_dir)
-                
-                # Create unique subdirectory for this load
-                import time
-                load_id = str(int(time.time()))
-                files_dir = os.path.join(app_data_dir, f"load_{load_id}")
-                os.makedirs(files_dir, exist_ok=True)
-                
-                with open(csv_path, 'r', encoding='utf-8') as f:
-                    reader = csv.reader(f)
-                    header = next(reader)
-                    connections_section = False
-                    
-                    for row in reader:
-                        if row and row[0] == 'CONNECTIONS':
-                            connections_section = True
-                            next(reader)  # Skip connection header
-                            continue
-                            
-                        if connections_section:
-                            if len(row) >= 3:
-                                id1, id2, label = int(row[0]), int(row[1]), row[2]                            
-                                # Check if IDs exist in people, textboxes, or legends
-                                card1 = self.app.people.get(id1) or self.app.textboxes.get(id1) or self.app.legends.get(id1)
-                                card2 = self.app.people.get(id2) or self.app.textboxes.get(id2) or self.app.legends.get(id2)
-                                
-                                if card1 and card2:
-                                    card1.connections[id2] = label
-                                    card2.connections[id1] = label
-                                else:
-                                    logger.warning(f"Connection references missing card: {id1} or {id2}")
-                        else:
-                            if len(row) >= 8:
-                                card_id = int(row[0])
-                                
-                                # Check if this is a textbox or legend (new format with Type column)
-                                is_textbox = False
-                                is_legend = False
-                                if len(row) >= 11:
-                                    if row[10] == 'textbox':
-                                        is_textbox = True
-                                    elif row[10] == 'legend':
-                                        is_legend = True
-                                elif len(row) >= 3 and not row[2]:  # Empty DOB might indicate textbox in old format
-                                    # Additional heuristic: if name is actually content (longer than typical name)
-                                    if len(row[1]) > 50:
-                                        is_textbox = True
-                                
-                                if is_legend:
-                                    # This is a legend card
-                                    color_entries = {}
-                                    if len(row) > 2 and row[2]:  # color_entries JSON is in the content field
-                                        try:
-                                            color_entries = json.loads(row[2])
-                                        except json.JSONDecodeError:
-                                            logger.warning(f"Invalid color_entries data for legend {card_id}")
-                                    
-                                    legend = LegendCard(row[1], color_entries)
-                                    legend.x = float(row[6])
-                                    legend.y = float(row[7])
-                                    
-                                    self.app.legends[card_id] = legend
-                                    self.app.next_id = max(self.app.next_id, card_id + 1)
-                                elif is_textbox:
-                                    # This is a textbox card
-                                    textbox = TextboxCard(row[1], row[2] if len(row) > 2 else '')
-                                    textbox.x = float(row[6])
-                                    textbox.y = float(row[7])
-                                    
-                                    # Handle color field
-                                    if len(row) >= 9:
-                                        textbox.color = int(row[8])
-                                    else:
-                                        textbox.color = 0
-                                    
-                                    self.app.textboxes[card_id] = textbox
-                                    self.app.next_id = max(self.app.next_id, card_id + 1)
-                                else:
-                                    # This is a person card
-                                    person = Person(row[1], row[2], row[3], row[4], row[5])
-                                    person.x = float(row[6])
-                                    person.y = float(row[7])
-                                    
-                                    # Handle color field
-                                    if len(row) >= 9:
-                                        person.color = int(row[8])
-                                    else:
-                                        person.color = 0
-                                    
-                                    # Handle files field (new format)
-                                    if len(row) >= 10 and row[9]:
-                                        try:
-                                            zip_file_paths = json.loads(row[9])
-                                            person.files = []
-                                            
-                                            # Copy files from temp to permanent location and update paths
-                                            for zip_path in zip_file_paths:
-                                                temp_file_path = os.path.join(temp_dir, zip_path)
-                                                if os.path.exists(temp_file_path):
-                                                    # Create permanent file path
-                                                    filename_only = os.path.basename(zip_path)
-                                                    permanent_path = os.path.join(files_dir, filename_only)
-                                                    
-                                                    # Copy file to permanent location
-                                                    shutil.copy2(temp_file_path, permanent_path)
-                                                    person.files.append(permanent_path)
-                                                else:
-                                                    logger.warning(f"Attached file not found in ZIP: {zip_path}")
-                                        except json.JSONDecodeError:
-                                            logger.warning(f"Invalid files data for person {card_id}")
-                                            person.files = []
-                                    else:
-                                        person.files = []
-                                    
-                                    self.app.people[card_id] = person
-                                    self.app.next_id = max(self.app.next_id, card_id + 1)
-                
-                # Create widgets at base zoom (1.0)
-                for person_id in self.app.people:
-                    self.app.canvas_helpers.create_person_widget(person_id, zoom=1.0)
-                
-                for textbox_id in self.app.textboxes:
-                    self.app.canvas_helpers.create_textbox_widget(textbox_id, zoom=1.0)
-                
-                for legend_id in self.app.legends:
-                    self.app.canvas_helpers.create_legend_widget(legend_id, zoom=1.0)
-                
-                # Draw connections for the base zoom
-                self.app.canvas_helpers.update_connections()
+        # Count attached files
+        total_files = sum(person.file_count() for person in self.app.people.values())
+        messagebox.showinfo("Success", f"Data loaded successfully!\n\nLoaded:\n• {len(self.app.people)} people\n• {len(self.app.textboxes)} textbox cards\n• {len(self.app.legends)} legend cards\n• {total_files} attached files\n\nFiles are extracted when first opened, to: {files_dir}")
+        return True
+
+    def _load_from_db(self, db_filename):
+        """Load a project database: the cards around its saved view now, those of other regions when viewed"""
+        if not self.clear_all(loading=True):
+            return False
+        files_dir = self._new_files_dir()
+
+        project = ProjectDatabase(db_filename)
+        files = None
+        try:
+            files = DatabaseAttachments(db_filename, files_dir)
+            store = self.app.store
+            # Cards added while the rest is paged in must not take the ids still to come
+            store.next_id = max(store.next_id, project.max_id + 1)
+            if project.view and hasattr(self.app, 'view_animator'):
+                self.app.view_animator.center_on(*project.view)
+            self._paged_load = (project, files, set(), None)
+            self._paged_view = self._view_rect(PAGE_MARGIN)
+            with store.batch():
+                self._page_in(self._paged_view)
+        except Exception:
+            self._paged_load = None
+            project.close()
+            if files:
+                files.close()
+            raise
+
+        self.app.changes.mark_clean()
+        self.app.undo.clear()
+        self._release_projects(keep=(files,))
+
+        counts = project.counts()
+        total_cards = counts['people'] + counts['textboxes'] + counts['legends']
+        self._paged_load = self._paged_load[:3] + (total_cards,)
+        if len(self._paged_load[2]) < total_cards:
+            self._view_job = self.app.root.after(VIEW_POLL_MS, self._follow_view)
+        else:
+            self._end_paged_load()
+        messagebox.showinfo("Success", f"Data loaded successfully!\n\nOpened:\n• {counts['people']} people\n• {counts['textboxes']} textbox cards\n• {counts['legends']} legend cards\n• {counts['edges']} connections\n• {counts['blobs']} attached files\n\nCards are read from the file as you scroll to them; saving or exporting reads the rest.\nFiles are extracted when first opened, to: {files_dir}")
+        return True
 
-                # Then apply current zoom if different from 1.0
-                if hasattr(self.app.events, 'last_zoom') and self.app.events.last_zoom != 1.0:
-                    self.app.events.on_zoom(self.app.events.last_zoom)
-                
-                # Count extracted files
-                total_files = sum(len(person.files) for person in self.app.people.values())
-                messagebox.showinfo("Success", f"Data loaded successfully!\n\nLoaded:\n• {len(self.app.people)} people\n• {len(self.app.textboxes)} textbox cards\n• {len(self.app.legends)} legend cards\n• {total_files} attached files\n\nFiles extracted to: {files_dir}")
+    def _page_in(self, rect):
+        """Add the cards of the project database inside the world rectangle, with their connections to loaded cards
+
+        Returns the number of cards added.
+        """
+        project, files, loaded, _ = self._paged_load
+        rows = [row for row in project.cards_in(*rect) if row[1] not in loaded]
+        if not rows:
+            return 0
+        added = {row[1] for row in rows}
+        loaded.update(added)
+        # Every connection between loaded cards is kept on the board, so deleting one
+        # of them journals all its connections and finish_loading adds none twice
+        rows += [row for row in project.edges_of(added) if row[1] in loaded and row[2] in loaded]
+        self._add_rows(rows, files)
+        return len(added)
+
+    def _follow_view(self):
+        """Page in the cards of the region the view moved to, and check again shortly"""
+        self._view_job = None
+        rect = self._view_rect(PAGE_MARGIN)
+        if rect != self._paged_view:
+            self._paged_view = rect
+            # Paged-in cards are part of the opened file, not edits: keep them out of
+            # the undo history and leave the project clean if it was
+            was_dirty = self.app.changes.dirty
+            with self.app.undo.suspended(), self.app.store.batch():
+                added = self._page_in(rect)
+            if not was_dirty:
+                self.app.changes.mark_clean()
+            _, _, loaded, total_cards = self._paged_load
+            if len(loaded) >= total_cards:
+                self._end_paged_load()
+                self.app.update_status(f"Loaded all {total_cards} cards")
+                return
+            if added:
+                self.app.update_status(f"Loaded {len(loaded)} of {total_cards} cards")
+        self._view_job = self.app.root.after(VIEW_POLL_MS, self._follow_view)
+
+    @property
+    def cards_not_loaded(self):
+        """Number of cards of the open project database not read from it yet"""
+        if self._paged_load is None:
+            return 0
+        _, _, loaded, total_cards = self._paged_load
+        return total_cards - len(loaded)
+
+    def finish_loading(self):
+        """Add whatever is left of a project database being paged in, e.g. before saving"""
+        if self._paged_load is None:
+            return
+        project, files, loaded, _ = self._paged_load
+        was_dirty = self.app.changes.dirty
+        with self.app.undo.suspended(), self.app.store.batch():
+            for page in project.pages(skip=loaded):
+                self._add_rows(page, files)
+        if not was_dirty:
+            self.app.changes.mark_clean()
+        self._end_paged_load()
+
+    def _end_paged_load(self):
+        """Stop paging in a project database; its attachments stay readable"""
+        if self._paged_load is not None:
+            self._paged_load[0].close()
+            self._paged_load = None
+            self._paged_view = None
+        if self._view_job is not None:
+            self.app.root.after_cancel(self._view_job)
+            self._view_job = None
+
+    def _add_rows(self, rows, files):
+        """Add the card and connection rows of a project to the store; returns the ids of the cards added
+
+        Connections to cards that are missing, or already connected, are skipped.
+        """
+        store = self.app.store
+        added = set()
+        for row in rows:
+            if row[0] == CONNECTION:
+                _, id1, id2, label = row
+                # Check if both cards exist
+                if id1 in store and id2 in store:
+                    if not store.has_edge(id1, id2):
+                        store.connect(id1, id2, label)
+                else:
+                    logger.warning(f"Connection references missing card: {id1} or {id2}")
+                continue
+
+            _, card_id, card, attached = row
+            for ref, name in attached:
+                path = files.path(ref, name)
+                if path:
+                    card.files.append(path)
+                else:
+                    logger.warning(f"Attached file not found in project: {ref}")
+            store.add(card, card_id)
+            added.add(card_id)
+        return added
+
+    def _release_projects(self, keep=()):
+        """Close the files of earlier projects once neither the board, the undo history nor the clipboard needs them"""
+        in_store = {path for person in self.app.people.values() if person.file_count() for path in person.files}
+        held = self.app.undo.held_files()
+        if hasattr(self.app, 'events'):
+            # Copied people can be pasted into the next project and saved with it
+            held |= clipboard_files(self.app.events.clipboard_data)
+        release_projects(in_store, held, keep)
+
+    def _new_files_dir(self):
+        """Create the folder that attachments of a project being loaded are extracted to"""
+        # Create a permanent directory for extracted files
+        app_data_dir = os.path.expanduser("~/.comrade_files")
+        if not os.path.exists(app_data_dir):
+            os.makedirs(app_data_dir)
+        
+        # Create unique subdirectory for this load
+        import time
+        load_id = int(time.time())
+        while os.path.exists(os.path.join(app_data_dir, f"load_{load_id}")):
+            load_id += 1  # Projects loaded within a second must not share a folder
+        files_dir = os.path.join(app_data_dir, f"load_{load_id}")
+        os.makedirs(files_dir, exist_ok=True)
+        return files_dir
+
+    def _view_rect(self, margin=0):
+        """(left, top, right, bottom) of the world area the canvas shows, widened by margin"""
+        canvas = self.app.canvas
+        zoom = self.app.events.last_zoom if hasattr(self.app, 'events') else 1.0
+        left, top = canvas.canvasx(0) / zoom, canvas.canvasy(0) / zoom
+        right = canvas.canvasx(canvas.winfo_width()) / zoom
+        bottom = canvas.canvasy(canvas.winfo_height()) / zoom
+        return left - margin, top - margin, right + margin, bottom + margin
     
     def _load_legacy_csv(self, csv_filename):
         """Load data from legacy CSV format (backward compatibility)"""
-        self.clear_all()
+        if not self.clear_all(loading=True):
+            return False
         
-        with open(csv_filename, 'r', encoding='utf-8') as f:
+        with open(csv_filename, 'r', encoding='utf-8') as f, self.app.store.batch():
             reader = csv.reader(f)
             header = next(reader)
             connections_section = False
@@ -344,8 +322,7 @@ class DataManagement:
                     if len(row) >= 3:
                         id1, id2, label = int(row[0]), int(row[1]), row[2]                            
                         if id1 in self.app.people and id2 in self.app.people:
-                            self.app.people[id1].connections[id2] = label
-                            self.app.people[id2].connections[id1] = label
+                            self.app.store.connect(id1, id2, label)
                         else:
                             logger.warning(f"Connection references missing person: {id1} or {id2}")
                 else:
@@ -364,13 +341,13 @@ class DataManagement:
                         # No files in legacy format
                         person.files = []
                         
-                        self.app.people[person_id] = person
-                        self.app.next_id = max(self.app.next_id, person_id + 1)
-            
-            for person_id in self.app.people:
-                self.app.canvas_helpers.create_person_widget(person_id)
-            self.app.canvas_helpers.update_connections()
-            messagebox.showinfo("Success", "Legacy CSV data loaded successfully!\n\nNote: Use the new ZIP format for file attachments.")
+                        self.app.store.add(person, person_id)
+        
+        self.app.changes.mark_clean()
+        self.app.undo.clear()
+        self._release_projects()
+        messagebox.showinfo("Success", "Legacy CSV data loaded successfully!\n\nNote: Use the new ZIP format for file attachments.")
+        return True
 
     def export_to_png(self):
         """Export the current network diagram to PNG format at high DPI
@@ -385,6 +362,7 @@ class DataManagement:
         if not PIL_AVAILABLE:
             messagebox.showerror("Error", "PIL (Pillow) library is not installed.\n\nTo use PNG export, please install it with:\npip install Pillow")
             return
+        self.finish_loading()
             
         if not self.app.people and not self.app.textboxes and not self.app.legends:
             messagebox.showwarning("Warning", "No people, textboxes, or legends to export. Please add some content first.")
@@ -418,502 +396,57 @@ class DataManagement:
             dpi_scale = 6.0  # 6x scaling for high DPI (600 DPI equivalent)
             target_dpi = 600  # Target DPI for print quality
             
-            # Use the fixed canvas dimensions scaled up for high DPI
+            # Get current zoom level and apply DPI scaling
+            base_zoom = self.app.events.last_zoom
+            zoom = base_zoom * dpi_scale
+
+            # Use the fixed canvas dimensions, grown to fit any card placed beyond them
+            layout = self.app.canvas_helpers.layout
             base_width = self.app.fixed_canvas_width
             base_height = self.app.fixed_canvas_height
+            content = self.app.geometry.content_bounds()
+            if content is not None:
+                _, _, right, bottom = content
+                base_width = max(base_width, int(right * base_zoom) + 10)
+                base_height = max(base_height, int(bottom * base_zoom) + 10)
             canvas_width = int(base_width * dpi_scale)
             canvas_height = int(base_height * dpi_scale)
             
             # Create a white background image at high resolution
             image = Image.new('RGB', (canvas_width, canvas_height), '#f8fafc')
-            draw = ImageDraw.Draw(image)
-            
-            # Get current zoom level and apply DPI scaling
-            base_zoom = self.app.events.last_zoom
-            zoom = base_zoom * dpi_scale
+            backend = PILBackend(image)
               # Draw grid pattern (scaled for high DPI)
             grid_size = int(40 * dpi_scale)
             grid_color = '#e2e8f0'
             grid_width = max(1, int(1 * dpi_scale))
             for x in range(0, canvas_width, grid_size):
-                draw.line([(x, 0), (x, canvas_height)], fill=grid_color, width=grid_width)
+                backend.line(x, 0, x, canvas_height, fill=grid_color, width=grid_width)
             for y in range(0, canvas_height, grid_size):
-                draw.line([(0, y), (canvas_width, y)], fill=grid_color, width=grid_width)
+                backend.line(0, y, canvas_width, y, fill=grid_color, width=grid_width)
             
             # Store connection data to draw labels later
             connection_labels_to_draw = []
 
             # Draw connections first (so they appear behind cards)
             # Handle all types of connections: person-person, person-textbox, textbox-textbox, legend-legend, etc.
-            for (id1, id2) in self.app.connection_lines.keys():
-                # Get the connection objects (could be person, textbox, or legend)
-                card1 = self.app.people.get(id1) or self.app.textboxes.get(id1) or self.app.legends.get(id1)
-                card2 = self.app.people.get(id2) or self.app.textboxes.get(id2) or self.app.legends.get(id2)
-                
-                if card1 and card2:
-                    # Get the connection label from either card
-                    label = card1.connections.get(id2, "") or card2.connections.get(id1, "")
-                    
-                    x1, y1 = int(card1.x * zoom), int(card1.y * zoom)
-                    x2, y2 = int(card2.x * zoom), int(card2.y * zoom)
-                    
-                    # Draw connection line with DPI scaling
-                    line_width = max(1, int(2 * dpi_scale))
-                    draw.line([(x1, y1), (x2, y2)], fill=COLORS['primary'], width=line_width)
-                    
-                    # Store info for drawing label later
-                    if label and label.strip():
-                        connection_labels_to_draw.append({'label': label, 'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2})
-
-            # Draw people cards
-            for person_id, person in self.app.people.items():
-                x = int(person.x * zoom)
-                y = int(person.y * zoom)
-
-                # Try to load fonts for text with DPI scaling
-                name_font_size = int(11 * dpi_scale)
-                detail_font_size = int(9 * dpi_scale)
-                try:
-                    name_font = ImageFont.truetype("arial.ttf", name_font_size)
-                    detail_font = ImageFont.truetype("arial.ttf", detail_font_size)
-                except:
-                    try:
-                        name_font = ImageFont.load_default()
-                        detail_font = ImageFont.load_default()
-                    except:
-                        name_font = None
-                        detail_font = None
-                
-                # Prepare details, filtering out empty values
-                details = [
-                    ("DOB:", person.dob),
-                    ("Alias:", person.alias),
-                    ("Addr:", person.address),
-                    ("Phone:", person.phone),
-                    ("SSN:", person.ssn),
-                    ("Email:", person.email)
-                ]
-                details = [(label, value) for label, value in details if value and value.strip()]
-
-                # Calculate maximum width needed for details text
-                max_details_width = 0
-                if detail_font:
-                    label_column_width = 0
-                    value_column_width = 0
-                    for label, value in details:
-                        label_bbox = draw.textbbox((0, 0), label, font=detail_font)
-                        value_bbox = draw.textbbox((0, 0), value, font=detail_font)
-                        label_column_width = max(label_column_width, label_bbox[2] - label_bbox[0])
-                        value_column_width = max(value_column_width, value_bbox[2] - value_bbox[0])
-                    
-                    column_gap = int(10 * dpi_scale)
-                    max_details_width = label_column_width + column_gap + value_column_width
-                else: # Fallback if font is not available
-                    if details:
-                        max_len = max(len(l) + len(v) for l,v in details)
-                        max_details_width = max_len * int(6 * dpi_scale)
-
-                # Calculate width needed for the header (avatar + name)
-                avatar_space = int(40 * zoom) # Avatar size + padding
-                name_width = 0
-                if name_font:
-                    name_bbox = draw.textbbox((0, 0), person.name or "Unnamed", font=name_font)
-                    name_width = name_bbox[2] - name_bbox[0]
-                else: # Fallback
-                    name_width = len(person.name or "Unnamed") * int(7 * dpi_scale)
-                
-                header_width = avatar_space + name_width
+            # Endpoints for every edge come from the geometry index in one vectorized pass
+            edges = list(self.app.store.edges())
+            endpoints = self.app.geometry.edge_endpoints([key for key, _ in edges], zoom)
+            line_width = max(1, int(2 * dpi_scale))
+            for (_, label), coords in zip(edges, endpoints):
+                x1, y1, x2, y2 = (int(value) for value in coords)
 
-                # Determine card width
-                padding = int(15 * dpi_scale)
-                content_width = max(header_width, max_details_width)
-                
-                # Check for image to include in width calculation
-                image_file = None
-                image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
-                if hasattr(person, 'files') and person.files:
-                    for file_path in person.files:
-                        if os.path.exists(file_path) and os.path.splitext(file_path.lower())[1] in image_extensions:
-                            image_file = file_path
-                            break
-                
-                image_width = int(120 * dpi_scale) if image_file else 0
-                image_padding = int(10 * dpi_scale) if image_file else 0
+                # Draw connection line with DPI scaling
+                backend.line(x1, y1, x2, y2, fill=COLORS['primary'], width=line_width)
 
-                card_width = content_width + image_width + image_padding + 2 * padding
-                
-                # Determine card height
-                header_height = int(40 * zoom)
-                line_height = int(20 * zoom)
-                details_height = len(details) * line_height
-                vertical_padding = int(15 * zoom)
-                
-                base_card_height = header_height + details_height + 2 * vertical_padding
-                min_height = int(120 * zoom)
-                if image_file:
-                    min_height = int(140 * zoom) # Taller min height if image exists
-                
-                card_height = max(base_card_height, min_height)
+                # Store info for drawing label later
+                if label and label.strip():
+                    connection_labels_to_draw.append({'label': label, 'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2})
 
-                half_width = int(card_width // 2)
-                half_height = int(card_height // 2)
-
-                # Draw card shadow with DPI scaling
-                shadow_offset = int(3 * dpi_scale)
-                for i in range(3, 0, -1):
-                    shadow_color = '#e0e0e0' if i == 3 else ('#d0d0d0' if i == 2 else '#c0c0c0')
-                    offset = int(i * dpi_scale)
-                    draw.rectangle([
-                        x - half_width + offset, y - half_height + offset,
-                        x + half_width + offset, y + half_height + offset
-                    ], fill=shadow_color)
-                
-                # Get person's color for consistency with canvas display
-                person_color = CARD_COLORS[person.color % len(CARD_COLORS)]
-                
-                # Draw main card with DPI scaling
-                card_border_width = max(1, int(2 * dpi_scale))
-                draw.rectangle([
-                    x - half_width, y - half_height,
-                    x + half_width, y + half_height
-                ], fill=COLORS['surface'], outline=person_color, width=card_border_width)
-                
-                # Draw header
-                draw.rectangle([
-                    x - half_width, y - half_height,
-                    x + half_width, y - half_height + header_height
-                ], fill=person_color)
-                
-                # Draw avatar background with DPI scaling
-                avatar_size = int(20 * zoom)
-                avatar_x = x - half_width + int(15 * zoom)
-                avatar_y = y - half_height + int(15 * zoom)
-                avatar_border_width = max(1, int(2 * dpi_scale))
-                
-                draw.ellipse([
-                    avatar_x - avatar_size//2, avatar_y - avatar_size//2,
-                    avatar_x + avatar_size//2, avatar_y + avatar_size//2
-                ], fill='white', outline=person_color, width=avatar_border_width)
-                
-                # Draw name in header
-                name_x = avatar_x + avatar_size//2 + int(5 * zoom)
-                draw.text((name_x, avatar_y - int(6 * zoom)), 
-                         person.name or "Unnamed", fill='white', font=name_font)
-
-                # Draw details
-                details_start_y = y - half_height + header_height + vertical_padding
-                current_y = details_start_y
-                
-                # Recalculate label column width for drawing
-                label_column_width = 0
-                if detail_font and details:
-                    for label, value in details:
-                        label_bbox = draw.textbbox((0, 0), label, font=detail_font)
-                        label_column_width = max(label_column_width, label_bbox[2] - label_bbox[0])
-                
-                for label, value in details:
-                    label_x = x - half_width + padding
-                    data_x = label_x + label_column_width + column_gap
-                    
-                    # Draw label and data in separate columns
-                    draw.text((label_x, current_y), label, 
-                            fill=COLORS['text_primary'], font=detail_font)
-                    draw.text((data_x, current_y), value, 
-                            fill=COLORS['text_primary'], font=detail_font)
-                    current_y += line_height
-                
-                # Draw attached image if available
-                if image_file:
-                    try:
-                        # Load and resize image for export
-                        person_image = Image.open(image_file)
-                        
-                        # Calculate image dimensions (maintain aspect ratio)
-                        max_img_height = card_height - header_height - (2 * vertical_padding)
-                        max_img_width = image_width
-                        
-                        person_image.thumbnail((max_img_width, max_img_height), Image.Resampling.LANCZOS)
-                        img_width, img_height = person_image.size
-                        
-                        # Position image on the right side of the card
-                        img_x = x + half_width - padding - (max_img_width // 2)
-                        img_y = y - half_height + header_height + vertical_padding + (max_img_height // 2)
-                        
-                        # Paste the image onto the main image
-                        image.paste(person_image, (img_x - img_width//2, img_y - img_height//2), person_image if person_image.mode == 'RGBA' else None)
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to include image {image_file} in PNG export: {e}")
-
-            # Draw textbox cards
-            for textbox_id, textbox in self.app.textboxes.items():
-                x = int(textbox.x * zoom)
-                y = int(textbox.y * zoom)
-
-                # Try to load fonts for textbox with DPI scaling
-                title_font_size = int(12 * dpi_scale)
-                content_font_size = int(10 * dpi_scale)
-                try:
-                    title_font = ImageFont.truetype("arial.ttf", title_font_size)
-                    content_font = ImageFont.truetype("arial.ttf", content_font_size)
-                except:
-                    try:
-                        title_font = ImageFont.load_default()
-                        content_font = ImageFont.load_default()
-                    except:
-                        title_font = None
-                        content_font = None
-
-                # Calculate textbox dimensions with text wrapping
-                # Calculate title width using actual font if available
-                title_width = 0
-                if title_font and textbox.title:
-                    title_bbox = draw.textbbox((0, 0), textbox.title, font=title_font)
-                    title_width = title_bbox[2] - title_bbox[0]
-                else:
-                    title_width = len(textbox.title) * int(10 * dpi_scale) if textbox.title else int(100 * dpi_scale)
-                
-                # For content, we'll use a fixed width for wrapping and calculate height based on wrapped lines
-                content_char_width = 70  # Characters per line for export (higher than canvas for better readability)
-                wrapped_lines = []
-                if textbox.content:
-                    content_lines = textbox.content.split('\n')
-                    for line in content_lines:
-                        if len(line) <= content_char_width:
-                            wrapped_lines.append(line)
-                        else:
-                            # Wrap long lines
-                            words = line.split(' ')
-                            current_line = ''
-                            for word in words:
-                                if len(current_line + word) <= content_char_width:
-                                    current_line += word + ' '
-                                else:
-                                    if current_line:
-                                        wrapped_lines.append(current_line.strip())
-                                    current_line = word + ' '
-                            if current_line:
-                                wrapped_lines.append(current_line.strip())
-                
-                # Calculate dimensions with DPI scaling like person cards
-                # Calculate actual content width based on wrapped lines
-                content_width = 0
-                if content_font and wrapped_lines:
-                    for line in wrapped_lines:
-                        if line.strip():
-                            line_bbox = draw.textbbox((0, 0), line, font=content_font)
-                            line_width = line_bbox[2] - line_bbox[0]
-                            content_width = max(content_width, line_width)
-                else:
-                    # Fallback calculation if font is not available
-                    if wrapped_lines:
-                        max_line_length = max(len(line) for line in wrapped_lines if line.strip())
-                        content_width = max_line_length * int(6 * dpi_scale)
-                
-                padding = int(15 * dpi_scale)
-                base_width = max(title_width, content_width, int(250 * dpi_scale))
-                
-                # Calculate height based on content lines with DPI scaling
-                header_height = int(45 * zoom)
-                line_height = int(18 * zoom)
-                content_height = len(wrapped_lines) * line_height
-                vertical_padding = int(15 * zoom)
-                
-                base_card_height = header_height + content_height + 2 * vertical_padding
-                min_height = int(120 * zoom)
-                base_height = max(base_card_height, min_height)
-                
-                card_width = base_width + 2 * padding
-                card_height = base_height
-                
-                half_width = card_width // 2
-                half_height = card_height // 2
-
-                # Draw textbox shadow with DPI scaling
-                shadow_offset = int(3 * dpi_scale)
-                for i in range(3, 0, -1):
-                    shadow_color = '#e0e0e0' if i == 3 else ('#d0d0d0' if i == 2 else '#c0c0c0')
-                    offset = int(i * dpi_scale)
-                    draw.rectangle([
-                        x - half_width + offset, y - half_height + offset,
-                        x + half_width + offset, y + half_height + offset
-                    ], fill=shadow_color)
-
-                # Get textbox's color for consistency with canvas display
-                textbox_color = CARD_COLORS[textbox.color % len(CARD_COLORS)]
-                
-                # Draw main textbox card with DPI scaling
-                card_border_width = max(1, int(2 * dpi_scale))
-                draw.rectangle([
-                    x - half_width, y - half_height,
-                    x + half_width, y + half_height
-                ], fill=COLORS['surface'], outline=textbox_color, width=card_border_width)
-                
-                # Draw header
-                header_height = int(45 * zoom)
-                draw.rectangle([
-                    x - half_width, y - half_height,
-                    x + half_width, y - half_height + header_height
-                ], fill=textbox_color)
-
-                # Draw title in header
-                title_x = x - half_width + int(15 * zoom)
-                title_y = y - half_height + int(17 * zoom)
-                
-                # Draw square icon (similar to person's circular avatar)
-                icon_size = int(16 * zoom)
-                square_border_width = max(1, int(2 * dpi_scale))
-                
-                draw.rectangle([
-                    title_x - icon_size//2, title_y - icon_size//2,
-                    title_x + icon_size//2, title_y + icon_size//2
-                ], fill='white', outline=textbox_color, width=square_border_width)
-                
-                # Draw title text
-                text_x = title_x + icon_size//2 + int(5 * zoom)
-                draw.text((text_x, title_y - int(6 * zoom)), 
-                        textbox.title or "Untitled", fill='white', font=title_font or None)
-
-                # Draw content
-                if textbox.content:
-                    content_start_y = y - half_height + header_height + int(15 * zoom)
-                    content_x = x - half_width + int(15 * zoom)
-                    
-                    # Use wrapped lines for display (limit to 8 lines for export)
-                    display_lines = wrapped_lines[:8]
-                    line_height = int(18 * zoom)
-                    
-                    for i, line in enumerate(display_lines):
-                        if line.strip():  # Only show non-empty lines
-                            line_y = content_start_y + (i * line_height)
-                            
-                            if content_font:
-                                draw.text((content_x, line_y), line, 
-                                        fill=COLORS['text_primary'], font=content_font)
-                            else:
-                                draw.text((content_x, line_y), line, 
-                                        fill=COLORS['text_primary'])
-                    
-                    # Show "..." if there are more lines
-                    if len(wrapped_lines) > 8:
-                        more_y = content_start_y + (8 * line_height)
-                        if content_font:
-                            draw.text((content_x, more_y), "...", 
-                                    fill=COLORS['text_secondary'], font=content_font)
-                        else:
-                            draw.text((content_x, more_y), "...", 
-                                    fill=COLORS['text_secondary'])
-
-            # Draw legend cards
-            for legend_id, legend in self.app.legends.items():
-                x = int(legend.x * zoom)
-                y = int(legend.y * zoom)
-
-                # Try to load fonts for legend with DPI scaling
-                title_font_size = int(12 * dpi_scale)
-                entry_font_size = int(10 * dpi_scale)
-                try:
-                    title_font = ImageFont.truetype("arial.ttf", title_font_size)
-                    entry_font = ImageFont.truetype("arial.ttf", entry_font_size)
-                except:
-                    try:
-                        title_font = ImageFont.load_default()
-                        entry_font = ImageFont.load_default()
-                    except:
-                        title_font = None
-                        entry_font = None
-
-                # Calculate legend dimensions
-                title_width = len(legend.title) * 10 if legend.title else 100
-                
-                # Calculate width based on longest description
-                max_desc_width = 0
-                for desc in legend.color_entries.values():
-                    if desc:
-                        max_desc_width = max(max_desc_width, len(desc) * 8)
-                
-                # Add space for color swatch + padding
-                swatch_width = 30
-                padding = 20
-                
-                base_width = max(title_width, max_desc_width + swatch_width + padding, 250)
-                base_height = max(120, 60 + len(legend.color_entries) * 30)
-                
-                card_width = int(base_width * zoom)
-                card_height = int(base_height * zoom)
-                
-                half_width = card_width // 2
-                half_height = card_height // 2
-
-                # Draw legend shadow with DPI scaling
-                shadow_offset = int(3 * dpi_scale)
-                for i in range(3, 0, -1):
-                    shadow_color = '#e0e0e0' if i == 3 else ('#d0d0d0' if i == 2 else '#c0c0c0')
-                    offset = int(i * dpi_scale)
-                    draw.rectangle([
-                        x - half_width + offset, y - half_height + offset,
-                        x + half_width + offset, y + half_height + offset
-                    ], fill=shadow_color)
-
-                # Draw main legend card with DPI scaling
-                card_border_width = max(1, int(2 * dpi_scale))
-                draw.rectangle([
-                    x - half_width, y - half_height,
-                    x + half_width, y + half_height
-                ], fill=COLORS['surface'], outline=COLORS['border'], width=card_border_width)
-                
-                # Draw header
-                header_height = int(45 * zoom)
-                draw.rectangle([
-                    x - half_width, y - half_height,
-                    x + half_width, y - half_height + header_height
-                ], fill=COLORS['slate_gray'])
-
-                # Draw title in header (no folder icon)
-                title_x = x - half_width + int(15 * zoom)
-                title_y = y - half_height + int(17 * zoom)
-                
-                # Draw title text
-                draw.text((title_x, title_y - int(6 * zoom)), 
-                        legend.title or "Legend", fill='white', font=title_font or None)
-
-                # Draw color entries
-                if legend.color_entries:
-                    entry_start_y = y - half_height + header_height + int(15 * zoom)
-                    entry_x = x - half_width + int(15 * zoom)
-                    
-                    line_height = int(25 * zoom)
-                    swatch_size = int(15 * zoom)
-                    
-                    for i, (color_index, description) in enumerate(legend.color_entries.items()):
-                        entry_y = entry_start_y + (i * line_height)
-                        
-                        # Draw color swatch
-                        if isinstance(color_index, (int, str)):
-                            try:
-                                color_idx = int(color_index)
-                                color = CARD_COLORS[color_idx % len(CARD_COLORS)]
-                            except (ValueError, IndexError):
-                                color = CARD_COLORS[0]
-                        else:
-                            color = CARD_COLORS[0]
-                        
-                        swatch_border_width = max(1, int(1 * dpi_scale))
-                        draw.rectangle([
-                            entry_x, entry_y - swatch_size//2,
-                            entry_x + swatch_size, entry_y + swatch_size//2
-                        ], fill=color, outline=COLORS['border'], width=swatch_border_width)
-                        
-                        # Draw description text
-                        desc_x = entry_x + swatch_size + int(10 * zoom)
-                        if entry_font:
-                            draw.text((desc_x, entry_y - int(5 * zoom)), 
-                                    description or f"Color {color_index}",
-                                    fill=COLORS['text_primary'], font=entry_font)
-                        else:
-                            draw.text((desc_x, entry_y - int(5 * zoom)), 
-                                    description or f"Color {color_index}",
-                                    fill=COLORS['text_primary'])
+            # Draw cards from the same cached layout the canvas uses
+            painter = CardPainter(backend, load_image=self.load_export_image)
+            for card_id, card in self.app.store.items():
+                painter.paint(card_id, card, layout.get(card_id, card), zoom, pixel_scale=dpi_scale)
 
             # Draw connection labels on top of cards
             for conn in connection_labels_to_draw:
@@ -921,24 +454,9 @@ class DataManagement:
                 mid_y = (conn['y1'] + conn['y2']) // 2
                 label = conn['label']
                 
-                # Try to load a font with DPI scaling
-                font_size = int(10 * dpi_scale)
-                try:
-                    font = ImageFont.truetype("arial.ttf", font_size)
-                except:
-                    try:
-                        font = ImageFont.load_default()
-                    except:
-                        font = None
-                
                 # Get text size for background with DPI scaling
-                if font:
-                    bbox = draw.textbbox((0, 0), label, font=font)
-                    text_width = bbox[2] - bbox[0]
-                    text_height = bbox[3] - bbox[1]
-                else:
-                    text_width = int(len(label) * 6 * dpi_scale)
-                    text_height = int(12 * dpi_scale)
+                font = ("Arial", int(10 * dpi_scale))
+                text_width, text_height = backend.measure_text(label, font)
                 
                 # Draw label background with DPI scaling
                 padding = int(4 * dpi_scale)
@@ -948,12 +466,12 @@ class DataManagement:
                 bg_bottom = mid_y + text_height // 2 + padding
                 
                 border_width = max(1, int(1 * dpi_scale))
-                draw.rectangle([bg_left, bg_top, bg_right, bg_bottom], 
-                             fill='white', outline=COLORS['border'], width=border_width)
+                backend.rectangle(bg_left, bg_top, bg_right, bg_bottom,
+                                  fill='white', outline=COLORS['border'], width=border_width)
                 
                 # Draw label text
-                draw.text((mid_x - text_width // 2, mid_y - text_height // 2), 
-                        label, fill=COLORS['text_primary'], font=font)
+                backend.text(mid_x, mid_y, text=label, font=font,
+                             fill=COLORS['text_primary'], anchor='center')
 
             # Save the image with high DPI information
             image.save(filename, 'PNG', dpi=(target_dpi, target_dpi))
@@ -968,18 +486,33 @@ class DataManagement:
                 # Actually trigger the zoom event handler to apply the zoom
                 self.app.events.on_zoom(original_zoom)
 
-    def clear_all(self):
+    def load_export_image(self, image_path, max_width, max_height, zoom):
+        """Load a person image fitted to the card's image slot and scaled for export"""
+        try:
+            with Image.open(local_path(image_path)) as person_image:
+                base_width, base_height = fit_image_size(person_image.width, person_image.height, max_width, max_height)
+                size = (max(1, int(base_width * zoom)), max(1, int(base_height * zoom)))
+                return person_image.convert('RGBA').resize(size, Image.Resampling.LANCZOS), base_width, base_height
+        except Exception as e:
+            logger.error(f"Failed to include image {image_path} in PNG export: {e}")
+            return None
+
+    def clear_all(self, loading=False):
+        """Clear the board after confirmation; returns True if it is empty afterwards
+
+        With loading, the board is cleared to make way for another project,
+        whose load starts a new undo history.
+        """
         # Check if there's any data to clear
         total_people = len(self.app.people)
         total_textboxes = len(self.app.textboxes)
         total_legends = len(self.app.legends)
-        total_connections = sum(len(person.connections) for person in self.app.people.values()) // 2
-        total_textbox_connections = sum(len(textbox.connections) for textbox in self.app.textboxes.values()) // 2
-        total_legend_connections = sum(len(legend.connections) for legend in self.app.legends.values()) // 2
+        total_all_connections = self.app.store.edge_count()
         
         if not total_people and not total_textboxes and not total_legends:
-            messagebox.showinfo("Nothing to Clear", "There are no people, textboxes, legends, or connections to clear.")
-            return
+            if not loading:
+                messagebox.showinfo("Nothing to Clear", "There are no people, textboxes, legends, or connections to clear.")
+            return True
             
         # Build confirmation message
         items_to_delete = []
@@ -989,53 +522,52 @@ class DataManagement:
             items_to_delete.append(f"• {total_textboxes} textbox cards")
         if total_legends > 0:
             items_to_delete.append(f"• {total_legends} legend cards")
-        if total_connections > 0 or total_textbox_connections > 0 or total_legend_connections > 0:
-            total_all_connections = total_connections + total_textbox_connections + total_legend_connections
+        if total_all_connections > 0:
             items_to_delete.append(f"• {total_all_connections} connections")
             
-        result = messagebox.askyesno(
-            "Confirm Clear All", 
-            f"Are you sure you want to clear all data?\n\n"
-            f"This will permanently delete:\n"
-            f"{chr(10).join(items_to_delete)}\n\n"
-            f"This action cannot be undone!",
-            icon='warning'
-        )
+        if loading:
+            result = messagebox.askyesno(
+                "Confirm Load",
+                f"Loading a project replaces the current one.\n\n"
+                f"This will permanently delete:\n"
+                f"{chr(10).join(items_to_delete)}\n\n"
+                f"This cannot be undone.",
+                icon='warning'
+            )
+        else:
+            result = messagebox.askyesno(
+                "Confirm Clear All",
+                f"Are you sure you want to clear all data?\n\n"
+                f"This will delete:\n"
+                f"{chr(10).join(items_to_delete)}\n\n"
+                f"You can undo this with Ctrl+Z.",
+                icon='warning'
+            )
         
         if not result:
-            return
+            return False
             
-        # Proceed with clearing
-        self.app.canvas.delete("all")
-        self.app.people.clear()
-        self.app.person_widgets.clear()
-        self.app.textboxes.clear()
-        self.app.textbox_widgets.clear()
-        self.app.legends.clear()
-        self.app.legend_widgets.clear()
-        self.app.connection_lines.clear()
-        self.app.original_font_sizes.clear()
-        self.app.original_image_sizes.clear()
-        self.app.image_cache.clear()
-        self.app.scaled_image_cache.clear()
-        self.app.base_image_cache.clear()
+        # Proceed with clearing; the canvas resets itself and redraws the grid.
+        # The clear is an edit like any other: undoable, and unsaved until saved
+        self._end_paged_load()
+        self.app.store.clear()
+        self._release_projects()
         self.app.selected_person = None
         self.app.selected_textbox = None
         self.app.selected_legend = None
         self.app.selected_connection = None
-        self.app.next_id = 1
         
         # Reset zoom and view
+        if hasattr(self.app, 'view_animator'):
+            self.app.view_animator.stop()
         if hasattr(self.app, 'events'):
             self.app.events.last_zoom = 1.0
             self.app.canvas.xview_moveto(0)
             self.app.canvas.yview_moveto(0)
-
-        # Recreate the grid pattern after clearing
-        self.app.canvas_helpers.add_grid_pattern()
         
         # Update status
         self.app.update_status("All data cleared successfully")
+        return True
 
     def cleanup_old_files(self):
         """Clean up old extracted files to save disk space"""
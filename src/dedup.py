@@ -0,0 +1,297 @@
+# dedup.py
+"""
+Whole-network duplicate detection for people.
+
+Comparing every person with every other is quadratic, so people are first
+grouped by blocking keys: a phonetic code of their name, their phone number
+and email address with the formatting stripped, and their date of birth.
+Only people who share a block are compared. A block too large to compare
+exhaustively (a placeholder phone number, a common name) is compared as a
+sliding window over its members sorted by name instead.
+
+Scoring the candidate pairs is spread across a ``multiprocessing`` pool.
+The pairs found are returned best first for review, and ``merge_people``
+folds one person into another: empty fields, files and connections move
+over and the duplicate card is removed, all in one undoable batch.
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+from datetime import datetime
+from difflib import SequenceMatcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.8  # Lowest score reported as a likely duplicate
+MAX_BLOCK = 100          # Larger blocks are compared as a sliding window
+WINDOW = 20              # Neighbours each person is compared with in a large block
+CHUNK_SIZE = 20_000      # Pairs sent to a worker process at a time
+PARALLEL_MIN_PAIRS = 50_000  # Fewer pairs are scored in this process; starting a pool costs more
+
+AGREEMENT_WEIGHT = 0.5  # Each matching identifier closes this much of the gap to a perfect score
+DOB_CONFLICT = 0.5      # Different birth dates scale the score by this
+
+# Fields copied from the duplicate when the kept person has none
+MERGE_FIELDS = ('dob', 'alias', 'address', 'phone', 'ssn', 'email')
+
+DOB_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%Y/%m/%d', '%d.%m.%Y', '%B %d, %Y', '%b %d, %Y', '%d %B %Y')
+
+_SOUNDEX_CODES = {ch: str(code) for code, letters in enumerate(
+    ("aehiouwy", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r")) for ch in letters}
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+# Normalization
+
+def soundex(word):
+    """American Soundex code of a word, e.g. 'Robert' -> 'R163'; '' for a word without letters"""
+    letters = [ch for ch in word.lower() if ch in _SOUNDEX_CODES]
+    if not letters:
+        return ""
+    code = [letters[0].upper()]
+    previous = _SOUNDEX_CODES[letters[0]]
+    for ch in letters[1:]:
+        digit = _SOUNDEX_CODES[ch]
+        if digit != '0' and digit != previous:
+            code.append(digit)
+            if len(code) == 4:
+                break
+        if ch not in "hw":  # h and w do not separate letters with the same code
+            previous = digit
+    return "".join(code).ljust(4, '0')
+
+
+def name_tokens(name):
+    """Lower-cased words of a name, in order, ignoring punctuation and digits"""
+    return _WORD.findall(name.casefold()) if name else []
+
+
+def normalize_phone(phone):
+    """Digits only, without a leading country code; '' if too short to identify anyone"""
+    digits = "".join(ch for ch in phone if ch.isdigit()) if phone else ""
+    if len(digits) < 7:
+        return ""
+    return digits[-10:]
+
+
+def normalize_email(email):
+    email = email.strip().lower() if email else ""
+    return email if "@" in email else ""
+
+
+def normalize_dob(dob):
+    """ISO date for the formats people type; digits only for anything else"""
+    dob = dob.strip() if dob else ""
+    for fmt in DOB_FORMATS:
+        try:
+            return datetime.strptime(dob, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return "".join(ch for ch in dob if ch.isdigit())
+
+
+def person_record(person):
+    """The normalized fields duplicates are scored on: (name, dob, phone, email)"""
+    return (" ".join(sorted(name_tokens(person.name))), normalize_dob(person.dob),
+            normalize_phone(person.phone), normalize_email(person.email))
+
+
+def person_records(store):
+    """{card_id: record} for every person; cheap enough to take on the UI thread before scoring elsewhere"""
+    return {card_id: person_record(person) for card_id, person in store.items('person')}
+
+
+# Blocking
+
+def blocking_keys(record):
+    """Keys under which a person is grouped; only people sharing a key are compared"""
+    name, dob, phone, email = record
+    keys = []
+    if name:
+        # Word order does not matter: "Smith, John" and "Jon Smith" share a key
+        keys.append(('name', " ".join(sorted(soundex(token) for token in name.split()))))
+    if phone:
+        keys.append(('phone', phone))
+    if email:
+        keys.append(('email', email))
+    if dob:
+        keys.append(('dob', dob))
+    return keys
+
+
+def candidate_pairs(records):
+    """Sorted (low_id, high_id) pairs of people sharing at least one block"""
+    blocks = {}
+    for card_id, record in records.items():
+        for key in blocking_keys(record):
+            blocks.setdefault(key, []).append(card_id)
+    pairs = set()
+    windowed = 0
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        if len(members) <= MAX_BLOCK:
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    pairs.add((first, second) if first < second else (second, first))
+        else:
+            windowed += 1
+            members.sort(key=lambda card_id: records[card_id][0])
+            for i, first in enumerate(members):
+                for second in members[i + 1:i + 1 + WINDOW]:
+                    pairs.add((first, second) if first < second else (second, first))
+    if windowed:
+        logger.info(f"{windowed} blocks over {MAX_BLOCK} people compared as sliding windows")
+    return sorted(pairs)
+
+
+# Scoring
+
+def score_records(first, second, threshold=0.0):
+    """Return (score, matching identifiers) for two records, or None if the score is below threshold
+
+    The score starts at the similarity of the names and moves halfway to 1
+    for each identifier both people share; different birth dates halve it.
+    """
+    name1, dob1, phone1, email1 = first
+    name2, dob2, phone2, email2 = second
+    agreements, scale = [], 1.0
+    for field, value1, value2 in (('dob', dob1, dob2), ('phone', phone1, phone2), ('email', email1, email2)):
+        if value1 and value2:
+            if value1 == value2:
+                agreements.append(field)
+            elif field == 'dob':
+                scale = DOB_CONFLICT
+    gap = (1 - AGREEMENT_WEIGHT) ** len(agreements)
+
+    def score_for(ratio):
+        return scale * (1 - (1 - ratio) * gap)
+
+    if not (name1 and name2):
+        ratio = 0.0
+    elif name1 == name2:
+        ratio = 1.0
+    else:
+        # The cheap upper bounds first: most pairs from a shared birthday are strangers
+        matcher = SequenceMatcher(None, name1, name2)
+        if score_for(matcher.real_quick_ratio()) < threshold or score_for(matcher.quick_ratio()) < threshold:
+            return None
+        ratio = matcher.ratio()
+    score = score_for(ratio)
+    if score < threshold:
+        return None
+    return score, tuple(agreements)
+
+
+_worker_records = None
+
+
+def _init_worker(records):
+    global _worker_records
+    _worker_records = records
+
+
+def _score_chunk(args):
+    pairs, threshold = args
+    return _score_pairs(_worker_records, pairs, threshold)
+
+
+def _score_pairs(records, pairs, threshold):
+    found = []
+    for id1, id2 in pairs:
+        result = score_records(records[id1], records[id2], threshold)
+        if result is not None:
+            found.append((result[0], id1, id2, result[1]))
+    return found
+
+
+def find_duplicates(records, threshold=DEFAULT_THRESHOLD, processes=None, progress=None):
+    """Return [(score, id1, id2, matching identifiers)] for likely duplicate people, best first
+
+    records is ``person_records(store)``. Scoring runs on ``processes``
+    worker processes (default: one per CPU) once there are enough pairs to
+    be worth it. progress, if given, is called with (pairs scored, total).
+    """
+    pairs = candidate_pairs(records)
+    total = len(pairs)
+    processes = processes or os.cpu_count() or 1
+    logger.info(f"Scoring {total} candidate pairs among {len(records)} people")
+    found = []
+    if processes == 1 or total < PARALLEL_MIN_PAIRS:
+        for start in range(0, total, CHUNK_SIZE):
+            found.extend(_score_pairs(records, pairs[start:start + CHUNK_SIZE], threshold))
+            if progress:
+                progress(min(start + CHUNK_SIZE, total), total)
+    else:
+        chunks = [(pairs[start:start + CHUNK_SIZE], threshold) for start in range(0, total, CHUNK_SIZE)]
+        done = 0
+        # Spawned, not forked: this runs on a background thread of the Tk process, which must not be forked
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(processes, initializer=_init_worker, initargs=(records,)) as pool:
+            for chunk_found in pool.imap_unordered(_score_chunk, chunks):
+                found.extend(chunk_found)
+                done = min(done + CHUNK_SIZE, total)
+                if progress:
+                    progress(done, total)
+    # Best first; equal scores in id order so the list is stable from run to run
+    found.sort(key=lambda match: (-match[0], match[1], match[2]))
+    logger.info(f"Found {len(found)} likely duplicate pairs")
+    return found
+
+
+# Merging
+
+def merge_people(store, keep_id, duplicate_id):
+    """Fold a duplicate person into another and remove it, as one batch; returns keep_id
+
+    Fields the kept person lacks are taken from the duplicate (its name
+    becomes an alias when it differs), files are combined, and the
+    duplicate's connections move over unless the kept person already has a
+    labelled connection to the same card.
+    """
+    keep, duplicate = store[keep_id], store[duplicate_id]
+    fields = {field: getattr(duplicate, field) for field in MERGE_FIELDS
+              if getattr(duplicate, field) and not getattr(keep, field)}
+    if ('alias' not in fields and not keep.alias and duplicate.name
+            and duplicate.name.strip().lower() != keep.name.strip().lower()):
+        fields['alias'] = duplicate.name
+    if duplicate.file_count():
+        kept_files = list(keep.files) if keep.file_count() else []
+        files = kept_files + [path for path in duplicate.files if path not in kept_files]
+        if len(files) > len(kept_files):
+            fields['files'] = files
+    with store.batch():
+        if fields:
+            store.update(keep_id, **fields)
+        for other_id, label in list(store.iter_neighbors(duplicate_id)):
+            if other_id == keep_id:
+                continue
+            existing = store.edge_label(keep_id, other_id, default=None)
+            if existing is None or (not existing and label):
+                store.connect(keep_id, other_id, label)
+        store.remove(duplicate_id)
+    logger.info(f"Merged person {duplicate_id} into {keep_id}")
+    return keep_id
+
+
+def choose_kept(store, id1, id2):
+    """Return (keep_id, duplicate_id): the person with more connections and files stays, else the older card"""
+    def weight(card_id):
+        person = store[card_id]
+        return (store.degree(card_id) + person.file_count(), -card_id)
+    return (id1, id2) if weight(id1) >= weight(id2) else (id2, id1)
+
+
+def redirect_matches(matches, duplicate_id, keep_id):
+    """Review list after a merge: pairs with the removed person now point at the kept one"""
+    redirected, seen = [], set()
+    for score, id1, id2, fields in matches:
+        id1 = keep_id if id1 == duplicate_id else id1
+        id2 = keep_id if id2 == duplicate_id else id2
+        pair = (id1, id2) if id1 < id2 else (id2, id1)
+        if id1 != id2 and pair not in seen:
+            seen.add(pair)
+            redirected.append((score, *pair, fields))
+    return redirected
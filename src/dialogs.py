@@ -9,8 +9,13 @@ import os
 import webbrowser
 import requests
 import threading
+import logging
 from pathlib import Path
 from .constants import COLORS
+from .dedup import redirect_matches
+from .library import ProjectLibrary
+
+logger = logging.getLogger(__name__)
 
 class PersonDialog:
     """
@@ -1027,4 +1032,459 @@ class LegendDialog:
         
     def cancel(self):
         """Handle Cancel button click"""
-        self.dialog.destroy()
\ No newline at end of file
+        self.dialog.destroy()
+
+class DuplicateReviewDialog:
+    """
+    Window listing likely duplicate people, best match first, for merging one pair at a time
+    """
+    def __init__(self, parent, app, matches):
+        self.app = app
+        self.matches = matches  # [(score, id1, id2, matching identifiers)]
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("👥 Review Duplicates")
+        self.dialog.geometry("640x520")
+        self.dialog.configure(bg=COLORS['background'])
+        # Not modal: the canvas stays usable to look at each pair
+        self.dialog.transient(parent)
+        
+        # Center the dialog
+        self.dialog.update_idletasks()
+        x = (self.dialog.winfo_screenwidth() // 2) - (640 // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (520 // 2)
+        self.dialog.geometry(f"640x520+{x}+{y}")
+
+        # Main container
+        main_frame = tk.Frame(self.dialog, bg=COLORS['background'])
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=25, pady=25)
+        
+        # Title
+        self.title_label = tk.Label(main_frame,
+                                    font=("Segoe UI", 16, "bold"),
+                                    fg=COLORS['primary'],
+                                    bg=COLORS['background'])
+        self.title_label.pack(anchor=tk.W, pady=(0, 5))
+        
+        tk.Label(main_frame,
+                text="Merging keeps the card with more connections and files, and moves the other's details onto it.",
+                font=("Segoe UI", 9),
+                fg=COLORS['text_secondary'],
+                bg=COLORS['background']).pack(anchor=tk.W, pady=(0, 15))
+        
+        # Ranked list of pairs
+        list_frame = tk.Frame(main_frame, bg=COLORS['border'], relief=tk.SOLID, bd=1)
+        list_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
+        
+        self.listbox = tk.Listbox(list_frame,
+                                  font=("Segoe UI", 10),
+                                  activestyle="none",
+                                  relief=tk.FLAT,
+                                  bd=0,
+                                  selectbackground=COLORS['primary'])
+        scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=self.listbox.yview)
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        self.listbox.bind("<Double-Button-1>", lambda e: self.show())
+        
+        # Button frame
+        button_frame = tk.Frame(main_frame, bg=COLORS['background'])
+        button_frame.pack(fill=tk.X)
+        
+        for text, command, color in (("Close", self.close, COLORS['text_secondary']),
+                                     ("Not a Duplicate", self.skip, COLORS['text_secondary']),
+                                     ("👁️ Show", self.show, COLORS['secondary']),
+                                     ("🔗 Merge", self.merge, COLORS['primary'])):
+            tk.Button(button_frame,
+                     text=text,
+                     font=("Segoe UI", 11, "bold"),
+                     bg=color,
+                     fg='white',
+                     relief=tk.FLAT,
+                     padx=15,
+                     pady=8,
+                     command=command,
+                     cursor='hand2').pack(side=tk.RIGHT, padx=(10, 0))
+        
+        # Key bindings
+        self.dialog.bind('<Return>', lambda e: self.merge())
+        self.dialog.bind('<Delete>', lambda e: self.skip())
+        self.dialog.bind('<Escape>', lambda e: self.close())
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.refresh()
+        self.listbox.focus_set()
+
+    def refresh(self, index=0):
+        """Redraw the list, dropping pairs whose cards no longer exist, and select row index"""
+        store = self.app.store
+        self.matches = [match for match in self.matches if match[1] in store and match[2] in store]
+        self.listbox.delete(0, tk.END)
+        for score, id1, id2, fields in self.matches:
+            shared = f"   (same {', '.join(fields)})" if fields else ""
+            self.listbox.insert(tk.END, f"{score:.0%}   {store[id1].name}  ↔  {store[id2].name}{shared}")
+        self.title_label.config(text=f"👥 {len(self.matches)} Likely Duplicates")
+        if self.matches:
+            index = min(index, len(self.matches) - 1)
+            self.listbox.selection_set(index)
+            self.listbox.see(index)
+
+    def selected_index(self):
+        selection = self.listbox.curselection()
+        return selection[0] if selection and selection[0] < len(self.matches) else None
+
+    def show(self):
+        """Scroll the canvas to the selected pair and select both cards"""
+        index = self.selected_index()
+        if index is not None:
+            _, id1, id2, _ = self.matches[index]
+            self.app.events.show_cards([id1, id2], f"👥 Showing {self.app.store[id1].name} and {self.app.store[id2].name}")
+
+    def merge(self):
+        """Merge the selected pair and move on to the next"""
+        index = self.selected_index()
+        if index is None:
+            return
+        _, id1, id2, _ = self.matches[index]
+        if id1 not in self.app.store or id2 not in self.app.store:
+            self.refresh(index)
+            return
+        keep_id, duplicate_id = self.app.merge_people(id1, id2)
+        self.matches = redirect_matches(self.matches, duplicate_id, keep_id)
+        self.refresh(index)
+
+    def skip(self):
+        """Drop the selected pair from the list"""
+        index = self.selected_index()
+        if index is not None:
+            del self.matches[index]
+            self.refresh(index)
+
+    def close(self):
+        self.dialog.destroy()
+
+class SharedIdentifierDialog:
+    """
+    Window listing phone numbers, emails, SSNs and addresses shared by people who are not yet connected
+    """
+    FIELD_ICONS = {'phone': "📞", 'email': "📧", 'ssn': "🪪", 'address': "🏠"}
+
+    def __init__(self, parent, app):
+        self.app = app
+        self.suggestions = []  # [(field, normalized value, [card ids])]
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("🪪 Shared Identifiers")
+        self.dialog.geometry("640x520")
+        self.dialog.configure(bg=COLORS['background'])
+        # Not modal: the canvas stays usable to look at each group
+        self.dialog.transient(parent)
+        
+        # Center the dialog
+        self.dialog.update_idletasks()
+        x = (self.dialog.winfo_screenwidth() // 2) - (640 // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (520 // 2)
+        self.dialog.geometry(f"640x520+{x}+{y}")
+
+        # Main container
+        main_frame = tk.Frame(self.dialog, bg=COLORS['background'])
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=25, pady=25)
+        
+        # Title
+        self.title_label = tk.Label(main_frame,
+                                    font=("Segoe UI", 16, "bold"),
+                                    fg=COLORS['primary'],
+                                    bg=COLORS['background'])
+        self.title_label.pack(anchor=tk.W, pady=(0, 5))
+        
+        tk.Label(main_frame,
+                text="People listed together have the same identifier. Connect links every pair of them.",
+                font=("Segoe UI", 9),
+                fg=COLORS['text_secondary'],
+                bg=COLORS['background']).pack(anchor=tk.W, pady=(0, 15))
+        
+        # Groups, largest first
+        list_frame = tk.Frame(main_frame, bg=COLORS['border'], relief=tk.SOLID, bd=1)
+        list_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
+        
+        self.listbox = tk.Listbox(list_frame,
+                                  font=("Segoe UI", 10),
+                                  activestyle="none",
+                                  relief=tk.FLAT,
+                                  bd=0,
+                                  selectbackground=COLORS['primary'])
+        scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=self.listbox.yview)
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        self.listbox.bind("<Double-Button-1>", lambda e: self.show())
+        
+        # Button frame
+        button_frame = tk.Frame(main_frame, bg=COLORS['background'])
+        button_frame.pack(fill=tk.X)
+        
+        for text, command, color in (("Close", self.close, COLORS['text_secondary']),
+                                     ("👁️ Show", self.show, COLORS['secondary']),
+                                     ("🔗 Connect", self.connect, COLORS['primary'])):
+            tk.Button(button_frame,
+                     text=text,
+                     font=("Segoe UI", 11, "bold"),
+                     bg=color,
+                     fg='white',
+                     relief=tk.FLAT,
+                     padx=15,
+                     pady=8,
+                     command=command,
+                     cursor='hand2').pack(side=tk.RIGHT, padx=(10, 0))
+        
+        # Key bindings
+        self.dialog.bind('<Return>', lambda e: self.connect())
+        self.dialog.bind('<Escape>', lambda e: self.close())
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.refresh()
+        self.listbox.focus_set()
+
+    def refresh(self, index=0):
+        """Reload the groups from the identifier index and select row index"""
+        store = self.app.store
+        self.suggestions = self.app.identifiers.suggestions()
+        self.listbox.delete(0, tk.END)
+        for field, value, card_ids in self.suggestions:
+            names = ", ".join(store[card_id].name for card_id in card_ids)
+            self.listbox.insert(tk.END, f"{self.FIELD_ICONS[field]} {value}   —   {len(card_ids)} people: {names}")
+        self.title_label.config(text=f"🪪 {len(self.suggestions)} Shared Identifiers")
+        if self.suggestions:
+            index = min(index, len(self.suggestions) - 1)
+            self.listbox.selection_set(index)
+            self.listbox.see(index)
+
+    def selected(self):
+        selection = self.listbox.curselection()
+        return self.suggestions[selection[0]] if selection and selection[0] < len(self.suggestions) else None
+
+    def show(self):
+        """Scroll the canvas to the selected group and select its people"""
+        suggestion = self.selected()
+        if suggestion is not None:
+            field, value, card_ids = suggestion
+            self.app.events.show_cards(card_ids, f"{self.FIELD_ICONS[field]} {len(card_ids)} people share {value}")
+
+    def connect(self):
+        """Connect the selected group's people and move on to the next group"""
+        suggestion = self.selected()
+        if suggestion is not None:
+            index = self.listbox.curselection()[0]
+            self.app.connect_shared_identifier(*suggestion)
+            self.refresh(index)
+
+    def close(self):
+        self.dialog.destroy()
+
+class LibraryDialog:
+    """
+    Window searching every project saved in a folder, without opening them
+    """
+    KIND_ICONS = {'person': "👤", 'textbox': "📝", 'legend': "🗂️", 'connection': "🔗"}
+
+    def __init__(self, parent, app):
+        self.app = app
+        self.library = ProjectLibrary(app.library_path)
+        self.folder = self.library.get_setting('folder')
+        self.hits = []  # [(path, card_id, kind, heading, snippet)]
+        self.scan_cancel = None
+        self.closed = False
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("📚 Project Library")
+        self.dialog.geometry("720x560")
+        self.dialog.configure(bg=COLORS['background'])
+        # Not modal: a project opened from here is looked at on the canvas
+        self.dialog.transient(parent)
+        
+        # Center the dialog
+        self.dialog.update_idletasks()
+        x = (self.dialog.winfo_screenwidth() // 2) - (720 // 2)
+        y = (self.dialog.winfo_screenheight() // 2) - (560 // 2)
+        self.dialog.geometry(f"720x560+{x}+{y}")
+
+        # Main container
+        main_frame = tk.Frame(self.dialog, bg=COLORS['background'])
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=25, pady=25)
+        
+        # Title
+        tk.Label(main_frame,
+                text="📚 Project Library",
+                font=("Segoe UI", 16, "bold"),
+                fg=COLORS['primary'],
+                bg=COLORS['background']).pack(anchor=tk.W, pady=(0, 5))
+        
+        # Folder the library covers
+        folder_frame = tk.Frame(main_frame, bg=COLORS['background'])
+        folder_frame.pack(fill=tk.X, pady=(0, 10))
+        self.folder_label = tk.Label(folder_frame,
+                                     font=("Segoe UI", 9),
+                                     fg=COLORS['text_secondary'],
+                                     bg=COLORS['background'],
+                                     anchor=tk.W)
+        self.folder_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Button(folder_frame,
+                 text="📁 Choose Folder",
+                 font=("Segoe UI", 9),
+                 relief=tk.FLAT,
+                 command=self.choose_folder,
+                 cursor='hand2').pack(side=tk.RIGHT)
+        
+        # Search entry
+        self.query_var = tk.StringVar()
+        self.entry = tk.Entry(main_frame,
+                              textvariable=self.query_var,
+                              font=("Segoe UI", 11),
+                              relief=tk.SOLID,
+                              bd=1)
+        self.entry.pack(fill=tk.X, pady=(0, 10), ipady=4)
+        self.query_var.trace_add("write", lambda *args: self.search())
+        
+        # Matching cards, best first
+        list_frame = tk.Frame(main_frame, bg=COLORS['border'], relief=tk.SOLID, bd=1)
+        list_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        self.listbox = tk.Listbox(list_frame,
+                                  font=("Segoe UI", 10),
+                                  activestyle="none",
+                                  relief=tk.FLAT,
+                                  bd=0,
+                                  selectbackground=COLORS['primary'])
+        scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=self.listbox.yview)
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        self.listbox.bind("<Double-Button-1>", lambda e: self.open_selected())
+        
+        self.status_label = tk.Label(main_frame,
+                                     font=("Segoe UI", 9),
+                                     fg=COLORS['text_secondary'],
+                                     bg=COLORS['background'],
+                                     anchor=tk.W)
+        self.status_label.pack(fill=tk.X, pady=(0, 15))
+        
+        # Button frame
+        button_frame = tk.Frame(main_frame, bg=COLORS['background'])
+        button_frame.pack(fill=tk.X)
+        
+        for text, command, color in (("Close", self.close, COLORS['text_secondary']),
+                                     ("🔄 Rescan", self.rescan, COLORS['secondary']),
+                                     ("📂 Open Project", self.open_selected, COLORS['primary'])):
+            tk.Button(button_frame,
+                     text=text,
+                     font=("Segoe UI", 11, "bold"),
+                     bg=color,
+                     fg='white',
+                     relief=tk.FLAT,
+                     padx=15,
+                     pady=8,
+                     command=command,
+                     cursor='hand2').pack(side=tk.RIGHT, padx=(10, 0))
+        
+        # Key bindings
+        self.entry.bind('<Return>', lambda e: self.open_selected())
+        self.entry.bind('<Down>', lambda e: self.move_selection(1))
+        self.entry.bind('<Up>', lambda e: self.move_selection(-1))
+        self.dialog.bind('<Escape>', lambda e: self.close())
+        self.dialog.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.show_folder()
+        self.show_summary()
+        self.entry.focus_set()
+        # Catch up with projects saved since the last scan; unchanged ones are skipped
+        if self.folder:
+            self.rescan()
+
+    def show_folder(self):
+        self.folder_label.config(text=f"Folder: {self.folder}" if self.folder else "No folder chosen yet")
+
+    def show_summary(self):
+        projects = self.library.projects()
+        failed = sum(1 for project in projects if project[3])
+        summary = f"{len(projects) - failed} projects indexed"
+        if failed:
+            summary += f", {failed} could not be read"
+        self.status_label.config(text=summary)
+
+    def choose_folder(self):
+        folder = filedialog.askdirectory(parent=self.dialog, initialdir=self.folder or os.path.expanduser("~"))
+        if folder:
+            self.folder = folder
+            self.library.set_setting('folder', folder)
+            self.show_folder()
+            self.rescan()
+
+    def rescan(self):
+        """Index new and changed projects in the folder in the background"""
+        if not self.folder:
+            self.choose_folder()
+            return
+        if self.scan_cancel is not None:
+            return  # Already scanning
+        folder, library_path = self.folder, self.app.library_path
+        cancel = self.scan_cancel = threading.Event()
+        self.status_label.config(text="🔄 Looking for new and changed projects...")
+
+        def post(callback):
+            self.app.root.after(0, lambda: None if self.closed else callback())
+
+        def progress(done, total):
+            if total:
+                post(lambda: self.status_label.config(text=f"🔄 Indexing projects: {done}/{total}"))
+
+        def scan_thread():
+            counts = None
+            try:
+                # SQLite connections stay on the thread that made them
+                with ProjectLibrary(library_path) as library:
+                    counts = library.scan(folder, progress=progress, cancel=cancel)
+            except Exception as e:
+                logger.error(f"Library scan failed: {e}", exc_info=True)
+            post(lambda: self.scan_finished(counts))
+
+        threading.Thread(target=scan_thread, daemon=True).start()
+
+    def scan_finished(self, counts):
+        self.scan_cancel = None
+        self.show_summary()
+        if counts is None:
+            self.status_label.config(text="❌ Could not scan the folder")
+        self.search()
+
+    def search(self):
+        self.hits = self.library.search(self.query_var.get())
+        self.listbox.delete(0, tk.END)
+        for path, card_id, kind, heading, snippet in self.hits:
+            line = f"{self.KIND_ICONS.get(kind, '')} {heading}   —   {os.path.basename(path)}"
+            if snippet and snippet.replace('[', '').replace(']', '') != heading:
+                line += f"   ({snippet})"
+            self.listbox.insert(tk.END, line)
+        if self.hits:
+            self.listbox.selection_set(0)
+
+    def move_selection(self, step):
+        if not self.hits:
+            return "break"
+        selection = self.listbox.curselection()
+        index = max(0, min(len(self.hits) - 1, (selection[0] + step) if selection else 0))
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(index)
+        self.listbox.see(index)
+        return "break"
+
+    def open_selected(self):
+        """Load the selected card's project and show the card"""
+        selection = self.listbox.curselection()
+        if selection and selection[0] < len(self.hits):
+            path, card_id = self.hits[selection[0]][:2]
+            self.app.open_library_project(path, card_id)
+
+    def close(self):
+        self.closed = True
+        if self.scan_cancel is not None:
+            self.scan_cancel.set()
+        self.library.close()
+        self.dialog.destroy()
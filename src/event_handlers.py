@@ -1,7 +1,15 @@
+import logging
+import os
 from datetime import datetime
 from src.constants import COLORS, CARD_COLORS
 from src.dialogs import ConnectionLabelDialog, PersonDialog, TextboxDialog, LegendDialog
-from tkinter import messagebox
+from src.clipboard import copy_subgraph, paste_subgraph, to_json, from_json
+from src.filters import FilterError
+from tkinter import messagebox, TclError
+
+logger = logging.getLogger(__name__)
+
+SEARCH_RESULT_LIMIT = 50
 
 # This file will contain event handling logic.
 
@@ -18,19 +26,21 @@ class EventHandlers:
         self.selected_legend = None
         self.selected_connection = None
         self.last_zoom = 1.0
-        self.zoom_debounce_timer = None
         self._panning = False
         self.current_hover = None
         self._last_mouse_move_time = 0
-        self._pending_color_refresh = None
         
-        # Clipboard system for copy/cut/paste
+        # Multi-card selection (Ctrl+click), used alongside the single selected_* card
+        self.selection = set()
+        
+        # Clipboard system for copy/cut/paste: a serialized subgraph (see src/clipboard.py)
         self.clipboard_data = None
-        self.clipboard_type = None
-        self.clipboard_source_id = None  # For cut operations
         self.last_mouse_x = 500  # Default position for paste
         self.last_mouse_y = 500
 
+        # Results of the last search, in the order listed under the search bar
+        self.search_hits = []
+
     def on_zoom(self, value):
         # Scale the canvas content based on the zoom value
         try:
@@ -42,36 +52,22 @@ class EventHandlers:
         if abs(zoom - self.last_zoom) < 0.01:
             return
         
-        # Store previous zoom for efficient scaling
-        prev_zoom = self.last_zoom
-        
-        # Use single canvas.scale operation for better performance
-        scale_factor = zoom / prev_zoom
-        self.app.canvas.scale("all", 0, 0, scale_factor, scale_factor)
-        self.last_zoom = zoom
-        
-        # Keep the scroll region fixed to maintain consistent canvas size
-        self.app.canvas.configure(scrollregion=(0, 0, self.app.fixed_canvas_width, self.app.fixed_canvas_height))
-        
-        # Batch UI updates for better performance
-        self.debounced_zoom_update(zoom)
+        # Apply the cheap canvas.scale immediately; the animator defers the rest
+        self.app.view_animator.jump_zoom(zoom)
 
-    def debounced_zoom_update(self, zoom):
-        """Perform expensive zoom operations with debouncing"""
-        # Cancel previous timer if it exists
-        if self.zoom_debounce_timer:
-            self.app.root.after_cancel(self.zoom_debounce_timer)
-        
-        # Schedule the expensive operations after a short delay
-        self.zoom_debounce_timer = self.app.root.after(50, lambda: self._perform_zoom_update(zoom))
+    def schedule_zoom_refresh(self):
+        """Queue the expensive zoom work to run once pan/zoom motion settles"""
+        self.app.view_animator.defer_until_settled("zoom_refresh", self._perform_zoom_update)
     
-    def _perform_zoom_update(self, zoom):
-        """Perform the actual expensive zoom update operations"""
-        self.app.canvas_helpers.rescale_text(zoom)
+    def _perform_zoom_update(self):
+        """Perform the actual expensive zoom update operations in time-sliced steps"""
+        zoom = self.last_zoom
+        yield from self.app.canvas_helpers.iter_rescale_text(zoom)
         self.app.canvas_helpers.rescale_images(zoom)
+        yield
         self.app.canvas_helpers.update_connections()
+        yield
         self.app.canvas_helpers.redraw_grid()
-        self.zoom_debounce_timer = None
 
     def on_canvas_resize(self, event):
         self.app.canvas_helpers.redraw_grid()
@@ -91,6 +87,7 @@ class EventHandlers:
         
         # Always clear selections on a new click
         self.clear_connection_selection()
+        self.set_selection(())
         self.selected_person = None
         self.selected_textbox = None
         self.selected_legend = None
@@ -164,38 +161,13 @@ class EventHandlers:
             dx_world = dx_canvas / zoom
             dy_world = dy_canvas / zoom
             
-            if self.selected_person:
-                # Update logical (unscaled) position using world delta
-                self.app.people[self.selected_person].x += dx_world
-                self.app.people[self.selected_person].y += dy_world
-
-                # Move existing canvas items directly during drag (much more efficient)
-                person_items = self.app.person_widgets[self.selected_person]
-                for item in person_items:
-                    self.app.canvas.move(item, dx_canvas, dy_canvas)
-            
-            elif self.selected_textbox:
-                # Update logical (unscaled) position using world delta
-                self.app.textboxes[self.selected_textbox].x += dx_world
-                self.app.textboxes[self.selected_textbox].y += dy_world
-
-                # Move existing canvas items directly during drag (much more efficient)
-                textbox_items = self.app.textbox_widgets[self.selected_textbox]
-                for item in textbox_items:
-                    self.app.canvas.move(item, dx_canvas, dy_canvas)
-            
-            elif self.selected_legend:
-                # Update logical (unscaled) position using world delta
-                self.app.legends[self.selected_legend].x += dx_world
-                self.app.legends[self.selected_legend].y += dy_world
-
-                # Move existing canvas items directly during drag (much more efficient)
-                legend_items = self.app.legend_widgets[self.selected_legend]
-                for item in legend_items:
-                    self.app.canvas.move(item, dx_canvas, dy_canvas)
-
-            # Update connections immediately (but efficiently)
-            self.app.canvas_helpers.update_connections()  # Update connections
+            card_id = self.selected_person or self.selected_textbox or self.selected_legend
+            card = self.app.store[card_id]
+
+            # Update the logical (unscaled) position; the canvas moves the card's items
+            # and redraws only the connections touching it
+            self.app.store.move(card_id, card.x + dx_world, card.y + dy_world)
+
             # Update drag data for next movement
             self.drag_data = {"x": canvas_x, "y": canvas_y}
 
@@ -203,16 +175,12 @@ class EventHandlers:
         if self.dragging and (self.selected_person or self.selected_textbox or self.selected_legend):
             self.dragging = False
             
-            # Don't refresh the widget - it's already at the correct position and scale
-            # Only refresh if there was a pending color change
-            if self._pending_color_refresh:
-                if self.selected_person:
-                    self.app.root.after(50, lambda: self.app.refresh_person_widget(self._pending_color_refresh))
-                elif self.selected_textbox:
-                    self.app.root.after(50, lambda: self.app.refresh_textbox_widget(self._pending_color_refresh))
-                elif self.selected_legend:
-                    self.app.root.after(50, lambda: self.app.refresh_legend_widget(self._pending_color_refresh))
-                self._pending_color_refresh = None
+            # The drag is one undo step
+            self.app.undo.seal()
+            
+            # Don't refresh moved widgets - they're already at the correct position and scale.
+            # Only cards edited mid-drag (e.g. a color change) still need redrawing
+            self.app.root.after(50, self.app.canvas_helpers.refresh_stale_cards)
         else:
             self.dragging = False
     
@@ -301,10 +269,7 @@ class EventHandlers:
         
         if self.connecting and self.temp_line and self.connection_start:
             # Get starting position based on connection type
-            if self.connection_start in self.app.people:
-                start_obj = self.app.people[self.connection_start]
-            else:
-                start_obj = self.app.textboxes[self.connection_start]
+            start_obj = self.app.store[self.connection_start]
             
             zoom = self.last_zoom
             start_x, start_y = start_obj.x * zoom, start_obj.y * zoom
@@ -355,15 +320,74 @@ class EventHandlers:
             self.complete_connection(card_id)
     
     def on_escape_key(self, event):
-        """Handle escape key to cancel connections"""
+        """Handle escape key to cancel connections or clear the multi-selection"""
         if self.connecting:
             self.cancel_connection()
             self.app.update_status("Connection cancelled with Escape key")
+        elif self.selection:
+            self.set_selection(())
+            self.app.update_status("Selection cleared")
+        elif self.app.focus.active:
+            self.app.focus.clear()
+            self.app.update_status("Showing the whole network")
+        elif self.app.filter.active:
+            self.clear_filter()
+
+    def on_canvas_ctrl_click(self, event):
+        """Handle Ctrl+click to add a card to or remove it from the multi-selection"""
+        canvas_x = self.app.canvas.canvasx(event.x)
+        canvas_y = self.app.canvas.canvasy(event.y)
+        card_id = self.card_at(canvas_x, canvas_y)
+        if card_id is None:
+            return
+        
+        # The card selected by a plain click joins the multi-selection
+        selection = set(self.selection)
+        single = self.selected_person or self.selected_textbox or self.selected_legend
+        if single:
+            selection.add(single)
+        selection ^= {card_id}
+        self.selected_person = None
+        self.selected_textbox = None
+        self.selected_legend = None
+        self.dragging = False
+        self.set_selection(selection)
+        self.app.update_status(f"{len(selection)} cards selected")
+
+    def on_select_all_key(self, event):
+        """Handle Ctrl+A to select every card shown on the canvas"""
+        self.set_selection(card_id for card_id in self.app.store if self.app.canvas_helpers.is_visible(card_id))
+        self.app.update_status(f"{len(self.selection)} cards selected")
+
+    def set_selection(self, card_ids):
+        """Replace the multi-selection and update its highlight"""
+        self.selection = set(card_ids)
+        self.app.canvas_helpers.show_selection(self.selection)
+
+    def selected_card_ids(self):
+        """Cards the next copy/cut/delete applies to: the multi-selection, else the selected card"""
+        if self.selection:
+            return [card_id for card_id in self.selection if card_id in self.app.store]
+        single = self.selected_person or self.selected_textbox or self.selected_legend
+        return [single] if single else []
+
+    def card_at(self, canvas_x, canvas_y, tolerance=5):
+        """Return the id of the topmost card under a canvas position, or None"""
+        items = self.app.canvas.find_overlapping(canvas_x - tolerance, canvas_y - tolerance,
+                                                 canvas_x + tolerance, canvas_y + tolerance)
+        for item in reversed(items):
+            for tag in self.app.canvas.gettags(item):
+                kind, _, card_id = tag.partition("_")
+                if kind in ("person", "textbox", "legend") and card_id.isdigit():
+                    return int(card_id)
+        return None
     
     def on_delete_key(self, event):
-        """Handle delete key to remove selected connection, person, textbox, or legend"""
+        """Handle delete key to remove selected connection, cards, person, textbox, or legend"""
         if self.selected_connection:
             self.delete_connection()
+        elif self.selection:
+            self.app.delete_cards(self.selection)
         elif self.selected_person:
             self.app.delete_person()
         elif self.selected_textbox:
@@ -373,45 +397,67 @@ class EventHandlers:
     
     def on_color_cycle_key(self, event):
         """Handle 'c' key to cycle colors of selected person or textbox"""
-        if self.selected_person:
-            person = self.app.people[self.selected_person]
-            person.color = (person.color + 1) % len(CARD_COLORS)
-            
-            if not self.dragging:
-                self.app.refresh_person_widget(self.selected_person)
-                self.app.update_status(f"Changed {person.name}'s color")
-            else:
-                self.app.update_status(f"Color will be updated for {person.name} after drag")
-                self._pending_color_refresh = self.selected_person
-        elif self.selected_textbox:
-            textbox = self.app.textboxes[self.selected_textbox]
-            textbox.color = (textbox.color + 1) % len(CARD_COLORS)
-            
-            if not self.dragging:
-                self.app.refresh_textbox_widget(self.selected_textbox)
-                self.app.update_status(f"Changed textbox '{textbox.title}' color")
-            else:
-                self.app.update_status(f"Color will be updated for textbox '{textbox.title}' after drag")
-                self._pending_color_refresh = self.selected_textbox
+        card_id = self.selected_person or self.selected_textbox
+        if not card_id:
+            return
+        card = self.app.store[card_id]
+        name = card.name if card.card_type == 'person' else f"textbox '{card.title}'"
+        
+        # The canvas redraws the card from the change event (deferred until a drag ends)
+        self.app.store.update(card_id, color=(card.color + 1) % len(CARD_COLORS))
+        if not self.dragging:
+            self.app.update_status(f"Changed {card.name}'s color" if card.card_type == 'person' else f"Changed {name} color")
+        else:
+            self.app.update_status(f"Color will be updated for {name} after drag")
+
+    def on_focus_key(self, event):
+        """Handle 'f' key to show only the selected card's neighborhood, or the whole network again"""
+        focus = self.app.focus
+        card_id = self.selected_person or self.selected_textbox or self.selected_legend
+        if not card_id and len(self.selection) == 1:
+            card_id = next(iter(self.selection))
+        if not card_id or card_id == focus.center_id:
+            if focus.active:
+                focus.clear()
+                self.app.update_status("Showing the whole network")
+            return
+        # The neighborhood may reach cards not paged in yet
+        self.app.data.finish_loading()
+        focus.focus(card_id, self.focus_hops())
+        self.app.update_status(f"Focused on {self._describe([card_id])}: {len(focus.distances)} cards within {focus.hops} hops - press F or Escape to show everything")
+
+    def on_focus_hops_changed(self):
+        """Handle the hop count spinbox, growing or shrinking the focused neighborhood"""
+        focus = self.app.focus
+        focus.set_hops(self.focus_hops())
+        if focus.active:
+            self.app.update_status(f"{len(focus.distances)} cards within {focus.hops} hops")
+
+    def focus_hops(self):
+        try:
+            return int(self.app.focus_hops_var.get())
+        except (AttributeError, ValueError, TclError):
+            return self.app.focus.hops
 
     def on_middle_button_press(self, event):
-        self.app.canvas.scan_mark(event.x, event.y)
+        self.app.view_animator.pan_press(event.x, event.y)
         self._panning = True
 
     def on_middle_button_motion(self, event):
         if self._panning:
-            self.app.canvas.scan_dragto(event.x, event.y, gain=1)
+            self.app.view_animator.pan_drag(event.x, event.y)
 
     def on_middle_button_release(self, event):
         self._panning = False
+        self.app.view_animator.pan_release()
 
     def on_mouse_wheel(self, event):
-        """Handle mouse wheel events to change the zoom slider"""
-        current_zoom = self.app.zoom_var.get()
+        """Handle mouse wheel events by animating the zoom around the cursor"""
+        animator = self.app.view_animator
+        current_zoom = animator.target_zoom if animator.target_zoom is not None else self.last_zoom
         zoom_step = 0.05
         new_zoom = min(current_zoom + zoom_step, 1.0) if event.delta > 0 else max(current_zoom - zoom_step, 0.5)
-        self.app.zoom_var.set(new_zoom)
-        self.on_zoom(new_zoom)
+        animator.zoom_to(new_zoom, anchor=(event.x, event.y))
 
     def start_connection(self, card_id, x, y):
         """Start drawing a connection line from a card (person or textbox)"""
@@ -419,12 +465,8 @@ class EventHandlers:
         self.connection_start = card_id
         
         # Get the card object and name
-        if card_id in self.app.people:
-            card_obj = self.app.people[card_id]
-            card_name = card_obj.name
-        else:
-            card_obj = self.app.textboxes[card_id]
-            card_name = card_obj.title
+        card_obj = self.app.store[card_id]
+        card_name = card_obj.name if card_obj.card_type == 'person' else card_obj.title
             
         zoom = self.last_zoom
         start_x, start_y = card_obj.x * zoom, card_obj.y * zoom
@@ -446,15 +488,16 @@ class EventHandlers:
             return
         
         # Get card objects
-        card1 = self.app.people.get(id1) or self.app.textboxes.get(id1)
-        card2 = self.app.people.get(id2) or self.app.textboxes.get(id2)
+        card1 = self.app.store.get(id1)
+        card2 = self.app.store.get(id2)
         
-        if not card1 or not card2:
+        # Only people and textboxes can be linked interactively
+        if not card1 or not card2 or 'legend' in (card1.card_type, card2.card_type):
             self.cancel_connection()
             return
             
         # Check if connection already exists
-        if id2 in card1.connections:
+        if self.app.store.has_edge(id1, id2):
             messagebox.showinfo("Connection Exists", "These two cards are already connected.")
             self.cancel_connection()
             return
@@ -464,12 +507,8 @@ class EventHandlers:
         self.app.root.wait_window(dialog.dialog)
         label = dialog.result if dialog.result else ""
         
-        # Add connection to data structures
-        card1.connections[id2] = label
-        card2.connections[id1] = label
-        
-        # Draw the final connection line
-        self.app.draw_connection(id1, id2, label, self.last_zoom)
+        # Add connection to the edge table; the canvas draws the line
+        self.app.store.connect(id1, id2, label)
         
         # Clean up
         self.cancel_connection()
@@ -505,22 +544,12 @@ class EventHandlers:
                                   phone=person.phone,
                                   ssn=person.ssn,
                                   email=person.email,
-                                  files=person.files)
+                                  files=list(person.files))
             self.app.root.wait_window(dialog.dialog)
             
             if dialog.result:
-                # Update person data
-                person.name = dialog.result['name']
-                person.dob = dialog.result['dob']
-                person.alias = dialog.result['alias']
-                person.address = dialog.result['address']
-                person.phone = dialog.result['phone']
-                person.ssn = dialog.result['ssn']
-                person.email = dialog.result['email']
-                person.files = dialog.result['files']
-                
-                # Refresh the specific person's widget on the canvas
-                self.app.refresh_person_widget(person_id)
+                # Update person data; the canvas redraws the card if anything changed
+                self.app.store.update(person_id, **dialog.result)
                 self.app.update_status(f"Updated details for {person.name}")
 
     def edit_textbox(self, textbox_id):
@@ -536,12 +565,9 @@ class EventHandlers:
             self.app.root.wait_window(dialog.dialog)
             
             if dialog.result:
-                # Update textbox data
-                textbox.title = dialog.result['title']
-                textbox.content = dialog.result['content']
-                
-                # Refresh the specific textbox's widget on the canvas
-                self.app.refresh_textbox_widget(textbox_id)
+                # Update textbox data; the canvas redraws the card if anything changed
+                self.app.store.update(textbox_id, title=dialog.result['title'],
+                                      content=dialog.result['content'])
                 self.app.update_status(f"Updated textbox '{textbox.title}'")
 
     def edit_legend(self, legend_id):
@@ -557,12 +583,9 @@ class EventHandlers:
             self.app.root.wait_window(dialog.dialog)
             
             if dialog.result:
-                # Update legend data
-                legend.title = dialog.result['title']
-                legend.color_entries = dialog.result['color_entries']
-                
-                # Refresh the specific legend's widget on the canvas
-                self.app.refresh_legend_widget(legend_id)
+                # Update legend data; the canvas redraws the card if anything changed
+                self.app.store.update(legend_id, title=dialog.result['title'],
+                                      color_entries=dialog.result['color_entries'])
                 self.app.update_status(f"Updated legend '{legend.title}'")
 
     def edit_connection_label(self):
@@ -573,22 +596,20 @@ class EventHandlers:
         id1, id2 = self.selected_connection
         
         # Get card objects (could be person, textbox, or legend)
-        card1 = self.app.people.get(id1) or self.app.textboxes.get(id1) or self.app.legends.get(id1)
-        card2 = self.app.people.get(id2) or self.app.textboxes.get(id2) or self.app.legends.get(id2)
+        card1 = self.app.store.get(id1)
+        card2 = self.app.store.get(id2)
         
         if not card1 or not card2:
             return
             
-        current_label = card1.connections.get(id2, "")
+        current_label = self.app.store.edge_label(id1, id2)
         
         dialog = ConnectionLabelDialog(self.app.root, "Edit Connection Label", initial_value=current_label)
         self.app.root.wait_window(dialog.dialog)
         
         if dialog.result is not None:
             new_label = dialog.result
-            card1.connections[id2] = new_label
-            card2.connections[id1] = new_label
-            self.app.canvas_helpers.update_connections()
+            self.app.store.connect(id1, id2, new_label)
             
             # Get card names for status
             name1 = card1.name if hasattr(card1, 'name') else card1.title
@@ -606,8 +627,8 @@ class EventHandlers:
         id1, id2 = self.selected_connection
         
         # Get card objects (could be person, textbox, or legend)
-        card1 = self.app.people.get(id1) or self.app.textboxes.get(id1) or self.app.legends.get(id1)
-        card2 = self.app.people.get(id2) or self.app.textboxes.get(id2) or self.app.legends.get(id2)
+        card1 = self.app.store.get(id1)
+        card2 = self.app.store.get(id2)
         
         if not card1 or not card2:
             return
@@ -623,21 +644,8 @@ class EventHandlers:
         )
         
         if result:
-            # Remove from data structures
-            if id2 in card1.connections:
-                del card1.connections[id2]
-            if id1 in card2.connections:
-                del card2.connections[id1]
-            
-            # Remove from canvas
-            if self.selected_connection in self.app.connection_lines:
-                line_id, label_id, clickable_area_id, bg_rect_id = self.app.connection_lines.pop(self.selected_connection)
-                self.app.canvas.delete(line_id)
-                if label_id:
-                    self.app.canvas.delete(label_id)
-                if bg_rect_id:
-                    self.app.canvas.delete(bg_rect_id)
-                self.app.canvas.delete(clickable_area_id)
+            # Remove from the edge table; the canvas deletes the line
+            self.app.store.disconnect(id1, id2)
             
             self.selected_connection = None
             self.app.update_status(f"🗑️ Connection between {name1} and {name2} deleted")
@@ -667,139 +675,248 @@ class EventHandlers:
         self.selected_connection = None
 
     def on_copy_key(self, event):
-        """Handle Ctrl+C to copy selected card"""
-        if self.selected_person:
-            self.copy_card('person', self.selected_person)
-        elif self.selected_textbox:
-            self.copy_card('textbox', self.selected_textbox)
-        elif self.selected_legend:
-            self.copy_card('legend', self.selected_legend)
+        """Handle Ctrl+C to copy the selected cards"""
+        card_ids = self.selected_card_ids()
+        if card_ids:
+            self.copy_cards(card_ids)
         else:
             self.app.update_status("❌ No card selected for copying")
     
     def on_cut_key(self, event):
-        """Handle Ctrl+X to cut selected card"""
-        if self.selected_person:
-            self.cut_card('person', self.selected_person)
-        elif self.selected_textbox:
-            self.cut_card('textbox', self.selected_textbox)
-        elif self.selected_legend:
-            self.cut_card('legend', self.selected_legend)
+        """Handle Ctrl+X to cut the selected cards"""
+        card_ids = self.selected_card_ids()
+        if card_ids:
+            self.cut_cards(card_ids)
         else:
             self.app.update_status("❌ No card selected for cutting")
     
     def on_paste_key(self, event):
-        """Handle Ctrl+V to paste card at mouse cursor"""
-        if self.clipboard_data is None:
-            self.app.update_status("❌ Nothing to paste")
+        """Handle Ctrl+V to paste cards at mouse cursor"""
+        self.paste_cards()
+    
+    def on_undo_key(self, event):
+        """Handle Ctrl+Z to undo the last change"""
+        self._step_history(self.app.undo.undo, "↩️ Undone", "❌ Nothing to undo")
+
+    def on_redo_key(self, event):
+        """Handle Ctrl+Y / Ctrl+Shift+Z to redo the last undone change"""
+        self._step_history(self.app.undo.redo, "↪️ Redone", "❌ Nothing to redo")
+
+    def _step_history(self, step, done_message, empty_message):
+        if self.dragging or self.connecting:
+            return
+        if not step():
+            self.app.update_status(empty_message)
             return
+        # Drop selections pointing at cards or connections that no longer exist
+        store = self.app.store
+        if self.selected_person not in store:
+            self.selected_person = None
+        if self.selected_textbox not in store:
+            self.selected_textbox = None
+        if self.selected_legend not in store:
+            self.selected_legend = None
+        if self.selected_connection and not store.has_edge(*self.selected_connection):
+            self.selected_connection = None
+        self.app.update_status(done_message)
+
+    def copy_cards(self, card_ids):
+        """Copy cards and the connections between them to the clipboard"""
+        self.clipboard_data = copy_subgraph(self.app.store, card_ids)
         
-        self.paste_card()
-    
-    def copy_card(self, card_type, card_id):
-        """Copy a card to clipboard"""
-        from src.models import Person, TextboxCard, LegendCard
-        import copy
-        
-        if card_type == 'person':
-            original = self.app.people[card_id]
-            # Create a deep copy to avoid reference issues
-            self.clipboard_data = copy.deepcopy(original)
-            card_name = original.name
-        elif card_type == 'textbox':
-            original = self.app.textboxes[card_id]
-            self.clipboard_data = copy.deepcopy(original)
-            card_name = original.title
-        elif card_type == 'legend':
-            original = self.app.legends[card_id]
-            self.clipboard_data = copy.deepcopy(original)
-            card_name = original.title
-        
-        self.clipboard_type = card_type
-        self.clipboard_source_id = None  # Clear cut source since this is copy
-        self.app.update_status(f"📋 Copied '{card_name}' to clipboard")
+        # Also offer the cards to other COMRADE windows through the system clipboard
+        try:
+            self.app.root.clipboard_clear()
+            self.app.root.clipboard_append(to_json(self.clipboard_data))
+        except TclError as e:
+            logger.warning(f"Could not write to the system clipboard: {e}")
+        
+        self.app.update_status(f"📋 Copied {self._describe(card_ids)} to clipboard")
     
-    def cut_card(self, card_type, card_id):
-        """Cut a card to clipboard (copy + mark for deletion)"""
-        # First copy the card
-        self.copy_card(card_type, card_id)
-        
-        # Mark source for deletion after paste
-        self.clipboard_source_id = card_id
-        
-        if card_type == 'person':
-            card_name = self.app.people[card_id].name
-        elif card_type == 'textbox':
-            card_name = self.app.textboxes[card_id].title
-        elif card_type == 'legend':
-            card_name = self.app.legends[card_id].title
-            
-        self.app.update_status(f"✂️ Cut '{card_name}' to clipboard")
+    def cut_cards(self, card_ids):
+        """Cut cards to the clipboard: copy, then delete them in one undoable step"""
+        # Copy and delete every connection, including those to cards still being paged in
+        self.app.data.finish_loading()
+        self.copy_cards(card_ids)
+        description = self._describe(card_ids)
+        # One batch and one undo step, as delete_cards removes them
+        self.app.store.remove_many(card_ids)
+        self.set_selection(())
+        self.selected_person = None
+        self.selected_textbox = None
+        self.selected_legend = None
+        self.app.update_status(f"✂️ Cut {description} to clipboard (Ctrl+Z to undo)")
     
-    def paste_card(self):
-        """Paste card from clipboard at mouse cursor position"""
-        from src.models import Person, TextboxCard, LegendCard
-        import copy
+    def paste_cards(self):
+        """Paste the clipboard's cards centred at the mouse cursor position"""
+        data = self._read_system_clipboard() or self.clipboard_data
+        if not data:
+            self.app.update_status("❌ Nothing to paste")
+            return
         
-        if self.clipboard_data is None:
+        # One batch: a single insert, a single render and a single undo step
+        new_ids = paste_subgraph(self.app.store, data, self.last_mouse_x, self.last_mouse_y)
+        if not new_ids:
+            self.app.update_status("❌ Nothing to paste")
             return
         
-        # Create new card with unique ID
-        new_id = self.app.next_id
-        self.app.next_id += 1
-        
-        # Deep copy the clipboard data to avoid reference issues
-        new_card = copy.deepcopy(self.clipboard_data)
-        
-        # Set position to mouse cursor location
-        new_card.x = self.last_mouse_x
-        new_card.y = self.last_mouse_y
-        
-        # Clear all connections (new card should have no connections)
-        new_card.connections = {}
-        
-        # Add to appropriate collection and create widget
-        if self.clipboard_type == 'person':
-            self.app.people[new_id] = new_card
-            self.app.canvas_helpers.create_person_widget(new_id)
-            card_name = new_card.name
-        elif self.clipboard_type == 'textbox':
-            self.app.textboxes[new_id] = new_card
-            self.app.canvas_helpers.create_textbox_widget(new_id)
-            card_name = new_card.title
-        elif self.clipboard_type == 'legend':
-            self.app.legends[new_id] = new_card
-            self.app.canvas_helpers.create_legend_widget(new_id)
-            card_name = new_card.title
-        
-        # If this was a cut operation, delete the source card
-        if self.clipboard_source_id is not None:
-            if self.clipboard_type == 'person' and self.clipboard_source_id in self.app.people:
-                self.selected_person = self.clipboard_source_id
-                self.app.delete_person()
-            elif self.clipboard_type == 'textbox' and self.clipboard_source_id in self.app.textboxes:
-                self.selected_textbox = self.clipboard_source_id
-                self.app.delete_textbox()
-            elif self.clipboard_type == 'legend' and self.clipboard_source_id in self.app.legends:
-                self.selected_legend = self.clipboard_source_id
-                self.app.delete_legend()
-            
-            # Clear cut source after successful paste
-            self.clipboard_source_id = None
-            self.app.update_status(f"📌 Pasted '{card_name}' at cursor position")
+        # Select the newly pasted cards
+        self.selected_person = None
+        self.selected_textbox = None
+        self.selected_legend = None
+        if len(new_ids) == 1:
+            self.set_selection(())
+            card_type = self.app.store.type_of(new_ids[0])
+            setattr(self, f"selected_{card_type}", new_ids[0])
         else:
-            self.app.update_status(f"📌 Pasted '{card_name}' at cursor position")
-        
-        # Select the newly pasted card
-        if self.clipboard_type == 'person':
-            self.selected_person = new_id
-            self.selected_textbox = None
-            self.selected_legend = None
-        elif self.clipboard_type == 'textbox':
-            self.selected_textbox = new_id
-            self.selected_person = None
-            self.selected_legend = None
-        elif self.clipboard_type == 'legend':
-            self.selected_legend = new_id
-            self.selected_person = None
-            self.selected_textbox = None
+            self.set_selection(new_ids)
+        self.app.update_status(f"📌 Pasted {self._describe(new_ids)} at cursor position")
+    
+    def _read_system_clipboard(self):
+        """Return subgraph data copied by any COMRADE window, or None"""
+        try:
+            return from_json(self.app.root.clipboard_get())
+        except TclError:
+            return None
+    
+    def _describe(self, card_ids):
+        """Short description of a set of cards for status messages"""
+        if len(card_ids) != 1:
+            return f"{len(card_ids)} cards"
+        card = self.app.store.get(card_ids[0])
+        if card is None:
+            return "1 card"
+        return f"'{card.name if card.card_type == 'person' else card.title}'"
+
+    # Search
+
+    def on_find_key(self, event):
+        """Handle Ctrl+F to jump to the search bar"""
+        self.app.search_entry.focus_set()
+        self.app.search_entry.select_range(0, 'end')
+        return "break"
+
+    def on_search_changed(self):
+        """Search as the user types and list the best matches under the search bar"""
+        results = self.app.search_results
+        query = self.app.search_var.get()
+        self.search_hits = self.app.search.search(query, limit=SEARCH_RESULT_LIMIT)
+        # Then files attached to people, as ('file', card id, path)
+        self.search_hits += [('file', card_id, path) for card_id, path
+                             in self.app.attachments.search(query, limit=SEARCH_RESULT_LIMIT - len(self.search_hits))]
+        results.delete(0, 'end')
+        if not self.search_hits:
+            results.place_forget()
+            if query.strip() and self.app.data.cards_not_loaded:
+                self.app.update_status(f"No matches for '{query.strip()}' among the loaded cards;"
+                                       f" {self.app.data.cards_not_loaded} more are read as you scroll to them")
+            elif query.strip() and self.app.search.pending:
+                self.app.update_status(f"No matches for '{query.strip()}' yet, still indexing {self.app.search.pending} cards")
+            elif query.strip():
+                self.app.update_status(f"No matches for '{query.strip()}'")
+            return
+        for hit in self.search_hits:
+            results.insert('end', self._search_hit_label(hit))
+        results.place(in_=self.app.search_entry, relx=0, rely=1, relwidth=1)
+        results.lift()
+
+    def on_search_move(self, step):
+        """Move the highlighted result with the arrow keys"""
+        results = self.app.search_results
+        if not self.search_hits:
+            return "break"
+        current = results.curselection()
+        index = (current[0] + step) % len(self.search_hits) if current else 0
+        results.selection_clear(0, 'end')
+        results.selection_set(index)
+        results.see(index)
+        return "break"
+
+    def on_search_enter(self, event):
+        """Jump to the highlighted result, or the best one"""
+        if self.search_hits:
+            current = self.app.search_results.curselection()
+            self.jump_to_search_hit(self.search_hits[current[0] if current else 0])
+
+    def on_search_select(self, event):
+        current = self.app.search_results.curselection()
+        if current and current[0] < len(self.search_hits):
+            self.jump_to_search_hit(self.search_hits[current[0]])
+
+    def on_search_escape(self, event):
+        self.app.search_var.set("")
+        self.app.search_results.place_forget()
+        self.app.canvas.focus_set()
+
+    # Filter
+
+    def on_filter_apply(self, event=None):
+        """Apply the filter typed in the filter bar; an empty filter shows everything"""
+        text = self.app.filter_var.get().strip()
+        if not text:
+            self.clear_filter()
+            return "break"
+        # A filter is over the whole network, not just the cards paged in so far
+        self.app.data.finish_loading()
+        try:
+            matching = self.app.filter.apply(text)
+        except FilterError as e:
+            self.app.filter_entry.configure(foreground=COLORS['danger'])
+            self.app.update_status(f"❌ Filter: {e}")
+            return "break"
+        self.app.filter_entry.configure(foreground=COLORS['text_primary'])
+        self.set_selection(card_id for card_id in self.selection if card_id in matching)
+        self.app.update_status(f"🔽 Filter: showing {len(matching)} of {len(self.app.store)} cards")
+        return "break"
+
+    def on_filter_escape(self, event=None):
+        self.clear_filter()
+        self.app.canvas.focus_set()
+        return "break"
+
+    def clear_filter(self):
+        """Show every card again and empty the filter bar"""
+        self.app.filter_var.set("")
+        self.app.filter_entry.configure(foreground=COLORS['text_primary'])
+        if self.app.filter.active:
+            self.app.filter.clear()
+            self.app.update_status("Showing the whole network")
+
+    def jump_to_search_hit(self, hit):
+        """Scroll to a matching card (both ends of a matching connection, the owner of a matching file) and select it"""
+        if isinstance(hit, tuple) and hit[0] == 'file':
+            card_ids = [hit[1]] if hit[1] in self.app.store else []
+        else:
+            card_ids = [card_id for card_id in (hit if isinstance(hit, tuple) else (hit,)) if card_id in self.app.store]
+        if not card_ids:
+            return
+        self.app.search_results.place_forget()
+        self.show_cards(card_ids, f"🔎 Found {self._search_hit_label(hit)}")
+
+    def show_cards(self, card_ids, status):
+        """Scroll the view to center on cards, leaving focus mode or the filter if they hide them, and select them"""
+        card_ids = [card_id for card_id in card_ids if card_id in self.app.store]
+        if not card_ids:
+            return
+        if not all(self.app.canvas_helpers.is_realized(card_id) for card_id in card_ids):
+            self.app.focus.clear()
+        if not all(self.app.canvas_helpers.is_visible(card_id) for card_id in card_ids):
+            self.clear_filter()
+        cards = [self.app.store[card_id] for card_id in card_ids]
+        self.app.view_animator.center_on(sum(card.x for card in cards) / len(cards),
+                                         sum(card.y for card in cards) / len(cards))
+        self.set_selection(card_ids)
+        self.app.canvas.focus_set()
+        self.app.update_status(status)
+
+    def _search_hit_label(self, hit):
+        store = self.app.store
+        if isinstance(hit, tuple) and hit[0] == 'file':
+            return f"📎 {os.path.basename(hit[2])} — {self._describe([hit[1]])}"
+        if isinstance(hit, tuple):
+            names = [self._describe([card_id]) for card_id in hit]
+            return f"🔗 {names[0]} — {store.edge_label(*hit)} — {names[1]}"
+        card = store[hit]
+        if card.card_type == 'person':
+            return f"👤 {card.name}"
+        return f"{'📝' if card.card_type == 'textbox' else '🗂️'} {card.title}"
@@ -0,0 +1,477 @@
+# filters.py
+"""
+Attribute filters for the canvas.
+
+A filter is a small query language over card attributes:
+
+    color=red AND degree>5 AND address~"Main St" AND type=person
+    (type=textbox OR name~smith) AND NOT color=blue
+
+Each comparison is answered from an index instead of by testing every card:
+card types from the store's per-type maps, colors and connection counts
+from an ``AttributeIndex`` that follows the store's change events, and text
+from the full-text ``SearchIndex``. The resulting id sets are combined with
+set intersection and union, so text is only checked against the cards the
+index lookups already narrowed down to.
+
+``FilterMode`` applies a filter to the canvas by hiding the items of every
+other card (and of connections touching them) through the canvas item
+state, and keeps it applied while the network is edited.
+"""
+
+import logging
+import re
+
+from src.constants import CARD_COLOR_NAMES
+from src.graph_store import (BATCH, CARD_ADDED, CARD_REMOVED, CARD_TYPES, EDGE_ADDED, EDGE_REMOVED,
+                             FIELD_CHANGED, STORE_CLEARED)
+from src.search_index import SEARCH_FIELDS, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Text fields a filter can compare, with the card types that have them
+TEXT_FIELDS = {
+    'name': ('person',), 'alias': ('person',), 'address': ('person',), 'phone': ('person',),
+    'email': ('person',), 'dob': ('person',), 'ssn': ('person',),
+    'title': ('textbox', 'legend'), 'content': ('textbox',),
+}
+ANY_TEXT = 'text'  # text~word matches any searchable field
+
+COMPARISONS = ('>=', '<=', '!=', '=', '>', '<', '~')
+FIELD_OPERATORS = {
+    'type': ('=', '!='),
+    'color': ('=', '!='),
+    'degree': ('=', '!=', '>', '<', '>=', '<='),
+    ANY_TEXT: ('~',),
+}
+for _field in TEXT_FIELDS:
+    FIELD_OPERATORS[_field] = ('=', '!=', '~')
+
+_TOKEN = re.compile(r'\s*(?:(\()|(\))|(>=|<=|!=|=|>|<|~)|"((?:[^"\\]|\\.)*)"|([^\s()=<>!~"]+))')
+
+
+class FilterError(ValueError):
+    """A filter that cannot be parsed or refers to an unknown field or value"""
+
+
+# Parsing
+
+def _lex(text):
+    """[(kind, value)] with kind one of ( ) op str word"""
+    tokens, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match or match.end() == position:
+            raise FilterError(f"Unexpected character {text[position:].strip()[:1]!r}")
+        position = match.end()
+        opening, closing, op, quoted, word = match.groups()
+        if opening:
+            tokens.append(('(', opening))
+        elif closing:
+            tokens.append((')', closing))
+        elif op:
+            tokens.append(('op', op))
+        elif quoted is not None:
+            tokens.append(('str', re.sub(r'\\(.)', r'\1', quoted)))
+        else:
+            tokens.append(('word', word))
+    return tokens
+
+
+class _Parser:
+    """Recursive descent over the tokens: OR binds loosest, then AND (or plain adjacency), then NOT"""
+    def __init__(self, text):
+        self.tokens = _lex(text)
+        self.position = 0
+
+    def peek(self, keyword=None):
+        if self.position >= len(self.tokens):
+            return None
+        kind, value = self.tokens[self.position]
+        if keyword is not None:
+            return kind == 'word' and value.upper() == keyword
+        return kind
+
+    def take(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise FilterError("The filter is empty")
+        node = self.parse_or()
+        if self.position < len(self.tokens):
+            raise FilterError(f"Unexpected {self.tokens[self.position][1]!r}")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek('OR'):
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else ('or', children)
+
+    def parse_and(self):
+        children = [self.parse_not()]
+        while self.peek() is not None and self.peek() != ')' and not self.peek('OR'):
+            if self.peek('AND'):
+                self.take()
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else ('and', children)
+
+    def parse_not(self):
+        if self.peek('NOT'):
+            self.take()
+            return ('not', self.parse_not())
+        if self.peek() == '(':
+            self.take()
+            node = self.parse_or()
+            if self.peek() != ')':
+                raise FilterError("Missing ')'")
+            self.take()
+            return node
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        if self.peek() != 'word':
+            raise FilterError("Expected a field name such as name, color, degree or type")
+        field = self.take()[1].lower()
+        if self.peek() != 'op':
+            raise FilterError(f"Expected a comparison after {field!r}, e.g. {field}=value")
+        op = self.take()[1]
+        if self.peek() not in ('word', 'str'):
+            raise FilterError(f"Expected a value after {field}{op}")
+        return _comparison(field, op, self.take()[1])
+
+
+def _comparison(field, op, value):
+    """Check a comparison and convert its value to what the index lookup needs"""
+    operators = FIELD_OPERATORS.get(field)
+    if operators is None:
+        raise FilterError(f"Unknown field {field!r}; use one of: {', '.join(FIELD_OPERATORS)}")
+    if op not in operators:
+        raise FilterError(f"{field} cannot be compared with {op}; use {' '.join(operators)}")
+    if field == 'type':
+        value = value.lower()
+        if value not in CARD_TYPES:
+            raise FilterError(f"Unknown card type {value!r}; use one of: {', '.join(CARD_TYPES)}")
+    elif field == 'color':
+        name = value.lower()
+        if name in CARD_COLOR_NAMES:
+            value = CARD_COLOR_NAMES.index(name)
+        elif name.isdigit() and int(name) < len(CARD_COLOR_NAMES):
+            value = int(name)
+        else:
+            raise FilterError(f"Unknown color {value!r}; use one of: {', '.join(CARD_COLOR_NAMES)}")
+    elif field == 'degree':
+        try:
+            value = int(value)
+        except ValueError:
+            raise FilterError(f"degree must be compared with a whole number, not {value!r}")
+    elif op == '~':
+        value = tokenize(value)
+        if not value:
+            raise FilterError(f"{field}~ needs at least one word to look for")
+    else:
+        value = value.strip().casefold()
+    return ('compare', field, op, value)
+
+
+def parse_filter(text):
+    """Parse a filter into a tree of ('and'|'or', [children]), ('not', child) and ('compare', field, op, value)"""
+    return _Parser(text).parse()
+
+
+# Attribute index
+
+class AttributeIndex:
+    """
+    Cards by color and by number of connections, kept in sync with a GraphStore
+    """
+    def __init__(self, store):
+        self.store = store
+        self._by_color = {}   # {color: {card_id}}
+        self._by_degree = {}  # {degree: {card_id}}
+        self._color_of = {}   # {card_id: color}
+        self._degree_of = {}  # {card_id: degree}
+        self.built = False
+        store.subscribe(self.on_store_event,
+                        kinds=(CARD_ADDED, CARD_REMOVED, FIELD_CHANGED, EDGE_ADDED, EDGE_REMOVED, STORE_CLEARED))
+
+    def build(self):
+        self._reset()
+        for card_id, card in self.store.items():
+            self._put(card_id, card)
+        self.built = True
+        logger.info(f"Attribute index built for {len(self._color_of)} cards")
+
+    def ensure_built(self):
+        if not self.built:
+            self.build()
+
+    def _reset(self):
+        self._by_color.clear()
+        self._by_degree.clear()
+        self._color_of.clear()
+        self._degree_of.clear()
+
+    def on_store_event(self, event):
+        if not self.built:
+            return  # Built from scratch on first use
+        events = event.new if event.kind == BATCH else (event,)
+        if any(inner.kind == STORE_CLEARED for inner in events):
+            self.built = False
+            self._reset()
+            return
+        touched = {}
+        for inner in events:
+            if inner.kind == FIELD_CHANGED and 'color' not in inner.new:
+                continue
+            touched[inner.card_id] = None
+            if inner.kind in (EDGE_ADDED, EDGE_REMOVED):
+                touched[inner.other_id] = None
+        # Re-index each touched card once, from its final state
+        for card_id in touched:
+            self._discard(card_id)
+            card = self.store.get(card_id)
+            if card is not None:
+                self._put(card_id, card)
+
+    def _put(self, card_id, card):
+        color, degree = card.color, self.store.degree(card_id)
+        self._color_of[card_id] = color
+        self._degree_of[card_id] = degree
+        self._by_color.setdefault(color, set()).add(card_id)
+        self._by_degree.setdefault(degree, set()).add(card_id)
+
+    def _discard(self, card_id):
+        for values, buckets in ((self._color_of, self._by_color), (self._degree_of, self._by_degree)):
+            value = values.pop(card_id, None)
+            if value is None:
+                continue
+            bucket = buckets[value]
+            bucket.discard(card_id)
+            if not bucket:
+                del buckets[value]
+
+    def with_color(self, color):
+        self.ensure_built()
+        return self._by_color.get(color, set())
+
+    def with_degree(self, test):
+        """Cards whose number of connections passes test; one set union per distinct degree"""
+        self.ensure_built()
+        matching = [cards for degree, cards in self._by_degree.items() if test(degree)]
+        return set().union(*matching) if matching else set()
+
+
+# Evaluation
+
+_DEGREE_TESTS = {
+    '=': lambda value: lambda degree: degree == value,
+    '!=': lambda value: lambda degree: degree != value,
+    '>': lambda value: lambda degree: degree > value,
+    '<': lambda value: lambda degree: degree < value,
+    '>=': lambda value: lambda degree: degree >= value,
+    '<=': lambda value: lambda degree: degree <= value,
+}
+
+
+class FilterQuery:
+    """
+    A parsed filter, evaluated to the set of matching card ids through the indexes
+    """
+    def __init__(self, text):
+        self.text = text
+        self.tree = parse_filter(text)
+
+    def matches(self, store, attributes, search):
+        """Return the ids of the cards the filter keeps"""
+        return self._evaluate(self.tree, _Context(store, attributes, search), None)
+
+    def _evaluate(self, node, context, within):
+        """Matching ids, restricted to within when it is given (it may be ignored by cheap lookups)"""
+        kind = node[0]
+        if kind == 'and':
+            # Index lookups first, so text is only verified on what they leave
+            children = sorted(node[1], key=_cost)
+            result = within
+            for child in children:
+                found = self._evaluate(child, context, result)
+                result = found if result is None else _intersect(result, found)
+                if not result:
+                    break
+            return result
+        if kind == 'or':
+            result = set()
+            for child in node[1]:
+                result |= self._evaluate(child, context, within)
+            return result
+        if kind == 'not':
+            universe = context.universe() if within is None else within
+            return universe - self._evaluate(node[1], context, within)
+        return self._compare(node, context, within)
+
+    def _compare(self, node, context, within):
+        _, field, op, value = node
+        store = context.store
+        if field == 'type':
+            found = set(store.of_type(value))
+        elif field == 'color':
+            found = set(context.attributes.with_color(value))
+        elif field == 'degree':
+            return context.attributes.with_degree(_DEGREE_TESTS[op](value))
+        elif op == '~':
+            found = self._contains(field, value, context, within)
+        else:
+            found = self._equals(field, value, context, within)
+        if op == '!=':
+            universe = context.universe() if within is None else within
+            return universe - found
+        return found
+
+    @staticmethod
+    def _contains(field, words, context, within):
+        """Cards whose field has a word starting with each of words"""
+        store, search = context.store, context.search
+        types = TEXT_FIELDS.get(field, CARD_TYPES)
+        if field == ANY_TEXT or all(field in SEARCH_FIELDS.get(card_type, ()) for card_type in types):
+            candidates = None
+            for word in sorted(words, key=len, reverse=True):
+                documents = search.documents_with(word, prefix=True)
+                candidates = documents if candidates is None else candidates & documents
+                if not candidates:
+                    return set()
+            candidates = {document for document in candidates if not isinstance(document, tuple)}
+            if within is not None:
+                candidates = _intersect(candidates, within)
+            if field == ANY_TEXT:
+                return candidates
+        else:
+            # Not in the search index (SSN): only the cards of the right type are read
+            candidates = _cards_of(store, types, within)
+        found = set()
+        for card_id in candidates:
+            card = store.get(card_id)
+            if card is None or card.card_type not in types:
+                continue
+            card_words = tokenize(getattr(card, field))
+            if all(any(card_word.startswith(word) for card_word in card_words) for word in words):
+                found.add(card_id)
+        return found
+
+    @staticmethod
+    def _equals(field, value, context, within):
+        """Cards whose field equals value, ignoring case and surrounding spaces"""
+        store, search = context.store, context.search
+        types = TEXT_FIELDS[field]
+        words = tokenize(value)
+        if words and all(field in SEARCH_FIELDS.get(card_type, ()) for card_type in types):
+            candidates = None
+            for word in words:
+                documents = search.documents_with(word)
+                candidates = documents if candidates is None else candidates & documents
+            if within is not None:
+                candidates = _intersect(candidates, within)
+        else:
+            candidates = _cards_of(store, types, within)
+        found = set()
+        for card_id in candidates:
+            card = store.get(card_id)
+            if card is not None and card.card_type in types and getattr(card, field).strip().casefold() == value:
+                found.add(card_id)
+        return found
+
+
+class _Context:
+    __slots__ = ('store', 'attributes', 'search', '_universe')
+
+    def __init__(self, store, attributes, search):
+        self.store = store
+        self.attributes = attributes
+        self.search = search
+        self._universe = None
+
+    def universe(self):
+        if self._universe is None:
+            self._universe = set(self.store)
+        return self._universe
+
+
+def _cost(node):
+    """Rough evaluation order for AND: index lookups, then text, then anything nested"""
+    if node[0] == 'compare':
+        return 0 if node[1] in ('type', 'color', 'degree') else 1
+    return 2
+
+
+def _intersect(first, second):
+    return first & second if len(first) <= len(second) else second & first
+
+
+def _cards_of(store, card_types, within):
+    if within is not None:
+        return [card_id for card_id in within if store.type_of(card_id) in card_types]
+    return [card_id for card_type in card_types for card_id in store.of_type(card_type)]
+
+
+# Canvas filter
+
+class FilterMode:
+    """
+    Keeps only the cards matching a filter visible on the canvas
+    """
+    def __init__(self, app):
+        self.app = app
+        self.query = None
+        self.matching = set()
+        self._refresh_pending = False
+        # Subscribed after the canvas, so the canvas has drawn a change before the filter re-applies
+        app.store.subscribe(self.on_store_event,
+                            kinds=(CARD_ADDED, FIELD_CHANGED, EDGE_ADDED, EDGE_REMOVED, STORE_CLEARED))
+
+    @property
+    def active(self):
+        return self.query is not None
+
+    def apply(self, text):
+        """Show only the cards matching text; raises FilterError for an invalid filter"""
+        query = FilterQuery(text)
+        self.query = query
+        self.refresh()
+        return self.matching
+
+    def refresh(self):
+        """Evaluate the current filter again and update which cards are hidden"""
+        self._refresh_pending = False
+        if not self.active:
+            return
+        app = self.app
+        self.matching = self.query.matches(app.store, app.attributes, app.search)
+        app.canvas_helpers.set_filter(self.matching)
+        logger.info(f"Filter {self.query.text!r}: {len(self.matching)} of {len(app.store)} cards shown")
+
+    def clear(self):
+        """Show every card again"""
+        if not self.active:
+            return
+        self.query = None
+        self.matching = set()
+        self.app.canvas_helpers.set_filter(None)
+        logger.info("Filter cleared")
+
+    def on_store_event(self, event):
+        if not self.active:
+            return
+        events = event.new if event.kind == BATCH else (event,)
+        if any(inner.kind == STORE_CLEARED for inner in events):
+            # The canvas already dropped the filter along with everything else
+            self.query = None
+            self.matching = set()
+            return
+        # Edits can change which cards match; re-evaluate once the current burst of events is over
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.app.root.after_idle(self.refresh)
@@ -0,0 +1,132 @@
+# focus.py
+"""
+Ego-network focus mode.
+
+Focusing on a card realizes only its k-hop neighborhood on the canvas:
+every other card and connection is left undrawn, so a small neighborhood
+inside a huge board costs about as much as a small board. The neighborhood
+is found by a breadth-first search over the store's adjacency index, and
+changing k (or editing connections near the focus) updates the canvas by
+the difference between the old and new neighborhoods. Cards the user
+creates while focused (added or pasted) are shown along with the
+neighborhood; cards paged in from a project or brought back by undo and
+redo are shown only if they fall inside it.
+"""
+
+import logging
+
+from src.graph_store import BATCH, CARD_ADDED, CARD_REMOVED, EDGE_ADDED, EDGE_REMOVED, STORE_CLEARED
+
+logger = logging.getLogger(__name__)
+
+MAX_HOPS = 6
+
+
+def ego_network(store, center_id, hops, distances=None):
+    """Return {card_id: hop distance} for the cards within hops of center_id
+
+    Pass the result of a smaller search as distances to continue it from
+    its frontier instead of starting over.
+    """
+    if distances is None:
+        distances = {center_id: 0}
+    else:
+        distances = dict(distances)
+    reached = max(distances.values(), default=0)
+    frontier = [card_id for card_id, distance in distances.items() if distance == reached]
+    for distance in range(reached + 1, hops + 1):
+        next_frontier = []
+        for card_id in frontier:
+            for other_id in store.neighbors(card_id):
+                if other_id not in distances:
+                    distances[other_id] = distance
+                    next_frontier.append(other_id)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+    return distances
+
+
+class FocusMode:
+    """
+    Keeps the canvas limited to one card's k-hop neighborhood
+    """
+    def __init__(self, app):
+        self.app = app
+        self.center_id = None
+        self.hops = 1
+        self.distances = {}  # {card_id: hop distance} of the realized neighborhood
+        self.added = set()   # Cards created during this focus, shown wherever they are
+        # Subscribed after the canvas, so the canvas has applied a change before the neighborhood follows it
+        app.store.subscribe(self.on_store_event,
+                            kinds=(CARD_ADDED, CARD_REMOVED, EDGE_ADDED, EDGE_REMOVED, STORE_CLEARED))
+
+    @property
+    def active(self):
+        return self.center_id is not None
+
+    def focus(self, card_id, hops=None):
+        """Show only the neighborhood of card_id"""
+        if card_id not in self.app.store:
+            return
+        if hops is not None:
+            self.hops = max(0, min(MAX_HOPS, hops))
+        if card_id != self.center_id:
+            self.center_id = card_id
+            self.distances = {}
+            self.added = set()
+        self._update(ego_network(self.app.store, card_id, self.hops))
+
+    def set_hops(self, hops):
+        """Grow or shrink the neighborhood around the current focus"""
+        hops = max(0, min(MAX_HOPS, hops))
+        if hops == self.hops:
+            return
+        previous, self.hops = self.hops, hops
+        if not self.active:
+            return
+        if hops > previous:
+            # Continue the search from the current frontier
+            distances = ego_network(self.app.store, self.center_id, hops, self.distances)
+        else:
+            distances = {card_id: distance for card_id, distance in self.distances.items() if distance <= hops}
+        self._update(distances)
+
+    def clear(self):
+        """Leave focus mode and realize the whole board again"""
+        if not self.active:
+            return
+        self.center_id = None
+        self.distances = {}
+        self.added = set()
+        self.app.canvas_helpers.set_focus(None)
+        logger.info("Focus cleared")
+
+    def _update(self, distances):
+        self.distances = distances
+        self.app.canvas_helpers.set_focus(self.added.union(distances))
+        logger.info(f"Focused on card {self.center_id}: {len(distances)} cards within {self.hops} hops")
+
+    def on_store_event(self, event):
+        if not self.active:
+            return
+        events = event.new if event.kind == BATCH else (event,)
+        if any(inner.kind == STORE_CLEARED for inner in events):
+            # The canvas already dropped the focus along with everything else
+            self.center_id = None
+            self.distances = {}
+            self.added = set()
+            return
+        if self.center_id not in self.app.store:
+            self.clear()
+            return
+        # The canvas skipped new cards outside the focus; show the ones the user just made, or they cannot see them
+        created = set()
+        if not self.app.undo.replaying:
+            created = {inner.card_id for inner in events if inner.kind == CARD_ADDED and inner.card_id in self.app.store}
+        # A removed card leaves the set too, so undo does not find it still marked as shown
+        added = (self.added | created).intersection(self.app.store)
+        changed, self.added = added != self.added, added
+        if changed or any(inner.card_id in self.distances or inner.other_id in self.distances for inner in events):
+            # Only changes at a realized card can reshape the neighborhood
+            self._update(ego_network(self.app.store, self.center_id, self.hops))
@@ -0,0 +1,211 @@
+# geometry_index.py
+"""
+Struct-of-arrays geometry index for the cards on the board.
+
+Card positions and half-extents are mirrored into contiguous columns (x, y,
+half width, half height) indexed by a dense card slot, so whole-board
+passes - content bounds and zoom-scaled edge endpoints for the export and
+the canvas's connection redraw - run as a handful of vectorized NumPy
+operations instead of a Python loop over every card. Slots stay dense: removing a card moves the
+last card into its slot.
+
+The index follows the graph store's change events; cards keep their
+``x``/``y`` attributes, which remain the source of truth. Without NumPy the
+same interface falls back to plain Python lists and loops.
+"""
+
+import logging
+from itertools import chain
+
+from src.card_layout import LayoutEngine
+from src.graph_store import (BATCH, CARD_ADDED, CARD_MOVED, CARD_REMOVED, FIELD_CHANGED,
+                             STORE_CLEARED)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+X, Y, HALF_WIDTH, HALF_HEIGHT = range(4)
+COLUMNS = 4
+INITIAL_CAPACITY = 256
+
+
+class GeometryIndex:
+    """
+    Card positions and half-extents in contiguous columns, kept in sync with a GraphStore
+    """
+    def __init__(self, store, layout=None, use_numpy=NUMPY_AVAILABLE):
+        self.store = store
+        self.layout = layout if layout is not None else LayoutEngine()
+        self.use_numpy = use_numpy and NUMPY_AVAILABLE
+        self._slots = {}  # {card_id: slot}
+        self._ids = []    # [card_id] by slot
+        self._reset_columns()
+        self.rebuild()
+        store.subscribe(self.on_store_event)
+
+    def _reset_columns(self, capacity=INITIAL_CAPACITY):
+        if self.use_numpy:
+            # One row per column, so each column is contiguous
+            self._data = np.zeros((COLUMNS, capacity))
+            self._slot_by_id = np.full(capacity, -1, dtype=np.intp)  # Vectorized {card_id: slot}, -1 if absent
+        else:
+            self._data = [[] for _ in range(COLUMNS)]
+
+    def rebuild(self):
+        """Re-read every card from the store"""
+        self._slots.clear()
+        self._ids.clear()
+        self._reset_columns(max(INITIAL_CAPACITY, len(self.store)))
+        for card_id, card in self.store.items():
+            self._put(card_id, card)
+        logger.debug(f"Geometry index rebuilt with {len(self._ids)} cards")
+
+    # Store events
+
+    def on_store_event(self, event):
+        if event.kind == BATCH:
+            events = event.new
+        else:
+            events = (event,)
+        if any(change.kind == STORE_CLEARED for change in events):
+            self.rebuild()
+            return
+        # Re-read each touched card once, from its final state
+        touched = dict.fromkeys(change.card_id for change in events
+                                if change.kind in (CARD_ADDED, CARD_REMOVED, CARD_MOVED, FIELD_CHANGED))
+        for card_id in touched:
+            card = self.store.get(card_id)
+            if card is None:
+                self._discard(card_id)
+            else:
+                self._put(card_id, card)
+
+    # Slot management
+
+    def _put(self, card_id, card):
+        geometry = self.layout.get(card_id, card)
+        slot = self._slots.get(card_id)
+        if slot is None:
+            slot = len(self._ids)
+            self._slots[card_id] = slot
+            self._ids.append(card_id)
+            if self.use_numpy:
+                if slot == self._data.shape[1]:
+                    self._grow()
+                if card_id >= len(self._slot_by_id):
+                    self._grow_ids(card_id)
+                self._slot_by_id[card_id] = slot
+            else:
+                for column in self._data:
+                    column.append(0.0)
+        row = (float(card.x), float(card.y), geometry.half_width, geometry.half_height)
+        if self.use_numpy:
+            self._data[:, slot] = row
+        else:
+            for column, value in zip(self._data, row):
+                column[slot] = value
+
+    def _grow(self):
+        data = np.zeros((COLUMNS, self._data.shape[1] * 2))
+        data[:, :self._data.shape[1]] = self._data
+        self._data = data
+
+    def _grow_ids(self, card_id):
+        slot_by_id = np.full(max(card_id + 1, len(self._slot_by_id) * 2), -1, dtype=np.intp)
+        slot_by_id[:len(self._slot_by_id)] = self._slot_by_id
+        self._slot_by_id = slot_by_id
+
+    def _discard(self, card_id):
+        slot = self._slots.pop(card_id, None)
+        if slot is None:
+            return
+        last = len(self._ids) - 1
+        moved_id = self._ids.pop()
+        if slot != last:
+            # Keep slots dense by moving the last card into the hole
+            self._ids[slot] = moved_id
+            self._slots[moved_id] = slot
+            if self.use_numpy:
+                self._data[:, slot] = self._data[:, last]
+                self._slot_by_id[moved_id] = slot
+        if self.use_numpy:
+            self._slot_by_id[card_id] = -1
+        else:
+            for column in self._data:
+                if slot != last:
+                    column[slot] = column[last]
+                column.pop()
+
+    # Lookups
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, card_id):
+        return card_id in self._slots
+
+    def slot_of(self, card_id):
+        return self._slots[card_id]
+
+    def ids(self):
+        """Card ids in slot order, matching the rows of the column views"""
+        return list(self._ids)
+
+    def columns(self):
+        """Read-only (x, y, half width, half height) views of the live slots"""
+        count = len(self._ids)
+        if self.use_numpy:
+            view = self._data[:, :count]
+            view.flags.writeable = False
+            return view
+        return tuple(tuple(column) for column in self._data)
+
+    def view(self, card_id):
+        """Read-only (x, y, half width, half height) of one card; a view into the columns with NumPy"""
+        slot = self._slots[card_id]
+        if self.use_numpy:
+            view = self._data[:, slot]
+            view.flags.writeable = False
+            return view
+        return tuple(column[slot] for column in self._data)
+
+    def bounds(self, card_id):
+        x, y, half_width, half_height = self.view(card_id)
+        return (x - half_width, y - half_height, x + half_width, y + half_height)
+
+    # Whole-board passes
+
+    def content_bounds(self):
+        """World-space box around every card as (left, top, right, bottom), or None if empty"""
+        if not self._ids:
+            return None
+        if self.use_numpy:
+            x, y, half_width, half_height = self.columns()
+            return (float((x - half_width).min()), float((y - half_height).min()),
+                    float((x + half_width).max()), float((y + half_height).max()))
+        x, y, half_width, half_height = self._data
+        return (min(map(float.__sub__, x, half_width)), min(map(float.__sub__, y, half_height)),
+                max(map(float.__add__, x, half_width)), max(map(float.__add__, y, half_height)))
+
+    def edge_endpoints(self, edges, zoom=1.0):
+        """Scaled (x1, y1, x2, y2) rows for (id1, id2) edges; both cards must be indexed"""
+        slots = self._slots
+        if self.use_numpy:
+            edges = edges if isinstance(edges, list) else list(edges)
+            ids = np.fromiter(chain.from_iterable(edges), dtype=np.intp, count=2 * len(edges))
+            pairs = self._slot_by_id[ids].reshape(-1, 2)
+            x, y = self._data[X], self._data[Y]
+            first, second = pairs[:, 0], pairs[:, 1]
+            return np.column_stack((x[first], y[first], x[second], y[second])) * zoom
+        x, y = self._data[X], self._data[Y]
+        rows = []
+        for id1, id2 in edges:
+            first, second = slots[id1], slots[id2]
+            rows.append((x[first] * zoom, y[first] * zoom, x[second] * zoom, y[second] * zoom))
+        return rows
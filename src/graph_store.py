@@ -0,0 +1,426 @@
+# graph_store.py
+"""
+Graph store owning every card in the network.
+
+All cards live in one id -> card map, so resolving an id of unknown type is
+a single dict probe. Read-only per-type views (``people``, ``textboxes``,
+``legends``) are kept in sync for code that only cares about one card type.
+The store also allocates card ids.
+
+Connections are undirected and stored once, in an edge table keyed by the
+ordered id pair with interned labels, plus an adjacency index by endpoint.
+
+Every mutation goes through the store and is announced to subscribers as a
+typed ``StoreEvent``, so views (the canvas, change tracking) update only what
+changed instead of redrawing everything. Inside ``with store.batch():`` the
+events are held back and delivered as one ``BATCH`` event when the block
+ends; if it raises, every mutation made in the block is reverted.
+"""
+
+import sys
+import logging
+from contextlib import contextmanager, nullcontext
+from collections.abc import MutableMapping
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+CARD_TYPES = ('person', 'textbox', 'legend')
+
+# Store event kinds
+CARD_ADDED = 'card_added'          # new=card
+CARD_REMOVED = 'card_removed'      # old=card (its edges are removed first)
+FIELD_CHANGED = 'field_changed'    # old/new={field: value} for the changed fields
+CARD_MOVED = 'card_moved'          # old/new=(x, y)
+EDGE_ADDED = 'edge_added'          # card_id/other_id=edge key, new=label
+EDGE_REMOVED = 'edge_removed'      # card_id/other_id=edge key, old=label
+EDGE_RELABELED = 'edge_relabeled'  # card_id/other_id=edge key, old/new=label
+STORE_CLEARED = 'store_cleared'    # old=(cards, edges, next_id) as they were before clearing
+BATCH = 'batch'                    # new=[events] of a committed batch, in order
+
+
+def edge_key(id1, id2):
+    """Key of the undirected edge between two cards"""
+    return (id1, id2) if id1 < id2 else (id2, id1)
+
+
+class StoreEvent:
+    """
+    A single change to the store, passed to subscribers
+    """
+    __slots__ = ('kind', 'card_id', 'other_id', 'old', 'new')
+
+    def __init__(self, kind, card_id=None, other_id=None, old=None, new=None):
+        self.kind = kind
+        self.card_id = card_id
+        self.other_id = other_id
+        self.old = old
+        self.new = new
+
+    @property
+    def edge(self):
+        """The (low_id, high_id) key of an edge event"""
+        return (self.card_id, self.other_id)
+
+    def __repr__(self):
+        return f"StoreEvent({self.kind}, card_id={self.card_id}, other_id={self.other_id}, old={self.old!r}, new={self.new!r})"
+
+
+class ConnectionsView(MutableMapping):
+    """
+    Live {other_id: label} view of one card's edges in the store
+    """
+    __slots__ = ('_store', '_card_id')
+
+    def __init__(self, store, card_id):
+        self._store = store
+        self._card_id = card_id
+
+    def __getitem__(self, other_id):
+        label = self._store._edges.get(edge_key(self._card_id, other_id))
+        if label is None:
+            raise KeyError(other_id)
+        return label
+
+    def __setitem__(self, other_id, label):
+        self._store.connect(self._card_id, other_id, label)
+
+    def __delitem__(self, other_id):
+        if not self._store.disconnect(self._card_id, other_id):
+            raise KeyError(other_id)
+
+    def __iter__(self):
+        return iter(self._store._adjacency.get(self._card_id, ()))
+
+    def __len__(self):
+        return self._store.degree(self._card_id)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class GraphStore:
+    """
+    Single source of truth for cards and their ids
+    """
+    def __init__(self):
+        self._cards = {}  # {card_id: card}
+        self._by_type = {card_type: {} for card_type in CARD_TYPES}
+        self.people = MappingProxyType(self._by_type['person'])      # {id: Person}
+        self.textboxes = MappingProxyType(self._by_type['textbox'])  # {id: TextboxCard}
+        self.legends = MappingProxyType(self._by_type['legend'])     # {id: LegendCard}
+        self._edges = {}      # {(low_id, high_id): label}
+        self._adjacency = {}  # {card_id: {neighbour ids}}
+        self._subscribers = []  # [(callback, kinds or None)]
+        self._pending = None  # Events held back while a batch is open
+        self.next_id = 1
+
+    # Change events
+
+    def subscribe(self, callback, kinds=None):
+        """Call callback(event) after every change, or only for the given event kinds"""
+        self._subscribers.append((callback, frozenset(kinds) if kinds else None))
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers = [(cb, kinds) for cb, kinds in self._subscribers if cb != callback]
+
+    def _emit(self, kind, card_id=None, other_id=None, old=None, new=None):
+        if self._pending is None and not self._subscribers:
+            return
+        event = StoreEvent(kind, card_id, other_id, old, new)
+        if self._pending is not None:
+            self._pending.append(event)
+        else:
+            self._dispatch(event)
+
+    def _dispatch(self, event):
+        for callback, kinds in list(self._subscribers):
+            delivered = event
+            if kinds is not None and event.kind not in kinds:
+                if event.kind != BATCH:
+                    continue
+                # Filtered subscribers only see the parts of a batch they asked for
+                events = [inner for inner in event.new if inner.kind in kinds]
+                if not events:
+                    continue
+                delivered = StoreEvent(BATCH, new=events)
+            try:
+                callback(delivered)
+            except Exception as e:
+                # A failing view must not leave the model half-updated
+                logger.error(f"Store subscriber failed on {event.kind}: {e}", exc_info=True)
+
+    @property
+    def in_batch(self):
+        return self._pending is not None
+
+    @contextmanager
+    def batch(self):
+        """Group mutations into one BATCH event; an exception reverts them all"""
+        outermost = self._pending is None
+        if outermost:
+            self._pending = []
+            next_id = self.next_id
+        start = len(self._pending)
+        try:
+            yield self
+        except BaseException:
+            logger.warning(f"Rolling back {len(self._pending) - start} store changes")
+            self.revert(self._pending[start:])
+            del self._pending[start:]
+            if outermost:
+                self._pending = None
+                self.next_id = next_id
+            raise
+        if outermost:
+            events, self._pending = self._pending, None
+            if events:
+                self._dispatch(StoreEvent(BATCH, new=events))
+
+    def revert(self, events):
+        """Apply the inverse of each event, newest first"""
+        for event in reversed(events):
+            kind = event.kind
+            if kind == CARD_ADDED:
+                self.remove(event.card_id)
+            elif kind == CARD_REMOVED:
+                self.add(event.old, event.card_id)
+            elif kind == FIELD_CHANGED:
+                self.update(event.card_id, **event.old)
+            elif kind == CARD_MOVED:
+                self.move(event.card_id, *event.old)
+            elif kind == EDGE_ADDED:
+                self.disconnect(event.card_id, event.other_id)
+            elif kind in (EDGE_REMOVED, EDGE_RELABELED):
+                self.connect(event.card_id, event.other_id, event.old)
+            elif kind == STORE_CLEARED:
+                cards, edges, next_id = event.old
+                for card_id, card in cards.items():
+                    self.add(card, card_id)
+                for (id1, id2), label in edges.items():
+                    self.connect(id1, id2, label)
+                self.next_id = max(self.next_id, next_id)
+            elif kind == BATCH:
+                self.revert(event.new)
+
+    def replay(self, events):
+        """Apply events again, oldest first (the inverse of revert)"""
+        for event in events:
+            kind = event.kind
+            if kind == CARD_ADDED:
+                self.add(event.new, event.card_id)
+            elif kind == CARD_REMOVED:
+                self.remove(event.card_id)
+            elif kind == FIELD_CHANGED:
+                self.update(event.card_id, **event.new)
+            elif kind == CARD_MOVED:
+                self.move(event.card_id, *event.new)
+            elif kind in (EDGE_ADDED, EDGE_RELABELED):
+                self.connect(event.card_id, event.other_id, event.new)
+            elif kind == EDGE_REMOVED:
+                self.disconnect(event.card_id, event.other_id)
+            elif kind == STORE_CLEARED:
+                self.clear()
+            elif kind == BATCH:
+                self.replay(event.new)
+
+    # Cards
+
+    def __len__(self):
+        return len(self._cards)
+
+    def __contains__(self, card_id):
+        return card_id in self._cards
+
+    def __iter__(self):
+        return iter(self._cards)
+
+    def __getitem__(self, card_id):
+        return self._cards[card_id]
+
+    def get(self, card_id, default=None):
+        """Return the card with this id regardless of its type"""
+        return self._cards.get(card_id, default)
+
+    def type_of(self, card_id):
+        """Return the card type of an id, or None if no such card exists"""
+        card = self._cards.get(card_id)
+        return card.card_type if card is not None else None
+
+    def of_type(self, card_type):
+        """Read-only {id: card} view of one card type"""
+        return MappingProxyType(self._by_type[card_type])
+
+    def items(self, card_type=None):
+        """Iterate (card_id, card) pairs, optionally for one card type only"""
+        if card_type is None:
+            return iter(self._cards.items())
+        return iter(self._by_type[card_type].items())
+
+    def count(self, card_type=None):
+        return len(self._cards) if card_type is None else len(self._by_type[card_type])
+
+    def allocate_id(self):
+        """Reserve and return a fresh card id"""
+        card_id = self.next_id
+        self.next_id += 1
+        return card_id
+
+    def add(self, card, card_id=None):
+        """Add a card, allocating an id unless one is given (e.g. when loading); returns the id"""
+        if card_id is None:
+            card_id = self.allocate_id()
+        elif card_id in self._cards:
+            raise ValueError(f"Card id {card_id} is already in use")
+        else:
+            self.next_id = max(self.next_id, card_id + 1)
+        pending = [(other_id, label) for other_id, label in card.iter_connections()
+                   if other_id in self._cards and other_id != card_id]
+        card._connections = None
+        card.card_id = card_id
+        card._store = self
+        # A card arriving with edges is announced as one batch
+        with self.batch() if pending else nullcontext():
+            self._cards[card_id] = card
+            self._by_type[card.card_type][card_id] = card
+            self._emit(CARD_ADDED, card_id, new=card)
+            # Connections a detached card carried along become edges where the other card exists
+            for other_id, label in pending:
+                self.connect(card_id, other_id, label)
+        return card_id
+
+    def remove(self, card_id):
+        """Remove a card together with all of its edges; returns the card"""
+        card = self._cards[card_id]
+        neighbors = list(self._adjacency.get(card_id, ()))
+        # A card leaving with its edges is announced as one batch
+        with self.batch() if neighbors else nullcontext():
+            for other_id in neighbors:
+                self.disconnect(card_id, other_id)
+            del self._cards[card_id]
+            del self._by_type[card.card_type][card_id]
+            card._store = None
+            card.card_id = None
+            self._emit(CARD_REMOVED, card_id, old=card)
+        return card
+
+    def remove_many(self, card_ids):
+        """Remove several cards with all their edges as one batch; returns the removed cards"""
+        removed = []
+        with self.batch():
+            for card_id in dict.fromkeys(card_ids):
+                if card_id in self._cards:
+                    removed.append(self.remove(card_id))
+        return removed
+
+    def update(self, card_id, **fields):
+        """Set card fields, announcing the ones that actually changed; returns them as {field: new}"""
+        card = self._cards[card_id]
+        old, new = {}, {}
+        for field, value in fields.items():
+            previous = getattr(card, field)
+            if previous != value:
+                setattr(card, field, value)
+                old[field] = previous
+                new[field] = value
+        if new:
+            self._emit(FIELD_CHANGED, card_id, old=old, new=new)
+        return new
+
+    def move(self, card_id, x, y):
+        """Move a card to a new logical (unscaled) position"""
+        card = self._cards[card_id]
+        old = (card.x, card.y)
+        if old == (x, y):
+            return
+        card.x = x
+        card.y = y
+        self._emit(CARD_MOVED, card_id, old=old, new=(x, y))
+
+    def clear(self):
+        cards, edges, next_id = self._cards, self._edges, self.next_id
+        for card in cards.values():
+            card._store = None
+            card.card_id = None
+        self._cards = {}
+        for by_type in self._by_type.values():
+            by_type.clear()
+        self._edges = {}
+        self._adjacency.clear()
+        self.next_id = 1
+        # The old tables are handed over as they are, so clearing can still be reverted
+        self._emit(STORE_CLEARED, old=(cards, edges, next_id))
+
+    # Edges
+
+    def connect(self, id1, id2, label=""):
+        """Add an edge, or relabel it if it already exists"""
+        if id1 == id2:
+            raise ValueError("A card cannot be connected to itself")
+        if id1 not in self._cards or id2 not in self._cards:
+            raise KeyError(f"Cannot connect missing card: {id1} or {id2}")
+        key = edge_key(id1, id2)
+        label = sys.intern(label) if label else ""
+        previous = self._edges.get(key)
+        if previous == label:
+            return
+        self._edges[key] = label
+        if previous is not None:
+            self._emit(EDGE_RELABELED, *key, old=previous, new=label)
+            return
+        self._adjacency.setdefault(id1, set()).add(id2)
+        self._adjacency.setdefault(id2, set()).add(id1)
+        self._emit(EDGE_ADDED, *key, new=label)
+
+    def disconnect(self, id1, id2):
+        """Remove an edge; returns False if there was none"""
+        key = edge_key(id1, id2)
+        label = self._edges.pop(key, None)
+        if label is None:
+            return False
+        self._discard_neighbor(id1, id2)
+        self._discard_neighbor(id2, id1)
+        self._emit(EDGE_REMOVED, *key, old=label)
+        return True
+
+    def _discard_neighbor(self, card_id, other_id):
+        neighbors = self._adjacency.get(card_id)
+        if neighbors is not None:
+            neighbors.discard(other_id)
+            if not neighbors:
+                del self._adjacency[card_id]
+
+    def has_edge(self, id1, id2):
+        return edge_key(id1, id2) in self._edges
+
+    def edge_label(self, id1, id2, default=""):
+        return self._edges.get(edge_key(id1, id2), default)
+
+    def edges(self):
+        """Iterate ((low_id, high_id), label) once per edge"""
+        return iter(self._edges.items())
+
+    def edge_count(self):
+        return len(self._edges)
+
+    def neighbors(self, card_id):
+        """Iterate the ids of the cards connected to a card"""
+        return iter(self._adjacency.get(card_id, ()))
+
+    def iter_neighbors(self, card_id):
+        """Iterate (other_id, label) pairs for a card's edges"""
+        edges = self._edges
+        return ((other_id, edges[edge_key(card_id, other_id)]) for other_id in self._adjacency.get(card_id, ()))
+
+    def edges_touching(self, card_ids):
+        """Keys of every edge with at least one endpoint among card_ids"""
+        adjacency = self._adjacency
+        return {edge_key(card_id, other_id) for card_id in card_ids for other_id in adjacency.get(card_id, ())}
+
+    def degree(self, card_id):
+        return len(self._adjacency.get(card_id, ()))
+
+    def connections_of(self, card_id):
+        """Live mapping view of a card's connections"""
+        return ConnectionsView(self, card_id)
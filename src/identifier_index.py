@@ -0,0 +1,186 @@
+# identifier_index.py
+"""
+Index of the identifiers people share.
+
+Phone numbers, emails, SSNs and addresses are free text, typed in whatever
+format the source used. This index keeps a hash map from each identifier's
+normalized form (digits-only phone and SSN, lower-cased email, address with
+punctuation dropped and street words abbreviated) to the people who have it,
+so everyone sharing a phone or an address is found by a hash lookup per
+person instead of comparing every pair. Like the other indexes it is built
+on first use and then follows the graph store's change events.
+"""
+
+import logging
+import re
+
+from src.graph_store import BATCH, CARD_ADDED, CARD_REMOVED, FIELD_CHANGED, STORE_CLEARED
+from src.dedup import normalize_email, normalize_phone
+
+logger = logging.getLogger(__name__)
+
+IDENTIFIER_FIELDS = ('phone', 'email', 'ssn', 'address')
+MAX_SUGGESTED_GROUP = 20  # Bigger groups are placeholders ("N/A", a shelter's address), not leads
+
+ADDRESS_WORDS = {
+    'street': 'st', 'avenue': 'ave', 'av': 'ave', 'road': 'rd', 'boulevard': 'blvd', 'drive': 'dr',
+    'lane': 'ln', 'court': 'ct', 'place': 'pl', 'terrace': 'ter', 'highway': 'hwy', 'parkway': 'pkwy',
+    'circle': 'cir', 'square': 'sq', 'trail': 'trl', 'way': 'wy', 'apartment': 'apt', 'suite': 'ste',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+}
+
+_ADDRESS_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize_ssn(ssn):
+    """The nine digits of an SSN; '' for anything else"""
+    digits = "".join(ch for ch in ssn if ch.isdigit()) if ssn else ""
+    return digits if len(digits) == 9 else ""
+
+
+def normalize_address(address):
+    """Lower-cased address words with punctuation dropped and street words abbreviated
+
+    '12 Main Street, Apt. 4' and '12 main st #4' both become '12 main st apt 4'.
+    """
+    if not address:
+        return ""
+    words = _ADDRESS_WORD.findall(address.casefold().replace('#', ' apt '))
+    words = [ADDRESS_WORDS.get(word, word) for word in words]
+    # "apt apt 4" from "Apt. #4"
+    words = [word for i, word in enumerate(words) if not (word == 'apt' and i and words[i - 1] == 'apt')]
+    return " ".join(words)
+
+
+NORMALIZERS = {
+    'phone': normalize_phone,
+    'email': normalize_email,
+    'ssn': normalize_ssn,
+    'address': normalize_address,
+}
+
+
+def identifier_keys(person):
+    """The (field, normalized value) pairs a person can share with others"""
+    keys = []
+    for field in IDENTIFIER_FIELDS:
+        value = NORMALIZERS[field](getattr(person, field))
+        if value:
+            keys.append((field, value))
+    return keys
+
+
+class IdentifierIndex:
+    """
+    People by normalized phone, email, SSN and address, kept in sync with a GraphStore
+    """
+    def __init__(self, store):
+        self.store = store
+        self._people = {}  # {(field, value): {card_id}}
+        self._keys = {}    # {card_id: ((field, value), ...)}
+        self._shared = set()  # Keys held by two or more people
+        self.built = False
+        store.subscribe(self.on_store_event, kinds=(CARD_ADDED, CARD_REMOVED, FIELD_CHANGED, STORE_CLEARED))
+
+    def build(self):
+        """Index every person's identifiers"""
+        self._people.clear()
+        self._keys.clear()
+        self._shared.clear()
+        for card_id, person in self.store.items('person'):
+            self._put(card_id, person)
+        self.built = True
+        logger.info(f"Identifier index built: {len(self._people)} identifiers, {len(self._shared)} shared")
+
+    def ensure_built(self):
+        if not self.built:
+            self.build()
+
+    # Store events
+
+    def on_store_event(self, event):
+        if not self.built:
+            return  # Built from scratch on first use
+        events = event.new if event.kind == BATCH else (event,)
+        if any(inner.kind == STORE_CLEARED for inner in events):
+            self.built = False
+            self._people.clear()
+            self._keys.clear()
+            self._shared.clear()
+            return
+        touched = {}
+        for inner in events:
+            if inner.kind == FIELD_CHANGED and not any(field in inner.new for field in IDENTIFIER_FIELDS):
+                continue
+            touched[inner.card_id] = None
+        # Re-index each touched person once, from their final state
+        for card_id in touched:
+            self._discard(card_id)
+            person = self.store.people.get(card_id)
+            if person is not None:
+                self._put(card_id, person)
+
+    def _put(self, card_id, person):
+        keys = tuple(identifier_keys(person))
+        if not keys:
+            return
+        self._keys[card_id] = keys
+        for key in keys:
+            people = self._people.setdefault(key, set())
+            people.add(card_id)
+            if len(people) == 2:
+                self._shared.add(key)
+
+    def _discard(self, card_id):
+        for key in self._keys.pop(card_id, ()):
+            people = self._people[key]
+            people.discard(card_id)
+            if len(people) < 2:
+                self._shared.discard(key)
+                if not people:
+                    del self._people[key]
+
+    # Lookups
+
+    def people_with(self, field, value):
+        """Ids of the people whose field normalizes to the same value as value"""
+        self.ensure_built()
+        return set(self._people.get((field, NORMALIZERS[field](value)), ()))
+
+    def shared_groups(self):
+        """{(field, normalized value): {card_id}} for every identifier two or more people share"""
+        self.ensure_built()
+        return {key: set(self._people[key]) for key in self._shared}
+
+    def suggestions(self, max_group=MAX_SUGGESTED_GROUP):
+        """[(field, normalized value, [card ids])] for shared identifiers whose people are not all connected
+
+        Largest groups first. Groups with more than max_group people are left out.
+        """
+        self.ensure_built()
+        store = self.store
+        found = []
+        for key in self._shared:
+            people = sorted(self._people[key])
+            if len(people) > max_group:
+                continue
+            if any(not store.has_edge(first, second)
+                   for i, first in enumerate(people) for second in people[i + 1:]):
+                found.append((*key, people))
+        found.sort(key=lambda suggestion: (-len(suggestion[2]), IDENTIFIER_FIELDS.index(suggestion[0]), suggestion[1]))
+        return found
+
+
+def connect_shared(store, field, card_ids):
+    """Connect every pair of the given people not yet connected, as one batch; returns how many were added"""
+    label = f"Same {'SSN' if field == 'ssn' else field}"
+    card_ids = [card_id for card_id in card_ids if card_id in store]
+    added = 0
+    with store.batch():
+        for i, first in enumerate(card_ids):
+            for second in card_ids[i + 1:]:
+                if not store.has_edge(first, second):
+                    store.connect(first, second, label)
+                    added += 1
+    return added
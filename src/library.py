@@ -0,0 +1,301 @@
+# library.py
+"""
+Search across a folder of saved projects.
+
+A ``ProjectLibrary`` keeps a local SQLite database with a full-text (FTS5)
+index of every card and labelled connection in each project it has
+scanned. Scanning reads only ``data.csv`` from each archive, or the card
+and connection tables of a project database; attachments are never
+extracted. A project is re-read only when its file's
+modification time or size changed, and projects whose files are gone are
+dropped, so rescanning a folder of unchanged projects costs one ``stat``
+per file. Searches are answered by the FTS index alone, without opening
+any archive.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src.project_db import PROJECT_DB_EXTENSION, ProjectDatabase, is_project_db
+from src.project_io import CARD, open_project_csv, read_project_csv
+from src.search_index import SEARCH_FIELDS, tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIBRARY_PATH = os.path.expanduser("~/.comrade_library.sqlite3")
+PROJECT_EXTENSIONS = ('.zip', PROJECT_DB_EXTENSION)
+READ_WORKERS = 4  # Archives read at once; inflating data.csv releases the GIL
+SNIPPET_WORDS = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    cards INTEGER NOT NULL DEFAULT 0,
+    connections INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    card_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    heading TEXT NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_project ON entries(project_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_text USING fts5(
+    title, body, content='entries', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def card_entry(card):
+    """(title, body) a card is indexed under: its name or title, then its other searchable text"""
+    fields = SEARCH_FIELDS.get(card.card_type, ())
+    if not fields:
+        return None
+    title = getattr(card, fields[0]) or ""
+    body = [getattr(card, field) for field in fields[1:]]
+    if card.card_type == 'person':
+        # Phone numbers are also found without their separators
+        body.append("".join(ch for ch in card.phone if ch.isdigit()))
+    elif card.card_type == 'legend':
+        body.extend(card.color_entries.values())
+    return title, " ".join(part for part in body if part)
+
+
+def read_project_entries(path):
+    """Return ([(card_id, kind, heading, title, body)], card count, connection count) for a project file
+
+    heading is what a match is listed as; a connection is listed by its
+    cards' names but only found by its label. Only data.csv is read,
+    straight out of an archive; a project database is read without its
+    attachment blobs.
+    """
+    if is_project_db(path):
+        with ProjectDatabase(path) as project:
+            return _entries(project.rows())
+    with zipfile.ZipFile(path) as zipf, open_project_csv(zipf) as f:
+        return _entries(read_project_csv(f))
+
+
+def _entries(rows):
+    """read_project_entries for the rows of a project, as read_project_csv yields them"""
+    entries, titles = [], {}
+    cards = connections = 0
+    for row in rows:
+        if row[0] == CARD:
+            _, card_id, card, _ = row
+            cards += 1
+            entry = card_entry(card)
+            if entry is not None:
+                titles[card_id] = entry[0]
+                entries.append((card_id, card.card_type, entry[0], *entry))
+        else:
+            _, id1, id2, label = row
+            connections += 1
+            if label:
+                heading = f"{titles.get(id1, id1)} — {titles.get(id2, id2)}"
+                entries.append((id1, 'connection', heading, label, ""))
+    return entries, cards, connections
+
+
+def find_projects(directory):
+    """Absolute paths of the project files under directory, in sorted order"""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(PROJECT_EXTENSIONS):
+                found.append(os.path.abspath(os.path.join(root, name)))
+    return found
+
+
+def match_expression(query):
+    """FTS5 query matching cards with every word of query, the last one as a prefix"""
+    terms = tokenize(query)
+    if not terms:
+        return None
+    # Quoted, so words like AND or NEAR are not read as operators
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+class ProjectLibrary:
+    """
+    Full-text index of the cards in a folder of project archives, stored in SQLite
+
+    A connection belongs to the thread that made it; scan in the background
+    with a library object of its own.
+    """
+    def __init__(self, path=DEFAULT_LIBRARY_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30)
+        # Readers keep searching while a scan writes; the index can always be rebuilt, so skip the per-commit sync
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Settings
+
+    def get_setting(self, key, default=None):
+        row = self.db.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_setting(self, key, value):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+
+    # Scanning
+
+    def scan(self, directory, progress=None, cancel=None):
+        """Bring the index up to date with the projects under directory; returns counts of what changed
+
+        Only new projects and those whose modification time or size changed
+        are read. progress, if given, is called with (projects done, total);
+        cancel is a threading.Event that stops the scan between projects.
+        """
+        paths = find_projects(directory)
+        prefix = os.path.join(os.path.abspath(directory), "")
+        known = {path: (project_id, mtime_ns, size) for project_id, path, mtime_ns, size
+                 in self.db.execute("SELECT id, path, mtime_ns, size FROM projects")
+                 if path.startswith(prefix)}
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}
+
+        stale = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            previous = known.get(path)
+            if previous and previous[1:] == (stat.st_mtime_ns, stat.st_size):
+                counts['unchanged'] += 1
+            else:
+                stale.append((path, stat))
+
+        on_disk = set(paths)
+        gone = [project_id for path, (project_id, _, _) in known.items() if path not in on_disk]
+        if gone:
+            with self.db:
+                for project_id in gone:
+                    self._forget(project_id)
+            counts['removed'] = len(gone)
+
+        total = len(stale)
+        if progress:
+            progress(0, total)
+        cancel = cancel or threading.Event()
+        with ThreadPoolExecutor(READ_WORKERS) as pool:
+            # Archives are read on the pool, a few ahead of the writes; only this thread writes
+            pending = deque()
+            queued = iter(stale)
+            for done in range(1, total + 1):
+                while len(pending) < READ_WORKERS * 2:
+                    item = next(queued, None)
+                    if item is None:
+                        break
+                    pending.append((item, pool.submit(self._read, item[0])))
+                (path, stat), future = pending.popleft()
+                if cancel.is_set():
+                    for _, queued_future in pending:
+                        queued_future.cancel()
+                    break
+                entries, cards, connections, error = future.result()
+                self._store(path, stat, entries, cards, connections, error)
+                if error:
+                    counts['failed'] += 1
+                else:
+                    counts['updated' if path in known else 'added'] += 1
+                if progress:
+                    progress(done, total)
+        logger.info(f"Library scan of {directory}: {counts}")
+        return counts
+
+    @staticmethod
+    def _read(path):
+        try:
+            return (*read_project_entries(path), None)
+        except Exception as e:
+            # Recorded with the file's size and time, so it is not re-read until it changes
+            logger.warning(f"Could not index {path}: {e}")
+            return [], 0, 0, str(e) or type(e).__name__
+
+    def _store(self, path, stat, entries, cards, connections, error):
+        with self.db:
+            previous = self.db.execute("SELECT id FROM projects WHERE path = ?", (path,)).fetchone()
+            if previous:
+                self._forget(previous[0])
+            project_id = self.db.execute(
+                "INSERT INTO projects (path, mtime_ns, size, cards, connections, error) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, stat.st_mtime_ns, stat.st_size, cards, connections, error)).lastrowid
+            self.db.executemany(
+                "INSERT INTO entries (project_id, card_id, kind, heading, title, body) VALUES (?, ?, ?, ?, ?, ?)",
+                [(project_id, *entry) for entry in entries])
+            # One statement per project; a per-row trigger makes indexing several times slower
+            self.db.execute("INSERT INTO entries_text (rowid, title, body)"
+                            " SELECT id, title, body FROM entries WHERE project_id = ?", (project_id,))
+
+    def _forget(self, project_id):
+        # Text rows of an external-content FTS table are removed by replaying their values
+        self.db.execute("INSERT INTO entries_text (entries_text, rowid, title, body)"
+                        " SELECT 'delete', id, title, body FROM entries WHERE project_id = ?", (project_id,))
+        self.db.execute("DELETE FROM entries WHERE project_id = ?", (project_id,))
+        self.db.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+
+    # Lookups
+
+    def projects(self):
+        """[(path, cards, connections, error)] for every indexed project, by path"""
+        return self.db.execute("SELECT path, cards, connections, error FROM projects ORDER BY path").fetchall()
+
+    def search(self, query, limit=200):
+        """Return [(path, card_id, kind, heading, snippet)] for cards matching every word of query, best first
+
+        Connection matches carry the id of one of their cards.
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        return self.db.execute(
+            "SELECT projects.path, entries.card_id, entries.kind, entries.heading,"
+            f" snippet(entries_text, -1, '[', ']', '…', {SNIPPET_WORDS})"
+            " FROM entries_text"
+            " JOIN entries ON entries.id = entries_text.rowid"
+            " JOIN projects ON projects.id = entries.project_id"
+            " WHERE entries_text MATCH ? ORDER BY bm25(entries_text) LIMIT ?",
+            (expression, limit)).fetchall()
+
+    def search_projects(self, query):
+        """Return [(path, matching cards)] for the projects with a card matching query, most matches first"""
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        return self.db.execute(
+            "SELECT projects.path, COUNT(*) AS matches"
+            " FROM entries_text"
+            " JOIN entries ON entries.id = entries_text.rowid"
+            " JOIN projects ON projects.id = entries.project_id"
+            " WHERE entries_text MATCH ? GROUP BY projects.id ORDER BY matches DESC, projects.path",
+            (expression,)).fetchall()
@@ -1,45 +1,142 @@
 # models.py
 """
 Data models for the People Connection Visualizer
+
+Cards use ``__slots__`` so large networks don't pay for a per-instance
+``__dict__``. Empty text fields share a single empty string, and the
+``connections``/``files`` containers are only allocated once something is
+stored in them.
 """
 
-class Person:
+EMPTY = ""
+
+
+def _text(value):
+    """Normalize an optional text field, sharing one empty string across all cards"""
+    return value if value else EMPTY
+
+
+class Card:
     """
-    Represents a person in the connection network
+    Base class for all cards on the canvas.
+
+    Once a card is added to a GraphStore its connections live in the store's
+    edge table and ``connections`` is a live view of it. A detached card
+    (e.g. a clipboard copy) keeps its connections in a local dict.
     """
-    def __init__(self, name, dob="", alias="", address="", phone="", ssn="", email="", color=0):
-        self.name = name
-        self.dob = dob
-        self.alias = alias
-        self.address = address
-        self.phone = phone
-        self.ssn = ssn
-        self.email = email
+    __slots__ = ('x', 'y', 'base_x', 'base_y', 'color', 'card_id', '_store', '_connections')
+
+    card_type = None
+
+    def __init__(self, color=0):
         self.x = 0
         self.y = 0
         self.color = color  # Index into CARD_COLORS array
-        self.connections = {}  # {person_id: label}
-        self.files = []  # List of attached file paths
-    
-    def __repr__(self):
-        return f"Person(name='{self.name}', connections={len(self.connections)})"
-    
-    def add_connection(self, person_id, label):
-        """Add a connection to another person"""
-        self.connections[person_id] = label
-    def remove_connection(self, person_id):
-        """Remove a connection to another person"""
-        if person_id in self.connections:
-            del self.connections[person_id]
-    
-    def has_connection(self, person_id):
-        """Check if connected to another person"""
-        return person_id in self.connections
-    
-    def get_connection_label(self, person_id):
+        self.card_id = None  # Assigned by the store
+        self._store = None
+        self._connections = None  # {card_id: label} while detached, allocated on first write
+        # base_x/base_y are declared but left unset until the card is first drawn
+
+    @property
+    def connections(self):
+        if self._store is not None:
+            return self._store.connections_of(self.card_id)
+        if self._connections is None:
+            self._connections = {}
+        return self._connections
+
+    @connections.setter
+    def connections(self, value):
+        if self._store is not None:
+            view = self._store.connections_of(self.card_id)
+            view.clear()
+            view.update(value or {})
+        else:
+            self._connections = dict(value) if value else None
+
+    def iter_connections(self):
+        """Iterate (card_id, label) pairs without allocating an empty dict"""
+        if self._store is not None:
+            return self._store.iter_neighbors(self.card_id)
+        return iter(self._connections.items()) if self._connections else iter(())
+
+    def connection_count(self):
+        if self._store is not None:
+            return self._store.degree(self.card_id)
+        return len(self._connections) if self._connections else 0
+
+    def add_connection(self, card_id, label):
+        """Add a connection to another card"""
+        self.connections[card_id] = label
+
+    def remove_connection(self, card_id):
+        """Remove a connection to another card"""
+        if self._store is not None:
+            self._store.disconnect(self.card_id, card_id)
+        elif self._connections and card_id in self._connections:
+            del self._connections[card_id]
+
+    def has_connection(self, card_id):
+        """Check if connected to another card"""
+        if self._store is not None:
+            return self._store.has_edge(self.card_id, card_id)
+        return bool(self._connections) and card_id in self._connections
+
+    def get_connection_label(self, card_id):
         """Get the label for a connection"""
-        return self.connections.get(person_id, "")
-    
+        if self._store is not None:
+            return self._store.edge_label(self.card_id, card_id)
+        return self._connections.get(card_id, "") if self._connections else ""
+
+    def __getstate__(self):
+        # Copies are always detached: they carry their connections along but not the store
+        state = {}
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                if hasattr(self, slot):
+                    state[slot] = getattr(self, slot)
+        if self._store is not None:
+            state['_connections'] = dict(self.iter_connections()) or None
+        state['_store'] = None
+        state['card_id'] = None
+        return None, state
+
+
+class Person(Card):
+    """
+    Represents a person in the connection network
+    """
+    __slots__ = ('name', 'dob', 'alias', 'address', 'phone', 'ssn', 'email', '_files')
+
+    card_type = 'person'
+
+    def __init__(self, name, dob="", alias="", address="", phone="", ssn="", email="", color=0):
+        super().__init__(color)
+        self.name = name
+        self.dob = _text(dob)
+        self.alias = _text(alias)
+        self.address = _text(address)
+        self.phone = _text(phone)
+        self.ssn = _text(ssn)
+        self.email = _text(email)
+        self._files = None  # List of attached file paths, allocated on first write
+
+    @property
+    def files(self):
+        if self._files is None:
+            self._files = []
+        return self._files
+
+    @files.setter
+    def files(self, value):
+        self._files = value or None
+
+    def file_count(self):
+        return len(self._files) if self._files else 0
+
+    def __repr__(self):
+        return f"Person(name='{self.name}', connections={self.connection_count()})"
+
     def to_dict(self):
         """Convert to dictionary for serialization"""
         return {
@@ -53,10 +150,10 @@ class Person:
             'x': self.x,
             'y': self.y,
             'color': self.color,
-            'connections': self.connections,
+            'connections': dict(self.iter_connections()),
             'files': self.files
         }
-    
+
     @classmethod
     def from_dict(cls, data):
         """Create Person from dictionary"""
@@ -76,38 +173,24 @@ class Person:
         person.files = data.get('files', [])
         return person
 
-class TextboxCard:
+
+class TextboxCard(Card):
     """
     Represents a textbox card with title and content
     """
+    __slots__ = ('title', 'content')
+
+    card_type = 'textbox'
+
     def __init__(self, title, content="", color=0):
+        super().__init__(color)
         self.title = title
-        self.content = content
-        self.x = 0
-        self.y = 0
-        self.color = color  # Index into CARD_COLORS array
-        self.connections = {}  # {card_id: label} - can connect to both people and textboxes
-        
+        self.content = _text(content)
+        # Connections can link to both people and textboxes
+
     def __repr__(self):
-        return f"TextboxCard(title='{self.title}', connections={len(self.connections)})"
-    
-    def add_connection(self, card_id, label):
-        """Add a connection to another card"""
-        self.connections[card_id] = label
-        
-    def remove_connection(self, card_id):
-        """Remove a connection to another card"""
-        if card_id in self.connections:
-            del self.connections[card_id]
-    
-    def has_connection(self, card_id):
-        """Check if connected to another card"""
-        return card_id in self.connections
-    
-    def get_connection_label(self, card_id):
-        """Get the label for a connection"""
-        return self.connections.get(card_id, "")
-    
+        return f"TextboxCard(title='{self.title}', connections={self.connection_count()})"
+
     def to_dict(self):
         """Convert to dictionary for serialization"""
         return {
@@ -116,10 +199,10 @@ class TextboxCard:
             'x': self.x,
             'y': self.y,
             'color': self.color,
-            'connections': self.connections,
+            'connections': dict(self.iter_connections()),
             'type': 'textbox'  # Add type identifier for serialization
         }
-    
+
     @classmethod
     def from_dict(cls, data):
         """Create TextboxCard from dictionary"""
@@ -133,37 +216,23 @@ class TextboxCard:
         textbox.connections = data.get('connections', {})
         return textbox
 
-class LegendCard:
+
+class LegendCard(Card):
     """
     Represents a legend card with color entries and descriptions
     """
+    __slots__ = ('title', 'color_entries')
+
+    card_type = 'legend'
+
     def __init__(self, title="Legend", color_entries=None):
+        super().__init__()
         self.title = title
-        self.x = 0
-        self.y = 0
         self.color_entries = color_entries or {}  # {color_index: description}
-        self.connections = {}  # {card_id: label} - can connect to people and textboxes
-        
+
     def __repr__(self):
-        return f"LegendCard(title='{self.title}', entries={len(self.color_entries)}, connections={len(self.connections)})"
-    
-    def add_connection(self, card_id, label):
-        """Add a connection to another card"""
-        self.connections[card_id] = label
-        
-    def remove_connection(self, card_id):
-        """Remove a connection to another card"""
-        if card_id in self.connections:
-            del self.connections[card_id]
-    
-    def has_connection(self, card_id):
-        """Check if connected to another card"""
-        return card_id in self.connections
-    
-    def get_connection_label(self, card_id):
-        """Get the label for a connection"""
-        return self.connections.get(card_id, "")
-    
+        return f"LegendCard(title='{self.title}', entries={len(self.color_entries)}, connections={self.connection_count()})"
+
     def to_dict(self):
         """Convert to dictionary for serialization"""
         return {
@@ -171,10 +240,10 @@ class LegendCard:
             'x': self.x,
             'y': self.y,
             'color_entries': self.color_entries,
-            'connections': self.connections,
+            'connections': dict(self.iter_connections()),
             'type': 'legend'  # Add type identifier for serialization
         }
-    
+
     @classmethod
     def from_dict(cls, data):
         """Create LegendCard from dictionary"""
@@ -185,4 +254,4 @@ class LegendCard:
         legend.x = data.get('x', 0)
         legend.y = data.get('y', 0)
         legend.connections = data.get('connections', {})
-        return legend
\ No newline at end of file
+        return legend
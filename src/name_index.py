@@ -0,0 +1,227 @@
+# name_index.py
+"""
+Index of person names for the similar-name check when adding a person.
+
+``utils.find_similar_names`` scores every existing name with
+``difflib.SequenceMatcher.ratio()``. This index returns the same best match
+without doing that: it keeps each name's character counts in one matrix,
+computes an upper bound on every name's ratio in a single vectorized pass
+(the bound ``SequenceMatcher.quick_ratio()`` uses: characters in common),
+then scores names best bound first and stops as soon as no remaining bound
+can beat the best ratio found. Typically only a handful of names are ever
+scored.
+
+Without NumPy the same search runs as a Python loop with difflib's quick
+bounds, still skipping the full ratio for most names.
+"""
+
+import logging
+from collections import Counter
+from difflib import SequenceMatcher
+
+from src.graph_store import BATCH, CARD_ADDED, CARD_REMOVED, FIELD_CHANGED, STORE_CLEARED
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+INITIAL_CAPACITY = 1024
+
+
+def normalize_name(name):
+    return name.strip().lower() if name else ""
+
+
+class NameIndex:
+    """
+    Person names kept in sync with a GraphStore, for finding the most similar name
+    """
+    def __init__(self, store, use_numpy=NUMPY_AVAILABLE):
+        self.store = store
+        self.use_numpy = use_numpy and NUMPY_AVAILABLE
+        self.built = False
+        self._reset()
+        store.subscribe(self.on_store_event, kinds=(CARD_ADDED, CARD_REMOVED, FIELD_CHANGED, STORE_CLEARED))
+
+    def _reset(self, capacity=INITIAL_CAPACITY):
+        self._slots = {}     # {card_id: slot}
+        self._ids = []       # [card_id] by slot
+        self._names = []     # [normalized name] by slot
+        self._order = []     # [insertion sequence] by slot; ties go to the earliest name, like the list scan
+        self._exact = {}     # {normalized name: {card_id}}
+        self._next_order = 0
+        self._columns = {}   # {character: column of the counts matrix}
+        if self.use_numpy:
+            self._counts = np.zeros((capacity, 32), dtype=np.int16)
+            self._lengths = np.zeros(capacity, dtype=np.int32)
+
+    def build(self):
+        """Index every person's name, in the store's order"""
+        self._reset(max(INITIAL_CAPACITY, self.store.count('person')))
+        rows, columns, counts = [], [], []
+        for card_id, person in self.store.items('person'):
+            slot = self._append(card_id, person.name)
+            if slot is not None and self.use_numpy:
+                for ch, count in Counter(self._names[slot]).items():
+                    rows.append(slot)
+                    columns.append(self._columns.setdefault(ch, len(self._columns)))
+                    counts.append(count)
+        if self.use_numpy:
+            # Fill the whole matrix at once rather than a row per name
+            self._counts = np.zeros((len(self._lengths), max(32, len(self._columns))), dtype=np.int16)
+            self._counts[rows, columns] = counts
+            self._lengths[:len(self._names)] = [len(name) for name in self._names]
+        self.built = True
+        logger.info(f"Name index built with {len(self._ids)} names")
+
+    def ensure_built(self):
+        if not self.built:
+            self.build()
+
+    # Store events
+
+    def on_store_event(self, event):
+        if not self.built:
+            return  # Built from scratch on the first lookup
+        events = event.new if event.kind == BATCH else (event,)
+        if any(inner.kind == STORE_CLEARED for inner in events):
+            self.built = False
+            self._reset()
+            return
+        for inner in events:
+            if inner.kind == CARD_ADDED and inner.new.card_type == 'person':
+                self._put(inner.card_id, inner.new.name)
+            elif inner.kind == CARD_REMOVED:
+                self._discard(inner.card_id)
+            elif (inner.kind == FIELD_CHANGED and 'name' in inner.new
+                  and self.store.type_of(inner.card_id) == 'person'):
+                # A rename keeps its place in the order, as the card keeps its place in the store;
+                # a person named for the first time (saved blank) is indexed now
+                slot = self._slots.get(inner.card_id)
+                order = self._order[slot] if slot is not None else None
+                self._discard(inner.card_id)
+                self._put(inner.card_id, inner.new['name'], order)
+
+    # Slot management
+
+    def _append(self, card_id, name, order=None):
+        """Add a name to the slot lists; returns its slot, or None for a blank name"""
+        name = normalize_name(name)
+        if not name:
+            return None
+        if order is None:
+            order = self._next_order
+            self._next_order += 1
+        slot = len(self._ids)
+        self._slots[card_id] = slot
+        self._ids.append(card_id)
+        self._names.append(name)
+        self._order.append(order)
+        self._exact.setdefault(name, set()).add(card_id)
+        return slot
+
+    def _put(self, card_id, name, order=None):
+        slot = self._append(card_id, name, order)
+        if slot is None or not self.use_numpy:
+            return
+        if slot == len(self._lengths):
+            self._counts = np.concatenate([self._counts, np.zeros_like(self._counts)])
+            self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+        counts = Counter(self._names[slot])
+        self._counts[slot, [self._column(ch) for ch in counts]] = list(counts.values())
+        self._lengths[slot] = len(self._names[slot])
+
+    def _column(self, ch):
+        column = self._columns.get(ch)
+        if column is None:
+            column = self._columns[ch] = len(self._columns)
+            if column == self._counts.shape[1]:
+                self._counts = np.hstack([self._counts, np.zeros_like(self._counts)])
+        return column
+
+    def _discard(self, card_id):
+        slot = self._slots.pop(card_id, None)
+        if slot is None:
+            return
+        same = self._exact[self._names[slot]]
+        same.discard(card_id)
+        if not same:
+            del self._exact[self._names[slot]]
+        last = len(self._ids) - 1
+        if slot != last:
+            # Keep slots dense by moving the last name into the hole
+            moved_id = self._ids[last]
+            self._slots[moved_id] = slot
+            for column in (self._ids, self._names, self._order):
+                column[slot] = column[last]
+            if self.use_numpy:
+                self._counts[slot] = self._counts[last]
+                self._lengths[slot] = self._lengths[last]
+        for column in (self._ids, self._names, self._order):
+            column.pop()
+        if self.use_numpy:
+            self._counts[last] = 0
+
+    # Lookups
+
+    def __len__(self):
+        self.ensure_built()
+        return len(self._ids)
+
+    def find_similar(self, name, threshold=0.7):
+        """Return the id of the person whose name is most similar to name, if at least threshold
+
+        Gives the same answer as ``utils.find_similar_names`` over the
+        people's names in store order.
+        """
+        name = normalize_name(name)
+        if not name:
+            return None
+        self.ensure_built()
+        same = self._exact.get(name)
+        if same:
+            return min(same, key=lambda card_id: self._order[self._slots[card_id]])
+        if self.use_numpy:
+            candidates = self._candidates_numpy(name, threshold)
+        else:
+            candidates = self._candidates_python(name, threshold)
+
+        best_slot, best_ratio = None, 0.0
+        for bound, slot in candidates:
+            if bound < best_ratio:
+                break  # No remaining name can beat the best one
+            ratio = SequenceMatcher(None, name, self._names[slot]).ratio()
+            if ratio >= threshold and (ratio > best_ratio or
+                                       (ratio == best_ratio and self._order[slot] < self._order[best_slot])):
+                best_slot, best_ratio = slot, ratio
+        return None if best_slot is None else self._ids[best_slot]
+
+    def _candidates_numpy(self, name, threshold):
+        """(upper bound, slot) for every name that could reach threshold, highest bound first"""
+        count = len(self._ids)
+        query = np.zeros(self._counts.shape[1], dtype=np.int16)
+        for ch in name:
+            column = self._columns.get(ch)
+            if column is not None:
+                query[column] += 1
+        common = np.minimum(self._counts[:count], query).sum(axis=1)
+        bounds = 2.0 * common / (len(name) + self._lengths[:count])
+        slots = np.flatnonzero(bounds >= threshold)
+        slots = slots[np.argsort(-bounds[slots], kind='stable')]
+        return zip(bounds[slots].tolist(), slots.tolist())
+
+    def _candidates_python(self, name, threshold):
+        candidates = []
+        for slot, existing in enumerate(self._names):
+            matcher = SequenceMatcher(None, name, existing)
+            if matcher.real_quick_ratio() >= threshold:
+                bound = matcher.quick_ratio()
+                if bound >= threshold:
+                    candidates.append((bound, slot))
+        candidates.sort(key=lambda candidate: -candidate[0])
+        return candidates
@@ -0,0 +1,368 @@
+# project_db.py
+"""
+COMRADE projects stored in SQLite.
+
+A ``.comrade`` project is a SQLite database with a table per card type,
+the connections, and each attached file once, as a blob keyed by its
+SHA-256. An R-tree over card positions finds the cards in a region of the
+canvas, so a project is opened a region at a time: the cards around the
+view it was saved with come first, then those of each region the view
+moves to, each with the connections it completes, while the totals are
+read from one small table. The rest can still be read in pages when the
+whole project is needed. Names are indexed for tools that query the file
+directly.
+
+Projects move between this format and ZIP archives with
+``convert_project``; both formats yield the same rows as
+``read_project_csv``, so the application loads them the same way.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from src.models import Person, TextboxCard, LegendCard
+from src.project_io import (CARD, CONNECTION, COPY_CHUNK, LazyAttachments, ProjectAttachments, hash_attachments,
+                            local_path, open_project_csv, read_project_csv, release_archive, write_project)
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DB_EXTENSION = '.comrade'
+FORMAT_VERSION = 1
+PAGE_SIZE = 5000       # Cards or connections read at a time
+PAGE_MARGIN = 600      # Cards this far outside the view are paged in with it (wider than any card)
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID;
+CREATE TABLE people (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL, dob TEXT NOT NULL, alias TEXT NOT NULL, address TEXT NOT NULL,
+    phone TEXT NOT NULL, ssn TEXT NOT NULL, email TEXT NOT NULL,
+    x REAL NOT NULL, y REAL NOT NULL, color INTEGER NOT NULL
+);
+CREATE TABLE textboxes (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL, content TEXT NOT NULL,
+    x REAL NOT NULL, y REAL NOT NULL, color INTEGER NOT NULL
+);
+CREATE TABLE legends (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL, color_entries TEXT NOT NULL,
+    x REAL NOT NULL, y REAL NOT NULL
+);
+CREATE TABLE edges (id1 INTEGER NOT NULL, id2 INTEGER NOT NULL, label TEXT NOT NULL,
+                    PRIMARY KEY (id1, id2)) WITHOUT ROWID;
+CREATE TABLE attachments (card_id INTEGER NOT NULL, position INTEGER NOT NULL,
+                          digest TEXT NOT NULL, name TEXT NOT NULL,
+                          PRIMARY KEY (card_id, position)) WITHOUT ROWID;
+CREATE TABLE blobs (id INTEGER PRIMARY KEY, digest TEXT UNIQUE NOT NULL, data BLOB NOT NULL);
+CREATE VIRTUAL TABLE positions USING rtree(id, min_x, max_x, min_y, max_y);
+"""
+# Built once the rows are in, which is faster than keeping them up to date row by row
+INDEXES = """
+CREATE INDEX people_by_name ON people(name COLLATE NOCASE);
+CREATE INDEX edges_by_id2 ON edges(id2);
+"""
+
+COUNTS = ('people', 'textboxes', 'legends', 'edges', 'blobs')
+IN_RECT = ("SELECT id FROM positions"
+           " WHERE min_x <= :right AND max_x >= :left AND min_y <= :bottom AND max_y >= :top")
+IDS_PER_QUERY = 500  # Card ids bound into one IN (...) list, well under SQLite's variable limit
+
+
+def is_project_db(filename):
+    return filename.lower().endswith(PROJECT_DB_EXTENSION)
+
+
+def write_project_db(filename, people, textboxes, legends, edges, view=None):
+    """Write a project database to filename; returns the number of attached files stored
+
+    Arguments are those of write_project, plus the (x, y) world position
+    the view was centered on, which opening starts from. The database is
+    built next to filename and moved over it once complete, so a failed
+    save leaves the previous file as it was.
+    """
+    release_archive(filename)
+    digests = hash_attachments(people)
+    partial = filename + ".part"
+    if os.path.exists(partial):
+        os.remove(partial)
+    db = sqlite3.connect(partial)
+    try:
+        # A new file that only replaces the project once complete: no journal needed
+        db.execute("PRAGMA journal_mode=OFF")
+        db.execute("PRAGMA synchronous=OFF")
+        db.executescript(SCHEMA)
+        db.executemany("INSERT INTO people VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+            (person_id, person.name, person.dob, person.alias, person.address, person.phone,
+             person.ssn, person.email, person.x, person.y, person.color)
+            for person_id, person in people.items()))
+        db.executemany("INSERT INTO textboxes VALUES (?, ?, ?, ?, ?, ?)", (
+            (textbox_id, textbox.title, textbox.content, textbox.x, textbox.y, textbox.color)
+            for textbox_id, textbox in textboxes.items()))
+        db.executemany("INSERT INTO legends VALUES (?, ?, ?, ?, ?)", (
+            (legend_id, legend.title, json.dumps(legend.color_entries), legend.x, legend.y)
+            for legend_id, legend in legends.items()))
+        for cards in (people, textboxes, legends):
+            db.executemany("INSERT INTO positions VALUES (?, ?, ?, ?, ?)",
+                           ((card_id, card.x, card.x, card.y, card.y) for card_id, card in cards.items()))
+        db.executemany("INSERT INTO edges VALUES (?, ?, ?)",
+                       ((id1, id2, label) for (id1, id2), label in edges))
+        db.executemany("INSERT INTO attachments VALUES (?, ?, ?, ?)", (
+            (person_id, position, digests[path], os.path.basename(path))
+            for person_id, person in people.items() if person.file_count()
+            for position, path in enumerate(person.files) if path in digests))
+        stored = 0
+        blobs = {}  # Digest -> a file with that content
+        for path, digest in digests.items():
+            blobs.setdefault(digest, path)
+        for digest, path in blobs.items():
+            try:
+                _store_blob(db, digest, path)
+                stored += 1
+            except OSError as e:
+                logger.warning(f"File not found: {path} ({e})")
+        db.executescript(INDEXES)
+        counts = {table: db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in COUNTS}
+        max_id = max((max(cards, default=0) for cards in (people, textboxes, legends)), default=0)
+        meta = {'version': FORMAT_VERSION, 'max_id': max_id, **counts}
+        if view is not None:
+            meta['view_x'], meta['view_y'] = view
+        db.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+        db.commit()
+        db.close()
+        os.replace(partial, filename)
+    except BaseException:
+        db.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return stored
+
+
+def _store_blob(db, digest, path):
+    path = local_path(path)
+    if not hasattr(db, 'blobopen'):  # Before Python 3.11 a blob is written in one piece
+        with open(path, 'rb') as f:
+            db.execute("INSERT INTO blobs (digest, data) VALUES (?, ?)", (digest, f.read()))
+        return
+    size = os.path.getsize(path)
+    blob_id = db.execute("INSERT INTO blobs (digest, data) VALUES (?, zeroblob(?))", (digest, size)).lastrowid
+    with open(path, 'rb') as src, db.blobopen('blobs', 'data', blob_id) as blob:
+        for chunk in iter(lambda: src.read(COPY_CHUNK), b''):
+            blob.write(chunk)
+
+
+def _connect(path, check_same_thread=True):
+    if not os.path.isfile(path):
+        raise FileNotFoundError(path)
+    # Read-only, so opening a project never changes it
+    return sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True,
+                           check_same_thread=check_same_thread)
+
+
+class ProjectDatabase:
+    """
+    Read access to a project database, a region or a page at a time
+
+    Cards come back as the rows read_project_csv yields, with each attached
+    file referred to by its digest.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.db = _connect(path)
+        try:
+            self.meta = dict(self.db.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError:
+            self.db.close()
+            raise ValueError("Invalid COMRADE file: not a project database") from None
+        if self.meta.get('version') != FORMAT_VERSION:
+            self.db.close()
+            raise ValueError(f"Unsupported COMRADE project version: {self.meta.get('version')}")
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def counts(self):
+        """{'people', 'textboxes', 'legends', 'edges', 'blobs': count}, without reading any rows"""
+        return {table: self.meta.get(table, 0) for table in COUNTS}
+
+    @property
+    def max_id(self):
+        return self.meta.get('max_id', 0)
+
+    @property
+    def view(self):
+        """(x, y) the view was centered on when the project was saved, or None"""
+        if 'view_x' not in self.meta:
+            return None
+        return self.meta['view_x'], self.meta['view_y']
+
+    # Cards
+
+    def cards_in(self, left, top, right, bottom):
+        """Rows of the cards positioned inside the rectangle, by way of the R-tree"""
+        rect = {'left': left, 'top': top, 'right': right, 'bottom': bottom}
+        return self._cards(f"id IN ({IN_RECT})", rect)
+
+    def edges_in(self, left, top, right, bottom):
+        """Connection rows between two cards both inside the rectangle"""
+        rect = {'left': left, 'top': top, 'right': right, 'bottom': bottom}
+        return [(CONNECTION, *row) for row in self.db.execute(
+            f"SELECT id1, id2, label FROM edges WHERE id1 IN ({IN_RECT}) AND id2 IN ({IN_RECT})", rect)]
+
+    def edges_of(self, card_ids):
+        """Connection rows with at least one of their cards among card_ids, each once"""
+        card_ids = list(card_ids)
+        found = {}
+        for start in range(0, len(card_ids), IDS_PER_QUERY):
+            chunk = card_ids[start:start + IDS_PER_QUERY]
+            marks = ",".join("?" * len(chunk))
+            for id1, id2, label in self.db.execute(
+                    f"SELECT id1, id2, label FROM edges WHERE id1 IN ({marks})"
+                    f" UNION ALL SELECT id1, id2, label FROM edges WHERE id2 IN ({marks})", chunk * 2):
+                found[id1, id2] = label
+        return [(CONNECTION, id1, id2, label) for (id1, id2), label in found.items()]
+
+    def pages(self, skip=frozenset(), size=PAGE_SIZE):
+        """Yield lists of rows holding about size cards each, with the connections they complete
+
+        Cards whose ids are in skip (a page loaded already) are left out
+        and count as loaded. A connection comes in the page that loads the
+        second of its two cards, so once a page is added every connection
+        between the cards loaded so far is there too.
+        """
+        loaded = set(skip)
+        for table in ('people', 'textboxes', 'legends'):
+            after = 0
+            while True:
+                ids = [card_id for card_id, in self.db.execute(
+                    f"SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT ?", (after, size))]
+                if not ids:
+                    break
+                low, high = ids[0], ids[-1]
+                after = high
+                page = [row for row in self._cards("id BETWEEN :low AND :high", {'low': low, 'high': high},
+                                                   tables=(table,))
+                        if row[1] not in loaded]
+                if not page:
+                    continue
+                added = {row[1] for row in page}
+                loaded.update(added)
+                # Other tables' ids fall in the same range, so the ranges only narrow the search
+                for id1, id2, label in self.db.execute(
+                        "SELECT id1, id2, label FROM edges WHERE id1 BETWEEN :low AND :high"
+                        " UNION ALL SELECT id1, id2, label FROM edges WHERE id2 BETWEEN :low AND :high"
+                        " AND id1 NOT BETWEEN :low AND :high", {'low': low, 'high': high}):
+                    if (id1 in added or id2 in added) and id1 in loaded and id2 in loaded:
+                        page.append((CONNECTION, id1, id2, label))
+                yield page
+
+    def rows(self):
+        """Every card and connection, as read_project_csv yields them (each connection after its cards)"""
+        for page in self.pages():
+            yield from page
+
+    def _cards(self, where, params, tables=('people', 'textboxes', 'legends')):
+        rows = []
+        if 'people' in tables:
+            attached = {}
+            for card_id, digest, name in self.db.execute(
+                    f"SELECT card_id, digest, name FROM attachments WHERE card_id IN"
+                    f" (SELECT id FROM people WHERE {where}) ORDER BY card_id, position", params):
+                attached.setdefault(card_id, []).append((digest, name))
+            for card_id, name, dob, alias, address, phone, ssn, email, x, y, color in self.db.execute(
+                    f"SELECT id, name, dob, alias, address, phone, ssn, email, x, y, color FROM people"
+                    f" WHERE {where} ORDER BY id", params):
+                person = Person(name, dob, alias, address, phone, ssn, email, color)
+                person.x, person.y = x, y
+                rows.append((CARD, card_id, person, attached.get(card_id, [])))
+        if 'textboxes' in tables:
+            for card_id, title, content, x, y, color in self.db.execute(
+                    f"SELECT id, title, content, x, y, color FROM textboxes WHERE {where} ORDER BY id", params):
+                textbox = TextboxCard(title, content, color)
+                textbox.x, textbox.y = x, y
+                rows.append((CARD, card_id, textbox, []))
+        if 'legends' in tables:
+            for card_id, title, color_entries, x, y in self.db.execute(
+                    f"SELECT id, title, color_entries, x, y FROM legends WHERE {where} ORDER BY id", params):
+                legend = LegendCard(title, json.loads(color_entries))
+                legend.x, legend.y = x, y
+                rows.append((CARD, card_id, legend, []))
+        return rows
+
+
+class DatabaseAttachments(LazyAttachments):
+    """
+    Attached files of a loaded project database, extracted from its blobs on first use
+    """
+    def __init__(self, path, directory):
+        # Files are fetched from whichever thread needs them; LazyAttachments serializes the fetches
+        self.db = _connect(path, check_same_thread=False)
+        super().__init__(path, directory)
+
+    def _entry(self, digest):
+        row = self.db.execute("SELECT id FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        return (row[0], digest) if row else None
+
+    def _digest(self, entry):
+        return entry[1]
+
+    def _copy_out(self, entry, dst):
+        blob_id = entry[0]
+        if not hasattr(self.db, 'blobopen'):
+            dst.write(self.db.execute("SELECT data FROM blobs WHERE id = ?", (blob_id,)).fetchone()[0])
+            return None
+        with self.db.blobopen('blobs', 'data', blob_id, readonly=True) as blob:
+            for chunk in iter(lambda: blob.read(COPY_CHUNK), b''):
+                dst.write(chunk)
+        return None
+
+    def _close_source(self):
+        self.db.close()
+
+
+def convert_project(source, target):
+    """Rewrite the project in source (ZIP or database) in target's format; returns the files stored
+
+    Attachments pass through a temporary folder, extracted one at a time
+    as they are written.
+    """
+    people, textboxes, legends, edges = {}, {}, {}, []
+    by_type = {'person': people, 'textbox': textboxes, 'legend': legends}
+    with tempfile.TemporaryDirectory() as files_dir:
+        if is_project_db(source):
+            files = DatabaseAttachments(source, files_dir)
+            with ProjectDatabase(source) as project:
+                rows = list(project.rows())
+                view = project.view
+        else:
+            files = ProjectAttachments(source, files_dir)
+            with open_project_csv(files.zipf) as f:
+                rows = list(read_project_csv(f))
+            view = None
+        try:
+            for row in rows:
+                if row[0] == CONNECTION:
+                    edges.append((row[1:3], row[3]))
+                    continue
+                _, card_id, card, attached = row
+                for ref, name in attached:
+                    path = files.path(ref, name)
+                    if path:
+                        card.files.append(path)
+                by_type[card.card_type][card_id] = card
+            if is_project_db(target):
+                return write_project_db(target, people, textboxes, legends, edges, view)
+            return write_project(target, people, textboxes, legends, edges)
+        finally:
+            files.close()
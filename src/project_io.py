@@ -0,0 +1,522 @@
+# project_io.py
+"""
+Reading and writing COMRADE project files.
+
+A project is a ZIP archive holding ``data.csv`` (cards, then a
+``CONNECTIONS`` section) and the attached files. Each file is stored once
+under ``blobs/<sha256>``, its content hash, and a person's row refers to
+it by that path with the file's name, so evidence attached to many people
+takes the space of one copy. (Older projects kept one copy per person
+under ``files/``; they read the same way.)
+
+``read_project_csv`` turns the CSV into cards and connections without
+touching the application, so loading a project and indexing a folder of
+them parse it the same way. ``write_project`` streams a project straight
+into its archive: no temporary copy of the CSV is made, and attachments
+that are already compressed (photos, video, archives) are stored as they
+are while the others are deflated. ``ProjectAttachments``
+keeps a loaded project's archive open and extracts each file only when it
+is first needed. ``project_db`` stores the same projects in SQLite.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import zipfile
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src.models import Person, TextboxCard, LegendCard
+
+logger = logging.getLogger(__name__)
+
+PROJECT_CSV = "data.csv"
+CSV_HEADER = ['ID', 'Name', 'DOB', 'Alias', 'Address', 'Phone', 'SSN', 'Email', 'X', 'Y', 'Color', 'Files', 'Type']
+CONNECTIONS_MARKER = 'CONNECTIONS'
+CONNECTIONS_HEADER = ['From_ID', 'To_ID', 'Label']
+
+CARD, CONNECTION = 'card', 'connection'
+
+BLOB_DIR = "blobs/"
+HEX_DIGITS = frozenset("0123456789abcdef")
+COPY_CHUNK = 1024 * 1024  # Attachments are copied into the archive this much at a time
+HASH_WORKERS = 4          # Attachments hashed at once; hashlib releases the GIL
+PREPARE_WORKERS = 4       # Attachments extracted and sniffed ahead of the one being written
+
+# Formats that are compressed already; deflating them again costs time and saves nothing
+STORED_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.heif',
+    '.mp4', '.m4v', '.mov', '.avi', '.mkv', '.webm', '.3gp',
+    '.mp3', '.m4a', '.aac', '.ogg', '.opus', '.flac',
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp', '.epub',
+})
+COMPRESSED_SIGNATURES = (
+    b'\xff\xd8\xff',          # JPEG
+    b'\x89PNG\r\n\x1a\n',     # PNG
+    b'GIF87a', b'GIF89a',
+    b'PK\x03\x04',            # ZIP and the office formats built on it
+    b'\x1f\x8b',              # gzip
+    b'BZh',                    # bzip2
+    b'\xfd7zXZ\x00',          # xz
+    b"7z\xbc\xaf'\x1c",        # 7-Zip
+    b'Rar!\x1a\x07',
+    b'OggS', b'fLaC', b'ID3',  # Ogg, FLAC, MP3 with tags
+)
+
+
+def open_project_csv(zipf):
+    """Text stream of a project archive's data.csv, read straight from the archive"""
+    try:
+        raw = zipf.open(PROJECT_CSV)
+    except KeyError:
+        raise ValueError("Invalid COMRADE file: data.csv not found") from None
+    return io.TextIOWrapper(raw, encoding='utf-8', newline='')
+
+
+def read_project_csv(f):
+    """Yield the rows of a project's data.csv, in file order
+
+    Cards come first as (CARD, card_id, card, attached) where attached
+    lists (archive path, file name) for each of a person's files (empty
+    for other cards); several people may share an archive path. Then
+    (CONNECTION, id1, id2, label) for each connection.
+    """
+    reader = csv.reader(f)
+    next(reader, None)  # Header
+    connections_section = False
+
+    for row in reader:
+        if row and row[0] == CONNECTIONS_MARKER:
+            connections_section = True
+            next(reader, None)  # Skip connection header
+            continue
+
+        if connections_section:
+            if len(row) >= 3:
+                yield CONNECTION, int(row[0]), int(row[1]), row[2]
+        elif len(row) >= 8:
+            card_id = int(row[0])
+            card, attached = _card_from_row(card_id, row)
+            yield CARD, card_id, card, attached
+
+
+def _card_from_row(card_id, row):
+    # Check if this is a textbox or legend (new format with Type column)
+    is_textbox = False
+    is_legend = False
+    if len(row) >= 11:
+        # The type is always the last column (person rows have two extra columns)
+        if row[-1] == 'textbox':
+            is_textbox = True
+        elif row[-1] == 'legend':
+            is_legend = True
+    elif len(row) >= 3 and not row[2]:  # Empty DOB might indicate textbox in old format
+        # Additional heuristic: if name is actually content (longer than typical name)
+        if len(row[1]) > 50:
+            is_textbox = True
+
+    if is_legend:
+        color_entries = {}
+        if len(row) > 2 and row[2]:  # color_entries JSON is in the content field
+            try:
+                color_entries = json.loads(row[2])
+            except json.JSONDecodeError:
+                logger.warning(f"Invalid color_entries data for legend {card_id}")
+        legend = LegendCard(row[1], color_entries)
+        legend.x = float(row[6])
+        legend.y = float(row[7])
+        return legend, []
+
+    if is_textbox:
+        textbox = TextboxCard(row[1], row[2] if len(row) > 2 else '')
+        textbox.x = float(row[6])
+        textbox.y = float(row[7])
+        textbox.color = int(row[8]) if len(row) >= 9 else 0
+        return textbox, []
+
+    # A person; newer files have SSN and Email before X/Y
+    if len(row) >= 13:
+        person = Person(*row[1:8])
+        row = row[:1] + row[1:6] + row[8:]
+    else:
+        person = Person(row[1], row[2], row[3], row[4], row[5])
+    person.x = float(row[6])
+    person.y = float(row[7])
+    person.color = int(row[8]) if len(row) >= 9 else 0
+    person.files = []
+
+    attached = []
+    if len(row) >= 10 and row[9]:
+        try:
+            attached = [_attachment_ref(entry) for entry in json.loads(row[9])]
+        except (json.JSONDecodeError, TypeError, KeyError):
+            logger.warning(f"Invalid files data for person {card_id}")
+            attached = []
+    return person, attached
+
+
+def _attachment_ref(entry):
+    # Shared blobs are {"path", "name"}; older projects list a per-person archive path
+    if isinstance(entry, dict):
+        return entry['path'], entry['name']
+    return entry, os.path.basename(entry)
+
+
+def file_digest(path):
+    """SHA-256 hex digest of a file's content, or None if it cannot be read"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(COPY_CHUNK), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def unique_name(name, used):
+    """name, or name with a counter before its extension, so it is not in used (which it is added to)
+
+    used holds lowercased names, as Windows file names ignore case.
+    """
+    stem, ext = os.path.splitext(name)
+    candidate, counter = name, 1
+    while candidate.lower() in used:
+        candidate = f"{stem}_{counter}{ext}"
+        counter += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+_open_projects = []  # Attachments of the loaded projects still open, newest first
+_open_projects_lock = threading.Lock()
+
+
+class LazyAttachments(ABC):
+    """
+    Attached files of a loaded project, extracted from its file on first use
+
+    Loading only decides where each file will go; the project file stays
+    open and a file is written out when something first needs its bytes
+    (drawing a photo, reading a text file, saving). Everyone sharing a
+    blob gets the same path. Names that clash in the folder get a counter;
+    the project's own paths are never used as file paths, so a project
+    cannot write outside the folder.
+
+    Code that reads attachments goes through attachment_available and
+    local_path, which see into every project still open: cards undone
+    back from an earlier project keep working. A project is closed once
+    the board and its undo history no longer need it (release_projects). Subclasses say
+    how an entry is found and copied out of their kind of project file.
+    """
+    def __init__(self, archive_path, directory):
+        self.archive_path = archive_path
+        self.directory = directory
+        self._paths = {}    # Reference in the project -> path of its file
+        self._pending = {}  # Path -> entry of files not written out yet
+        self._used = set()
+        self._lock = threading.Lock()
+        with _open_projects_lock:
+            _open_projects.insert(0, self)
+
+    def __len__(self):
+        return len(self._paths)
+
+    @property
+    def pending(self):
+        """Number of files not extracted yet"""
+        return len(self._pending)
+
+    def path(self, ref, name):
+        """Path the file a card refers to is (or will be) extracted to; None if the project lacks it"""
+        with self._lock:
+            path = self._paths.get(ref)
+            if path is None:
+                entry = self._entry(ref)
+                if entry is None:
+                    return None
+                name = unique_name(os.path.basename(name) or os.path.basename(ref), self._used)
+                path = os.path.join(self.directory, name)
+                self._paths[ref] = path
+                self._pending[path] = entry
+            return path
+
+    def holds(self, path):
+        return path in self._pending
+
+    def blob_digest(self, path):
+        """Content hash of a file not extracted yet, if the project names it by its hash; else None"""
+        entry = self._pending.get(path)
+        digest = self._digest(entry) if entry is not None else None
+        return digest if digest and len(digest) == 64 and all(ch in HEX_DIGITS for ch in digest) else None
+
+    def fetch(self, path):
+        """Extract path if it is one of this project's files not written out yet"""
+        with self._lock:
+            entry = self._pending.get(path)
+            if entry is None:
+                return
+            # Written under another name first, so a half-written file is never taken for the whole one
+            partial = path + ".part"
+            with open(partial, 'wb') as dst:
+                modified = self._copy_out(entry, dst)
+            if modified is not None:
+                os.utime(partial, (modified, modified))
+            os.replace(partial, path)
+            del self._pending[path]
+
+    def fetch_all(self):
+        for path in list(self._pending):
+            self.fetch(path)
+
+    def close(self):
+        """Stop reading the project file; files not extracted yet are no longer available"""
+        with _open_projects_lock:
+            if self in _open_projects:
+                _open_projects.remove(self)
+        with self._lock:
+            self._pending.clear()
+            self._close_source()
+
+    # For subclasses
+
+    @abstractmethod
+    def _entry(self, ref):
+        """The project's entry for a card's reference, or None if there is none"""
+
+    def _digest(self, entry):
+        return None
+
+    @abstractmethod
+    def _copy_out(self, entry, dst):
+        """Write an entry's bytes to dst; returns its modification time, or None"""
+
+    def _close_source(self):
+        pass
+
+
+class ProjectAttachments(LazyAttachments):
+    """
+    Attached files of a loaded ZIP project, extracted from the archive on first use
+    """
+    def __init__(self, archive_path, directory):
+        self.zipf = zipfile.ZipFile(archive_path)
+        super().__init__(archive_path, directory)
+
+    def _entry(self, zip_path):
+        try:
+            return self.zipf.getinfo(zip_path)
+        except KeyError:
+            return None
+
+    def _digest(self, info):
+        return info.filename[len(BLOB_DIR):] if info.filename.startswith(BLOB_DIR) else None
+
+    def _copy_out(self, info, dst):
+        with self.zipf.open(info) as src:
+            shutil.copyfileobj(src, dst, COPY_CHUNK)
+        return time.mktime(info.date_time + (0, 0, -1))
+
+    def _close_source(self):
+        self.zipf.close()
+
+
+def attachment_available(path):
+    """True if path exists, or is an attachment of a loaded project that is not extracted yet"""
+    with _open_projects_lock:
+        projects = list(_open_projects)
+    return any(project.holds(path) for project in projects) or os.path.exists(path)
+
+
+def local_path(path):
+    """path, extracted first if it is an attachment of a loaded project that is not extracted yet"""
+    with _open_projects_lock:
+        projects = list(_open_projects)
+    for project in projects:
+        if project.holds(path):
+            project.fetch(path)
+            break
+    return path
+
+
+def content_digest(path):
+    """SHA-256 hex digest of an attachment's content, or None if it cannot be read
+
+    A file still in its project's archive as a blob is not extracted for
+    this: the blob's name is its digest.
+    """
+    with _open_projects_lock:
+        projects = list(_open_projects)
+    for project in projects:
+        digest = project.blob_digest(path)
+        if digest:
+            return digest
+    return file_digest(local_path(path))
+
+
+def release_archive(filename):
+    """Extract every file still read from the archive at filename and close it, so it can be overwritten"""
+    with _open_projects_lock:
+        projects = list(_open_projects)
+    for project in projects:
+        try:
+            same = os.path.samefile(project.archive_path, filename)
+        except OSError:
+            same = False
+        if same:
+            project.fetch_all()
+            project.close()
+
+
+def release_projects(in_store, in_history=(), keep=()):
+    """Close the loaded projects (other than those in keep) that the board no longer needs open
+
+    Files not extracted yet that a card on the board refers to (in_store)
+    are extracted first. A project with pending files the undo history can
+    bring back (in_history) stays open; extracting those on every clear
+    would undo the point of loading lazily. Returns the number closed.
+    """
+    with _open_projects_lock:
+        projects = [project for project in _open_projects if project not in keep]
+    closed = 0
+    for project in projects:
+        for path in in_store:
+            if project.holds(path):
+                project.fetch(path)
+        if any(project.holds(path) for path in in_history):
+            continue
+        project.close()
+        closed += 1
+    return closed
+
+
+def compression_for(path):
+    """ZIP_STORED if the file at path is already compressed, going by its extension or leading bytes; else ZIP_DEFLATED"""
+    if os.path.splitext(path)[1].lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(16)
+    except OSError:
+        return zipfile.ZIP_DEFLATED
+    if (head.startswith(COMPRESSED_SIGNATURES)
+            or head[4:8] == b'ftyp'                            # MP4, MOV, HEIC
+            or (head[:4] == b'RIFF' and head[8:12] == b'WEBP')):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def prepare_attachment(file_path, zip_path):
+    """(local path, ZipInfo with its compression chosen) for an attachment; runs on a worker thread
+
+    A file still in a loaded project's archive is extracted here, so the
+    writer does not wait on it.
+    """
+    file_path = local_path(file_path)  # Its bytes are needed now, if it is still in a loaded project's archive
+    info = zipfile.ZipInfo.from_file(file_path, zip_path)
+    info.compress_type = compression_for(file_path)
+    return file_path, info
+
+
+def hash_attachments(people):
+    """{path: SHA-256 hex digest} of the files attached to people, hashed on a thread pool
+
+    Files that cannot be read are left out, with a warning.
+    """
+    paths = list(dict.fromkeys(file_path for person in people.values() for file_path in person.files))
+    with ThreadPoolExecutor(HASH_WORKERS) as hashers:
+        digests = {path: digest for path, digest in zip(paths, hashers.map(content_digest, paths)) if digest}
+    for path in paths:
+        if path not in digests:
+            logger.warning(f"File not found: {path}")
+    return digests
+
+
+def write_project(filename, people, textboxes, legends, edges):
+    """Write a project archive to filename; returns the number of attached files stored
+
+    people, textboxes and legends map card ids to cards; edges yields
+    ((id1, id2), label). data.csv is written row by row into its archive
+    entry, then each distinct file content once, as a blob named by its
+    hash: those already compressed are copied in chunks as they are, the
+    others are deflated as they are copied. Worker threads get the next
+    few files ready (extracted from a loaded archive, sniffed) while one
+    is written, and zlib releases the GIL, so the two overlap. Entries go
+    through ZipFile.open, and only chunks are held, so memory and spare
+    disk do not grow with the project.
+    """
+    # Files still read from the archive about to be replaced are extracted first
+    release_archive(filename)
+    # Hash every attached file first: the CSV refers to the files by their hashes
+    digests = hash_attachments(people)
+    attachments = {}  # Archive path -> a file with that content, in the order they are written
+    for path, digest in digests.items():
+        attachments.setdefault(BLOB_DIR + digest, path)
+
+    with zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        with zipf.open(PROJECT_CSV, 'w') as raw, \
+                io.TextIOWrapper(raw, encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+
+            for person_id, person in people.items():
+                refs = [{'path': BLOB_DIR + digests[file_path], 'name': os.path.basename(file_path)}
+                        for file_path in person.files if file_path in digests]
+                files_json = json.dumps(refs) if refs else ""
+                writer.writerow([
+                    person_id, person.name, person.dob, person.alias,
+                    person.address, person.phone, person.ssn, person.email, person.x, person.y,
+                    person.color, files_json, 'person'
+                ])
+
+            for textbox_id, textbox in textboxes.items():
+                writer.writerow([
+                    textbox_id, textbox.title, textbox.content, '',
+                    '', '', textbox.x, textbox.y,
+                    textbox.color, '', 'textbox'
+                ])
+
+            for legend_id, legend in legends.items():
+                color_entries_json = json.dumps(legend.color_entries) if legend.color_entries else ""
+                writer.writerow([
+                    legend_id, legend.title, color_entries_json, '',
+                    '', '', legend.x, legend.y,
+                    0, '', 'legend'  # legends don't have a color property
+                ])
+
+            writer.writerow([CONNECTIONS_MARKER])
+            writer.writerow(CONNECTIONS_HEADER)
+            for (id1, id2), label in edges:
+                writer.writerow([id1, id2, label])
+
+        # An archive takes one entry at a time, so the files follow the CSV
+        stored = 0
+        with ThreadPoolExecutor(PREPARE_WORKERS) as pool:
+            pending = deque()
+            queued = iter(attachments.items())
+            while True:
+                while len(pending) < PREPARE_WORKERS * 2:
+                    item = next(queued, None)
+                    if item is None:
+                        break
+                    zip_path, file_path = item
+                    pending.append((file_path, pool.submit(prepare_attachment, file_path, zip_path)))
+                if not pending:
+                    break
+                file_path, future = pending.popleft()
+                try:
+                    local, info = future.result()
+                    with open(local, 'rb') as src, zipf.open(info, 'w') as dst:
+                        shutil.copyfileobj(src, dst, COPY_CHUNK)
+                    stored += 1
+                except OSError as e:
+                    logger.warning(f"File not found: {file_path} ({e})")
+    return stored
@@ -0,0 +1,325 @@
+# render_backend.py
+"""
+Render backends for drawing cards and connections.
+
+Card and connection drawing code talks to a ``RenderBackend`` instead of a
+specific toolkit, so the same drawing code can target the Tk canvas, a PIL
+image for PNG export, or an in-memory recorder that counts draw operations
+without needing a display.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Primitive operations counted as draw calls
+DRAW_OPERATIONS = ('line', 'rectangle', 'oval', 'text', 'image')
+
+
+class RenderBackend(ABC):
+    """
+    Interface implemented by all render backends.
+
+    Coordinates are in backend pixels (already multiplied by zoom). Fonts are
+    Tk-style tuples such as ("Segoe UI", 11, "bold"). Colors use '' for
+    "no fill"/"no outline" as on the Tk canvas. Every primitive returns an
+    item handle that can be passed to bbox/bind/lower/raise_item.
+    """
+    # Whether the backend can render emoji glyphs used as card icons
+    supports_emoji = True
+
+    @abstractmethod
+    def line(self, x1, y1, x2, y2, fill, width=1, tags=(), dash=None):
+        """Draw a line; returns its item handle"""
+
+    @abstractmethod
+    def rectangle(self, x1, y1, x2, y2, fill='', outline='', width=1, tags=()):
+        """Draw a rectangle; returns its item handle"""
+
+    @abstractmethod
+    def oval(self, x1, y1, x2, y2, fill='', outline='', width=1, tags=()):
+        """Draw an oval; returns its item handle"""
+
+    @abstractmethod
+    def text(self, x, y, text, font, fill, anchor='center', tags=()):
+        """Draw text anchored at (x, y); returns its item handle"""
+
+    @abstractmethod
+    def image(self, x, y, image, anchor='center', tags=()):
+        """Draw an image anchored at (x, y); returns its item handle"""
+
+    @abstractmethod
+    def measure_text(self, text, font):
+        """Return the (width, height) of text rendered in font"""
+
+    def bbox(self, item):
+        """Return the bounding box of a drawn item, or None"""
+        return None
+
+    def bind(self, item, sequence, callback):
+        """Bind an input event to a drawn item (no-op for non-interactive backends)"""
+
+    def lower(self, item, below=None):
+        """Lower an item in the stacking order (no-op where drawing order is final)"""
+
+    def raise_item(self, item, above=None):
+        """Raise an item in the stacking order (no-op where drawing order is final)"""
+
+    def move(self, item, dx, dy):
+        """Move a drawn item by an offset (no-op where drawing is final)"""
+
+    def delete(self, *items):
+        """Remove drawn items or tags in one call (no-op where drawing is final)"""
+
+    def set_state(self, item, state):
+        """Show ('normal') or hide ('hidden') drawn items or tags without deleting them (no-op where drawing is final)"""
+
+
+class TkCanvasBackend(RenderBackend):
+    """
+    Backend drawing onto a tk.Canvas
+    """
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._fonts = {}
+
+    def line(self, x1, y1, x2, y2, fill, width=1, tags=(), dash=None):
+        if dash:
+            return self.canvas.create_line(x1, y1, x2, y2, fill=fill, width=width, tags=tags, dash=dash)
+        return self.canvas.create_line(x1, y1, x2, y2, fill=fill, width=width, tags=tags)
+
+    def rectangle(self, x1, y1, x2, y2, fill='', outline='', width=1, tags=()):
+        return self.canvas.create_rectangle(x1, y1, x2, y2, fill=fill, outline=outline, width=width, tags=tags)
+
+    def oval(self, x1, y1, x2, y2, fill='', outline='', width=1, tags=()):
+        return self.canvas.create_oval(x1, y1, x2, y2, fill=fill, outline=outline, width=width, tags=tags)
+
+    def text(self, x, y, text, font, fill, anchor='center', tags=()):
+        return self.canvas.create_text(x, y, text=text, font=font, fill=fill, anchor=anchor, tags=tags)
+
+    def image(self, x, y, image, anchor='center', tags=()):
+        return self.canvas.create_image(x, y, image=image, anchor=anchor, tags=tags)
+
+    def measure_text(self, text, font):
+        from tkinter import font as tkfont
+        if font not in self._fonts:
+            family, size = font[0], font[1]
+            weight = 'bold' if 'bold' in font[2:] else 'normal'
+            slant = 'italic' if 'italic' in font[2:] else 'roman'
+            self._fonts[font] = tkfont.Font(root=self.canvas, family=family, size=size, weight=weight, slant=slant)
+        tk_font = self._fonts[font]
+        return tk_font.measure(text), tk_font.metrics('linespace')
+
+    def bbox(self, item):
+        return self.canvas.bbox(item)
+
+    def bind(self, item, sequence, callback):
+        self.canvas.tag_bind(item, sequence, callback)
+
+    def lower(self, item, below=None):
+        if below is None:
+            self.canvas.tag_lower(item)
+        else:
+            self.canvas.tag_lower(item, below)
+
+    def raise_item(self, item, above=None):
+        if above is None:
+            self.canvas.tag_raise(item)
+        else:
+            self.canvas.tag_raise(item, above)
+
+    def move(self, item, dx, dy):
+        self.canvas.move(item, dx, dy)
+
+    def delete(self, *items):
+        if items:
+            self.canvas.delete(*items)
+
+    def set_state(self, item, state):
+        self.canvas.itemconfigure(item, state=state)
+
+
+class PILBackend(RenderBackend):
+    """
+    Backend drawing onto a PIL image (used for PNG export)
+    """
+    supports_emoji = False
+
+    # Tk anchors mapped to (horizontal, vertical) offsets as fractions of the text box
+    _ANCHOR_OFFSETS = {
+        'nw': (0.0, 0.0), 'n': (0.5, 0.0), 'ne': (1.0, 0.0),
+        'w': (0.0, 0.5), 'center': (0.5, 0.5), 'e': (1.0, 0.5),
+        'sw': (0.0, 1.0), 's': (0.5, 1.0), 'se': (1.0, 1.0),
+    }
+
+    def __init__(self, image, font_file="arial.ttf"):
+        if not PIL_AVAILABLE:
+            raise RuntimeError("PIL (Pillow) is required for the PIL render backend")
+        self.target = image
+        self.draw = ImageDraw.Draw(image)
+        self.font_file = font_file
+        self._fonts = {}
+        self._items = 0
+
+    def _next_item(self):
+        self._items += 1
+        return self._items
+
+    def get_font(self, font):
+        """Resolve a Tk font tuple to a cached PIL font"""
+        size = max(1, int(font[1]))
+        key = (font[0], size)
+        if key not in self._fonts:
+            try:
+                self._fonts[key] = ImageFont.truetype(self.font_file, size)
+            except Exception:
+                try:
+                    self._fonts[key] = ImageFont.load_default(size)
+                except TypeError:
+                    # Older Pillow versions don't accept a size for the default font
+                    self._fonts[key] = ImageFont.load_default()
+        return self._fonts[key]
+
+    def line(self, x1, y1, x2, y2, fill, width=1, tags=(), dash=None):
+        self.draw.line([(x1, y1), (x2, y2)], fill=fill or None, width=max(1, int(width)))
+        return self._next_item()
+
+    def rectangle(self, x1, y1, x2, y2, fill='', outline='', width=1, tags=()):
+        self.draw.rectangle([x1, y1, x2, y2], fill=fill or None,
+                            outline=outline or None, width=max(0, int(width)) if outline else 0)
+        return self._next_item()
+
+    def oval(self, x1, y1, x2, y2, fill='', outline='', width=1, tags=()):
+        self.draw.ellipse([x1, y1, x2, y2], fill=fill or None,
+                          outline=outline or None, width=max(0, int(width)) if outline else 0)
+        return self._next_item()
+
+    def text(self, x, y, text, font, fill, anchor='center', tags=()):
+        pil_font = self.get_font(font)
+        left, top, right, bottom = self.draw.textbbox((0, 0), text, font=pil_font)
+        fx, fy = self._ANCHOR_OFFSETS.get(anchor, (0.5, 0.5))
+        origin = (x - left - fx * (right - left), y - top - fy * (bottom - top))
+        self.draw.text(origin, text, fill=fill, font=pil_font)
+        return self._next_item()
+
+    def image(self, x, y, image, anchor='center', tags=()):
+        fx, fy = self._ANCHOR_OFFSETS.get(anchor, (0.5, 0.5))
+        position = (int(x - fx * image.width), int(y - fy * image.height))
+        self.target.paste(image, position, image if image.mode == 'RGBA' else None)
+        return self._next_item()
+
+    def measure_text(self, text, font):
+        left, top, right, bottom = self.draw.textbbox((0, 0), text, font=self.get_font(font))
+        return right - left, bottom - top
+
+
+class RecordingBackend(RenderBackend):
+    """
+    In-memory backend that records draw operations.
+
+    Used by tests and benchmarks to count draw calls per frame and detect
+    rendering regressions without a display.
+    """
+    def __init__(self, supports_emoji=True):
+        self.supports_emoji = supports_emoji
+        self.operations = []  # [(op, args, kwargs)] since the last begin_frame()
+        self.frames = []      # Counter of operations for each completed frame
+        self._boxes = {}
+        self._items = 0
+
+    def _record(self, op, box, *args, **kwargs):
+        self._items += 1
+        self.operations.append((op, args, kwargs))
+        self._boxes[self._items] = box
+        return self._items
+
+    def begin_frame(self):
+        """Start counting a new frame"""
+        self.operations = []
+
+    def end_frame(self):
+        """Finish the current frame and return its operation counts"""
+        counts = self.counts()
+        self.frames.append(counts)
+        return counts
+
+    def counts(self):
+        """Return a Counter of the draw operations recorded in the current frame"""
+        return Counter(op for op, _, _ in self.operations if op in DRAW_OPERATIONS)
+
+    @property
+    def draw_calls(self):
+        return sum(self.counts().values())
+
+    def ops(self, kind):
+        """Return the recorded operations of one kind"""
+        return [(args, kwargs) for op, args, kwargs in self.operations if op == kind]
+
+    def line(self, x1, y1, x2, y2, fill, width=1, tags=(), dash=None):
+        return self._record('line', (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)),
+                            x1, y1, x2, y2, fill=fill, width=width, tags=tags, dash=dash)
+
+    def rectangle(self, x1, y1, x2, y2, fill='', outline='', width=1, tags=()):
+        return self._record('rectangle', (x1, y1, x2, y2), x1, y1, x2, y2,
+                            fill=fill, outline=outline, width=width, tags=tags)
+
+    def oval(self, x1, y1, x2, y2, fill='', outline='', width=1, tags=()):
+        return self._record('oval', (x1, y1, x2, y2), x1, y1, x2, y2,
+                            fill=fill, outline=outline, width=width, tags=tags)
+
+    def text(self, x, y, text, font, fill, anchor='center', tags=()):
+        width, height = self.measure_text(text, font)
+        fx, fy = PILBackend._ANCHOR_OFFSETS.get(anchor, (0.5, 0.5))
+        left, top = x - fx * width, y - fy * height
+        return self._record('text', (left, top, left + width, top + height), x, y,
+                            text=text, font=font, fill=fill, anchor=anchor, tags=tags)
+
+    def image(self, x, y, image, anchor='center', tags=()):
+        width = getattr(image, 'width', 0)
+        height = getattr(image, 'height', 0)
+        width = width() if callable(width) else width
+        height = height() if callable(height) else height
+        fx, fy = PILBackend._ANCHOR_OFFSETS.get(anchor, (0.5, 0.5))
+        left, top = x - fx * width, y - fy * height
+        return self._record('image', (left, top, left + width, top + height),
+                            x, y, image=image, anchor=anchor, tags=tags)
+
+    def measure_text(self, text, font):
+        # Rough average glyph metrics; good enough for layout assertions
+        size = abs(font[1]) if len(font) > 1 else 10
+        return int(len(text) * size * 0.6), int(size * 1.3)
+
+    def bbox(self, item):
+        box = self._boxes.get(item)
+        return tuple(int(v) for v in box) if box else None
+
+    def bind(self, item, sequence, callback):
+        self.operations.append(('bind', (item, sequence), {}))
+
+    def lower(self, item, below=None):
+        self.operations.append(('lower', (item, below), {}))
+
+    def raise_item(self, item, above=None):
+        self.operations.append(('raise', (item, above), {}))
+
+    def move(self, item, dx, dy):
+        self.operations.append(('move', (item, dx, dy), {}))
+        box = self._boxes.get(item)
+        if box:
+            self._boxes[item] = (box[0] + dx, box[1] + dy, box[2] + dx, box[3] + dy)
+
+    def delete(self, *items):
+        self.operations.append(('delete', items, {}))
+        for item in items:
+            self._boxes.pop(item, None)
+
+    def set_state(self, item, state):
+        self.operations.append(('set_state', (item, state), {}))
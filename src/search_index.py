@@ -0,0 +1,315 @@
+# search_index.py
+"""
+Full-text search over the cards and connection labels.
+
+An inverted index maps each lower-cased word to the cards (by id) and
+connections (by edge key) containing it. It follows the graph store's
+change events, re-indexing only the cards and edges a change touched. A
+change touching many documents at once, such as loading a project, is
+indexed a step at a time in the background, so typing in the search bar
+only ever queries the index.
+
+A query matches documents containing every query word, either exactly, as
+a prefix (so results appear while typing) or, for longer words, within one
+typo. Prefixes are found by bisecting a sorted vocabulary and typos by
+looking up the word's one-edit variants, so neither scans every card.
+"""
+
+import heapq
+import logging
+import re
+import string
+import time
+from bisect import bisect_left, insort
+from itertools import chain, islice
+
+from src.graph_store import (BATCH, CARD_ADDED, CARD_REMOVED, EDGE_ADDED, EDGE_RELABELED,
+                             EDGE_REMOVED, FIELD_CHANGED, STORE_CLEARED)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = {
+    'person': ('name', 'alias', 'address', 'phone', 'email', 'dob'),
+    'textbox': ('title', 'content'),
+    'legend': ('title',),
+}
+
+MAX_EXPANSIONS = 1000  # Vocabulary words a single prefix may expand to
+MIN_FUZZY = 4          # Shorter query words are not matched with typos
+BUILD_STEP = 2000      # Changes touching more documents are indexed in background steps
+STEP_SECONDS = 0.02    # Longest a background step may hold up the UI
+MERGE_WORDS = 64       # More new words than this are merged into the vocabulary in one sort
+
+EXACT, PREFIX, FUZZY = 3, 2, 1  # Match scores, best first
+
+_WORD = re.compile(r"\w+")
+_FUZZY_ALPHABET = string.ascii_lowercase + string.digits
+
+
+def tokenize(text):
+    return _WORD.findall(text.casefold()) if text else []
+
+
+def card_tokens(card):
+    """The set of words a card can be found by"""
+    tokens = set()
+    for field in SEARCH_FIELDS.get(card.card_type, ()):
+        tokens.update(tokenize(getattr(card, field)))
+    if card.card_type == 'person':
+        # Phone numbers are also searchable without their separators
+        digits = ''.join(ch for ch in card.phone if ch.isdigit())
+        if digits:
+            tokens.add(digits)
+    elif card.card_type == 'legend':
+        for description in card.color_entries.values():
+            tokens.update(tokenize(description))
+    return tokens
+
+
+def edit_variants(word):
+    """Every string one deletion, transposition, substitution or insertion away from word"""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    variants = {left + right[1:] for left, right in splits if right}
+    variants.update(left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1)
+    variants.update(left + ch + right[1:] for left, right in splits if right for ch in _FUZZY_ALPHABET)
+    variants.update(left + ch + right for left, right in splits for ch in _FUZZY_ALPHABET)
+    variants.discard(word)
+    return variants
+
+
+class SearchIndex:
+    """
+    Inverted index over card fields and connection labels, kept in sync with a GraphStore
+
+    schedule(callback) should run callback soon on the thread that owns the
+    store (e.g. through root.after); a change touching more than
+    BUILD_STEP documents is then indexed in steps. Without it every change
+    is indexed at once.
+    """
+    def __init__(self, store, schedule=None):
+        self.store = store
+        self._schedule = schedule
+        self._postings = {}     # {word: {card id or edge key}}
+        self._documents = {}    # {card id or edge key: frozenset(words)}
+        self._vocabulary = []   # Sorted words; may hold words whose postings emptied
+        self._stale_words = 0
+        self._waiting = {}      # {card id or edge key: None} still to be indexed, oldest first
+        self._step_scheduled = False
+        store.subscribe(self.on_store_event)
+        self._enqueue(self._all_documents())
+
+    @property
+    def pending(self):
+        """Number of cards and connections not indexed yet"""
+        return len(self._waiting)
+
+    def build(self):
+        """Index every card and labelled connection now, from scratch"""
+        self._postings.clear()
+        self._documents.clear()
+        self._vocabulary = []
+        self._stale_words = 0
+        self._waiting.clear()
+        self._index_now(self._all_documents())
+        logger.info(f"Search index built: {len(self._documents)} documents, {len(self._postings)} words")
+
+    def finish(self):
+        """Index whatever is still waiting, e.g. before a query that must see every card"""
+        if self._waiting:
+            self._index_now(list(self._waiting))
+
+    def _all_documents(self):
+        return chain(self.store, (key for key, _ in self.store.edges()))
+
+    # Store events
+
+    def on_store_event(self, event):
+        events = event.new if event.kind == BATCH else (event,)
+        if any(inner.kind == STORE_CLEARED for inner in events):
+            self._postings.clear()
+            self._documents.clear()
+            self._vocabulary = []
+            self._stale_words = 0
+            self._waiting.clear()
+            # Whatever the batch added after the clear is in the store now
+            self._enqueue(self._all_documents())
+            return
+        # Re-index each touched card and edge once, from its final state
+        touched = {}
+        for inner in events:
+            if inner.kind in (CARD_ADDED, CARD_REMOVED, FIELD_CHANGED):
+                touched[inner.card_id] = None
+            elif inner.kind in (EDGE_ADDED, EDGE_REMOVED, EDGE_RELABELED):
+                touched[inner.edge] = None
+        self._enqueue(touched)
+
+    def _enqueue(self, documents):
+        documents = list(documents)
+        if self._schedule is None or len(documents) <= BUILD_STEP:
+            # Small changes (an edit, a paste) are searchable at once, even while a build goes on
+            self._index_now(documents)
+            return
+        self._waiting.update(dict.fromkeys(documents))
+        logger.info(f"Indexing {len(self._waiting)} cards and connections in the background")
+        if not self._step_scheduled:
+            self._step_scheduled = True
+            self._schedule(self._build_step)
+
+    def _build_step(self):
+        self._step_scheduled = False
+        self._index_now(list(islice(self._waiting, BUILD_STEP)), deadline=time.perf_counter() + STEP_SECONDS)
+        if self._waiting:
+            self._step_scheduled = True
+            self._schedule(self._build_step)
+        else:
+            logger.info(f"Search index built: {len(self._documents)} documents, {len(self._postings)} words")
+
+    # Postings
+
+    def _index_now(self, documents, deadline=None):
+        new_words = []
+        for count, document in enumerate(documents):
+            if deadline is not None and count % 8 == 0 and time.perf_counter() > deadline:
+                break
+            self._waiting.pop(document, None)
+            self._reindex(document, self._tokens(document), new_words)
+        self._add_words(new_words)
+        if self._stale_words > len(self._vocabulary) // 2:
+            self._vocabulary = sorted(self._postings)
+            self._stale_words = 0
+
+    def _tokens(self, document):
+        """The words a card (by id) or connection (by edge key) is currently found by"""
+        if isinstance(document, tuple):
+            return set(tokenize(self.store.edge_label(*document, default=None)))
+        card = self.store.get(document)
+        return card_tokens(card) if card is not None else set()
+
+    def _reindex(self, document, tokens, new_words):
+        old = self._documents.pop(document, frozenset())
+        postings = self._postings
+        for token in old - tokens:
+            posting = postings[token]
+            posting.discard(document)
+            if not posting:
+                # Left in the sorted vocabulary until enough words go stale to compact it
+                del postings[token]
+                self._stale_words += 1
+        for token in tokens - old:
+            posting = postings.get(token)
+            if posting is None:
+                postings[token] = {document}
+                new_words.append(token)
+            else:
+                posting.add(document)
+        if tokens:
+            self._documents[document] = frozenset(tokens)
+
+    def _add_words(self, new_words):
+        """List words that gained postings in the sorted vocabulary, each once"""
+        vocabulary = self._vocabulary
+        fresh = set()
+        for word in new_words:
+            position = bisect_left(vocabulary, word)
+            if word in fresh or (position < len(vocabulary) and vocabulary[position] == word):
+                # Left listed when its postings emptied, and live again
+                self._stale_words -= 1
+            else:
+                fresh.add(word)
+        if len(fresh) > MERGE_WORDS:
+            # The vocabulary is one sorted run, so the sort merges in a single pass
+            vocabulary.extend(sorted(fresh))
+            vocabulary.sort()
+        else:
+            for word in fresh:
+                insort(vocabulary, word)
+
+    # Queries
+
+    def _matches(self, term, prefix, fuzzy):
+        """Return [(score, [posting sets])] for one query word, best score first
+
+        Postings are returned as they are, not merged, so a very common word
+        or prefix costs little unless its documents actually get visited.
+        """
+        postings = self._postings
+        levels = [(EXACT, [postings[term]] if term in postings else [])]
+        if prefix:
+            vocabulary = self._vocabulary
+            start = bisect_left(vocabulary, term)
+            prefixed = []
+            for word in vocabulary[start:start + MAX_EXPANSIONS]:
+                if not word.startswith(term):
+                    break
+                if word != term and word in postings:
+                    prefixed.append(postings[word])
+            levels.append((PREFIX, prefixed))
+        if fuzzy and len(term) >= MIN_FUZZY:
+            levels.append((FUZZY, [postings[variant] for variant in edit_variants(term) if variant in postings]))
+        return levels
+
+    def search(self, query, limit=50, prefix=True, fuzzy=True):
+        """Return up to limit card ids and edge keys matching every word of query, best first"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        # A lone letter only expands as a prefix while it is the word being typed
+        last = len(terms) - 1
+        matches = [self._matches(term, prefix and (len(term) > 1 or i == last), fuzzy) for i, term in enumerate(terms)]
+        # Start from the rarest word, so only its matches are ever scored
+        matches = sorted(matches,
+                         key=lambda levels: sum(len(documents) for _, group in levels for documents in group))
+        totals = {}
+        if len(matches) == 1:
+            # One word: take documents level by level and stop once there are enough
+            for score, group in matches[0]:
+                for documents in group:
+                    for document in documents:
+                        totals.setdefault(document, score)
+                        if len(totals) >= limit:
+                            break
+                    if len(totals) >= limit:
+                        break
+        else:
+            for score, group in reversed(matches[0]):
+                for documents in group:
+                    totals.update(dict.fromkeys(documents, score))
+            for levels in matches[1:]:
+                levels = [(score, self._merge(group, len(totals))) for score, group in levels]
+                narrowed = {}
+                for document, total in totals.items():
+                    for score, group in levels:
+                        if any(document in documents for documents in group):
+                            narrowed[document] = total + score
+                            break
+                totals = narrowed
+                if not totals:
+                    break
+        # Cards before connections on equal scores, then by id
+        return heapq.nsmallest(limit, totals, key=lambda document: (-totals[document], isinstance(document, tuple), document))
+
+    def documents_with(self, term, prefix=False):
+        """Set of documents containing the word term (or, with prefix, any word starting with it)"""
+        # Filters must match every card, not just those indexed so far
+        self.finish()
+        postings = self._postings
+        if not prefix:
+            return set(postings.get(term, ()))
+        vocabulary = self._vocabulary
+        group = []
+        for word in vocabulary[bisect_left(vocabulary, term):]:
+            if not word.startswith(term):
+                break
+            if word in postings:
+                group.append(postings[word])
+        return set().union(*group)
+
+    @staticmethod
+    def _merge(group, lookups):
+        """Union posting sets when that is cheaper than probing each of them for every lookup"""
+        if len(group) > 1 and lookups * len(group) > sum(len(documents) for documents in group):
+            return [set().union(*group)]
+        return group
+
+    def __len__(self):
+        return len(self._documents)
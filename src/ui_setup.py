@@ -4,6 +4,7 @@ import tkinter as tk
 from tkinter import ttk
 from src.constants import COLORS
 from src.utils import darken_color
+from src.focus import MAX_HOPS
 
 class UISetup:
     def __init__(self, app):
@@ -56,6 +57,12 @@ class UISetup:
                                foreground=COLORS['primary'], 
                                style="Modern.TLabel")
         title_label.pack(side=tk.LEFT)
+
+        # Search bar with a results list that drops down over the canvas
+        self.create_search_bar(header_frame)
+
+        # Filter bar, left of the search bar
+        self.create_filter_bar(header_frame)
         
         # Toolbar with modern buttons
         toolbar = ttk.Frame(main_container, style="Modern.TFrame")
@@ -67,7 +74,10 @@ class UISetup:
         self.create_modern_button(toolbar, "❌ Delete Selected", self.app.delete_selected, COLORS['danger'])
         self.create_modern_button(toolbar, "💾 Save Project", self.app.save_data, COLORS['accent'])
         self.create_modern_button(toolbar, "📁 Load Project", self.app.load_data, COLORS['accent'])
+        self.create_modern_button(toolbar, "📚 Library", self.app.show_library, COLORS['accent'])
         self.create_modern_button(toolbar, "🖼️ Export PNG", self.app.export_to_png, COLORS['secondary'])
+        self.create_modern_button(toolbar, "👥 Find Duplicates", self.app.find_duplicate_people, COLORS['secondary'])
+        self.create_modern_button(toolbar, "🪪 Shared Identifiers", self.app.show_shared_identifiers, COLORS['secondary'])
         self.create_modern_button(toolbar, "🔄 Check Updates", self.app.check_for_updates, COLORS['accent'])
         self.create_modern_button(toolbar, "🗑️ Clear All", self.app.clear_all, COLORS['danger'])
         
@@ -90,6 +100,7 @@ class UISetup:
         
         # Bind events
         self.app.canvas.bind("<Button-1>", self.app.events.on_canvas_click)
+        self.app.canvas.bind("<Control-Button-1>", self.app.events.on_canvas_ctrl_click)
         self.app.canvas.bind("<B1-Motion>", self.app.events.on_canvas_drag)
         self.app.canvas.bind("<ButtonRelease-1>", self.app.events.on_canvas_release)
         self.app.canvas.bind("<Button-3>", self.app.events.on_right_click)
@@ -110,6 +121,8 @@ class UISetup:
         self.app.root.bind("<Key-Delete>", self.app.events.on_delete_key)
         self.app.root.bind("<Key-BackSpace>", self.app.events.on_delete_key)
         self.app.root.bind("<Key-c>", self.app.events.on_color_cycle_key)
+        self.app.canvas.bind("<Key-f>", self.app.events.on_focus_key)
+        self.app.root.bind("<Key-f>", self.app.events.on_focus_key)
         
         # Bind clipboard operations (Ctrl+C, Ctrl+X, Ctrl+V)
         self.app.root.bind("<Control-c>", self.app.events.on_copy_key)
@@ -118,6 +131,13 @@ class UISetup:
         self.app.canvas.bind("<Control-c>", self.app.events.on_copy_key)
         self.app.canvas.bind("<Control-x>", self.app.events.on_cut_key)
         self.app.canvas.bind("<Control-v>", self.app.events.on_paste_key)
+        self.app.root.bind("<Control-a>", self.app.events.on_select_all_key)
+        self.app.root.bind("<Control-f>", self.app.events.on_find_key)
+        
+        # Bind undo/redo (Ctrl+Z, Ctrl+Y or Ctrl+Shift+Z)
+        self.app.root.bind("<Control-z>", self.app.events.on_undo_key)
+        self.app.root.bind("<Control-y>", self.app.events.on_redo_key)
+        self.app.root.bind("<Control-Z>", self.app.events.on_redo_key)
           # Modern instructions panel
         self.create_instructions_panel(main_container)
         
@@ -144,6 +164,19 @@ class UISetup:
         self.app.zoom_slider.pack(side=tk.RIGHT, padx=(0, 10))
         self.app.zoom_label = ttk.Label(self.app.status_frame, text="Zoom", style="Modern.TLabel")
         self.app.zoom_label.pack(side=tk.RIGHT)
+
+        # --- Focus hop count ---
+        self.app.focus_hops_var = tk.IntVar(value=self.app.focus.hops)
+        self.app.focus_hops_spinbox = ttk.Spinbox(
+            self.app.status_frame,
+            from_=0, to=MAX_HOPS, width=3,
+            textvariable=self.app.focus_hops_var,
+            command=self.app.events.on_focus_hops_changed,
+            state="readonly"
+        )
+        self.app.focus_hops_spinbox.pack(side=tk.RIGHT, padx=(0, 15))
+        self.app.focus_hops_label = ttk.Label(self.app.status_frame, text="Focus hops", style="Modern.TLabel")
+        self.app.focus_hops_label.pack(side=tk.RIGHT)
         
         # Bind canvas resize event
         self.app.canvas.bind('<Configure>', self.app.events.on_canvas_resize)
@@ -176,6 +209,48 @@ class UISetup:
         btn.pack(side=tk.LEFT, padx=(0, 10))
         return btn
 
+    def create_search_bar(self, parent):
+        """Create the find-as-you-type search entry and its results list"""
+        search_frame = ttk.Frame(parent, style="Modern.TFrame")
+        search_frame.pack(side=tk.RIGHT)
+        ttk.Label(search_frame, text="🔎", style="Modern.TLabel").pack(side=tk.LEFT, padx=(0, 5))
+
+        self.app.search_var = tk.StringVar()
+        self.app.search_entry = ttk.Entry(search_frame, textvariable=self.app.search_var,
+                                          width=32, style="Modern.TEntry")
+        self.app.search_entry.pack(side=tk.LEFT)
+        # Typing must not trigger the window's shortcuts (Backspace deletes cards, C cycles colors, ...)
+        entry = self.app.search_entry
+        entry.bindtags(tuple(tag for tag in entry.bindtags() if tag != str(self.app.root)))
+        self.app.search_var.trace_add("write", lambda *args: self.app.events.on_search_changed())
+        self.app.search_entry.bind("<Return>", self.app.events.on_search_enter)
+        self.app.search_entry.bind("<Down>", lambda e: self.app.events.on_search_move(1))
+        self.app.search_entry.bind("<Up>", lambda e: self.app.events.on_search_move(-1))
+        self.app.search_entry.bind("<Escape>", self.app.events.on_search_escape)
+
+        # Placed over the window below the entry while there are results
+        self.app.search_results = tk.Listbox(self.app.root, height=10, activestyle="none",
+                                             font=("Segoe UI", 9), relief=tk.FLAT,
+                                             highlightthickness=1, highlightcolor=COLORS['border'],
+                                             selectbackground=COLORS['primary'])
+        self.app.search_results.bind("<<ListboxSelect>>", self.app.events.on_search_select)
+
+    def create_filter_bar(self, parent):
+        """Create the entry for attribute filters such as color=red AND degree>5"""
+        filter_frame = ttk.Frame(parent, style="Modern.TFrame")
+        filter_frame.pack(side=tk.RIGHT, padx=(0, 20))
+        ttk.Label(filter_frame, text="🔽 Filter", style="Modern.TLabel").pack(side=tk.LEFT, padx=(0, 5))
+
+        self.app.filter_var = tk.StringVar()
+        self.app.filter_entry = ttk.Entry(filter_frame, textvariable=self.app.filter_var,
+                                          width=40, style="Modern.TEntry")
+        self.app.filter_entry.pack(side=tk.LEFT)
+        # Typing must not trigger the window's shortcuts
+        entry = self.app.filter_entry
+        entry.bindtags(tuple(tag for tag in entry.bindtags() if tag != str(self.app.root)))
+        self.app.filter_entry.bind("<Return>", self.app.events.on_filter_apply)
+        self.app.filter_entry.bind("<Escape>", self.app.events.on_filter_escape)
+
     def create_instructions_panel(self, parent):
         """Create a modern instructions panel"""
         instructions_frame = ttk.Frame(parent, style="Modern.TFrame")
@@ -186,7 +261,11 @@ class UISetup:
             "🔗 Right-click to link: first card, then target", 
             "✏️ Double-click on a card to edit information",
             "⌨️ Press 'C' to cycle selected card's color",
-            "📋 Ctrl+C to copy, Ctrl+X to cut, Ctrl+V to paste",
+            "🔎 Ctrl+F to search every card and label",
+            "🔽 Filter with e.g. color=red AND degree>5, then Enter",
+            "🎯 Press 'F' to show only the selected card's neighborhood",
+            "📋 Ctrl+click to select several cards; Ctrl+C to copy, Ctrl+X to cut, Ctrl+V to paste",
+            "↩️ Ctrl+Z to undo, Ctrl+Y to redo",
             "❌ Press Delete to remove selected card or connection",
             "🚫 Press Escape to cancel an active connection"
         ]
@@ -0,0 +1,135 @@
+# undo.py
+"""
+Undo/redo journal for the network.
+
+Records the store's change events instead of snapshots: each entry is the
+short list of events one user action produced, and undoing it applies their
+inverses through ``GraphStore.revert``. Events carry only the fields that
+changed (plus references to removed cards), so memory grows with the size
+of the edits, not the size of the network.
+"""
+
+import logging
+from collections import deque
+from contextlib import contextmanager
+
+from src.graph_store import (BATCH, CARD_ADDED, CARD_MOVED, CARD_REMOVED, FIELD_CHANGED, STORE_CLEARED,
+                             StoreEvent)
+
+logger = logging.getLogger(__name__)
+
+
+class UndoJournal:
+    """
+    Undo and redo stacks fed by store events
+    """
+    def __init__(self, app, limit=500):
+        self.app = app
+        self.store = app.store
+        self._undo = deque(maxlen=limit)  # [[events]] oldest first
+        self._redo = []
+        self._replaying = False
+        self._coalescing = False  # Whether the newest entry is a move that may still grow
+        self.store.subscribe(self.on_store_event)
+
+    def on_store_event(self, event):
+        if self._replaying:
+            return
+        events = event.new if event.kind == BATCH else [event]
+        if self._merge_move(events):
+            return
+        self._undo.append(events)
+        self._redo.clear()
+        self._coalescing = len(events) == 1 and events[0].kind == CARD_MOVED
+
+    def _merge_move(self, events):
+        """Fold consecutive moves of the same card (one drag) into a single entry"""
+        if not (self._coalescing and self._undo and len(events) == 1 and events[0].kind == CARD_MOVED):
+            return False
+        last = self._undo[-1][0]
+        if last.card_id != events[0].card_id:
+            return False
+        self._undo[-1] = [StoreEvent(CARD_MOVED, last.card_id, old=last.old, new=events[0].new)]
+        return True
+
+    def seal(self):
+        """End the current gesture so the next move starts a new entry (call when a drag ends)"""
+        self._coalescing = False
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """Revert the newest entry; returns False if there was nothing to undo"""
+        if not self._undo:
+            return False
+        events = self._undo[-1]
+        self._apply(self.store.revert, events)
+        self._redo.append(self._undo.pop())
+        return True
+
+    def redo(self):
+        """Re-apply the most recently undone entry; returns False if there was nothing to redo"""
+        if not self._redo:
+            return False
+        events = self._redo[-1]
+        self._apply(self.store.replay, events)
+        self._undo.append(self._redo.pop())
+        return True
+
+    def _apply(self, operation, events):
+        self._coalescing = False
+        self._replaying = True
+        try:
+            # One batch, so the canvas redraws once and a failure leaves the store untouched
+            with self.store.batch():
+                operation(events)
+        finally:
+            self._replaying = False
+
+    @property
+    def replaying(self):
+        """Whether the store is being changed by undo, redo or a suspended block rather than by the user"""
+        return self._replaying
+
+    @contextmanager
+    def suspended(self):
+        """Leave store changes made inside out of the history, e.g. cards paged in from a project"""
+        replaying, self._replaying = self._replaying, True
+        try:
+            yield
+        finally:
+            self._replaying = replaying
+
+    def clear(self):
+        """Forget all history, e.g. after loading a file"""
+        self._undo.clear()
+        self._redo.clear()
+        self._coalescing = False
+
+    def held_files(self):
+        """Paths of the files attached to cards (or file lists) that undo or redo can bring back"""
+        paths = set()
+        for entry in list(self._undo) + self._redo:
+            for event in entry:
+                if event.kind == CARD_ADDED:
+                    cards = (event.new,)
+                elif event.kind == CARD_REMOVED:
+                    cards = (event.old,)
+                elif event.kind == STORE_CLEARED:
+                    cards = event.old[0].values()
+                else:
+                    if event.kind == FIELD_CHANGED:
+                        for fields in (event.old, event.new):
+                            paths.update(fields.get('files') or ())
+                    continue
+                for card in cards:
+                    if getattr(card, 'card_type', None) == 'person' and card.file_count():
+                        paths.update(card.files)
+        return paths
+
+    def __len__(self):
+        return len(self._undo)
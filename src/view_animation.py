@@ -0,0 +1,388 @@
+# view_animation.py
+"""
+Animation loop for smooth pan and zoom on large boards.
+
+Zoom changes are eased towards a target over several frames and pans keep
+their momentum after the middle mouse button is released. Expensive work
+(text/image rescaling, connection redraws, grid) is deferred until motion
+settles and is then executed in time-sliced chunks so input stays responsive.
+"""
+
+import math
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Target frame interval and the share of it we allow ourselves to spend
+FRAME_INTERVAL_MS = 16
+FRAME_BUDGET_MS = 12.0
+
+# Zoom easing time constant (seconds) and snap tolerance
+ZOOM_EASE_TAU = 0.08
+ZOOM_SNAP_EPSILON = 0.002
+
+# Kinetic scrolling parameters
+PAN_FRICTION_TAU = 0.325       # Velocity decays by 1/e every 325 ms
+PAN_MIN_FLING_SPEED = 150.0    # px/s needed for a release to carry momentum
+PAN_STOP_SPEED = 20.0          # px/s below which momentum stops
+PAN_SAMPLE_WINDOW = 0.1        # Seconds of drag samples used for the velocity estimate
+
+# How long the view must be idle before deferred work starts
+SETTLE_DELAY_MS = 60
+
+
+class FrameStats:
+    """
+    Rolling frame-time statistics for the animation loop
+    """
+    def __init__(self, window=240, budget_ms=FRAME_BUDGET_MS):
+        self.budget_ms = budget_ms
+        self.samples = deque(maxlen=window)
+        self.total_frames = 0
+        self.over_budget_frames = 0
+
+    def record(self, duration_ms):
+        """Record the duration of one frame in milliseconds"""
+        self.samples.append(duration_ms)
+        self.total_frames += 1
+        if duration_ms > self.budget_ms:
+            self.over_budget_frames += 1
+
+    def reset(self):
+        self.samples.clear()
+        self.total_frames = 0
+        self.over_budget_frames = 0
+
+    @property
+    def mean_ms(self):
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    @property
+    def max_ms(self):
+        return max(self.samples) if self.samples else 0.0
+
+    def percentile(self, pct):
+        """Return the given percentile (0-100) of the recorded frame times"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(math.ceil(pct / 100.0 * len(ordered))) - 1)
+        return ordered[max(0, index)]
+
+    def snapshot(self):
+        """Return a dictionary summary suitable for logging or display"""
+        mean = self.mean_ms
+        return {
+            'frames': self.total_frames,
+            'mean_ms': round(mean, 2),
+            'p95_ms': round(self.percentile(95), 2),
+            'max_ms': round(self.max_ms, 2),
+            'fps': round(1000.0 / mean, 1) if mean > 0 else 0.0,
+            'over_budget': self.over_budget_frames,
+            'budget_ms': self.budget_ms,
+        }
+
+
+class KineticPan:
+    """
+    Tracks drag velocity and integrates momentum after release
+    """
+    def __init__(self, friction_tau=PAN_FRICTION_TAU, min_fling_speed=PAN_MIN_FLING_SPEED,
+                 stop_speed=PAN_STOP_SPEED, sample_window=PAN_SAMPLE_WINDOW):
+        self.friction_tau = friction_tau
+        self.min_fling_speed = min_fling_speed
+        self.stop_speed = stop_speed
+        self.sample_window = sample_window
+        self.samples = deque()  # (t, x, y)
+        self.vx = 0.0
+        self.vy = 0.0
+        self.active = False
+        # Sub-pixel remainder so slow glides don't stall on integer rounding
+        self._rx = 0.0
+        self._ry = 0.0
+
+    def press(self, x, y, t):
+        """Start tracking a new drag, cancelling any momentum in flight"""
+        self.stop()
+        self.samples.clear()
+        self.samples.append((t, x, y))
+
+    def drag(self, x, y, t):
+        """Record a drag sample"""
+        self.samples.append((t, x, y))
+        while len(self.samples) > 2 and t - self.samples[0][0] > self.sample_window:
+            self.samples.popleft()
+
+    def release(self, t):
+        """End the drag; returns True if the release carries momentum"""
+        self.vx = self.vy = 0.0
+        if len(self.samples) >= 2:
+            t0, x0, y0 = self.samples[0]
+            t1, x1, y1 = self.samples[-1]
+            # A pause before releasing means the user stopped the pan
+            if t - t1 <= self.sample_window and t1 > t0:
+                self.vx = (x1 - x0) / (t1 - t0)
+                self.vy = (y1 - y0) / (t1 - t0)
+        self.samples.clear()
+        self.active = math.hypot(self.vx, self.vy) >= self.min_fling_speed
+        if not self.active:
+            self.vx = self.vy = 0.0
+        return self.active
+
+    def step(self, dt):
+        """Advance the momentum by dt seconds; returns the integer (dx, dy) to pan"""
+        if not self.active or dt <= 0:
+            return 0, 0
+        # Exact integral of v*exp(-t/tau) over the step
+        decay = math.exp(-dt / self.friction_tau)
+        fx = self.vx * self.friction_tau * (1.0 - decay) + self._rx
+        fy = self.vy * self.friction_tau * (1.0 - decay) + self._ry
+        dx, dy = int(round(fx)), int(round(fy))
+        self._rx, self._ry = fx - dx, fy - dy
+        self.vx *= decay
+        self.vy *= decay
+        if math.hypot(self.vx, self.vy) < self.stop_speed:
+            self.stop()
+        return dx, dy
+
+    def stop(self):
+        self.active = False
+        self.vx = self.vy = 0.0
+        self._rx = self._ry = 0.0
+
+
+def ease_zoom(current, target, dt, tau=ZOOM_EASE_TAU, epsilon=ZOOM_SNAP_EPSILON):
+    """Move current zoom towards target with frame-rate independent exponential easing"""
+    if abs(target - current) <= epsilon:
+        return target
+    if dt <= 0:
+        return current
+    alpha = 1.0 - math.exp(-dt / tau)
+    new = current + (target - current) * alpha
+    if abs(target - new) <= epsilon:
+        return target
+    return new
+
+
+class BudgetedTaskQueue:
+    """
+    Runs generator-based tasks in slices that fit a per-frame time budget.
+
+    Each task is a generator; every ``yield`` is a point where the queue may
+    pause and hand control back to the Tk event loop.
+    """
+    def __init__(self):
+        self.tasks = deque()  # (key, generator)
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def add(self, key, task):
+        """Queue a task, replacing any pending task with the same key"""
+        self.discard(key)
+        self.tasks.append((key, task))
+
+    def discard(self, key):
+        for entry in list(self.tasks):
+            if entry[0] == key:
+                self.tasks.remove(entry)
+                entry[1].close()
+
+    def clear(self):
+        while self.tasks:
+            self.tasks.popleft()[1].close()
+
+    def run(self, budget_ms, clock=time.perf_counter):
+        """Run queued tasks until the budget is spent; returns True if work remains"""
+        deadline = clock() + budget_ms / 1000.0
+        while self.tasks:
+            key, task = self.tasks[0]
+            try:
+                next(task)
+            except StopIteration:
+                self.tasks.popleft()
+            except Exception as e:
+                logger.error(f"Deferred view task '{key}' failed: {e}")
+                self.tasks.popleft()
+            if clock() >= deadline:
+                break
+        return bool(self.tasks)
+
+
+class ViewAnimator:
+    """
+    Drives pan/zoom animation for the main canvas from a single frame loop
+    """
+    def __init__(self, app):
+        self.app = app
+        self.stats = FrameStats()
+        self.kinetic = KineticPan()
+        self.deferred = BudgetedTaskQueue()
+        self.target_zoom = None
+        self.zoom_anchor = None  # Screen (x, y) kept fixed while zooming
+        self._frame_job = None
+        self._last_frame_time = None
+        self._last_motion_time = 0.0
+        self._pan_origin = None
+
+    # --- Public API -----------------------------------------------------
+
+    @property
+    def in_motion(self):
+        return self.target_zoom is not None or self.kinetic.active or self._pan_origin is not None
+
+    def zoom_to(self, target, anchor=None):
+        """Animate the zoom towards target, keeping the screen anchor point fixed"""
+        self.target_zoom = target
+        self.zoom_anchor = anchor
+        self._mark_motion()
+        self._ensure_running()
+
+    def jump_zoom(self, zoom):
+        """Apply a zoom level immediately (e.g. from the slider) and defer the expensive work"""
+        self.target_zoom = None
+        self._apply_zoom(zoom, None)
+        self._mark_motion()
+        self._ensure_running()
+
+    def defer_until_settled(self, key, task_factory):
+        """
+        Schedule expensive work to run once motion settles.
+
+        ``task_factory`` is called when the view settles and must return a
+        generator (or an iterable) that performs the work in small steps.
+        """
+        self.deferred.add(key, self._lazy(task_factory))
+        self._ensure_running()
+
+    def pan_press(self, x, y):
+        self.kinetic.press(x, y, time.perf_counter())
+        self.app.canvas.scan_mark(x, y)
+        self._pan_origin = (x, y)
+        self._mark_motion()
+
+    def pan_drag(self, x, y):
+        if self._pan_origin is None:
+            return
+        self.kinetic.drag(x, y, time.perf_counter())
+        self.app.canvas.scan_dragto(x, y, gain=1)
+        self._mark_motion()
+
+    def pan_release(self):
+        if self._pan_origin is None:
+            return
+        self._pan_origin = None
+        self.kinetic.release(time.perf_counter())
+        self._mark_motion()
+        self._ensure_running()
+
+    def center_on(self, x, y):
+        """Scroll so the world position (x, y) is in the middle of the canvas"""
+        self.kinetic.stop()
+        canvas = self.app.canvas
+        zoom = self.app.events.last_zoom
+        width, height = self.app.fixed_canvas_width, self.app.fixed_canvas_height
+        canvas.xview_moveto(max(0.0, (x * zoom - canvas.winfo_width() / 2) / width))
+        canvas.yview_moveto(max(0.0, (y * zoom - canvas.winfo_height() / 2) / height))
+        self._mark_motion()
+
+    def stop(self):
+        """Stop all animation and cancel deferred work"""
+        self.kinetic.stop()
+        self.target_zoom = None
+        self.deferred.clear()
+        if self._frame_job:
+            self.app.root.after_cancel(self._frame_job)
+            self._frame_job = None
+        self._last_frame_time = None
+
+    def get_frame_stats(self):
+        """Return a summary of recent frame times"""
+        return self.stats.snapshot()
+
+    # --- Frame loop -------------------------------------------------------
+
+    def _lazy(self, task_factory):
+        task = task_factory()
+        if task is None:
+            return
+        yield from task
+
+    def _mark_motion(self):
+        self._last_motion_time = time.perf_counter()
+
+    def _ensure_running(self):
+        if self._frame_job is None:
+            self._last_frame_time = time.perf_counter()
+            self._frame_job = self.app.root.after(FRAME_INTERVAL_MS, self._frame)
+
+    def _frame(self):
+        self._frame_job = None
+        start = time.perf_counter()
+        dt = start - (self._last_frame_time or start)
+        self._last_frame_time = start
+        moved = False
+
+        if self.target_zoom is not None:
+            current = self.app.events.last_zoom
+            new_zoom = ease_zoom(current, self.target_zoom, dt)
+            self._apply_zoom(new_zoom, self.zoom_anchor)
+            if new_zoom == self.target_zoom:
+                self.target_zoom = None
+                self.zoom_anchor = None
+            moved = True
+
+        if self.kinetic.active:
+            dx, dy = self.kinetic.step(dt)
+            if (dx or dy) and not self._scroll_by(dx, dy):
+                # Hit the edge of the scroll region
+                self.kinetic.stop()
+            moved = True
+
+        if moved:
+            self._mark_motion()
+            self.stats.record((time.perf_counter() - start) * 1000.0)
+        elif self.deferred and not self.in_motion:
+            idle_ms = (start - self._last_motion_time) * 1000.0
+            if idle_ms >= SETTLE_DELAY_MS:
+                self.deferred.run(FRAME_BUDGET_MS)
+                if not self.deferred:
+                    logger.debug(f"View settled; frame stats: {self.stats.snapshot()}")
+
+        if self.in_motion or self.deferred:
+            self._frame_job = self.app.root.after(FRAME_INTERVAL_MS, self._frame)
+
+    def _apply_zoom(self, zoom, anchor):
+        """Cheap per-frame zoom: scale canvas items natively and keep the anchor fixed"""
+        canvas = self.app.canvas
+        prev_zoom = self.app.events.last_zoom
+        if prev_zoom == zoom:
+            return
+        scale_factor = zoom / prev_zoom
+
+        if anchor is not None:
+            ax, ay = anchor
+            cx, cy = canvas.canvasx(ax), canvas.canvasy(ay)
+        canvas.scale("all", 0, 0, scale_factor, scale_factor)
+        self.app.events.last_zoom = zoom
+        canvas.configure(scrollregion=(0, 0, self.app.fixed_canvas_width, self.app.fixed_canvas_height))
+        if anchor is not None:
+            # The point under the cursor moved from cx to cx * factor; scroll to follow it
+            self._scroll_by(-(cx * scale_factor - cx), -(cy * scale_factor - cy))
+
+        if hasattr(self.app, 'zoom_var'):
+            self.app.zoom_var.set(zoom)
+        self.app.events.schedule_zoom_refresh()
+
+    def _scroll_by(self, dx, dy):
+        """Move the content by (dx, dy) screen pixels; returns False if the view could not move"""
+        dx, dy = int(round(dx)), int(round(dy))
+        if not dx and not dy:
+            return True
+        canvas = self.app.canvas
+        before = (canvas.xview(), canvas.yview())
+        canvas.scan_mark(0, 0)
+        canvas.scan_dragto(dx, dy, gain=1)
+        return (canvas.xview(), canvas.yview()) != before
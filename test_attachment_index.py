@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test script for indexing the text of attached files
+"""
+
+import sys
+import os
+import codecs
+import json
+import shutil
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person
+from src.graph_store import GraphStore
+from src import attachment_index
+from src.attachment_index import AttachmentIndex, TextCache, decode_text, extract_text
+from src.project_io import file_digest
+import unittest
+
+class TestTextExtraction(unittest.TestCase):
+    """Test cases for sniffing encodings and stripping markup"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, name, data):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_decode(self):
+        """Test byte-order marks, BOM-less UTF-16, legacy code pages and binary data"""
+        text = "Café Müller, 12 Main St"
+        self.assertEqual(decode_text(text.encode('utf-8')), text)
+        self.assertEqual(decode_text(codecs.BOM_UTF8 + text.encode('utf-8')), text)
+        self.assertEqual(decode_text(text.encode('utf-16')), text)
+        self.assertEqual(decode_text(text.encode('utf-32')), text)
+        self.assertEqual(decode_text(text.encode('utf-16-le')), text)
+        self.assertEqual(decode_text(text.encode('utf-16-be')), text)
+        self.assertEqual(decode_text(text.encode('cp1252')), text)
+        self.assertIsNone(decode_text(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x01\x00"))
+
+    def test_formats(self):
+        """Test that markup, scripts and JSON syntax are left out"""
+        html = self.write("page.html", b"<html><head><style>.x{color:red}</style><script>var hidden=1</script></head>"
+                                       b"<body><p>Meeting at the <b>harbor</b> &amp; docks</p></body></html>")
+        self.assertEqual(extract_text(html).split(), ["Meeting", "at", "the", "harbor", "&", "docks"])
+        data = self.write("data.json", json.dumps({"contact": {"name": "Ann Lee", "calls": [5550100, None, True]}}).encode())
+        self.assertEqual(extract_text(data).split(), ["contact", "name", "Ann", "Lee", "calls", "5550100"])
+        xml = self.write("feed.xml", b"<item><title>Wire transfer</title></item>")
+        self.assertEqual(extract_text(xml).split(), ["Wire", "transfer"])
+        big = self.write("big.txt", b"start " + b"x " * 1000 + b"end")
+        self.assertEqual(extract_text(big, max_bytes=100).split()[0], "start")
+        self.assertNotIn("end", extract_text(big, max_bytes=100))
+        self.assertIsNone(extract_text(os.path.join(self.temp_dir, "missing.txt")))
+
+class TestAttachmentIndex(unittest.TestCase):
+    """Test cases for searching attached files and following edits"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.temp_dir, "cache.sqlite3")
+        self.notes = self.write("notes.txt", "Shipment arrives Tuesday at the warehouse")
+        self.page = self.write("page.html", "<p>Invoice for the <i>warehouse</i> lease</p>")
+        self.photo = self.write("photo.jpg", "not text")
+        self.store = GraphStore()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, name, text):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def make_index(self, processes=1):
+        return AttachmentIndex(self.store, cache_path=self.cache_path, processes=processes)
+
+    def test_search_and_edits(self):
+        """Test that words map to their card and file, and follow attaching, detaching and removal"""
+        index = self.make_index()
+        alice = self.store.add(Person("Alice"))
+        self.store.update(alice, files=[self.notes, self.photo])
+        bob = Person("Bob")
+        bob.files = [self.page, self.notes]
+        bob = self.store.add(bob)
+        index.extractor.wait()
+        self.assertEqual(index.pending, 0)
+        self.assertEqual(index.search("warehouse"), [(alice, self.notes), (bob, self.notes), (bob, self.page)])
+        self.assertEqual(index.search("tuesday wareh"), [(alice, self.notes), (bob, self.notes)])
+        self.assertEqual(index.search("lease"), [(bob, self.page)])
+        self.assertEqual(index.search("invoice p"), [])  # Markup is not indexed
+
+        self.store.update(bob, files=[self.page])
+        self.assertEqual(index.search("tuesday"), [(alice, self.notes)])
+        self.store.remove(alice)
+        self.assertEqual(index.search("tuesday"), [])
+        self.store.clear()
+        self.assertEqual(len(index), 0)
+
+    def test_results_for_detached_files_are_dropped(self):
+        """Test that words read from a file detached in the meantime are not indexed"""
+        index = self.make_index()
+        person = Person("Carol")
+        person.files = [self.notes]
+        carol = self.store.add(person)
+        index.extractor.wait()
+        self.store.update(carol, files=[])
+        index._apply([(carol, self.notes, {"shipment"})])  # Arriving late from the extraction thread
+        self.assertEqual(index.search("shipment"), [])
+        self.assertEqual(index.pending, 0)
+
+    def test_words_that_return_are_listed_once(self):
+        """Test that a word indexed again after its file was detached appears once in the vocabulary"""
+        index = self.make_index()
+        gus = self.store.add(Person("Gus"))
+        for _ in range(3):
+            self.store.update(gus, files=[self.notes])
+            index.extractor.wait()
+            self.store.update(gus, files=[])
+        self.store.update(gus, files=[self.notes])
+        index.extractor.wait()
+        self.assertEqual(index._vocabulary.count("shipment"), 1)
+        self.assertEqual(index.search("shipm"), [(gus, self.notes)])
+
+    def test_cache_by_content(self):
+        """Test that files already read are found by hash, even under another name or after reopening"""
+        index = self.make_index()
+        person = Person("Dave")
+        person.files = [self.notes, self.page]
+        self.store.add(person)
+        index.extractor.wait()
+        self.assertEqual((index.extractor.extracted, index.extractor.cached), (2, 0))
+
+        copy = self.write("copy of notes.txt", "Shipment arrives Tuesday at the warehouse")
+        other = self.make_index()
+        person = Person("Erin")
+        person.files = [copy]
+        erin = self.store.add(person)
+        other.extractor.wait()
+        self.assertEqual((other.extractor.extracted, other.extractor.cached), (0, 1))
+        self.assertEqual(other.search("shipment"), [(erin, copy)])
+
+        cache = TextCache(self.cache_path)
+        digest = file_digest(copy)
+        self.assertEqual(cache.get_many([digest]), {digest: {"shipment", "arrives", "tuesday", "at", "the", "warehouse"}})
+        cache.prune(max_files=1)
+        self.assertEqual(cache.get_many([file_digest(self.page)]), {})  # Least recently used goes first
+        cache.close()
+
+    def test_process_pool(self):
+        """Test that many files are read on the worker pool with the same result"""
+        paths = [self.write(f"doc{i}.txt", f"document number{i} common") for i in range(attachment_index.PARALLEL_MIN_FILES + 2)]
+        index = self.make_index(processes=2)
+        person = Person("Fay")
+        person.files = paths
+        fay = self.store.add(person)
+        index.extractor.wait()
+        self.assertEqual(index.extractor.extracted, len(paths))
+        self.assertEqual(len(index.search("common")), len(paths))
+        self.assertEqual(index.search("number3"), [(fay, paths[3])])
+
+def run_tests():
+    """Run all tests"""
+    print("Running attachment index tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared card layout engine
+Checks geometry caching and that canvas and export paint the same card bounds
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard, LegendCard
+from src.card_layout import LayoutEngine, CardPainter, wrap_text
+from src.render_backend import RecordingBackend
+from src.constants import COLORS
+import unittest
+
+class TestCardLayout(unittest.TestCase):
+    """Test cases for cached card geometry"""
+
+    def test_geometry_is_cached_until_fields_change(self):
+        """Test that geometry is reused until a layout field changes"""
+        layout = LayoutEngine()
+        person = Person("John Doe", "1990-01-01")
+        first = layout.get(1, person)
+        self.assertIs(layout.get(1, person), first)
+        person.x, person.y, person.color = 500, 300, 3  # Moving or recoloring keeps the layout
+        self.assertIs(layout.get(1, person), first)
+        person.address = "123 Main Street, Springfield"
+        second = layout.get(1, person)
+        self.assertIsNot(second, first)
+        self.assertEqual(len(second.rows), 2)
+        self.assertEqual((layout.hits, layout.misses), (2, 2))
+
+    def test_textbox_height_matches_displayed_lines(self):
+        """Test that long textboxes are sized to the lines actually shown"""
+        layout = LayoutEngine()
+        textbox = TextboxCard("Notes", "\n".join(f"line {i}" for i in range(30)))
+        geometry = layout.get(1, textbox)
+        self.assertEqual(len(geometry.lines), 8)
+        self.assertTrue(geometry.truncated)
+        self.assertEqual(geometry.height, 50 + 9 * 20)
+        self.assertEqual(wrap_text("word " * 30, width=20)[0], "word word word word")
+
+    def test_backends_share_card_bounds(self):
+        """Test that emoji and text-label backends draw the same card frames"""
+        layout = LayoutEngine()
+        cards = {1: Person("A", "1990", phone="555"), 2: TextboxCard("T", "x"), 3: LegendCard("L", {"0": "Red"})}
+        frames = []
+        texts = []
+        for supports_emoji in (True, False):
+            backend = RecordingBackend(supports_emoji=supports_emoji)
+            painter = CardPainter(backend)
+            for card_id, card in cards.items():
+                painter.paint(card_id, card, layout.get(card_id, card), zoom=0.5)
+            frames.append([args for args, kwargs in backend.ops('rectangle') if kwargs['fill'] == COLORS['surface']])
+            texts.append([kwargs['text'] for _, kwargs in backend.ops('text')])
+        self.assertEqual(len(frames[0]), 3)
+        self.assertEqual(frames[0], frames[1])
+        self.assertIn("🎂", texts[0])
+        self.assertIn("DOB:", texts[1])
+        self.assertNotIn("🎂", texts[1])
+
+def run_tests():
+    """Run all tests"""
+    print("Running card layout tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
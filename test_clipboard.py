@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the subgraph clipboard
+Checks serialization, id remapping of internal edges and batched paste
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard, LegendCard
+from src.graph_store import GraphStore, BATCH
+from src.clipboard import copy_subgraph, paste_subgraph, to_json, from_json
+import unittest
+
+class TestClipboard(unittest.TestCase):
+    """Test cases for copying and pasting subgraphs"""
+
+    def setUp(self):
+        self.store = GraphStore()
+        self.john = self.store.add(Person("John", phone="555-0123"))
+        self.jane = self.store.add(Person("Jane"))
+        self.notes = self.store.add(TextboxCard("Notes", "Met in 2020"))
+        self.outsider = self.store.add(Person("Outsider"))
+        self.store.move(self.jane, 100, 0)
+        self.store.move(self.notes, 50, 80)
+        self.store.connect(self.john, self.jane, "sister")
+        self.store.connect(self.jane, self.notes, "wrote")
+        self.store.connect(self.john, self.outsider, "knows")
+
+    def test_copy_keeps_only_internal_edges(self):
+        """Test that edges leaving the selection are dropped and empty fields omitted"""
+        data = copy_subgraph(self.store, [self.john, self.jane, self.notes])
+        self.assertEqual(len(data['cards']), 3)
+        self.assertEqual(sorted(map(tuple, data['edges'])), [(1, 2, "sister"), (2, 3, "wrote")])
+        self.assertNotIn('dob', data['cards'][0])
+        self.assertNotIn('connections', data['cards'][0])
+        self.assertEqual(data['cards'][0]['phone'], "555-0123")
+
+    def test_paste_remaps_ids_in_one_batch(self):
+        """Test that pasting through JSON creates new cards and edges in a single batch"""
+        text = to_json(copy_subgraph(self.store, [self.john, self.jane, self.notes]))
+        events = []
+        self.store.subscribe(events.append)
+        new_ids = paste_subgraph(self.store, from_json(text), 1000, 1000)
+        self.assertEqual(new_ids, [5, 6, 7])
+        self.assertEqual([event.kind for event in events], [BATCH])
+        self.assertEqual(self.store.edge_label(5, 6), "sister")
+        self.assertEqual(self.store.edge_label(6, 7), "wrote")
+        self.assertEqual(self.store.degree(5), 1)
+        self.assertEqual(self.store[7].content, "Met in 2020")
+        # The group keeps its layout, centred on the paste position
+        self.assertEqual([(self.store[i].x, self.store[i].y) for i in new_ids],
+                         [(950, 960), (1050, 960), (1000, 1040)])
+
+    def test_paste_many_cards(self):
+        """Test that a thousand-card selection round-trips"""
+        with self.store.batch():
+            ids = [self.store.add(LegendCard(f"L{i}", {"0": "Suspect"})) for i in range(1000)]
+            for id1, id2 in zip(ids, ids[1:]):
+                self.store.connect(id1, id2, "")
+        data = from_json(to_json(copy_subgraph(self.store, ids)))
+        new_ids = paste_subgraph(self.store, data, 0, 0)
+        self.assertEqual(len(new_ids), 1000)
+        self.assertEqual(self.store.edge_count(), 3 + 2 * 999)
+        self.assertEqual(self.store[new_ids[-1]].color_entries, {"0": "Suspect"})
+
+    def test_rejects_foreign_text(self):
+        """Test that clipboard text from other programs is ignored"""
+        self.assertIsNone(from_json("hello"))
+        self.assertIsNone(from_json('{"cards": []}'))
+        self.assertIsNone(from_json(None))
+
+def run_tests():
+    """Run all tests"""
+    print("Running clipboard tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script for whole-network duplicate detection and merging
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard
+from src.graph_store import GraphStore
+from src.undo import UndoJournal
+from src import dedup
+from src.dedup import (soundex, normalize_phone, normalize_dob, person_record, person_records,
+                       candidate_pairs, score_records, find_duplicates, merge_people,
+                       choose_kept, redirect_matches)
+import unittest
+
+class FakeApp:
+    def __init__(self, store):
+        self.store = store
+
+class TestNormalization(unittest.TestCase):
+    """Test cases for the normalized fields and blocking"""
+
+    def test_soundex(self):
+        """Test phonetic codes of similar-sounding names"""
+        self.assertEqual(soundex("Robert"), "R163")
+        self.assertEqual(soundex("Rupert"), "R163")
+        self.assertEqual(soundex("Ashcraft"), "A261")
+        self.assertEqual(soundex("Lee"), "L000")
+        self.assertEqual(soundex("123"), "")
+
+    def test_identifiers(self):
+        """Test that formatting differences disappear"""
+        self.assertEqual(normalize_phone("+1 (555) 010-2030"), normalize_phone("555.010.2030"))
+        self.assertEqual(normalize_phone("12-34"), "")
+        self.assertEqual(normalize_dob("03/04/1990"), "1990-03-04")
+        self.assertEqual(normalize_dob("March 4, 1990"), "1990-03-04")
+        self.assertEqual(person_record(Person("Smith, John", email=" JOHN@Example.com ")),
+                         ("john smith", "", "", "john@example.com"))
+
+    def test_candidate_pairs_share_a_block(self):
+        """Test that only people sharing a key are paired, and large blocks are windowed"""
+        records = {1: ("john smith", "", "", ""), 2: ("jon smith", "", "", ""),
+                   3: ("mary jones", "", "5550102030", ""), 4: ("maria jonas", "", "5550102030", ""),
+                   5: ("zed quill", "", "", "")}
+        self.assertEqual(candidate_pairs(records), [(1, 2), (3, 4)])
+
+        crowd = {card_id: (f"person {card_id:04d}", "1990-01-01", "", "") for card_id in range(1, 501)}
+        pairs = candidate_pairs(crowd)
+        self.assertIn((1, 2), pairs)
+        self.assertLess(len(pairs), 500 * (dedup.WINDOW + 1))
+
+class TestFindDuplicates(unittest.TestCase):
+    """Test cases for scoring and ranking likely duplicates"""
+
+    def setUp(self):
+        self.store = GraphStore()
+        self.john = self.store.add(Person("John Smith", dob="1990-03-04", phone="555-010-2030"))
+        self.jon = self.store.add(Person("Jon Smith", dob="03/04/1990", phone="(555) 010 2030"))
+        self.other_john = self.store.add(Person("John Smith", dob="1971-11-30"))
+        self.mary = self.store.add(Person("Mary Jones", email="mary@example.com"))
+        self.maria = self.store.add(Person("Mary Jones-Carter", email="MARY@example.com"))
+        self.store.add(TextboxCard("John Smith"))
+
+    def test_scores(self):
+        """Test that shared identifiers raise the score and a different birth date lowers it"""
+        records = person_records(self.store)
+        score, fields = score_records(records[self.john], records[self.jon])
+        self.assertGreater(score, 0.95)
+        self.assertEqual(fields, ('dob', 'phone'))
+        score, _ = score_records(records[self.john], records[self.other_john])
+        self.assertLessEqual(score, 0.5)
+        self.assertIsNone(score_records(records[self.john], records[self.other_john], threshold=0.8))
+
+    def test_ranked_results(self):
+        """Test the review list, best match first"""
+        found = find_duplicates(person_records(self.store), processes=1)
+        self.assertEqual([(id1, id2) for _, id1, id2, _ in found],
+                         [(self.john, self.jon), (self.mary, self.maria)])
+        self.assertGreaterEqual(found[0][0], found[1][0])
+
+    def test_process_pool(self):
+        """Test that scoring on worker processes gives the same list"""
+        old_minimum = dedup.PARALLEL_MIN_PAIRS
+        dedup.PARALLEL_MIN_PAIRS = 0
+        try:
+            records = person_records(self.store)
+            self.assertEqual(find_duplicates(records, processes=2), find_duplicates(records, processes=1))
+        finally:
+            dedup.PARALLEL_MIN_PAIRS = old_minimum
+
+class TestMergePeople(unittest.TestCase):
+    """Test cases for folding a duplicate into another person"""
+
+    def setUp(self):
+        self.store = GraphStore()
+        self.undo = UndoJournal(FakeApp(self.store))
+        self.keep = self.store.add(Person("John Smith", phone="555-0102"))
+        self.duplicate = self.store.add(Person("Jon Smith", dob="1990-03-04", phone="555 0102", email="jon@example.com"))
+        self.store.update(self.keep, files=["a.pdf"])
+        self.store.update(self.duplicate, files=["a.pdf", "b.jpg"])
+        self.friend = self.store.add(Person("Alice"))
+        self.note = self.store.add(TextboxCard("Note"))
+        self.store.connect(self.keep, self.friend, "friend")
+        self.store.connect(self.duplicate, self.friend, "coworker")
+        self.store.connect(self.duplicate, self.note, "mentioned in")
+        self.store.connect(self.keep, self.duplicate, "same person?")
+
+    def test_merge(self):
+        """Test that fields, files and connections move over and the duplicate goes"""
+        merge_people(self.store, self.keep, self.duplicate)
+        person = self.store[self.keep]
+        self.assertNotIn(self.duplicate, self.store)
+        self.assertEqual(person.phone, "555-0102")
+        self.assertEqual(person.dob, "1990-03-04")
+        self.assertEqual(person.email, "jon@example.com")
+        self.assertEqual(person.alias, "Jon Smith")
+        self.assertEqual(person.files, ["a.pdf", "b.jpg"])
+        self.assertEqual(dict(person.connections), {self.friend: "friend", self.note: "mentioned in"})
+
+    def test_merge_is_one_undo_step(self):
+        """Test that undoing a merge restores both people exactly"""
+        steps = len(self.undo)
+        merge_people(self.store, self.keep, self.duplicate)
+        self.assertEqual(len(self.undo), steps + 1)
+        self.undo.undo()
+        self.assertEqual(self.store[self.duplicate].name, "Jon Smith")
+        self.assertEqual(self.store[self.keep].files, ["a.pdf"])
+        self.assertEqual(self.store[self.keep].alias, "")
+        self.assertEqual(self.store.edge_label(self.duplicate, self.note), "mentioned in")
+        self.assertEqual(self.store.edge_label(self.keep, self.duplicate), "same person?")
+        self.assertFalse(self.store.has_edge(self.keep, self.note))
+
+    def test_review_list_after_merge(self):
+        """Test which person is kept and how the remaining pairs are redirected"""
+        # The second card has more connections and files
+        self.assertEqual(choose_kept(self.store, self.keep, self.duplicate), (self.duplicate, self.keep))
+        self.store.update(self.duplicate, files=[])
+        self.assertEqual(choose_kept(self.store, self.duplicate, self.keep), (self.keep, self.duplicate))
+        matches = [(0.9, self.keep, self.duplicate, ()), (0.85, self.duplicate, self.friend, ('dob',)),
+                   (0.8, self.keep, self.friend, ())]
+        self.assertEqual(redirect_matches(matches, self.duplicate, self.keep),
+                         [(0.85, self.keep, self.friend, ('dob',))])
+
+def run_tests():
+    """Run all tests"""
+    print("Running duplicate detection tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
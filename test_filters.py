@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for attribute filters
+Uses the recording backend to check which canvas items are hidden
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard, LegendCard
+from src.canvas_helpers import CanvasHelpers
+from src.graph_store import GraphStore
+from src.render_backend import RecordingBackend
+from src.search_index import SearchIndex
+from src.focus import FocusMode
+from src.filters import AttributeIndex, FilterMode, FilterQuery, FilterError, parse_filter
+import unittest
+
+def make_app():
+    """Build the minimal application state filters and CanvasHelpers need"""
+    store = GraphStore()
+    app = SimpleNamespace(
+        store=store, people=store.people, textboxes=store.textboxes, legends=store.legends,
+        person_widgets={}, textbox_widgets={}, legend_widgets={},
+        connection_lines={}, original_font_sizes={}, original_image_sizes={},
+        image_cache={}, scaled_image_cache={}, base_image_cache={},
+        fixed_canvas_width=400, fixed_canvas_height=400,
+    )
+    app.events = SimpleNamespace(dragging=False, connecting=False, connection_start=None, last_zoom=1.0)
+    app.root = SimpleNamespace(after_idle=lambda callback: app.idle.append(callback))
+    app.idle = []
+    app.search = SearchIndex(store)
+    app.attributes = AttributeIndex(store)
+    app.canvas_helpers = CanvasHelpers(app)
+    app.canvas_helpers.backend = RecordingBackend()
+    store.subscribe(app.canvas_helpers.on_store_event)
+    app.focus = FocusMode(app)
+    app.filter = FilterMode(app)
+    return app
+
+class TestFilterQuery(unittest.TestCase):
+    """Test cases for parsing filters and answering them from the indexes"""
+
+    def setUp(self):
+        self.app = make_app()
+        store = self.store = self.app.store
+        self.alice = store.add(Person("Alice Johnson", address="12 Main St", ssn="123-45-6789", color=1))
+        self.bob = store.add(Person("Bob Main", address="9 Main Street", color=1))
+        self.carol = store.add(Person("Carol", address="4 Oak Ave", color=2))
+        self.note = store.add(TextboxCard("Main points", "met Alice", color=1))
+        self.legend = store.add(LegendCard("Legend"))
+        for other in (self.bob, self.carol, self.note):
+            store.connect(self.alice, other, "knows")
+
+    def matches(self, text):
+        return FilterQuery(text).matches(self.store, self.app.attributes, self.app.search)
+
+    def test_parse(self):
+        """Test precedence, implicit AND, NOT and quoted values"""
+        self.assertEqual(parse_filter('type=person color=red OR NOT degree>=2'),
+                         ('or', [('and', [('compare', 'type', '=', 'person'), ('compare', 'color', '=', 1)]),
+                                 ('not', ('compare', 'degree', '>=', 2))]))
+        self.assertEqual(parse_filter('address~"Main \\"St\\""'), ('compare', 'address', '~', ['main', 'st']))
+        for text in ('', 'color=mauve', 'degree>many', 'shoe=1', 'name>3', '(type=person', 'name~""', 'type=person !'):
+            with self.assertRaises(FilterError, msg=text):
+                parse_filter(text)
+
+    def test_matches(self):
+        """Test each kind of comparison and their combinations"""
+        self.assertEqual(self.matches('color=red AND degree>0 AND address~"Main St" AND type=person'), {self.alice, self.bob})
+        self.assertEqual(self.matches('degree>2'), {self.alice})
+        self.assertEqual(self.matches('degree=0'), {self.legend})
+        self.assertEqual(self.matches('type=textbox OR name~car'), {self.note, self.carol})
+        self.assertEqual(self.matches('name="alice johnson"'), {self.alice})
+        self.assertEqual(self.matches('name!="Alice Johnson" AND type=person'), {self.bob, self.carol})
+        self.assertEqual(self.matches('text~main NOT type=person'), {self.note})
+        self.assertEqual(self.matches('title~main'), {self.note})
+        self.assertEqual(self.matches('ssn~123'), {self.alice})
+        self.assertEqual(self.matches('color!=red'), {self.carol, self.legend})
+
+    def test_attribute_index_follows_edits(self):
+        """Test that colors and degrees stay current through edits, batches and clears"""
+        self.assertEqual(self.matches('degree=1'), {self.bob, self.carol, self.note})
+        self.store.update(self.carol, color=1)
+        self.store.disconnect(self.alice, self.bob)
+        self.assertEqual(self.matches('color=red AND degree=0'), {self.bob})
+        with self.store.batch():
+            self.store.remove(self.alice)
+            new_id = self.store.add(Person("Dan", color=1))
+        self.assertEqual(self.matches('color=red AND degree=0'), {self.bob, self.carol, self.note, new_id})
+        self.store.clear()
+        self.assertEqual(self.matches('color=red'), set())
+
+class TestFilterMode(unittest.TestCase):
+    """Test cases for hiding filtered-out cards on the canvas"""
+
+    def setUp(self):
+        self.app = make_app()
+        self.store = self.app.store
+        self.backend = self.app.canvas_helpers.backend
+        with self.store.batch():
+            self.ids = [self.store.add(TextboxCard(f"Note {i}", color=1 if i < 3 else 0)) for i in range(10)]
+            for id1, id2 in zip(self.ids, self.ids[1:]):
+                self.store.connect(id1, id2, "next")
+
+    def states(self):
+        return [args for op, args, _ in self.backend.operations if op == 'set_state']
+
+    def test_hides_without_deleting(self):
+        """Test that filtering toggles item state instead of redrawing"""
+        self.backend.begin_frame()
+        self.app.filter.apply("color=red")
+        self.assertEqual(sum(self.backend.counts().values()), 0)
+        self.assertNotIn('delete', [op for op, _, _ in self.backend.operations])
+        # Most cards hidden: everything hidden by type, then the three matches shown
+        states = self.states()
+        self.assertIn(("textbox", 'hidden'), states)
+        self.assertIn(("edge", 'hidden'), states)
+        self.assertEqual({item for item, state in states if state == 'normal'},
+                         {f"textbox_{card_id}" for card_id in self.ids[:3]} |
+                         {f"edge_{self.ids[0]}_{self.ids[1]}", f"edge_{self.ids[1]}_{self.ids[2]}"})
+        self.assertFalse(self.app.canvas_helpers.is_visible(self.ids[5]))
+
+        # A small change toggles only the difference
+        self.backend.begin_frame()
+        self.app.filter.apply("color=red OR title~\"note 3\"")
+        self.assertEqual(set(self.states()), {(f"textbox_{self.ids[3]}", 'normal'),
+                                              (f"edge_{self.ids[2]}_{self.ids[3]}", 'normal'),
+                                              (f"edge_{self.ids[3]}_{self.ids[4]}", 'hidden')})
+
+        self.backend.begin_frame()
+        self.app.filter.clear()
+        self.assertIn(("textbox", 'normal'), self.states())
+        self.assertTrue(self.app.canvas_helpers.is_visible(self.ids[5]))
+
+    def test_follows_edits(self):
+        """Test that new and edited cards are filtered once the edit is over"""
+        self.app.filter.apply("color=red")
+        self.backend.begin_frame()
+        new_id = self.store.add(TextboxCard("Late", color=0))
+        self.store.update(self.ids[5], color=1)
+        self.assertEqual(len(self.app.idle), 1)  # One refresh for the whole burst
+        self.app.idle.pop()()
+        self.assertFalse(self.app.canvas_helpers.is_visible(new_id))
+        self.assertTrue(self.app.canvas_helpers.is_visible(self.ids[5]))
+        # Redrawn items of a hidden card come back hidden
+        self.store.update(self.ids[6], title="Renamed")
+        self.assertIn((f"textbox_{self.ids[6]}", 'hidden'), self.states())
+        self.store.clear()
+        self.assertFalse(self.app.filter.active)
+
+def run_tests():
+    """Run all tests"""
+    print("Running filter tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
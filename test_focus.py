@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test script for the ego-network focus mode
+Uses the recording backend to check which cards are realized
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard
+from src.canvas_helpers import CanvasHelpers
+from src.graph_store import GraphStore
+from src.render_backend import RecordingBackend
+from src.focus import FocusMode, ego_network
+from src.undo import UndoJournal
+import unittest
+
+def make_app():
+    """Build the minimal application state focus mode and CanvasHelpers need"""
+    store = GraphStore()
+    app = SimpleNamespace(
+        store=store, people=store.people, textboxes=store.textboxes, legends=store.legends,
+        person_widgets={}, textbox_widgets={}, legend_widgets={},
+        connection_lines={}, original_font_sizes={}, original_image_sizes={},
+        image_cache={}, scaled_image_cache={}, base_image_cache={},
+        fixed_canvas_width=400, fixed_canvas_height=400,
+    )
+    app.events = SimpleNamespace(dragging=False, connecting=False, connection_start=None, last_zoom=1.0)
+    app.canvas_helpers = CanvasHelpers(app)
+    app.canvas_helpers.backend = RecordingBackend()
+    store.subscribe(app.canvas_helpers.on_store_event)
+    app.undo = UndoJournal(app)
+    app.focus = FocusMode(app)
+    return app
+
+def make_chain(store, count):
+    """Connect count textbox cards in a line: 1 - 2 - 3 - ..."""
+    with store.batch():
+        ids = [store.add(TextboxCard(f"Note {i}")) for i in range(count)]
+        for id1, id2 in zip(ids, ids[1:]):
+            store.connect(id1, id2, "")
+    return ids
+
+class TestFocus(unittest.TestCase):
+    """Test cases for k-hop focus"""
+
+    def setUp(self):
+        self.app = make_app()
+        self.store = self.app.store
+        self.backend = self.app.canvas_helpers.backend
+
+    def realized(self):
+        return set(self.app.textbox_widgets) | set(self.app.person_widgets)
+
+    def test_ego_network_distances(self):
+        """Test the breadth-first search and continuing it from a smaller radius"""
+        ids = make_chain(self.store, 10)
+        self.store.connect(ids[0], ids[9], "loop")
+        distances = ego_network(self.store, ids[0], 2)
+        self.assertEqual(distances, {ids[0]: 0, ids[1]: 1, ids[9]: 1, ids[2]: 2, ids[8]: 2})
+        grown = ego_network(self.store, ids[0], 3, distances)
+        self.assertEqual(grown, ego_network(self.store, ids[0], 3))
+        self.assertEqual(len(distances), 5)
+
+    def test_focus_realizes_only_the_neighborhood(self):
+        """Test that focusing hides everything outside k hops, lines included"""
+        ids = make_chain(self.store, 200)
+        self.app.focus.focus(ids[100], hops=2)
+        self.assertEqual(self.realized(), set(ids[98:103]))
+        self.assertEqual(set(self.app.connection_lines), {(i, i + 1) for i in ids[98:102]})
+
+        # Edits outside the neighborhood are not drawn
+        self.backend.begin_frame()
+        self.store.update(ids[0], title="Far away")
+        self.store.move(ids[1], 500, 500)
+        self.assertEqual(self.backend.draw_calls, 0)
+
+        self.app.focus.clear()
+        self.assertEqual(self.realized(), set(ids))
+        self.assertEqual(len(self.app.connection_lines), 199)
+
+    def test_changing_hops_draws_only_the_difference(self):
+        """Test that growing and shrinking k touches only the cards entering or leaving"""
+        ids = make_chain(self.store, 100)
+        self.app.focus.focus(ids[50], hops=1)
+        self.backend.begin_frame()
+        self.app.focus.set_hops(3)
+        # Four new textbox cards of five rectangles each, and four new connections of two lines each
+        self.assertEqual(self.backend.counts()['rectangle'], 4 * 5)
+        self.assertEqual(self.backend.counts()['line'], 4 * 2)
+        self.assertEqual(self.realized(), set(ids[47:54]))
+
+        self.backend.begin_frame()
+        self.app.focus.set_hops(2)
+        self.assertEqual(self.backend.draw_calls, 0)
+        self.assertEqual(len(self.backend.ops('delete')), 1)
+        self.assertEqual(self.realized(), set(ids[48:53]))
+
+    def test_neighborhood_follows_connections(self):
+        """Test that linking a focused card pulls its new neighbor into view"""
+        ids = make_chain(self.store, 20)
+        stranger = self.store.add(Person("Stranger"))
+        self.app.focus.focus(ids[0], hops=1)
+        self.assertNotIn(stranger, self.realized())
+        self.store.connect(ids[0], stranger, "met")
+        self.assertIn(stranger, self.realized())
+        self.assertIn((ids[0], stranger), self.app.connection_lines)
+
+        self.store.disconnect(ids[0], stranger)
+        self.assertNotIn(stranger, self.realized())
+
+        # Removing the focused card shows everything again
+        self.store.remove(ids[0])
+        self.assertFalse(self.app.focus.active)
+        self.assertEqual(self.realized(), set(ids[1:]) | {stranger})
+
+    def test_created_cards_are_shown(self):
+        """Test that cards added or pasted while focused are drawn, and leave with the focus"""
+        ids = make_chain(self.store, 20)
+        self.app.focus.focus(ids[10], hops=1)
+        added = self.store.add(Person("New person"))
+        self.assertIn(added, self.realized())
+        with self.store.batch():
+            pasted = [self.store.add(TextboxCard(f"Pasted {i}")) for i in range(2)]
+            self.store.connect(pasted[0], pasted[1], "")
+        self.assertTrue(set(pasted) <= self.realized())
+        self.assertIn((pasted[0], pasted[1]), self.app.connection_lines)
+        self.assertEqual(self.realized(), set(ids[9:12]) | {added} | set(pasted))
+
+        # Still shown when the neighborhood changes, until the focus moves on
+        self.app.focus.set_hops(2)
+        self.assertIn(added, self.realized())
+        self.app.focus.focus(ids[0])
+        self.assertEqual(self.realized(), set(ids[0:3]))
+
+    def test_paged_and_restored_cards_stay_outside(self):
+        """Test that cards paged in or brought back by undo are drawn only inside the neighborhood"""
+        ids = make_chain(self.store, 20)
+        self.app.focus.focus(ids[10], hops=1)
+        # A page of a project database: one card joins the neighborhood, the rest are far away
+        with self.app.undo.suspended(), self.store.batch():
+            page = [self.store.add(TextboxCard(f"Paged {i}")) for i in range(50)]
+            self.store.connect(ids[10], page[0], "")
+        self.assertEqual(self.realized(), set(ids[9:12]) | {page[0]})
+
+        far = self.store.add(Person("Far away"))
+        self.store.remove(far)
+        self.app.undo.undo()
+        self.assertIn(far, self.store)
+        self.assertNotIn(far, self.realized())
+        self.assertEqual(self.realized(), set(ids[9:12]) | {page[0]})
+
+def run_tests():
+    """Run all tests"""
+    print("Running focus tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
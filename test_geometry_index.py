@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the geometry index
+Checks that the struct-of-arrays columns follow the store, with and without NumPy
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard, LegendCard
+from src.graph_store import GraphStore
+from src.card_layout import LayoutEngine
+from src.geometry_index import GeometryIndex, NUMPY_AVAILABLE
+import unittest
+
+class GeometryIndexTests:
+    """Test cases shared by the NumPy and pure Python column layouts"""
+    use_numpy = True
+
+    def setUp(self):
+        self.store = GraphStore()
+        self.layout = LayoutEngine()
+        self.index = GeometryIndex(self.store, self.layout, use_numpy=self.use_numpy)
+
+    def add(self, card, x, y):
+        card.x, card.y = x, y
+        return self.store.add(card)
+
+    def assert_matches_layout(self):
+        """Every card's indexed box equals the layout engine's box"""
+        self.assertEqual(len(self.index), len(self.store))
+        for card_id, card in self.store.items():
+            expected = self.layout.bounds(card_id, card)
+            for actual, wanted in zip(self.index.bounds(card_id), expected):
+                self.assertAlmostEqual(float(actual), wanted)
+
+    def test_follows_store_events(self):
+        """Test that adds, moves, edits and removals keep the columns in sync"""
+        first = self.add(Person("A"), 100, 100)
+        second = self.add(TextboxCard("Notes", "one"), 400, 200)
+        third = self.add(LegendCard("Legend"), 50, 600)
+        self.store.move(second, 450, 250)
+        self.store.update(second, content="one\ntwo\nthree")
+        self.assert_matches_layout()
+
+        # Removing a card moves the last slot into the hole
+        self.store.remove(first)
+        self.assertEqual(self.index.slot_of(third), 0)
+        self.assertNotIn(first, self.index)
+        self.assert_matches_layout()
+
+        self.store.clear()
+        self.assertEqual(len(self.index), 0)
+        self.assertIsNone(self.index.content_bounds())
+
+    def test_batch_and_revert(self):
+        """Test that one BATCH event and its revert leave the index consistent"""
+        batches = []
+        self.store.subscribe(batches.append)
+        with self.store.batch():
+            ids = [self.add(Person(f"P{i}"), i * 10, i * 5) for i in range(300)]
+            for card_id in ids[::3]:
+                self.store.move(card_id, 0, 0)
+            self.store.remove_many(ids[1::3])
+        self.assertEqual(len(self.index), 200)
+        self.assert_matches_layout()
+
+        with self.store.batch():
+            self.store.revert(batches[0].new)
+        self.assertEqual(len(self.index), 0)
+
+    def test_whole_board_passes(self):
+        """Test content bounds and edge endpoints against per-card results"""
+        ids = [self.add(Person(f"P{i}"), (i % 10) * 300, (i // 10) * 200) for i in range(50)]
+        for id1, id2 in zip(ids, ids[1:]):
+            self.store.connect(id1, id2, "")
+        boxes = [self.layout.bounds(card_id, self.store[card_id]) for card_id in ids]
+
+        bounds = self.index.content_bounds()
+        self.assertEqual(bounds, (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                                  max(b[2] for b in boxes), max(b[3] for b in boxes)))
+
+        edges = [key for key, _ in self.store.edges()]
+        endpoints = self.index.edge_endpoints(edges, zoom=0.5)
+        for (id1, id2), row in zip(edges, endpoints):
+            card1, card2 = self.store[id1], self.store[id2]
+            self.assertEqual([float(value) for value in row],
+                             [card1.x * 0.5, card1.y * 0.5, card2.x * 0.5, card2.y * 0.5])
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "NumPy is not installed")
+class TestGeometryIndexNumPy(GeometryIndexTests, unittest.TestCase):
+    """Test cases for the NumPy columns"""
+
+    def test_views_are_read_only(self):
+        """Test that a card's view reads through to the columns but cannot be written"""
+        card_id = self.add(Person("A"), 10, 20)
+        view = self.index.view(card_id)
+        self.assertEqual(list(view[:2]), [10.0, 20.0])
+        with self.assertRaises(ValueError):
+            view[0] = 99
+        self.store.move(card_id, 30, 40)
+        self.assertEqual(list(view[:2]), [30.0, 40.0])
+
+class TestGeometryIndexPython(GeometryIndexTests, unittest.TestCase):
+    """Test cases for the pure Python fallback"""
+    use_numpy = False
+
+def run_tests():
+    """Run all tests"""
+    print("Running geometry index tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test script for the graph store
+Checks id allocation, typed views, card removal, change events and batches
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard, LegendCard
+from src.graph_store import (GraphStore, CARD_ADDED, CARD_REMOVED, FIELD_CHANGED, CARD_MOVED,
+                             EDGE_ADDED, EDGE_REMOVED, EDGE_RELABELED, BATCH)
+import unittest
+
+class TestGraphStore(unittest.TestCase):
+    """Test cases for the unified card store"""
+
+    def setUp(self):
+        self.store = GraphStore()
+        self.person_id = self.store.add(Person("John"))
+        self.textbox_id = self.store.add(TextboxCard("Notes"))
+        self.legend_id = self.store.add(LegendCard())
+
+    def test_single_lookup_across_types(self):
+        """Test that any card resolves through one map and typed views stay in sync"""
+        self.assertEqual((self.person_id, self.textbox_id, self.legend_id), (1, 2, 3))
+        self.assertEqual(self.store.get(self.textbox_id).title, "Notes")
+        self.assertEqual(self.store.type_of(self.legend_id), 'legend')
+        self.assertIsNone(self.store.type_of(99))
+        self.assertEqual(list(self.store.people), [self.person_id])
+        self.assertEqual([card_id for card_id, _ in self.store.items('textbox')], [self.textbox_id])
+        self.assertEqual(len(self.store), 3)
+
+    def test_views_are_read_only(self):
+        """Test that cards can only be added through the store"""
+        with self.assertRaises(TypeError):
+            self.store.people[10] = Person("Jane")
+
+    def test_loaded_ids_advance_allocation(self):
+        """Test that adding a card with an explicit id reserves it"""
+        self.store.add(Person("Loaded"), 40)
+        self.assertEqual(self.store.allocate_id(), 41)
+        with self.assertRaises(ValueError):
+            self.store.add(Person("Duplicate"), 40)
+
+    def test_remove_drops_connections(self):
+        """Test that removing a card removes connections pointing at it"""
+        person = self.store[self.person_id]
+        textbox = self.store[self.textbox_id]
+        person.add_connection(self.textbox_id, "wrote")
+        textbox.add_connection(self.person_id, "wrote")
+        self.store.remove(self.textbox_id)
+        self.assertNotIn(self.textbox_id, self.store)
+        self.assertNotIn(self.textbox_id, self.store.textboxes)
+        self.assertFalse(person.has_connection(self.textbox_id))
+        self.store.clear()
+        self.assertEqual((len(self.store), self.store.allocate_id()), (0, 1))
+
+    def test_edges_stored_once(self):
+        """Test that an undirected edge is stored once and visible from both ends"""
+        self.store.connect(self.textbox_id, self.person_id, "".join(["wr", "ote"]))
+        self.store.connect(self.legend_id, self.person_id, "key")
+        self.assertEqual(dict(self.store.edges()), {(1, 2): "wrote", (1, 3): "key"})
+        self.assertIs(self.store.edge_label(1, 2), sys.intern("wrote"))
+        self.assertEqual(self.store[self.person_id].connections, {2: "wrote", 3: "key"})
+        self.assertEqual(self.store[self.legend_id].get_connection_label(self.person_id), "key")
+        self.assertEqual(sorted(self.store.neighbors(self.person_id)), [2, 3])
+        # Relabel through the card view, then disconnect from the other end
+        self.store[self.person_id].connections[2] = "edited"
+        self.assertEqual(self.store.edge_label(2, 1), "edited")
+        self.store[self.textbox_id].remove_connection(self.person_id)
+        self.assertEqual(self.store.edge_count(), 1)
+        self.assertEqual(self.store.degree(self.textbox_id), 0)
+
+    def test_detached_copies_keep_connections(self):
+        """Test that copies leave the store and re-adding restores edges to existing cards"""
+        import copy
+        self.store.connect(self.person_id, self.textbox_id, "wrote")
+        clone = copy.deepcopy(self.store[self.person_id])
+        self.assertIsNone(clone.card_id)
+        self.assertEqual(clone.connections, {2: "wrote"})
+        clone_id = self.store.add(clone)
+        self.assertEqual(self.store.edge_label(clone_id, self.textbox_id), "wrote")
+        self.assertEqual(self.store.degree(self.textbox_id), 2)
+
+    def test_change_events(self):
+        """Test that each mutation emits one typed event and no-op updates emit nothing"""
+        events = []
+        self.store.subscribe(events.append)
+        self.store.update(self.person_id, name="John", dob="1990-01-01")
+        self.store.update(self.person_id, name="John")
+        self.store.move(self.textbox_id, 10, 20)
+        self.store.connect(self.person_id, self.textbox_id, "wrote")
+        self.store.connect(self.textbox_id, self.person_id, "edited")
+        self.store.connect(self.person_id, self.legend_id)
+        self.store.remove(self.person_id)
+        kinds = [event.kind for event in events]
+        self.assertEqual(kinds, [FIELD_CHANGED, CARD_MOVED, EDGE_ADDED, EDGE_RELABELED, EDGE_ADDED, BATCH])
+        self.assertEqual((events[0].old, events[0].new), ({'dob': ""}, {'dob': "1990-01-01"}))
+        self.assertEqual((events[1].old, events[1].new), ((0, 0), (10, 20)))
+        self.assertEqual((events[3].edge, events[3].old, events[3].new), ((1, 2), "wrote", "edited"))
+        # Removing a connected card announces its edges and the card together
+        removal = events[-1].new
+        self.assertEqual([event.kind for event in removal], [EDGE_REMOVED, EDGE_REMOVED, CARD_REMOVED])
+        self.assertIsInstance(removal[-1].old, Person)
+
+    def test_filtered_subscription(self):
+        """Test that subscribers only see the event kinds they asked for"""
+        added = []
+        self.store.subscribe(added.append, kinds=(CARD_ADDED,))
+        self.store.move(self.person_id, 5, 5)
+        new_id = self.store.add(Person("Jane"))
+        self.assertEqual([(event.kind, event.card_id) for event in added], [(CARD_ADDED, new_id)])
+        self.store.unsubscribe(added.append)
+        self.store.add(Person("Jim"))
+        self.assertEqual(len(added), 1)
+
+    def test_batch_delivers_one_event(self):
+        """Test that a batch holds events back and delivers them together"""
+        events = []
+        self.store.subscribe(events.append)
+        moves = []
+        self.store.subscribe(moves.append, kinds=(CARD_MOVED,))
+        with self.store.batch():
+            new_id = self.store.add(Person("Jane"))
+            self.store.connect(new_id, self.person_id, "sister")
+            with self.store.batch():
+                self.store.move(new_id, 10, 10)
+            self.assertEqual(events, [])
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].kind, BATCH)
+        self.assertEqual([event.kind for event in events[0].new], [CARD_ADDED, EDGE_ADDED, CARD_MOVED])
+        self.assertEqual([event.kind for event in moves[0].new], [CARD_MOVED])
+
+    def test_batch_rolls_back_on_error(self):
+        """Test that an exception inside a batch reverts every change made in it"""
+        self.store.connect(self.person_id, self.textbox_id, "wrote")
+        events = []
+        self.store.subscribe(events.append)
+        with self.assertRaises(RuntimeError):
+            with self.store.batch():
+                self.store.add(TextboxCard("Temp"))
+                self.store.update(self.person_id, name="Johnny")
+                self.store.move(self.legend_id, 50, 50)
+                self.store.connect(self.person_id, self.textbox_id, "edited")
+                self.store.remove(self.textbox_id)
+                self.store.clear()
+                raise RuntimeError("import failed")
+        self.assertEqual(events, [])
+        self.assertEqual(sorted(self.store), [1, 2, 3])
+        self.assertEqual(self.store.next_id, 4)
+        self.assertEqual(self.store[self.person_id].name, "John")
+        self.assertEqual((self.store[self.legend_id].x, self.store[self.legend_id].y), (0, 0))
+        self.assertEqual(self.store.edge_label(self.person_id, self.textbox_id), "wrote")
+        self.assertEqual(self.store[self.textbox_id].connections, {1: "wrote"})
+
+def run_tests():
+    """Run all tests"""
+    print("Running graph store tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared identifier index
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard
+from src.graph_store import GraphStore
+from src.identifier_index import (IdentifierIndex, connect_shared, normalize_address, normalize_ssn,
+                                  MAX_SUGGESTED_GROUP)
+import unittest
+
+class TestIdentifierIndex(unittest.TestCase):
+    """Test cases for finding people who share a phone, email, SSN or address"""
+
+    def setUp(self):
+        self.store = GraphStore()
+        self.index = IdentifierIndex(self.store)
+        self.alice = self.store.add(Person("Alice", phone="(555) 010-2030", address="12 Main Street, Apt. 4"))
+        self.bob = self.store.add(Person("Bob", phone="555.010.2030", ssn="123-45-6789"))
+        self.carol = self.store.add(Person("Carol", address="12 main st #4", email="Carol@Example.com"))
+        self.dave = self.store.add(Person("Dave", ssn="123456789", email="carol@example.com "))
+        self.store.add(TextboxCard("Note", "555-010-2030"))
+
+    def test_normalization(self):
+        """Test that formatting differences disappear"""
+        self.assertEqual(normalize_address("12 Main Street, Apt. 4"), "12 main st apt 4")
+        self.assertEqual(normalize_address("12 main st #4"), "12 main st apt 4")
+        self.assertEqual(normalize_address("400 North Avenue"), "400 n ave")
+        self.assertEqual(normalize_ssn("123-45-6789"), "123456789")
+        self.assertEqual(normalize_ssn("12345"), "")
+
+    def test_shared_groups(self):
+        """Test that every shared identifier is found with its people"""
+        self.assertEqual(self.index.shared_groups(), {
+            ('phone', "5550102030"): {self.alice, self.bob},
+            ('address', "12 main st apt 4"): {self.alice, self.carol},
+            ('ssn', "123456789"): {self.bob, self.dave},
+            ('email', "carol@example.com"): {self.carol, self.dave},
+        })
+        self.assertEqual(self.index.people_with('phone', "+1 555 010 2030"), {self.alice, self.bob})
+
+    def test_incremental_updates(self):
+        """Test that edits, removals and clears keep the index current"""
+        self.index.ensure_built()
+        self.store.update(self.bob, phone="555-999-0000")
+        self.assertNotIn(('phone', "5550102030"), self.index.shared_groups())
+        erin = self.store.add(Person("Erin", phone="555 999 0000"))
+        self.assertEqual(self.index.people_with('phone', "5559990000"), {self.bob, erin})
+        self.store.update(self.bob, name="Robert")  # Not an identifier; nothing to re-index
+        with self.store.batch():
+            self.store.remove(erin)
+            self.store.remove(self.dave)
+        self.assertEqual(set(self.index.shared_groups()), {('address', "12 main st apt 4")})
+        self.store.clear()
+        self.assertEqual(self.index.shared_groups(), {})
+        self.store.add(Person("Frank", email="f@x.org"))
+        self.store.add(Person("Grace", email="F@X.org"))
+        self.assertEqual(len(self.index.shared_groups()), 1)
+
+    def test_suggestions_and_connect(self):
+        """Test that connecting a group removes it from the suggestions, as one undoable batch"""
+        suggestions = self.index.suggestions()
+        self.assertEqual(len(suggestions), 4)
+        self.assertIn(('phone', "5550102030", [self.alice, self.bob]), suggestions)
+
+        batches = []
+        self.store.subscribe(batches.append)
+        self.assertEqual(connect_shared(self.store, 'phone', [self.alice, self.bob]), 1)
+        self.assertEqual(self.store.edge_label(self.alice, self.bob), "Same phone")
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(len(self.index.suggestions()), 3)
+        self.assertEqual(connect_shared(self.store, 'phone', [self.alice, self.bob]), 0)
+
+        crowd = [self.store.add(Person(f"Resident {i}", address="1 Shelter Rd")) for i in range(MAX_SUGGESTED_GROUP + 1)]
+        self.assertEqual(len(self.index.shared_groups()[('address', "1 shelter rd")]), len(crowd))
+        self.assertNotIn('1 shelter rd', [value for _, value, _ in self.index.suggestions()])
+
+def run_tests():
+    """Run all tests"""
+    print("Running identifier index tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for reading project files and the cross-project library
+"""
+
+import sys
+import os
+import csv
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.project_io import CARD, CONNECTION, CSV_HEADER, CONNECTIONS_MARKER, CONNECTIONS_HEADER, read_project_csv
+from src.models import Person
+from src.project_db import write_project_db
+from src.library import ProjectLibrary, match_expression
+import unittest
+
+def project_csv(people=(), textboxes=(), connections=()):
+    """data.csv text in the format save_data writes"""
+    f = io.StringIO()
+    writer = csv.writer(f)
+    writer.writerow(CSV_HEADER)
+    for card_id, name, phone, files in people:
+        writer.writerow([card_id, name, '1990-01-01', '', '12 Main St', phone, '', '', 10, 20, 1,
+                         json.dumps(files) if files else '', 'person'])
+    for card_id, title, content in textboxes:
+        writer.writerow([card_id, title, content, '', '', '', 30, 40, 2, '', 'textbox'])
+    writer.writerow([CONNECTIONS_MARKER])
+    writer.writerow(CONNECTIONS_HEADER)
+    for row in connections:
+        writer.writerow(row)
+    return f.getvalue()
+
+def write_project(path, **cards):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr("data.csv", project_csv(**cards))
+        zipf.writestr("files/1_photo.jpg", b"not read by the library")
+
+class TestProjectCSV(unittest.TestCase):
+    """Test cases for parsing data.csv"""
+
+    def test_read_rows(self):
+        """Test that every card type and connection comes back with its fields"""
+        text = project_csv(people=[(1, "Alice Smith", "555-0100", ["files/1_photo.jpg"])],
+                           textboxes=[(2, "Case notes", "Met at the docks")],
+                           connections=[(1, 2, "wrote")])
+        rows = list(read_project_csv(io.StringIO(text, newline='')))
+        self.assertEqual([row[0] for row in rows], [CARD, CARD, CONNECTION])
+        _, card_id, person, attached = rows[0]
+        self.assertEqual((card_id, person.name, person.phone, person.x, person.y, person.color),
+                         (1, "Alice Smith", "555-0100", 10.0, 20.0, 1))
+        self.assertEqual(attached, [("files/1_photo.jpg", "1_photo.jpg")])
+        self.assertEqual(person.file_count(), 0)
+        _, card_id, textbox, attached = rows[1]
+        self.assertEqual((card_id, textbox.title, textbox.content, textbox.color, attached),
+                         (2, "Case notes", "Met at the docks", 2, []))
+        self.assertEqual(rows[2], (CONNECTION, 1, 2, "wrote"))
+
+class TestProjectLibrary(unittest.TestCase):
+    """Test cases for indexing and searching a folder of projects"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.folder = os.path.join(self.temp_dir, "projects")
+        os.makedirs(os.path.join(self.folder, "2024"))
+        self.first = os.path.join(self.folder, "harbor.zip")
+        self.second = os.path.join(self.folder, "2024", "airport.zip")
+        write_project(self.first, people=[(1, "Alice Smith", "555-010-2030", None), (2, "Bob Jones", "", None)],
+                      textboxes=[(3, "Dock notes", "Shipment arrives Tuesday")],
+                      connections=[(1, 2, "brother-in-law"), (2, 3, "")])
+        write_project(self.second, people=[(1, "Alicia Smithers", "", None)])
+        self.library = ProjectLibrary(os.path.join(self.temp_dir, "library.sqlite3"))
+
+    def tearDown(self):
+        self.library.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_search(self):
+        """Test matches across projects by word prefix, field and connection label"""
+        counts = self.library.scan(self.folder)
+        self.assertEqual((counts['added'], counts['failed']), (2, 0))
+        hits = self.library.search("smith")
+        self.assertEqual({(os.path.basename(path), card_id) for path, card_id, _, _, _ in hits},
+                         {("harbor.zip", 1), ("airport.zip", 1)})
+        self.assertEqual([hit[1:4] for hit in self.library.search("alice smi")], [(1, 'person', "Alice Smith")])
+        self.assertEqual([hit[1:3] for hit in self.library.search("tuesday")], [(3, 'textbox')])
+        self.assertEqual([hit[1:4] for hit in self.library.search("5550102030")], [(1, 'person', "Alice Smith")])
+        self.assertEqual([hit[2:4] for hit in self.library.search("brother")],
+                         [('connection', "Alice Smith — Bob Jones")])
+        self.assertEqual(self.library.search_projects("smith OR"), [])
+        self.assertEqual([(os.path.basename(path), matches) for path, matches in self.library.search_projects("s")],
+                         [("harbor.zip", 3), ("airport.zip", 1)])
+        self.assertEqual(self.library.search("  "), [])
+
+    def test_project_database(self):
+        """Test that project databases are indexed alongside archives"""
+        people = {1: Person("Dana Smith", phone="555-0199"), 2: Person("Eli Stone")}
+        path = os.path.join(self.folder, "depot.comrade")
+        write_project_db(path, people, {}, {}, [((1, 2), "partner")])
+        counts = self.library.scan(self.folder)
+        self.assertEqual((counts['added'], counts['failed']), (3, 0))
+        self.assertEqual([hit[1:4] for hit in self.library.search("dana")], [(1, 'person', "Dana Smith")])
+        self.assertEqual([(os.path.basename(hit[0]), hit[2], hit[3]) for hit in self.library.search("partner")],
+                         [("depot.comrade", 'connection', "Dana Smith — Eli Stone")])
+
+    def test_rescan_is_incremental(self):
+        """Test that only new and changed projects are read again, and removed ones are dropped"""
+        self.library.scan(self.folder)
+        self.assertEqual(self.library.scan(self.folder)['unchanged'], 2)
+
+        write_project(self.second, people=[(1, "Zed Quill", "", None)])
+        os.utime(self.second, ns=(1, 1))  # A different modification time even on coarse clocks
+        os.remove(self.first)
+        broken = os.path.join(self.folder, "broken.zip")
+        with open(broken, 'w') as f:
+            f.write("not a zip file")
+        counts = self.library.scan(self.folder)
+        self.assertEqual((counts['updated'], counts['removed'], counts['failed'], counts['unchanged']), (1, 1, 1, 0))
+        self.assertEqual(self.library.search("smith"), [])
+        self.assertEqual(len(self.library.search("quill")), 1)
+        self.assertEqual(len(self.library.projects()), 2)
+        # The unreadable file is remembered, not retried until it changes
+        self.assertEqual(self.library.scan(self.folder)['unchanged'], 2)
+
+    def test_match_expression(self):
+        """Test that query words are quoted and the last one matched as a prefix"""
+        self.assertEqual(match_expression('alice AND "bo'), '"alice" "and" "bo"*')
+        self.assertIsNone(match_expression('"*'))
+
+def run_tests():
+    """Run all tests"""
+    print("Running library tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the slotted card models
+Checks the compact storage and that serialization is unchanged
+"""
+
+import sys
+import os
+import copy
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard, LegendCard
+from src.graph_store import GraphStore
+import json
+import unittest
+
+class TestModels(unittest.TestCase):
+    """Test cases for the card models"""
+
+    def test_cards_have_no_instance_dict(self):
+        """Test that cards store their fields in slots"""
+        for card in (Person("A"), TextboxCard("T"), LegendCard()):
+            self.assertFalse(hasattr(card, '__dict__'))
+        with self.assertRaises(AttributeError):
+            Person("A").nickname = "x"
+
+    def test_containers_allocated_on_demand(self):
+        """Test that connections and files are only allocated when used"""
+        person = Person("A")
+        self.assertEqual(list(person.iter_connections()), [])
+        self.assertEqual((person.connection_count(), person.file_count()), (0, 0))
+        self.assertIsNone(person._connections)
+        self.assertFalse(person.has_connection(2))
+        person.add_connection(2, "knows")
+        self.assertEqual(person.connections, {2: "knows"})
+        person.files = []
+        person.files.append("a.txt")
+        self.assertEqual(person.files, ["a.txt"])
+
+    def test_base_position_is_optional(self):
+        """Test that base_x/base_y stay unset until a card is drawn"""
+        person = Person("A")
+        self.assertFalse(hasattr(person, 'base_x'))
+        person.base_x, person.base_y = 10, 20
+        self.assertEqual(copy.deepcopy(person).base_x, 10)
+
+    def test_person_dict_round_trip(self):
+        """Test that to_dict/from_dict are unchanged"""
+        person = Person("John", "1990", email="j@example.com", color=2)
+        person.x, person.y = 5, 6
+        person.add_connection(3, "friend")
+        person.files = ["photo.png"]
+        data = person.to_dict()
+        self.assertEqual(data['connections'], {3: "friend"})
+        self.assertEqual(data['files'], ["photo.png"])
+        restored = Person.from_dict(data)
+        self.assertEqual(restored.to_dict(), data)
+        legend = LegendCard.from_dict(LegendCard("Key", {"0": "Suspect"}).to_dict())
+        self.assertEqual(legend.color_entries, {"0": "Suspect"})
+        self.assertNotIn('color', legend.to_dict())
+
+    def test_stored_card_dict_is_a_snapshot(self):
+        """Test that to_dict of a card in a store returns a plain dict of its connections"""
+        store = GraphStore()
+        a, b = store.add(Person("A")), store.add(TextboxCard("T"))
+        store.connect(a, b, "wrote")
+        data = store[a].to_dict()
+        self.assertIs(type(data['connections']), dict)
+        self.assertEqual(json.loads(json.dumps(data))['connections'], {str(b): "wrote"})
+        data['connections'].clear()
+        self.assertTrue(store.has_edge(a, b))
+
+def run_tests():
+    """Run all tests"""
+    print("Running model tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
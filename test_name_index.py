@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the similar-name index
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard
+from src.graph_store import GraphStore
+from src.name_index import NameIndex, NUMPY_AVAILABLE
+from src.utils import find_similar_names
+import unittest
+
+NAMES = ["Alice Johnson", "Alicia Jonson", "Bob Stone", "Robert Stone", "Carol White",
+         "Karol Whyte", "Dave", "Eve Adams", "Jon Smith", "John Smith", "  "]
+QUERIES = ["alice johnson", "Alise Johnsen", "bob stones", "Carl White", "Dav", "John Smyth",
+           "Zebediah Quill", "eve adam", "", "Robert"]
+
+class TestNameIndex(unittest.TestCase):
+    """Test cases for finding the most similar person name"""
+
+    def make_index(self, use_numpy):
+        store = GraphStore()
+        for name in NAMES:
+            store.add(Person(name))
+        store.add(TextboxCard("Alice Johnson"))
+        return store, NameIndex(store, use_numpy=use_numpy)
+
+    def check_matches_linear_scan(self, use_numpy):
+        store, index = self.make_index(use_numpy)
+        names = [person.name for person in store.people.values()]
+        for query in QUERIES:
+            card_id = index.find_similar(query)
+            found = None if card_id is None else store[card_id].name.strip().lower()
+            self.assertEqual(found, find_similar_names(query, names), query)
+
+    def test_matches_linear_scan(self):
+        """Test that the index gives the same answer as find_similar_names"""
+        self.check_matches_linear_scan(use_numpy=False)
+        if NUMPY_AVAILABLE:
+            self.check_matches_linear_scan(use_numpy=True)
+
+    def test_ties_go_to_the_earliest_name(self):
+        """Test that equally similar names resolve to the one added first"""
+        for use_numpy in (False, NUMPY_AVAILABLE):
+            store = GraphStore()
+            first = store.add(Person("Anna Berg"))
+            store.add(Person("Anna Berg"))
+            store.add(Person("Anne Berg"))
+            index = NameIndex(store, use_numpy=use_numpy)
+            self.assertEqual(index.find_similar("anna berg"), first)
+            self.assertEqual(store[index.find_similar("Anny Berg")].name, "Anna Berg")
+
+    def test_incremental_updates(self):
+        """Test that adds, renames, removals and clears keep the index current"""
+        for use_numpy in (False, NUMPY_AVAILABLE):
+            store, index = self.make_index(use_numpy)
+            self.assertEqual(len(index), len(NAMES) - 1)
+            added = store.add(Person("Zebediah Quill"))
+            self.assertEqual(index.find_similar("Zebedia Quill"), added)
+
+            bob = next(card_id for card_id, person in store.items('person') if person.name == "Bob Stone")
+            store.update(bob, name="Mallory Grey")
+            self.assertEqual(index.find_similar("Malory Grey"), bob)
+            self.assertNotEqual(index.find_similar("Bob Stone"), bob)
+
+            with store.batch():
+                store.remove(added)
+                store.remove(bob)
+            self.assertIsNone(index.find_similar("Zebediah Quill"))
+            self.assertIsNone(index.find_similar("Mallory Grey"))
+
+            store.clear()
+            self.assertIsNone(index.find_similar("Alice Johnson"))
+            carol = store.add(Person("Carol"))
+            self.assertEqual(index.find_similar("carol"), carol)
+
+    def test_blank_name_filled_in_later(self):
+        """Test that a person saved without a name is indexed once named, and dropped when blanked"""
+        for use_numpy in (False, NUMPY_AVAILABLE):
+            store, index = self.make_index(use_numpy)
+            index.ensure_built()
+            blank = next(card_id for card_id, person in store.items('person') if not person.name.strip())
+            store.update(blank, name="Quentin Blake")
+            self.assertEqual(index.find_similar("Quentin Blak"), blank)
+            self.assertEqual(len(index), len(NAMES))
+            store.update(blank, name="")
+            self.assertNotEqual(index.find_similar("Quentin Blake"), blank)
+            self.assertEqual(len(index), len(NAMES) - 1)
+
+    def test_grows_past_initial_capacity(self):
+        """Test adding more names than the preallocated rows and columns"""
+        store = GraphStore()
+        index = NameIndex(store)
+        index.ensure_built()
+        ids = [store.add(Person(f"Person {i} {chr(0x400 + i % 64)}")) for i in range(1500)]
+        self.assertEqual(len(index), 1500)
+        self.assertEqual(index.find_similar(f"Person 1499 {chr(0x400 + 1499 % 64)}"), ids[-1])
+
+def run_tests():
+    """Run all tests"""
+    print("Running name index tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
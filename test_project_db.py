@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test script for SQLite project databases
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import zipfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard, LegendCard
+from src.project_io import (CARD, CONNECTION, attachment_available, local_path, open_project_csv,
+                            read_project_csv, write_project)
+from src.project_db import DatabaseAttachments, ProjectDatabase, convert_project, write_project_db
+import unittest
+
+class TestProjectDatabase(unittest.TestCase):
+    """Test cases for writing, paging through and converting project databases"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "case.comrade")
+        self.photo = os.path.join(self.temp_dir, "photo.jpg")
+        with open(self.photo, 'wb') as f:
+            f.write(b"\xff\xd8\xff" + os.urandom(3000))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def make_project(self):
+        """A person with a photo at each corner of a grid, a note and a legend, connected in a row"""
+        people = {}
+        for card_id in range(1, 10):
+            person = Person(f"Person {card_id}", phone=f"555-010{card_id}", color=card_id % 3)
+            person.x, person.y = (card_id - 1) % 3 * 1000, (card_id - 1) // 3 * 1000
+            if card_id in (1, 9):
+                person.files = [self.photo]
+            people[card_id] = person
+        note = TextboxCard("Case notes", "Met at the docks\nsecond line", color=2)
+        note.x, note.y = 50, 60
+        legend = LegendCard("Key", {"1": "Suspect", "2": "Witness"})
+        legend.x, legend.y = 2000, 2000
+        edges = [((card_id, card_id + 1), f"knows {card_id}") for card_id in range(1, 9)] + [((1, 10), "wrote")]
+        return people, {10: note}, {11: legend}, edges
+
+    def write(self, view=(0, 0)):
+        people, textboxes, legends, edges = self.make_project()
+        return write_project_db(self.path, people, textboxes, legends, edges, view)
+
+    def test_round_trip(self):
+        """Test that every card, connection and attachment reads back as it was written"""
+        self.assertEqual(self.write(), 1)
+        with ProjectDatabase(self.path) as project:
+            self.assertEqual(project.counts(), {'people': 9, 'textboxes': 1, 'legends': 1, 'edges': 9, 'blobs': 1})
+            self.assertEqual((project.max_id, project.view), (11, (0, 0)))
+            rows = list(project.rows())
+
+        cards = {row[1]: row for row in rows if row[0] == CARD}
+        self.assertEqual(len(cards), 11)
+        _, _, person, attached = cards[5]
+        self.assertEqual((person.name, person.phone, person.color, person.x, person.y),
+                         ("Person 5", "555-0105", 2, 1000, 1000))
+        self.assertEqual(len(cards[1][3]), 1)
+        self.assertEqual(cards[1][3][0][1], "photo.jpg")
+        self.assertEqual((cards[10][2].title, cards[10][2].content, cards[10][2].color),
+                         ("Case notes", "Met at the docks\nsecond line", 2))
+        self.assertEqual(cards[11][2].color_entries, {"1": "Suspect", "2": "Witness"})
+        connections = [row for row in rows if row[0] == CONNECTION]
+        self.assertEqual(len(connections), 9)
+        self.assertIn((CONNECTION, 1, 10, "wrote"), connections)
+
+    def test_region_and_pages(self):
+        """Test that the R-tree finds the cards of a region and the pages skip them"""
+        self.write()
+        with ProjectDatabase(self.path) as project:
+            first = project.cards_in(-100, -100, 1100, 1100)
+            self.assertEqual(sorted(row[1] for row in first), [1, 2, 4, 5, 10])
+            self.assertEqual(sorted(row[1:3] for row in project.edges_in(-100, -100, 1100, 1100)),
+                             [(1, 2), (1, 10), (4, 5)])
+            pages = list(project.pages(skip={row[1] for row in first}, size=2))
+
+        card_ids = [row[1] for page in pages for row in page if row[0] == CARD]
+        self.assertEqual(sorted(card_ids), [3, 6, 7, 8, 9, 11])
+        self.assertTrue(all(sum(1 for row in page if row[0] == CARD) <= 2 for page in pages))
+        # The connections inside the first region came with it; the rest come with their second card
+        connections = [row[1:3] for page in pages for row in page if row[0] == CONNECTION]
+        self.assertEqual(sorted(connections), [(2, 3), (3, 4), (5, 6), (6, 7), (7, 8), (8, 9)])
+
+    def test_edges_of(self):
+        """Test that the connections of a set of cards are found by either end, each once"""
+        self.write()
+        with ProjectDatabase(self.path) as project:
+            self.assertEqual(sorted(row[1:3] for row in project.edges_of([1, 2])), [(1, 2), (1, 10), (2, 3)])
+            self.assertEqual(sorted(row[1:] for row in project.edges_of([10])), [(1, 10, "wrote")])
+            self.assertEqual(len(project.edges_of(range(1, 2000))), 9)  # More ids than one query binds
+            self.assertEqual(project.edges_of([11]), [])
+
+    def test_pages_bring_connections_with_cards(self):
+        """Test that every connection between the cards paged in so far is there after each page"""
+        edges = self.make_project()[3]
+        self.write()
+        with ProjectDatabase(self.path) as project:
+            loaded, connections = set(), set()
+            for page in project.pages(size=3):
+                cards = [row[1] for row in page if row[0] == CARD]
+                for row in page[len(cards):]:
+                    self.assertEqual(row[0], CONNECTION)  # Connections follow the page's cards
+                loaded.update(cards)
+                connections.update(row[1:3] for row in page if row[0] == CONNECTION)
+                self.assertEqual(connections, {pair for pair, _ in edges if set(pair) <= loaded})
+        self.assertEqual(len(loaded), 11)
+
+    def test_attachments(self):
+        """Test that attachments stay in the database until read"""
+        self.write()
+        with ProjectDatabase(self.path) as project:
+            digest, name = project.cards_in(-1, -1, 1, 1)[0][3][0]
+        out = os.path.join(self.temp_dir, "loaded")
+        os.makedirs(out)
+        files = DatabaseAttachments(self.path, out)
+        self.addCleanup(files.close)
+
+        path = files.path(digest, name)
+        self.assertIsNone(files.path("0" * 64, "missing.jpg"))
+        self.assertEqual(os.listdir(out), [])
+        self.assertTrue(attachment_available(path))
+        with open(local_path(path), 'rb') as f, open(self.photo, 'rb') as original:
+            self.assertEqual(f.read(), original.read())
+
+    def test_convert(self):
+        """Test that a project survives a trip from ZIP to database and back"""
+        people, textboxes, legends, edges = self.make_project()
+        archive = os.path.join(self.temp_dir, "case.zip")
+        write_project(archive, people, textboxes, legends, edges)
+
+        self.assertEqual(convert_project(archive, self.path), 1)
+        exported = os.path.join(self.temp_dir, "exported.zip")
+        self.assertEqual(convert_project(self.path, exported), 1)
+
+        with ProjectDatabase(self.path) as project:
+            self.assertEqual(project.counts()['people'], 9)
+        with zipfile.ZipFile(archive) as before, zipfile.ZipFile(exported) as after:
+            self.assertEqual(sorted(before.namelist()), sorted(after.namelist()))
+            self.assertEqual(self.read_zip(before), self.read_zip(after))
+
+    def read_zip(self, zipf):
+        """Cards in order and connections in any order, as read from an archive"""
+        with open_project_csv(zipf) as f:
+            rows = list(read_project_csv(f))
+        return ([(row[1], row[2].to_dict(), row[3]) for row in rows if row[0] == CARD],
+                sorted(row for row in rows if row[0] == CONNECTION))
+
+    def test_invalid_file(self):
+        """Test that a file that is not a project database is refused"""
+        with open(self.path, 'wb') as f:
+            f.write(b"not a database" * 100)
+        with self.assertRaises(ValueError):
+            ProjectDatabase(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Test script for saving project archives
+"""
+
+import sys
+import os
+import hashlib
+import shutil
+import tempfile
+import zipfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard, LegendCard
+from src.graph_store import GraphStore
+from src.clipboard import clipboard_files, copy_subgraph, paste_subgraph
+from src.project_io import (CARD, CONNECTION, ProjectAttachments, attachment_available, compression_for,
+                            content_digest, local_path, open_project_csv, read_project_csv, release_projects,
+                            unique_name, write_project)
+import unittest
+
+class TestWriteProject(unittest.TestCase):
+    """Test cases for writing a project straight into its archive"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.archive = os.path.join(self.temp_dir, "case.zip")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def attach(self, name, data):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def blob(self, path):
+        with open(path, 'rb') as f:
+            return "blobs/" + hashlib.sha256(f.read()).hexdigest()
+
+    def open_attachments(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        files = ProjectAttachments(self.archive, directory)
+        self.addCleanup(files.close)
+        return files
+
+    def read_back(self):
+        with zipfile.ZipFile(self.archive) as zipf, open_project_csv(zipf) as f:
+            return list(read_project_csv(f)), zipf.namelist()
+
+    def test_round_trip(self):
+        """Test that cards, connections and attachments read back as they were saved"""
+        photo = self.attach("photo.jpg", os.urandom(3 * 1024 * 1024))
+        alice = Person("Alice Smith", "1990-01-01", "Al", "12 Main St", "555-0100", "123-45-6789", "a@example.com")
+        alice.x, alice.y, alice.color = 10, 20, 1
+        alice.files = [photo, os.path.join(self.temp_dir, "deleted.txt")]
+        notes = TextboxCard("Case notes", "Met at the docks, \"late\"\nsecond line")
+        legend = LegendCard("Key", {"red": "Suspect"})
+
+        stored = write_project(self.archive, {1: alice}, {2: notes}, {3: legend}, [((1, 2), "wrote")])
+
+        self.assertEqual(stored, 1)
+        rows, names = self.read_back()
+        self.assertEqual([row[0] for row in rows], [CARD, CARD, CARD, CONNECTION])
+        _, card_id, person, attached = rows[0]
+        self.assertEqual((card_id, person.name, person.ssn, person.email, person.x, person.color),
+                         (1, "Alice Smith", "123-45-6789", "a@example.com", 10.0, 1))
+        self.assertEqual(attached, [(self.blob(photo), "photo.jpg")])  # The missing file is left out
+        self.assertEqual(rows[1][2].content, notes.content)
+        self.assertEqual(rows[2][2].color_entries, {"red": "Suspect"})
+        self.assertEqual(rows[3], (CONNECTION, 1, 2, "wrote"))
+        with zipfile.ZipFile(self.archive) as zipf, open(photo, 'rb') as f:
+            self.assertEqual(zipf.read(self.blob(photo)), f.read())
+        self.assertEqual(names, ["data.csv", self.blob(photo)])
+
+    def test_shared_content(self):
+        """Test that a file's content is stored once however many people or copies refer to it"""
+        evidence = self.attach("evidence.pdf", b"%PDF same bytes")
+        copy = self.attach("copy of evidence.pdf", b"%PDF same bytes")
+        os.makedirs(os.path.join(self.temp_dir, "other"))
+        other = self.attach(os.path.join("other", "evidence.pdf"), b"%PDF other bytes")
+        alice, bob, carol = Person("Alice"), Person("Bob"), Person("Carol")
+        alice.files = [evidence, other]
+        bob.files = [evidence]
+        carol.files = [copy]
+
+        stored = write_project(self.archive, {1: alice, 2: bob, 3: carol}, {}, {}, [])
+
+        self.assertEqual(stored, 2)
+        rows, names = self.read_back()
+        self.assertEqual(names, ["data.csv", self.blob(evidence), self.blob(other)])
+        self.assertEqual(rows[0][3], [(self.blob(evidence), "evidence.pdf"), (self.blob(other), "evidence.pdf")])
+        self.assertEqual(rows[1][3], [(self.blob(evidence), "evidence.pdf")])
+        self.assertEqual(rows[2][3], [(self.blob(evidence), "copy of evidence.pdf")])
+
+    def test_extracted_on_first_use(self):
+        """Test that attachments stay in the archive until read, once each, with clashing names kept apart"""
+        evidence = self.attach("evidence.pdf", b"%PDF same bytes")
+        os.makedirs(os.path.join(self.temp_dir, "other"))
+        other = self.attach(os.path.join("other", "Evidence.pdf"), b"%PDF other bytes")
+        alice, bob = Person("Alice"), Person("Bob")
+        alice.files = [evidence, other]
+        bob.files = [evidence]
+        write_project(self.archive, {1: alice, 2: bob}, {}, {}, [])
+        rows, _ = self.read_back()
+        out = os.path.join(self.temp_dir, "loaded")
+
+        files = self.open_attachments(out)
+        loaded = [[files.path(*ref) for ref in row[3]] for row in rows]
+        self.assertIsNone(files.path("blobs/missing", "gone.txt"))
+
+        self.assertEqual(loaded, [[os.path.join(out, "evidence.pdf"), os.path.join(out, "Evidence_1.pdf")],
+                                  [os.path.join(out, "evidence.pdf")]])
+        self.assertEqual((len(files), files.pending), (2, 2))
+        self.assertEqual(os.listdir(out), [])
+        self.assertTrue(attachment_available(loaded[0][1]))
+        self.assertEqual(content_digest(loaded[0][1]), self.blob(other)[len("blobs/"):])
+        self.assertEqual(os.listdir(out), [])  # Its hash comes from the blob's name
+
+        with open(local_path(loaded[0][1]), 'rb') as f:
+            self.assertEqual(f.read(), b"%PDF other bytes")
+        self.assertEqual(os.listdir(out), ["Evidence_1.pdf"])
+        self.assertEqual(files.pending, 1)
+
+        files.close()
+        self.assertFalse(attachment_available(loaded[0][0]))
+
+    def test_save_over_loaded_project(self):
+        """Test that saving over the archive files are still read from extracts them first"""
+        photo = self.attach("photo.jpg", b"\xff\xd8\xff" + os.urandom(4096))
+        alice = Person("Alice")
+        alice.files = [photo]
+        write_project(self.archive, {1: alice}, {}, {}, [])
+        rows, _ = self.read_back()
+        files = self.open_attachments(os.path.join(self.temp_dir, "loaded"))
+        loaded = Person("Alice")
+        loaded.files = [files.path(*rows[0][3][0])]
+
+        self.assertEqual(write_project(self.archive, {1: loaded}, {}, {}, []), 1)
+
+        self.assertEqual(files.pending, 0)
+        with zipfile.ZipFile(self.archive) as zipf, open(photo, 'rb') as f:
+            self.assertIsNone(zipf.testzip())
+            self.assertEqual(zipf.read(self.blob(photo)), f.read())
+
+    def test_older_projects(self):
+        """Test that per-person copies under files/ from older saves still read and extract"""
+        with zipfile.ZipFile(self.archive, 'w') as zipf:
+            zipf.writestr("data.csv", "ID,Name,DOB,Alias,Address,Phone,SSN,Email,X,Y,Color,Files,Type\r\n"
+                                      '1,Alice,,,,,,,0,0,0,"[""files/1_scan.pdf""]",person\r\n'
+                                      "CONNECTIONS\r\nFrom_ID,To_ID,Label\r\n")
+            zipf.writestr("files/1_scan.pdf", b"%PDF old")
+        rows, _ = self.read_back()
+        self.assertEqual(rows[0][3], [("files/1_scan.pdf", "1_scan.pdf")])
+        path = self.open_attachments(self.temp_dir).path(*rows[0][3][0])
+        self.assertEqual(path, os.path.join(self.temp_dir, "1_scan.pdf"))
+        # Not named by its hash, so hashing it extracts it
+        self.assertEqual(content_digest(path), hashlib.sha256(b"%PDF old").hexdigest())
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b"%PDF old")
+
+    def test_unique_name(self):
+        """Test that names are made unique against the set of names already used, ignoring case"""
+        used = set()
+        self.assertEqual(unique_name("scan.pdf", used), "scan.pdf")
+        self.assertEqual(unique_name("Scan.pdf", used), "Scan_1.pdf")
+        self.assertEqual(unique_name("scan.pdf", used), "scan_2.pdf")
+        self.assertEqual(used, {"scan.pdf", "scan_1.pdf", "scan_2.pdf"})
+
+    def test_compression_policy(self):
+        """Test that compressed formats are stored, found by extension or by their leading bytes"""
+        jpeg = self.attach("photo.jpg", os.urandom(1024))
+        renamed_png = self.attach("image.dat", b"\x89PNG\r\n\x1a\n" + os.urandom(1024))
+        video = self.attach("clip", b"\x00\x00\x00\x18ftypmp42" + os.urandom(1024))
+        text = self.attach("notes.txt", b"the shipment arrives on tuesday\n" * 1000)
+        self.assertEqual(compression_for(jpeg), zipfile.ZIP_STORED)
+        self.assertEqual(compression_for(renamed_png), zipfile.ZIP_STORED)
+        self.assertEqual(compression_for(video), zipfile.ZIP_STORED)
+        self.assertEqual(compression_for(text), zipfile.ZIP_DEFLATED)
+
+        alice = Person("Alice")
+        alice.files = [jpeg, renamed_png, video, text]
+        self.assertEqual(write_project(self.archive, {1: alice}, {}, {}, []), 4)
+
+        with zipfile.ZipFile(self.archive) as zipf:
+            self.assertIsNone(zipf.testzip())
+            types = {info.filename: info.compress_type for info in zipf.infolist()}
+            self.assertEqual(types, {"data.csv": zipfile.ZIP_DEFLATED,
+                                     self.blob(jpeg): zipfile.ZIP_STORED,
+                                     self.blob(renamed_png): zipfile.ZIP_STORED,
+                                     self.blob(video): zipfile.ZIP_STORED,
+                                     self.blob(text): zipfile.ZIP_DEFLATED})
+            self.assertLess(zipf.getinfo(self.blob(text)).compress_size, 1000)
+            for path in alice.files:
+                with open(path, 'rb') as f:
+                    self.assertEqual(zipf.read(self.blob(path)), f.read())
+
+    def test_many_deflated_files(self):
+        """Test that files prepared on the workers are all written, in order and intact"""
+        alice = Person("Alice")
+        alice.files = [self.attach(f"log{number}.txt", f"entry {number}\n".encode() * (number * 500 + 1))
+                       for number in range(30)]
+        self.assertEqual(write_project(self.archive, {1: alice}, {}, {}, []), 30)
+        rows, names = self.read_back()
+        self.assertEqual(names[1:], [path for path, _ in rows[0][3]])
+        with zipfile.ZipFile(self.archive) as zipf:
+            self.assertIsNone(zipf.testzip())
+            self.assertEqual(zipf.read(self.blob(alice.files[29])), b"entry 29\n" * 14501)
+
+    def test_resave_attachments_from_loaded_archive(self):
+        """Test that files still inside a loaded archive are saved into a new one that reads back intact"""
+        alice = Person("Alice")
+        alice.files = [self.attach("photo.jpg", b"\xff\xd8\xff" + os.urandom(50000)),
+                       self.attach("notes.txt", b"met at the docks\n" * 5000)]
+        write_project(self.archive, {1: alice}, {}, {}, [])
+        rows, _ = self.read_back()
+        files = self.open_attachments(os.path.join(self.temp_dir, "loaded"))
+        loaded = Person("Alice")
+        loaded.files = [files.path(*ref) for ref in rows[0][3]]
+        self.assertEqual(files.pending, 2)
+
+        copy = os.path.join(self.temp_dir, "copy.zip")
+        self.assertEqual(write_project(copy, {1: loaded}, {}, {}, []), 2)
+        with zipfile.ZipFile(self.archive) as before, zipfile.ZipFile(copy) as after:
+            self.assertIsNone(after.testzip())
+            for info in before.infolist():
+                self.assertEqual(after.read(info.filename), before.read(info.filename))
+                self.assertEqual(after.getinfo(info.filename).compress_type, info.compress_type)
+
+    def test_release_projects(self):
+        """Test that earlier projects are closed once only their extracted files are needed"""
+        notes, photo = self.attach("notes.txt", b"met at the docks"), self.attach("photo.jpg", b"\xff\xd8\xff jpeg")
+        alice = Person("Alice")
+        alice.files = [notes, photo]
+        write_project(self.archive, {1: alice}, {}, {}, [])
+        rows, _ = self.read_back()
+
+        earlier = self.open_attachments(os.path.join(self.temp_dir, "earlier"))
+        kept_notes, kept_photo = (earlier.path(*ref) for ref in rows[0][3])
+        current = self.open_attachments(os.path.join(self.temp_dir, "current"))
+        current_notes = current.path(*rows[0][3][0])
+
+        # The undo history could bring the photo back, so its project stays open
+        self.assertEqual(release_projects({kept_notes}, {kept_photo}, keep=(current,)), 0)
+        self.assertTrue(os.path.exists(kept_notes))
+        self.assertTrue(earlier.holds(kept_photo))
+
+        # Once nothing needs it, it is closed; files on the board were extracted already
+        self.assertEqual(release_projects({kept_notes}, keep=(current,)), 1)
+        self.assertFalse(attachment_available(kept_photo))
+        with open(local_path(kept_notes), 'rb') as f:
+            self.assertEqual(f.read(), b"met at the docks")
+        self.assertTrue(attachment_available(current_notes))
+
+    def test_copied_files_survive_loading_another_project(self):
+        """Test that people copied from a project keep their files when pasted into the next one and saved"""
+        photo = self.attach("photo.jpg", b"\xff\xd8\xff jpeg")
+        alice = Person("Alice")
+        alice.files = [photo]
+        write_project(self.archive, {1: alice}, {}, {}, [])
+        rows, _ = self.read_back()
+        earlier = self.open_attachments(os.path.join(self.temp_dir, "earlier"))
+        store = GraphStore()
+        copied = Person("Alice")
+        copied.files = [earlier.path(*rows[0][3][0])]
+        data = copy_subgraph(store, [store.add(copied)])
+
+        # Loading the next project clears the board; only the clipboard still refers to the photo
+        current = self.open_attachments(os.path.join(self.temp_dir, "current"))
+        self.assertEqual(release_projects(set(), clipboard_files(data), keep=(current,)), 0)
+        pasted = GraphStore()
+        pasted_id = paste_subgraph(pasted, data, 0, 0)[0]
+        saved = os.path.join(self.temp_dir, "next.zip")
+        self.assertEqual(write_project(saved, pasted.people, {}, {}, []), 1)
+        with zipfile.ZipFile(saved) as zipf:
+            self.assertEqual(zipf.read(self.blob(photo)), b"\xff\xd8\xff jpeg")
+        self.assertEqual(len(pasted[pasted_id].files), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Test script for the render backends
+Uses the recording backend to count draw operations without a display
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard, LegendCard
+from src.canvas_helpers import CanvasHelpers
+from src.graph_store import GraphStore
+from src.geometry_index import GeometryIndex
+from src.render_backend import RenderBackend, RecordingBackend, PILBackend, PIL_AVAILABLE
+import unittest
+
+def make_app():
+    """Build the minimal application state CanvasHelpers needs"""
+    store = GraphStore()
+    app = SimpleNamespace(
+        store=store, people=store.people, textboxes=store.textboxes, legends=store.legends,
+        person_widgets={}, textbox_widgets={}, legend_widgets={},
+        connection_lines={}, original_font_sizes={}, original_image_sizes={},
+        image_cache={}, scaled_image_cache={}, base_image_cache={},
+        fixed_canvas_width=400, fixed_canvas_height=400,
+    )
+    app.events = SimpleNamespace(dragging=False, connecting=False, connection_start=None, last_zoom=1.0)
+    return app
+
+class TestRenderBackend(unittest.TestCase):
+    """Test cases for drawing through the render backend interface"""
+
+    def setUp(self):
+        self.app = make_app()
+        self.helpers = CanvasHelpers(self.app)
+        self.backend = RecordingBackend()
+        self.helpers.backend = self.backend
+
+    def test_person_widget_draw_calls(self):
+        """Test the draw operations issued for a person card"""
+        self.app.store.add(Person("John Doe", "1990-01-01", "Johnny", "123 Main St", "555-0123"), 1)
+        self.backend.begin_frame()
+        self.helpers.create_person_widget(1)
+        counts = self.backend.end_frame()
+        # 3 shadows + card + header, avatar, icon/name and two texts per detail row
+        self.assertEqual(counts['rectangle'], 5)
+        self.assertEqual(counts['oval'], 1)
+        self.assertEqual(counts['text'], 2 + 2 * 4)
+        self.assertEqual(len(self.app.person_widgets[1]), sum(counts.values()))
+
+    def test_textbox_and_legend_draw_calls(self):
+        """Test the draw operations issued for textbox and legend cards"""
+        self.app.store.add(TextboxCard("Notes", "line one\nline two"), 2)
+        self.app.store.add(LegendCard("Legend", {"0": "Suspect", "1": "Witness"}), 3)
+        self.backend.begin_frame()
+        self.helpers.create_textbox_widget(2)
+        self.helpers.create_legend_widget(3)
+        counts = self.backend.end_frame()
+        self.assertEqual(counts['rectangle'], 5 + 5 + 2)
+        self.assertEqual(counts['text'], 2 + 2 + 1 + 2)
+
+    def test_connection_draw_calls(self):
+        """Test that a labelled connection draws two lines, a label and its background"""
+        self.app.store.add(Person("A"), 1)
+        self.app.store.add(Person("B"), 2)
+        self.backend.begin_frame()
+        self.helpers.draw_connection(1, 2, "knows")
+        counts = self.backend.end_frame()
+        self.assertEqual(counts, {'line': 2, 'text': 1, 'rectangle': 1})
+        self.assertIn((1, 2), self.app.connection_lines)
+
+    def test_legend_connections_are_drawn(self):
+        """Test that edges to legend cards are redrawn with the rest"""
+        person_id = self.app.store.add(Person("A"))
+        legend_id = self.app.store.add(LegendCard("Legend"))
+        textbox_id = self.app.store.add(TextboxCard("Notes"))
+        self.app.store.connect(person_id, legend_id, "key")
+        self.app.store.connect(textbox_id, legend_id, "")
+        self.helpers.update_connections()
+        self.assertEqual(set(self.app.connection_lines), {(1, 2), (2, 3)})
+
+    def test_zoomed_connections_use_geometry_index(self):
+        """Test that redrawing every connection takes its scaled endpoints from the geometry index"""
+        store = self.app.store
+        self.app.geometry = GeometryIndex(store, self.helpers.layout)
+        first, second = store.add(Person("A")), store.add(Person("B"))
+        store.move(first, 100, 40)
+        store.move(second, 300, 240)
+        store.connect(first, second, "")
+        self.app.events.last_zoom = 0.5
+        self.backend.begin_frame()
+        self.helpers.update_connections()
+        self.assertEqual(self.backend.ops('line')[0][0], (50.0, 20.0, 150.0, 120.0))
+
+    def test_canvas_follows_store_events(self):
+        """Test that store changes redraw only the affected card and connections"""
+        store = self.app.store
+        store.subscribe(self.helpers.on_store_event)
+        person_id = store.add(Person("A"))
+        other_id = store.add(Person("B"))
+        textbox_id = store.add(TextboxCard("Notes"))
+        store.connect(person_id, other_id, "knows")
+        store.connect(other_id, textbox_id, "")
+        self.assertEqual(set(self.app.connection_lines), {(1, 2), (2, 3)})
+
+        # Moving a card shifts its items and redraws only its own connections
+        self.backend.begin_frame()
+        store.move(textbox_id, 30, 40)
+        moves = self.backend.ops('move')
+        self.assertEqual(len(moves), len(self.app.textbox_widgets[textbox_id]))
+        self.assertEqual(moves[0][0][1:], (30, 40))
+        self.assertEqual(self.backend.counts(), {'line': 2})
+
+        # Editing a card redraws its widget without touching connections
+        self.backend.begin_frame()
+        store.update(person_id, name="Alice")
+        self.assertEqual(self.backend.counts()['line'], 0)
+        self.assertTrue(self.backend.ops('delete'))
+
+        # Removing a card deletes its widget and its connection lines
+        store.remove(other_id)
+        self.assertNotIn(other_id, self.app.person_widgets)
+        self.assertEqual(self.app.connection_lines, {})
+
+    def test_batch_renders_once(self):
+        """Test that a bulk import draws each card and line once and restacks cards once"""
+        store = self.app.store
+        store.subscribe(self.helpers.on_store_event)
+        self.backend.begin_frame()
+        with store.batch():
+            ids = [store.add(TextboxCard(f"Note {i}")) for i in range(50)]
+            for card_id in ids[1:]:
+                store.connect(ids[0], card_id, "")
+                store.move(card_id, card_id * 10, 0)
+            store.remove(ids[-1])
+        counts = self.backend.counts()
+        self.assertEqual(len(self.app.textbox_widgets), 49)
+        self.assertEqual(len(self.app.connection_lines), 48)
+        # Five rectangles per textbox card, plus two lines per connection
+        self.assertEqual(counts['rectangle'], 5 * 49)
+        self.assertEqual(counts['line'], 2 * 48)
+        raises = [args for args, _ in self.backend.ops('raise') if args[0] == "person"]
+        self.assertEqual(len(raises), 1)
+
+    def test_bulk_delete_clears_canvas_in_one_call(self):
+        """Test that removing many cards deletes all their items and lines with one backend call"""
+        store = self.app.store
+        store.subscribe(self.helpers.on_store_event)
+        with store.batch():
+            ids = [store.add(Person(f"P{i}")) for i in range(100)]
+            for id1, id2 in zip(ids, ids[1:]):
+                store.connect(id1, id2, "next")
+        doomed = ids[::2]
+        self.assertEqual(len(store.edges_touching(doomed)), 99)
+        self.backend.begin_frame()
+        store.remove_many(doomed)
+        deletes = self.backend.ops('delete')
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(len(self.app.person_widgets), 50)
+        self.assertEqual(self.app.connection_lines, {})
+        self.assertEqual(self.backend.draw_calls, 0)
+
+    def test_incomplete_backend_is_refused(self):
+        """Test that a backend missing a primitive fails when created, not while painting"""
+        class LinesOnly(RenderBackend):
+            def line(self, x1, y1, x2, y2, fill, width=1, tags=(), dash=None):
+                return 1
+        with self.assertRaises(TypeError):
+            LinesOnly()
+
+    def test_recorded_image_box_follows_anchor(self):
+        """Test that recorded images are placed by their anchor"""
+        image = SimpleNamespace(width=40, height=20)
+        self.assertEqual(self.backend.bbox(self.backend.image(100, 100, image)), (80, 90, 120, 110))
+        self.assertEqual(self.backend.bbox(self.backend.image(100, 100, image, anchor='nw')), (100, 100, 140, 120))
+        self.assertEqual(self.backend.bbox(self.backend.image(100, 100, image, anchor='se')), (60, 80, 100, 100))
+
+    @unittest.skipUnless(PIL_AVAILABLE, "Pillow is not installed")
+    def test_pil_backend_draws_pixels(self):
+        """Test that the PIL backend renders onto an image"""
+        from PIL import Image
+        image = Image.new('RGB', (100, 100), '#ffffff')
+        backend = PILBackend(image)
+        backend.rectangle(10, 10, 50, 50, fill='#ff0000', outline='', width=0)
+        self.assertEqual(image.getpixel((30, 30)), (255, 0, 0))
+        width, height = backend.measure_text("Hello", ("Arial", 12))
+        self.assertGreater(width, 0)
+        self.assertGreater(height, 0)
+
+def run_tests():
+    """Run all tests"""
+    print("Running render backend tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
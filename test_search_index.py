@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the full-text search index
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard, LegendCard
+from src.graph_store import GraphStore
+from src.search_index import BUILD_STEP, SearchIndex, edit_variants
+import unittest
+
+class TestSearchIndex(unittest.TestCase):
+    """Test cases for searching cards and connection labels"""
+
+    def setUp(self):
+        self.store = GraphStore()
+        self.index = SearchIndex(self.store)
+        self.alice = self.store.add(Person("Alice Johnson", dob="1990-01-01", address="12 Main St", phone="(555) 010-2030"))
+        self.bob = self.store.add(Person("Bob Stone", alias="Bobby", email="bob@example.com"))
+        self.notes = self.store.add(TextboxCard("Meeting notes", "Saw Alice near the harbour"))
+        self.legend = self.store.add(LegendCard("Legend", {"0": "Suspect", "1": "Witness"}))
+        self.store.connect(self.alice, self.bob, "business partner")
+
+    def test_exact_prefix_and_fuzzy(self):
+        """Test whole words, prefixes while typing, and single typos"""
+        self.assertEqual(self.index.search("alice")[:2], [self.alice, self.notes])
+        self.assertEqual(self.index.search("johns"), [self.alice])
+        self.assertEqual(self.index.search("bob@example"), [self.bob])
+        self.assertEqual(self.index.search("5550102030"), [self.alice])
+        self.assertEqual(self.index.search("witness"), [self.legend])
+        self.assertEqual(self.index.search("harbor"), [self.notes])
+        self.assertEqual(self.index.search("harbor", fuzzy=False), [])
+        # Every word must match, and exact matches rank first
+        self.assertEqual(self.index.search("main alice"), [self.alice])
+        self.assertEqual(self.index.search("Stone"), [self.bob])
+
+    def test_connection_labels(self):
+        """Test that connection labels are found by their edge key"""
+        self.assertEqual(self.index.search("partner"), [(self.alice, self.bob)])
+        self.store.connect(self.alice, self.bob, "cousin")
+        self.assertEqual(self.index.search("partner"), [])
+        self.assertEqual(self.index.search("cousin"), [(self.alice, self.bob)])
+        self.store.disconnect(self.alice, self.bob)
+        self.assertEqual(self.index.search("cousin"), [])
+
+    def test_incremental_updates(self):
+        """Test that edits, removals, batches and clears keep the index current"""
+        self.store.update(self.bob, name="Robert Stone")
+        self.assertEqual(self.index.search("bob stone"), [self.bob])  # Still found by alias and email
+        self.assertEqual(self.index.search("robert"), [self.bob])
+        self.store.update(self.bob, alias="", email="")
+        self.assertEqual(self.index.search("bobby"), [])
+
+        with self.store.batch():
+            new_id = self.store.add(TextboxCard("Draft"))
+            self.store.update(new_id, content="zeppelin sighting")
+            self.store.remove(self.notes)
+        self.assertEqual(self.index.search("zeppelin"), [new_id])
+        self.assertEqual(self.index.search("harbour"), [])
+
+        self.store.clear()
+        self.assertEqual(self.index.search("alice"), [])
+        self.store.add(Person("Carol"))
+        self.assertEqual(len(self.index.search("carol")), 1)
+
+    def test_words_that_return_are_listed_once(self):
+        """Test that a word removed and added again appears once in the vocabulary"""
+        for _ in range(3):
+            self.store.update(self.notes, content="zebra")
+            self.store.update(self.notes, content="")
+        self.store.update(self.notes, content="zebra")
+        self.assertEqual(self.index._vocabulary.count("zebra"), 1)
+        self.assertEqual(self.index._vocabulary, sorted(set(self.index._vocabulary)))
+        self.assertEqual(self.index.search("zeb"), [self.notes])
+
+    def test_large_changes_are_indexed_in_steps(self):
+        """Test that a load is indexed in scheduled steps while searches and small edits go on"""
+        steps = []
+        index = SearchIndex(self.store, schedule=steps.append)
+        self.assertEqual((index.pending, steps), (0, []))  # A few cards are indexed at once
+        with self.store.batch():
+            loaded = [self.store.add(Person(f"Loaded {i}")) for i in range(2 * BUILD_STEP + 1)]
+        self.assertEqual((index.pending, len(steps)), (len(loaded), 1))
+        self.assertEqual(index.search("loaded"), [])  # Searching does not build
+        edited = self.store.add(Person("Zelda Loaded"))
+        self.assertEqual(index.search("zelda"), [edited])
+
+        steps.pop()()
+        self.assertLess(index.pending, len(loaded))
+        self.assertEqual(len(steps), 1)
+        self.assertEqual(len(index.search("loaded", limit=10000)), len(loaded) - index.pending + 1)
+        while steps:
+            steps.pop()()
+        self.assertEqual(index.pending, 0)
+        self.assertEqual(len(index.search("loaded", limit=10000)), len(loaded) + 1)
+        self.assertEqual(index._vocabulary, sorted(set(index._vocabulary)))
+
+    def test_filters_see_every_card(self):
+        """Test that a word lookup for filters indexes whatever is still waiting"""
+        index = SearchIndex(self.store, schedule=lambda step: None)
+        with self.store.batch():
+            for i in range(BUILD_STEP + 1):
+                self.store.add(TextboxCard(f"Ledger {i}"))
+        self.assertEqual(len(index.documents_with("ledger")), BUILD_STEP + 1)
+        self.assertEqual(index.pending, 0)
+
+    def test_edit_variants(self):
+        """Test the one-edit neighborhood used for typos"""
+        variants = edit_variants("cat")
+        for word in ("at", "act", "cut", "cart", "cats"):
+            self.assertIn(word, variants)
+        self.assertNotIn("cat", variants)
+        self.assertNotIn("dog", variants)
+
+def run_tests():
+    """Run all tests"""
+    print("Running search index tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for the undo/redo journal
+Checks edits, drag coalescing, deletes with their connections and memory use
+"""
+
+import sys
+import os
+import tracemalloc
+from types import SimpleNamespace
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.models import Person, TextboxCard
+from src.graph_store import GraphStore
+from src.undo import UndoJournal
+import unittest
+
+class TestUndoJournal(unittest.TestCase):
+    """Test cases for the delta-based undo journal"""
+
+    def setUp(self):
+        self.store = GraphStore()
+        self.journal = UndoJournal(SimpleNamespace(store=self.store))
+        self.person_id = self.store.add(Person("John"))
+        self.textbox_id = self.store.add(TextboxCard("Notes"))
+
+    def test_undo_redo_edit(self):
+        """Test that field edits and relabels undo and redo"""
+        self.store.update(self.person_id, name="Johnny", phone="555")
+        self.store.connect(self.person_id, self.textbox_id, "wrote")
+        self.store.connect(self.person_id, self.textbox_id, "edited")
+        self.assertTrue(self.journal.undo())
+        self.assertEqual(self.store.edge_label(1, 2), "wrote")
+        self.assertTrue(self.journal.undo())
+        self.assertFalse(self.store.has_edge(1, 2))
+        self.assertTrue(self.journal.undo())
+        self.assertEqual((self.store[1].name, self.store[1].phone), ("John", ""))
+        self.assertTrue(self.journal.redo())
+        self.assertEqual(self.store[1].name, "Johnny")
+        # A new change drops the redo history
+        self.store.move(self.person_id, 5, 5)
+        self.assertFalse(self.journal.can_redo())
+
+    def test_drag_is_one_step(self):
+        """Test that consecutive moves of one card coalesce until the gesture is sealed"""
+        for step in range(1, 20):
+            self.store.move(self.person_id, step, step * 2)
+        self.journal.seal()
+        self.store.move(self.person_id, 100, 100)
+        self.journal.undo()
+        self.assertEqual((self.store[1].x, self.store[1].y), (19, 38))
+        self.journal.undo()
+        self.assertEqual((self.store[1].x, self.store[1].y), (0, 0))
+
+    def test_delete_restores_connections(self):
+        """Test that undoing a delete brings back the card and its connections"""
+        other_id = self.store.add(Person("Jane"))
+        self.store.connect(self.person_id, self.textbox_id, "wrote")
+        self.store.connect(self.person_id, other_id, "sister")
+        removed = self.store.remove(self.person_id)
+        self.journal.undo()
+        self.assertIs(self.store[self.person_id], removed)
+        self.assertEqual(self.store[self.person_id].connections, {2: "wrote", 3: "sister"})
+        self.journal.redo()
+        self.assertNotIn(self.person_id, self.store)
+        self.assertEqual(self.store.edge_count(), 0)
+
+    def test_clear_and_batch_are_single_steps(self):
+        """Test that bulk operations undo as one step"""
+        with self.store.batch():
+            ids = [self.store.add(Person(f"P{i}")) for i in range(10)]
+            for card_id in ids[1:]:
+                self.store.connect(ids[0], card_id, "")
+        self.store.clear()
+        self.journal.undo()
+        self.assertEqual(len(self.store), 12)
+        self.assertEqual(self.store.edge_count(), 9)
+        self.journal.undo()
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.next_id, 13)
+
+    def test_held_files(self):
+        """Test that files of cards the history can bring back are reported"""
+        self.assertEqual(self.journal.held_files(), set())
+        self.store.update(self.person_id, files=["a.txt"])
+        self.assertEqual(self.journal.held_files(), {"a.txt"})
+        person = Person("Jane")
+        person.files = ["b.jpg"]
+        jane = self.store.add(person)
+        self.store.remove(jane)
+        self.store.clear()
+        self.assertEqual(self.journal.held_files(), {"a.txt", "b.jpg"})
+        self.journal.clear()
+        self.assertEqual(self.journal.held_files(), set())
+
+    def test_edit_memory_is_small(self):
+        """Test that journal entries stay far below 1 KB per edit on a large network"""
+        with self.store.batch():
+            for i in range(20000):
+                self.store.add(Person(f"P{i}"))
+        self.journal.clear()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(100):
+            self.store.update(3 + i, phone=f"555-{i:04d}")
+            self.store.move(3 + i, i + 1, i + 1)
+            self.journal.seal()
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        self.assertEqual(len(self.journal), 200)
+        self.assertLess(used / 200, 1024)
+
+def run_tests():
+    """Run all tests"""
+    print("Running undo journal tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the pan/zoom animation helpers
+These tests cover the display-independent parts of the animation loop
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.view_animation import FrameStats, KineticPan, BudgetedTaskQueue, ease_zoom
+import unittest
+
+class TestViewAnimation(unittest.TestCase):
+    """Test cases for frame stats, kinetic panning and deferred work"""
+
+    def test_frame_stats(self):
+        """Test frame statistics summary"""
+        stats = FrameStats(budget_ms=10)
+        for duration in [5, 5, 5, 20]:
+            stats.record(duration)
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot['frames'], 4)
+        self.assertEqual(snapshot['over_budget'], 1)
+        self.assertEqual(snapshot['max_ms'], 20)
+        self.assertAlmostEqual(snapshot['mean_ms'], 8.75)
+
+    def test_kinetic_pan_decays_to_stop(self):
+        """Test that a fast release glides and eventually stops"""
+        pan = KineticPan()
+        pan.press(0, 0, 0.0)
+        pan.drag(50, 0, 0.05)
+        self.assertTrue(pan.release(0.06))
+        travelled = 0
+        for _ in range(200):
+            dx, dy = pan.step(0.016)
+            travelled += dx
+            if not pan.active:
+                break
+        self.assertFalse(pan.active)
+        # Total glide distance approaches v * tau
+        self.assertAlmostEqual(travelled, 1000 * pan.friction_tau, delta=25)
+
+    def test_kinetic_pan_pause_before_release(self):
+        """Test that pausing before release cancels momentum"""
+        pan = KineticPan()
+        pan.press(0, 0, 0.0)
+        pan.drag(50, 0, 0.05)
+        self.assertFalse(pan.release(0.5))
+        self.assertEqual(pan.step(0.016), (0, 0))
+
+    def test_ease_zoom_converges(self):
+        """Test that zoom easing reaches the target"""
+        zoom = 1.0
+        for _ in range(100):
+            zoom = ease_zoom(zoom, 0.5, 0.016)
+        self.assertEqual(zoom, 0.5)
+
+    def test_budgeted_queue_slices_work(self):
+        """Test that tasks are resumed across frames and replaced by key"""
+        done = []
+
+        def task(name):
+            for i in range(3):
+                done.append((name, i))
+                yield
+
+        queue = BudgetedTaskQueue()
+        queue.add("a", task("first"))
+        queue.add("a", task("second"))
+        ticks = iter(range(1000))
+        clock = lambda: next(ticks)  # Every step exhausts the budget
+        while queue.run(0.5, clock=clock):
+            pass
+        self.assertEqual(done, [("second", 0), ("second", 1), ("second", 2)])
+
+def run_tests():
+    """Run all tests"""
+    print("Running view animation tests...")
+    unittest.main(verbosity=2, exit=False)
+
+if __name__ == "__main__":
+    run_tests()
+    print("\n✅ All tests completed!")